@@ -0,0 +1,7 @@
+"""
+Merlya benchmarks.
+
+Load and throughput benchmarks run against in-process test servers.
+They are not shipped in the wheel; run them from a source checkout,
+e.g. `python -m benchmarks.ssh_pool --help`.
+"""
@@ -0,0 +1,494 @@
+"""
+Merlya benchmarks - SSHPool load and throughput.
+
+Drives SSHPool against an in-process fleet (see benchmarks.ssh_server)
+and reports throughput, latency percentiles and how many connections
+and handshakes the fleet saw. Results are printed (or written) as JSON
+so runs can be compared across versions:
+
+    python -m benchmarks.ssh_pool --scenario execute --hosts 200 -o new.json
+    python -m benchmarks.ssh_pool --scenario execute --hosts 200 --compare old.json
+
+Scenarios:
+- execute: `commands` SSHPool.execute() calls per host.
+- fanout: `commands` rounds of SSHPool.execute_many() over the fleet.
+- health: `commands` rounds of the health_summary tool over the inventory.
+- scan: `commands` rounds of a parallel `/scan --quick` over the inventory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import asyncssh
+from loguru import logger
+
+from benchmarks.ssh_server import BenchSSHServer, ServerOptions
+from merlya.ssh.pool import SSHExecuteOptions, SSHPool
+from merlya.ssh.pool_fanout_mixin import FanoutOptions, SSHTarget
+from merlya.ssh.types import SSHConnectionOptions
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from benchmarks.ssh_server import SimulatedHost
+    from merlya.core.context import SharedContext
+
+SCENARIOS = ("execute", "fanout", "health", "scan")
+BENCH_USERNAME = "bench"
+
+
+@dataclass
+class BenchmarkConfig:
+    """What to run and against which fleet."""
+
+    scenario: str = "execute"
+    hosts: int = 10
+    commands: int = 20  # Commands per host (execute) or rounds (other scenarios)
+    concurrency: int = 100  # Commands in flight across the fleet
+    command: str = "uptime"
+    max_connections: int = SSHPool.DEFAULT_MAX_CONNECTIONS
+    max_retries: int = SSHPool.DEFAULT_MAX_RETRIES
+    timeout: int = 60
+    server: ServerOptions = field(default_factory=ServerOptions)
+
+
+@dataclass
+class BenchmarkResult:
+    """Outcome of one benchmark run."""
+
+    scenario: str
+    hosts: int
+    operations: int
+    errors: int
+    duration_s: float
+    ops_per_s: float
+    latency_ms: dict[str, float]
+    server: dict[str, int]
+    pool: dict[str, Any]
+    error_samples: dict[str, int]
+    config: dict[str, Any]
+    environment: dict[str, str]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Result as a JSON-ready dict."""
+        return asdict(self)
+
+
+class _Recorder:
+    """Latency samples and errors of a run."""
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.operations = 0
+        self.errors: Counter[str] = Counter()
+
+    def success(self, seconds: float, count: int = 1) -> None:
+        self.latencies.append(seconds)
+        self.operations += count
+
+    def failure(self, error: str, count: int = 1) -> None:
+        self.operations += count
+        self.errors[error[:80]] += count
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a sample (0 for an empty sample)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency_summary(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    return {
+        "p50": round(percentile(samples, 50) * 1000, 3),
+        "p90": round(percentile(samples, 90) * 1000, 3),
+        "p99": round(percentile(samples, 99) * 1000, 3),
+        "max": round(max(samples) * 1000, 3),
+        "mean": round(sum(samples) / len(samples) * 1000, 3),
+    }
+
+
+def _exec_options(host: SimulatedHost, timeout: int) -> SSHExecuteOptions:
+    return SSHExecuteOptions(
+        timeout=timeout,
+        username=BENCH_USERNAME,
+        options=SSHConnectionOptions(port=host.port),
+        host_name=host.name,
+    )
+
+
+# =============================================================================
+# Scenarios
+# =============================================================================
+
+
+async def _bench_execute(
+    pool: SSHPool, hosts: list[SimulatedHost], config: BenchmarkConfig, rec: _Recorder
+) -> None:
+    """`commands` execute() calls per host, at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(config.concurrency)
+
+    async def run(host: SimulatedHost) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await pool.execute(
+                    host.address, config.command, _exec_options(host, config.timeout)
+                )
+            except Exception as e:
+                rec.failure(f"{type(e).__name__}: {e}")
+                return
+            if result.exit_code != 0:
+                rec.failure(f"exit {result.exit_code}")
+            else:
+                rec.success(time.perf_counter() - started)
+
+    # Interleave hosts so every host is busy from the start
+    await asyncio.gather(*(run(host) for _ in range(config.commands) for host in hosts))
+
+
+async def _bench_fanout(
+    pool: SSHPool, hosts: list[SimulatedHost], config: BenchmarkConfig, rec: _Recorder
+) -> None:
+    """`commands` execute_many() rounds; latency is time to each host's result."""
+    targets = [
+        SSHTarget(host.address, _exec_options(host, config.timeout), host.name) for host in hosts
+    ]
+    fanout = FanoutOptions(max_concurrency=config.concurrency)
+    for _ in range(config.commands):
+        started = time.perf_counter()
+        async for _name, outcome in pool.execute_many(targets, config.command, fanout=fanout):
+            if isinstance(outcome, Exception):
+                rec.failure(f"{type(outcome).__name__}: {outcome}")
+            elif outcome.exit_code != 0:
+                rec.failure(f"exit {outcome.exit_code}")
+            else:
+                rec.success(time.perf_counter() - started)
+
+
+async def _bench_health(
+    ctx: SharedContext, hosts: list[SimulatedHost], config: BenchmarkConfig, rec: _Recorder
+) -> None:
+    """`commands` health_summary() rounds; latency is the round duration."""
+    from merlya.tools.system.health import health_summary
+
+    for _ in range(config.commands):
+        started = time.perf_counter()
+        result = await health_summary(ctx, timeout_per_host=config.timeout)
+        elapsed = time.perf_counter() - started
+        summary = (result.data or {}).get("summary", {})
+        unreachable = summary.get("unreachable", len(hosts))
+        if unreachable:
+            rec.failure("host unreachable", unreachable)
+        if unreachable < len(hosts):
+            rec.success(elapsed, len(hosts) - unreachable)
+
+
+async def _bench_scan(
+    ctx: SharedContext, hosts: list[SimulatedHost], config: BenchmarkConfig, rec: _Recorder
+) -> None:
+    """`commands` parallel quick-scan rounds (bypassing the scan cache); latency is the round duration."""
+    from merlya.commands.handlers.scan_format import parse_scan_options
+    from merlya.commands.handlers.system import _scan_hosts_parallel
+
+    names = [host.name for host in hosts]
+    for _ in range(config.commands):
+        started = time.perf_counter()
+        result = await _scan_hosts_parallel(ctx, names, parse_scan_options(["--quick", "--fresh"]))
+        elapsed = time.perf_counter() - started
+        failed = result.message.count("❌ `")
+        if failed:
+            rec.failure("scan failed", failed)
+        if failed < len(hosts):
+            rec.success(elapsed, len(hosts) - failed)
+
+
+async def _inventory_context(
+    pool: SSHPool, hosts: list[SimulatedHost], workdir: Path
+) -> SharedContext:
+    """A SharedContext whose inventory is the simulated fleet."""
+    from merlya.config import Config
+    from merlya.core.context import SharedContext
+    from merlya.i18n import get_i18n
+    from merlya.persistence import ConversationRepository, HostRepository, VariableRepository
+    from merlya.persistence.database import Database
+    from merlya.persistence.models import Host
+    from merlya.secrets import get_secret_store
+
+    config = Config()
+    config.ssh.result_cache = False  # Every round must reach the hosts
+    ctx = SharedContext(
+        config=config,
+        i18n=get_i18n("en"),
+        secrets=get_secret_store(),
+        auto_confirm=True,
+        quiet=True,
+    )
+    db = Database(workdir / "bench.db")
+    await db.connect()
+    ctx._db = db
+    ctx._host_repo = HostRepository(db)
+    ctx._var_repo = VariableRepository(db)
+    ctx._conv_repo = ConversationRepository(db)
+    ctx._ssh_pool = pool
+
+    for host in hosts:
+        await ctx.hosts.create(
+            Host(name=host.name, hostname=host.address, port=host.port, username=BENCH_USERNAME)
+        )
+    return ctx
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+
+async def run_benchmark(config: BenchmarkConfig) -> BenchmarkResult:
+    """
+    Run one benchmark scenario against a fresh fleet and pool.
+
+    Args:
+        config: Scenario, fleet size and server behaviour.
+
+    Returns:
+        Throughput, latency and connection counters of the run.
+    """
+    if config.scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario '{config.scenario}' (expected one of {SCENARIOS})")
+    if config.hosts < 1 or config.commands < 1 or config.concurrency < 1:
+        raise ValueError("hosts, commands and concurrency must be >= 1")
+
+    rec = _Recorder()
+    pool = SSHPool(max_connections=config.max_connections, max_retries=config.max_retries)
+    pool.retry_delay = 0.05  # Keep injected failures from dominating the run
+    ctx: SharedContext | None = None
+
+    async with BenchSSHServer(config.hosts, config.server) as server:
+        scenarios: dict[str, Callable[[], Awaitable[None]]] = {
+            "execute": lambda: _bench_execute(pool, server.hosts, config, rec),
+            "fanout": lambda: _bench_fanout(pool, server.hosts, config, rec),
+        }
+        with tempfile.TemporaryDirectory(prefix="merlya-bench-") as workdir:
+            if config.scenario in ("health", "scan"):
+                ctx = await _inventory_context(pool, server.hosts, Path(workdir))
+                scenarios["health"] = lambda: _bench_health(ctx, server.hosts, config, rec)
+                scenarios["scan"] = lambda: _bench_scan(ctx, server.hosts, config, rec)
+
+            started = time.perf_counter()
+            try:
+                await scenarios[config.scenario]()
+            finally:
+                duration = time.perf_counter() - started
+                pool_stats: dict[str, Any] = {
+                    **pool.get_registry_stats(),
+                    "open_circuits": sum(
+                        1
+                        for host in server.hosts
+                        if not pool._get_circuit_breaker(host.address).can_execute()
+                    ),
+                    "channel_limits": dict(Counter(pool.get_channel_limits().values())),
+                }
+                await pool.disconnect_all()
+                if ctx is not None:
+                    await ctx.db.close()
+
+        server_stats = server.stats.as_dict()
+        shared_address = server.shared_address
+
+    return BenchmarkResult(
+        scenario=config.scenario,
+        hosts=config.hosts,
+        operations=rec.operations,
+        errors=sum(rec.errors.values()),
+        duration_s=round(duration, 3),
+        ops_per_s=round(rec.operations / duration, 2) if duration else 0.0,
+        latency_ms=_latency_summary(rec.latencies),
+        server=server_stats,
+        pool=pool_stats,
+        error_samples=dict(rec.errors.most_common(5)),
+        config={**asdict(config), "shared_address": shared_address},
+        environment=_environment(),
+    )
+
+
+def _environment() -> dict[str, str]:
+    from merlya import __version__
+
+    return {
+        "merlya": __version__,
+        "asyncssh": asyncssh.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+    }
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any]) -> dict[str, Any]:
+    """
+    Compare two exported results.
+
+    Args:
+        baseline: Result exported by an earlier run.
+        current: Result of this run.
+
+    Returns:
+        Per-metric baseline, current value and relative change.
+    """
+    metrics = {
+        "ops_per_s": (baseline.get("ops_per_s", 0), current["ops_per_s"]),
+        "errors": (baseline.get("errors", 0), current["errors"]),
+        "handshakes": (
+            baseline.get("server", {}).get("handshakes", 0),
+            current["server"]["handshakes"],
+        ),
+    }
+    for name in ("p50", "p99"):
+        metrics[f"{name}_ms"] = (
+            baseline.get("latency_ms", {}).get(name, 0),
+            current["latency_ms"][name],
+        )
+    return {
+        name: {
+            "baseline": before,
+            "current": after,
+            "change_pct": round((after - before) / before * 100, 1) if before else None,
+        }
+        for name, (before, after) in metrics.items()
+    }
+
+
+def _raise_fd_limit() -> None:
+    """Allow one socket per client and server side of every simulated host."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and (hard == resource.RLIM_INFINITY or soft < hard):
+        target = hard if hard != resource.RLIM_INFINITY else max(soft, 65536)
+        with contextlib.suppress(ValueError, OSError):
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the benchmark argument parser."""
+    defaults = BenchmarkConfig()
+    server = ServerOptions()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.ssh_pool",
+        description="Benchmark SSHPool against an in-process SSH fleet.",
+    )
+    parser.add_argument("--scenario", choices=SCENARIOS, default=defaults.scenario)
+    parser.add_argument("--hosts", type=int, default=defaults.hosts, help="Simulated hosts")
+    parser.add_argument(
+        "--commands",
+        type=int,
+        default=defaults.commands,
+        help="Commands per host (execute) or rounds (fanout, health, scan)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=defaults.concurrency, help="Commands in flight"
+    )
+    parser.add_argument("--command", default=defaults.command, help="Command to run")
+    parser.add_argument("--max-connections", type=int, default=defaults.max_connections)
+    parser.add_argument("--max-retries", type=int, default=defaults.max_retries)
+    parser.add_argument("--timeout", type=int, default=defaults.timeout)
+    parser.add_argument(
+        "--latency", type=float, default=server.command_latency, help="Seconds per command"
+    )
+    parser.add_argument(
+        "--handshake-latency",
+        type=float,
+        default=server.handshake_latency,
+        help="Seconds per handshake",
+    )
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=server.max_sessions,
+        help="Channels per connection (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--refuse-rate", type=float, default=0.0, help="Share of connections refused"
+    )
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="Share of commands dropping the connection"
+    )
+    parser.add_argument(
+        "--shell",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Run commands with /bin/sh (default: only for health and scan)",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Failure injection seed")
+    parser.add_argument("-o", "--output", type=Path, help="Write the JSON result to a file")
+    parser.add_argument("--compare", type=Path, help="Compare with an exported result")
+    return parser
+
+
+def config_from_args(args: argparse.Namespace) -> BenchmarkConfig:
+    """Build a benchmark config from parsed arguments."""
+    shell = args.shell if args.shell is not None else args.scenario in ("health", "scan")
+    return BenchmarkConfig(
+        scenario=args.scenario,
+        hosts=args.hosts,
+        commands=args.commands,
+        concurrency=args.concurrency,
+        command=args.command,
+        max_connections=args.max_connections,
+        max_retries=args.max_retries,
+        timeout=args.timeout,
+        server=ServerOptions(
+            command_latency=args.latency,
+            handshake_latency=args.handshake_latency,
+            max_sessions=args.max_sessions,
+            refuse_rate=args.refuse_rate,
+            drop_rate=args.drop_rate,
+            shell=shell,
+            seed=args.seed,
+        ),
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a benchmark from the command line."""
+    args = create_parser().parse_args(argv)
+    config = config_from_args(args)
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+    _raise_fd_limit()
+
+    result = asyncio.run(run_benchmark(config)).as_dict()
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        result["comparison"] = compare_results(baseline, result)
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Merlya benchmarks - In-process SSH server.
+
+Simulates a fleet of SSH hosts on the loopback interface with asyncssh.
+Every simulated host gets its own loopback address (127.0.x.y, Linux) or,
+where only 127.0.0.1 is routable, its own port, so the pool's per-host
+state (circuit breakers, channel limits, connections) is exercised like it
+would be against a real fleet.
+
+Authentication is skipped and the server only listens on loopback. With
+`shell=True` commands are really run with /bin/sh on the local machine,
+so only point trusted clients at it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import socket
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, cast
+
+import asyncssh
+
+if TYPE_CHECKING:
+    from asyncssh import SSHReader, SSHServerChannel, SSHWriter
+
+DEFAULT_MAX_SESSIONS = 10  # OpenSSH default for MaxSessions
+MAX_SIMULATED_HOSTS = 254 * 256
+DEFAULT_OUTPUT = "ok\n"
+
+
+@dataclass
+class ServerOptions:
+    """Behaviour of the simulated hosts."""
+
+    command_latency: float = 0.0  # Seconds added to every command
+    handshake_latency: float = 0.0  # Seconds added before authentication completes
+    max_sessions: int = DEFAULT_MAX_SESSIONS  # Concurrent channels per connection (0 = unlimited)
+    refuse_rate: float = 0.0  # Share of new connections closed before the handshake
+    drop_rate: float = 0.0  # Share of commands whose connection is dropped mid-command
+    shell: bool = False  # Run commands with /bin/sh instead of answering `output`
+    output: str = DEFAULT_OUTPUT
+    seed: int | None = None
+
+
+@dataclass
+class ServerStats:
+    """Counters for everything the simulated fleet has seen."""
+
+    connections: int = 0
+    handshakes: int = 0
+    refused_connections: int = 0
+    sessions: int = 0
+    rejected_sessions: int = 0
+    dropped_connections: int = 0
+    peak_sessions_per_connection: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Counters as a JSON-ready dict."""
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class SimulatedHost:
+    """Address of one simulated host."""
+
+    name: str
+    address: str
+    port: int
+
+
+class _HostConnection(asyncssh.SSHServer):
+    """Server side of one client connection."""
+
+    def __init__(self, server: BenchSSHServer) -> None:
+        self._server = server
+        self._conn: asyncssh.SSHServerConnection | None = None
+        self._open_sessions = 0
+
+    def connection_made(self, conn: asyncssh.SSHServerConnection) -> None:
+        self._conn = conn
+        self._server.connections.add(conn)
+        stats = self._server.stats
+        stats.connections += 1
+        if self._server.roll(self._server.options.refuse_rate):
+            stats.refused_connections += 1
+            conn.abort()
+
+    def connection_lost(self, exc: Exception | None) -> None:  # noqa: ARG002
+        if self._conn is not None:
+            self._server.connections.discard(self._conn)
+
+    async def begin_auth(self, username: str) -> bool:  # noqa: ARG002
+        if self._server.options.handshake_latency:
+            await asyncio.sleep(self._server.options.handshake_latency)
+        return False  # No authentication required
+
+    def auth_completed(self) -> None:
+        self._server.stats.handshakes += 1
+
+    def session_requested(self) -> Any:
+        options, stats = self._server.options, self._server.stats
+        if options.max_sessions and self._open_sessions >= options.max_sessions:
+            stats.rejected_sessions += 1
+            raise asyncssh.ChannelOpenError(
+                asyncssh.OPEN_ADMINISTRATIVELY_PROHIBITED, "open failed"
+            )
+        self._open_sessions += 1
+        stats.sessions += 1
+        stats.peak_sessions_per_connection = max(
+            stats.peak_sessions_per_connection, self._open_sessions
+        )
+        return self._run
+
+    async def _run(
+        self, stdin: SSHReader[str], stdout: SSHWriter[str], stderr: SSHWriter[str]
+    ) -> None:
+        options = self._server.options
+        try:
+            command = stdin.channel.get_command() or ""
+            if options.command_latency:
+                await asyncio.sleep(options.command_latency)
+
+            if self._server.roll(options.drop_rate) and self._conn is not None:
+                self._server.stats.dropped_connections += 1
+                self._conn.abort()
+                return
+
+            if options.shell:
+                out, err, exit_code = await _run_shell(command)
+            else:
+                out, err, exit_code = options.output, "", 0
+            stdout.write(out)
+            if err:
+                stderr.write(err)
+            cast("SSHServerChannel[str]", stdout.channel).exit(exit_code)
+        except (asyncssh.Error, BrokenPipeError, ConnectionError):
+            pass  # Client went away mid-command
+        finally:
+            self._open_sessions -= 1
+
+
+async def _run_shell(command: str) -> tuple[str, str, int]:
+    """Run a command locally with /bin/sh."""
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, err = await proc.communicate()
+    return (
+        out.decode("utf-8", errors="replace"),
+        err.decode("utf-8", errors="replace"),
+        proc.returncode or 0,
+    )
+
+
+def _loopback_aliases_available() -> bool:
+    """Whether addresses other than 127.0.0.1 are routed to loopback (Linux)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        try:
+            probe.bind(("127.0.0.2", 0))
+        except OSError:
+            return False
+    return True
+
+
+def _loopback_address(index: int) -> str:
+    """Loopback address of the n-th simulated host (127.0.0.1, 127.0.0.2...)."""
+    return f"127.0.{index // 254}.{index % 254 + 1}"
+
+
+@dataclass
+class BenchSSHServer:
+    """A fleet of simulated SSH hosts served from this process."""
+
+    host_count: int
+    options: ServerOptions = field(default_factory=ServerOptions)
+    stats: ServerStats = field(default_factory=ServerStats)
+    hosts: list[SimulatedHost] = field(default_factory=list)
+    shared_address: bool = False  # True when hosts are told apart by port only
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.host_count <= MAX_SIMULATED_HOSTS:
+            raise ValueError(f"host_count must be between 1 and {MAX_SIMULATED_HOSTS}")
+        self._random = random.Random(self.options.seed)
+        self._acceptors: list[asyncssh.SSHAcceptor] = []
+        self.connections: set[asyncssh.SSHServerConnection] = set()
+
+    def roll(self, rate: float) -> bool:
+        """Decide whether an injected failure happens."""
+        return rate > 0 and self._random.random() < rate
+
+    async def start(self) -> list[SimulatedHost]:
+        """Start listening for every simulated host."""
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        listen_options: dict[str, Any] = {
+            "server_factory": lambda: _HostConnection(self),
+            "server_host_keys": [host_key],
+            "reuse_address": True,
+        }
+
+        first = await asyncssh.listen("127.0.0.1", 0, **listen_options)
+        self._acceptors.append(first)
+        port = first.get_port()
+        self.shared_address = self.host_count > 1 and not _loopback_aliases_available()
+
+        if self.shared_address:
+            ports = [port]
+            for _ in range(1, self.host_count):
+                acceptor = await asyncssh.listen("127.0.0.1", 0, **listen_options)
+                self._acceptors.append(acceptor)
+                ports.append(acceptor.get_port())
+            self.hosts = [
+                SimulatedHost(f"bench-{i:04d}", "127.0.0.1", p) for i, p in enumerate(ports)
+            ]
+        else:
+            addresses = [_loopback_address(i) for i in range(self.host_count)]
+            if len(addresses) > 1:
+                self._acceptors.append(await asyncssh.listen(addresses[1:], port, **listen_options))
+            self.hosts = [
+                SimulatedHost(f"bench-{i:04d}", address, port)
+                for i, address in enumerate(addresses)
+            ]
+        return self.hosts
+
+    async def stop(self) -> None:
+        """Stop listening and drop every client connection."""
+        for acceptor in self._acceptors:
+            acceptor.close()
+        for acceptor in self._acceptors:
+            with contextlib.suppress(Exception):
+                await acceptor.wait_closed()
+        self._acceptors.clear()
+        for conn in list(self.connections):
+            conn.abort()
+        self.connections.clear()
+
+    async def __aenter__(self) -> BenchSSHServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        await self.stop()
+
+
+__all__ = [
+    "BenchSSHServer",
+    "ServerOptions",
+    "ServerStats",
+    "SimulatedHost",
+]
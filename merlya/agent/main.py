@@ -79,7 +79,11 @@ class MerlyaAgent:
         self._agent = create_agent(model)
         self._message_history: list[ModelMessage] = []
         self._active_conversation: Conversation | None = None
+        # Messages already stored for the active conversation (append-only)
+        self._persisted_count = 0
+        self._persisted_tail: ModelMessage | None = None
         self._confirmation_state = ConfirmationState()
+        self._prewarm_task: asyncio.Task[int] | None = None
 
     async def run(
         self,
@@ -110,6 +114,7 @@ class MerlyaAgent:
 
             self._apply_credential_hints(user_input)
             await self._mark_unresolved_hosts(router_result)
+            self._start_prewarm(router_result)
 
             deps = AgentDependencies(
                 context=self.context,
@@ -173,6 +178,28 @@ class MerlyaAgent:
             router_result.unresolved_hosts = unresolved
             logger.debug(f"🔍 Unresolved hosts (not in inventory): {unresolved}")
 
+    def _start_prewarm(self, router_result: RouterResult | None) -> None:
+        """Open SSH connections to mentioned hosts while the LLM is thinking."""
+        if not router_result or not self.context.config.ssh.prewarm:
+            return
+
+        unresolved = set(router_result.unresolved_hosts or [])
+        hosts = [h for h in router_result.entities.get("hosts", []) if h not in unresolved]
+        if not hosts:
+            return
+
+        from merlya.tools.core.ssh_connection import prewarm_hosts
+
+        async def _prewarm() -> int:
+            try:
+                return await prewarm_hosts(self.context, hosts)
+            except Exception as e:
+                logger.debug(f"🔥 SSH prewarm skipped: {e}")
+                return 0
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._prewarm_task = asyncio.create_task(_prewarm())
+
     async def _run_agent_with_errors(
         self,
         user_input: str,
@@ -243,6 +270,7 @@ class MerlyaAgent:
         """Clear conversation history."""
         self._message_history.clear()
         self._active_conversation = None
+        self._mark_persisted()
         self._confirmation_state.reset()
         logger.debug("Conversation history cleared")
 
@@ -259,26 +287,41 @@ class MerlyaAgent:
         return conv
 
     async def _persist_history(self) -> None:
-        """Persist current history into the active conversation."""
-        if not self._active_conversation:
+        """Persist messages added since the last save into the active conversation."""
+        conv = self._active_conversation
+        if not conv:
             return
 
-        # Serialize ModelMessage objects to JSON-compatible format
-        # This preserves tool calls and all message metadata
-        self._active_conversation.messages = ModelMessagesTypeAdapter.dump_python(
-            self._message_history, mode="json"
-        )
+        if not conv.title:
+            conv.title = self._derive_title(self._extract_first_user_message())
 
-        if not self._active_conversation.title:
-            self._active_conversation.title = self._derive_title(self._extract_first_user_message())
+        history = self._message_history
+        stored = self._persisted_count
+        # Append unless the history processor truncated what was already stored
+        appendable = 0 <= stored <= len(history) and (
+            stored == 0 or history[stored - 1] == self._persisted_tail
+        )
 
         try:
-            await self.context.conversations.update(self._active_conversation)
+            # Serialize ModelMessage objects to JSON-compatible format
+            # This preserves tool calls and all message metadata
+            if appendable:
+                new_messages = ModelMessagesTypeAdapter.dump_python(history[stored:], mode="json")
+                await self.context.conversations.append_messages(conv, new_messages)
+            else:
+                all_messages = ModelMessagesTypeAdapter.dump_python(history, mode="json")
+                await self.context.conversations.replace_messages(conv, all_messages)
+            self._mark_persisted()
         except Exception as e:
             logger.warning(f"Failed to persist conversation history: {e}")
 
+    def _mark_persisted(self) -> None:
+        """Record the current history as stored."""
+        self._persisted_count = len(self._message_history)
+        self._persisted_tail = self._message_history[-1] if self._message_history else None
+
     def load_conversation(self, conv: Conversation) -> None:
-        """Load an existing conversation into the agent history."""
+        """Load an existing conversation (with its messages) into the agent history."""
         self._active_conversation = conv
 
         # Deserialize JSON messages back to ModelMessage objects
@@ -291,6 +334,12 @@ class MerlyaAgent:
         else:
             self._message_history = []
 
+        if len(self._message_history) == conv.message_count:
+            self._mark_persisted()
+        else:
+            # Stored rows differ from what was loaded: rewrite on next save (-1)
+            self._persisted_count, self._persisted_tail = -1, None
+
         logger.debug(
             f"Loaded conversation {conv.id[:8]} with {len(self._message_history)} messages"
         )
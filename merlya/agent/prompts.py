@@ -44,6 +44,7 @@ Never try to bypass this — it is a safety requirement.
 ## Direct Tools (no delegation needed)
 
 - `list_hosts()` / `get_host(name)` — browse the host inventory
+- `get_cached_scan(name)` — recent /scan results for a host (no SSH needed)
 - `ask_user(question)` — ask for clarification when the request is ambiguous
 - `request_credentials(service, host)` — request a credential/secret from the user
 
@@ -61,7 +61,33 @@ async def get_host(
     raise ModelRetry(f"Host not found: {result.error}")
 
 
+async def get_cached_scan(
+    ctx: RunContext[AgentDependencies],
+    name: str,
+) -> dict[str, Any]:
+    """
+    Get recent /scan results cached for a host, without connecting to it.
+
+    Check this before re-running diagnostics: cached sections (system,
+    security, quick) hold disk, memory, CPU, services, ports and security
+    findings from a scan still within its TTL.
+
+    Args:
+        name: Host name from inventory (e.g., "myserver", "db-prod").
+
+    Returns:
+        Cached scan sections keyed by scan type, with issues and cached_at.
+    """
+    from merlya.tools.core import get_cached_scan as _get_cached_scan
+
+    result = await _get_cached_scan(ctx.deps.context, name)
+    if result.success:
+        return cast("dict[str, Any]", result.data)
+    raise ModelRetry(f"Cached scan unavailable: {result.error}")
+
+
 def register(agent: Agent[Any, Any]) -> None:
     """Register host tools on agent."""
     agent.tool(list_hosts)
     agent.tool(get_host)
+    agent.tool(get_cached_scan)
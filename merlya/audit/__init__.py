@@ -8,6 +8,7 @@ Provides audit logging for security-sensitive operations:
 - Configuration changes
 """
 
+from merlya.audit.export import EXPORT_FORMATS, export_events
 from merlya.audit.formatters import (
     is_sensitive_key,
     is_sensitive_value,
@@ -22,6 +23,7 @@ from merlya.audit.log_methods import (
 )
 from merlya.audit.logger import (
     AuditLogger,
+    close_audit_logger,
     get_audit_logger,
 )
 from merlya.audit.models import AuditEvent, AuditEventType, ObservabilityStatus
@@ -30,24 +32,35 @@ from merlya.audit.storage import (
     ensure_table,
     export_json,
     get_recent,
+    iter_events,
+    search,
     store_event,
+    store_events,
 )
+from merlya.audit.writer import AuditWriter
 
 __all__ = [
+    # Export
+    "EXPORT_FORMATS",
     # Storage
     "MAX_RECENT_LIMIT",
     # Logger
     "AuditEvent",
     "AuditEventType",
     "AuditLogger",
+    # Writer
+    "AuditWriter",
     "ObservabilityStatus",
+    "close_audit_logger",
     "ensure_table",
+    "export_events",
     "export_json",
     "get_audit_logger",
     "get_recent",
     # Formatters
     "is_sensitive_key",
     "is_sensitive_value",
+    "iter_events",
     # Log methods
     "log_command",
     "log_destructive",
@@ -55,5 +68,7 @@ __all__ = [
     "log_tool",
     "sanitize_args",
     "sanitize_value",
+    "search",
     "store_event",
+    "store_events",
 ]
@@ -0,0 +1,130 @@
+"""
+Merlya Audit - Streaming export.
+
+Writes audit events to NDJSON or CSV (optionally gzip-compressed) while
+iterating over them page by page, so exporting a year of events runs in
+constant memory. Events are written oldest first in the SIEM-friendly
+shape of export_json().
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+from typing import TYPE_CHECKING, Any, Literal, TextIO
+
+from loguru import logger
+
+from .storage import iter_events, to_siem_event
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from pathlib import Path
+
+    from merlya.persistence.database import Database
+
+    from .models import AuditEventType
+
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_FORMATS: tuple[ExportFormat, ...] = ("ndjson", "csv")
+
+CSV_FIELDS = (
+    "timestamp",
+    "event_id",
+    "event_type",
+    "action",
+    "target",
+    "user",
+    "success",
+    "severity",
+    "source",
+    "details",
+)
+
+
+def _open(path: Path, compress: bool) -> TextIO:
+    """Open an export file for text writing (gzip-compressed if requested)."""
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return path.open("w", encoding="utf-8", newline="")
+
+
+async def export_events(
+    db: Database,
+    path: Path,
+    fmt: ExportFormat = "ndjson",
+    compress: bool = False,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    target: str | None = None,
+    event_type: AuditEventType | None = None,
+    success: bool | None = None,
+    limit: int | None = None,
+) -> int:
+    """
+    Stream audit events to a file.
+
+    The file is written next to `path` with a `.part` suffix and renamed
+    once complete, so a failed export never leaves a truncated file behind.
+
+    Args:
+        db: Database instance.
+        path: Output file.
+        fmt: "ndjson" (one JSON event per line) or "csv".
+        compress: Gzip the output.
+        since: Only events at or after this time.
+        until: Only events before this time.
+        target: Only events for this target.
+        event_type: Only events of this type.
+        success: Only successful (True) or failed (False) events.
+        limit: Maximum number of events (None for all).
+
+    Returns:
+        Number of events written.
+
+    Raises:
+        ValueError: If the format is unknown.
+        OSError: If the file cannot be written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {EXPORT_FORMATS})")
+
+    part = path.with_name(f"{path.name}.part")
+    count = 0
+    try:
+        with _open(part, compress) as out:
+            writer: Any = None
+            if fmt == "csv":
+                writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+            async for event in iter_events(
+                db,
+                since=since,
+                until=until,
+                target=target,
+                event_type=event_type,
+                success=success,
+                limit=limit,
+            ):
+                record = to_siem_event(event)
+                if writer is not None:
+                    writer.writerow({**record, "details": json.dumps(record["details"])})
+                else:
+                    out.write(json.dumps(record) + "\n")
+                count += 1
+        part.replace(path)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+
+    logger.debug(f"📤 Exported {count} audit events to {path}")
+    return count
+
+
+__all__ = [
+    "CSV_FIELDS",
+    "EXPORT_FORMATS",
+    "ExportFormat",
+    "export_events",
+]
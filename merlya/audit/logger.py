@@ -12,12 +12,12 @@ from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
+from .export import export_events as storage_export_events
 from .formatters import sanitize_args
 from .models import AuditEvent, AuditEventType, ObservabilityStatus
 from .storage import (
     MAX_RECENT_LIMIT,
     ensure_table,
-    store_event,
 )
 from .storage import (
     export_json as storage_export_json,
@@ -25,17 +25,29 @@ from .storage import (
 from .storage import (
     get_recent as storage_get_recent,
 )
+from .storage import (
+    search as storage_search,
+)
+from .writer import AuditWriter
+
+# Seconds queries wait for queued events to be written before reading
+READ_FLUSH_TIMEOUT = 5.0
 
 if TYPE_CHECKING:
     from datetime import datetime
+    from pathlib import Path
 
     from merlya.persistence.database import Database
 
+    from .export import ExportFormat
+
 
 class AuditLogger:
     """Audit logger for security-sensitive operations.
 
     Logs events to both loguru (console/file) and SQLite (persistent).
+    SQLite writes are group-committed by an AuditWriter; queries flush
+    queued events first, so they see everything logged before them.
 
     Example:
         >>> audit = await get_audit_logger()
@@ -59,6 +71,7 @@ class AuditLogger:
         """
         self.enabled = enabled
         self._db: Database | None = None
+        self._writer: AuditWriter | None = None
         self._initialized = False
 
     async def initialize(self, db: Database | None = None) -> None:
@@ -75,6 +88,7 @@ class AuditLogger:
 
         if db:
             await self._ensure_table()
+            self._writer = AuditWriter(db)
 
         self._initialized = True
         logger.debug("Audit logger initialized")
@@ -90,6 +104,10 @@ class AuditLogger:
 
         Args:
             event: The audit event to log.
+
+        Raises:
+            Exception: If database writes have been failing for longer than
+                the writer's failure_timeout and storing this event fails too.
         """
         if not self.enabled:
             return
@@ -98,9 +116,28 @@ class AuditLogger:
         log_func = logger.info if event.success else logger.warning
         log_func(f"AUDIT: {event.to_log_line()}")
 
-        # Log to database (if available)
-        if self._db and self._initialized:
-            await store_event(self._db, event)
+        # Queue for the database (if available); waits only when the queue is full
+        if self._writer and self._initialized:
+            await self._writer.put(event)
+
+    async def flush(self, timeout: float | None = None) -> bool:
+        """
+        Write queued events to the database now.
+
+        Args:
+            timeout: Seconds to wait at most (None waits until written).
+
+        Returns:
+            True if every queued event was committed.
+        """
+        if not self._writer:
+            return True
+        return await self._writer.flush(timeout)
+
+    async def close(self) -> None:
+        """Flush queued events and stop the background writer."""
+        if self._writer:
+            await self._writer.close()
 
     # Specialized logging methods (delegate to log_methods module)
     async def log_command(
@@ -204,8 +241,31 @@ class AuditLogger:
         """
         if not self._db:
             return []
+        await self.flush(READ_FLUSH_TIMEOUT)
         return await storage_get_recent(self._db, limit, event_type)
 
+    async def search(
+        self,
+        term: str,
+        limit: int = 50,
+        event_type: AuditEventType | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Full-text search over audit events (bm25-ranked, prefix matching).
+
+        Args:
+            term: Free-text search terms.
+            limit: Maximum number of events to return (1-1000, default 50).
+            event_type: Filter by event type.
+
+        Returns:
+            List of audit event dictionaries with a "snippet" key.
+        """
+        if not self._db:
+            return []
+        await self.flush(READ_FLUSH_TIMEOUT)
+        return await storage_search(self._db, term, limit, event_type)
+
     async def export_json(
         self,
         limit: int = 100,
@@ -227,8 +287,54 @@ class AuditLogger:
 
         if not self._db:
             return json.dumps({"events": [], "count": 0})
+        await self.flush(READ_FLUSH_TIMEOUT)
         return await storage_export_json(self._db, limit, event_type, since)
 
+    async def export_events(
+        self,
+        path: Path,
+        fmt: ExportFormat = "ndjson",
+        compress: bool = False,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        target: str | None = None,
+        event_type: AuditEventType | None = None,
+        success: bool | None = None,
+        limit: int | None = None,
+    ) -> int:
+        """
+        Stream audit events to an NDJSON or CSV file (constant memory, no size cap).
+
+        Args:
+            path: Output file.
+            fmt: "ndjson" or "csv".
+            compress: Gzip the output.
+            since: Only events at or after this time.
+            until: Only events before this time.
+            target: Only events for this target.
+            event_type: Only events of this type.
+            success: Only successful (True) or failed (False) events.
+            limit: Maximum number of events (None for all).
+
+        Returns:
+            Number of events written.
+        """
+        if not self._db:
+            return 0
+        await self.flush(READ_FLUSH_TIMEOUT)
+        return await storage_export_events(
+            self._db,
+            path,
+            fmt,
+            compress,
+            since=since,
+            until=until,
+            target=target,
+            event_type=event_type,
+            success=success,
+            limit=limit,
+        )
+
     @classmethod
     async def get_instance(cls, enabled: bool = True) -> AuditLogger:
         """Get singleton instance (thread-safe)."""
@@ -257,10 +363,17 @@ async def get_audit_logger(enabled: bool = True) -> AuditLogger:
     return await AuditLogger.get_instance(enabled=enabled)
 
 
+async def close_audit_logger() -> None:
+    """Flush and stop the audit logger singleton's writer, if it was created."""
+    if AuditLogger._instance is not None:
+        await AuditLogger._instance.close()
+
+
 __all__ = [
     "AuditEvent",
     "AuditEventType",
     "AuditLogger",
     "ObservabilityStatus",
+    "close_audit_logger",
     "get_audit_logger",
 ]
@@ -12,7 +12,11 @@ from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
+from merlya.persistence.database import to_fts_query, track_queries
+
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from merlya.persistence.database import Database
 
     from .models import AuditEvent, AuditEventType
@@ -20,7 +24,67 @@ if TYPE_CHECKING:
 # Maximum allowed limit for get_recent queries (prevent excessive memory usage)
 MAX_RECENT_LIMIT = 1000
 
+# Rows fetched per keyset page by iter_events()
+EXPORT_PAGE_SIZE = 500
 
+# Composite indexes ending in (created_at, id), the keyset of iter_events(), so
+# every export filter is an index range scan; failures get a partial index.
+# They supersede the single-column idx_audit_logs_type / idx_audit_logs_created.
+AUDIT_INDEXES = (
+    "DROP INDEX IF EXISTS idx_audit_logs_type",
+    "DROP INDEX IF EXISTS idx_audit_logs_created",
+    "CREATE INDEX IF NOT EXISTS idx_audit_logs_created_id ON audit_logs(created_at, id)",
+    """
+    CREATE INDEX IF NOT EXISTS idx_audit_logs_type_created
+    ON audit_logs(event_type, created_at, id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_audit_logs_target_created
+    ON audit_logs(target, created_at, id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_audit_logs_failed
+    ON audit_logs(created_at, id) WHERE success = 0
+    """,
+)
+
+# FTS5 index over action, target and details, kept in sync by triggers.
+# Rows are matched by event id (the implicit rowid is not stable across VACUUM).
+AUDIT_SEARCH_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS audit_fts USING fts5(
+        action, target, details, event_id UNINDEXED
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS audit_logs_fts_insert AFTER INSERT ON audit_logs BEGIN
+        INSERT INTO audit_fts (action, target, details, event_id)
+        VALUES (new.action, new.target, new.details, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS audit_logs_fts_delete AFTER DELETE ON audit_logs BEGIN
+        DELETE FROM audit_fts WHERE event_id = old.id;
+    END
+    """,
+)
+
+
+def _row_to_dict(row: Any) -> dict[str, Any]:
+    """Convert an audit_logs row to an event dictionary."""
+    return {
+        "id": row["id"],
+        "event_type": row["event_type"],
+        "action": row["action"],
+        "target": row["target"],
+        "user": row["user"],
+        "details": json.loads(row["details"]) if row["details"] else None,
+        "success": bool(row["success"]),
+        "created_at": row["created_at"],
+    }
+
+
+@track_queries
 async def ensure_table(db: Database) -> None:
     """Ensure audit_logs table exists."""
     await db.execute(
@@ -37,13 +101,40 @@ async def ensure_table(db: Database) -> None:
         )
         """
     )
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_type ON audit_logs(event_type)")
-    await db.execute(
-        "CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at DESC)"
-    )
+    for statement in AUDIT_INDEXES:
+        await db.execute(statement)
+
+    async with await db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_fts'"
+    ) as cursor:
+        has_index = await cursor.fetchone() is not None
+    for statement in AUDIT_SEARCH_SCHEMA:
+        await db.execute(statement)
+    if not has_index:
+        # Backfill events logged before the search index existed
+        await db.execute(
+            """
+            INSERT INTO audit_fts (action, target, details, event_id)
+            SELECT action, target, details, id FROM audit_logs
+            """
+        )
     await db.commit()
 
 
+def _event_params(event: AuditEvent) -> tuple[Any, ...]:
+    """audit_logs column values of an event."""
+    return (
+        event.event_id,
+        event.event_type.value,
+        event.action,
+        event.target,
+        event.user,
+        json.dumps(event.details) if event.details else None,
+        1 if event.success else 0,
+    )
+
+
+@track_queries
 async def store_event(db: Database, event: AuditEvent) -> None:
     """Store an audit event in the database."""
     try:
@@ -52,15 +143,7 @@ async def store_event(db: Database, event: AuditEvent) -> None:
             INSERT INTO audit_logs (id, event_type, action, target, user, details, success)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                event.event_id,
-                event.event_type.value,
-                event.action,
-                event.target,
-                event.user,
-                json.dumps(event.details) if event.details else None,
-                1 if event.success else 0,
-            ),
+            _event_params(event),
         )
         await db.commit()
     except Exception as e:
@@ -69,6 +152,29 @@ async def store_event(db: Database, event: AuditEvent) -> None:
         raise
 
 
+@track_queries
+async def store_events(db: Database, events: list[AuditEvent]) -> None:
+    """
+    Store a batch of audit events in one transaction (one commit).
+
+    Raises:
+        Exception: If the batch could not be stored (nothing is written).
+    """
+    if not events:
+        return
+    async with db.transaction():
+        # OR IGNORE: retrying a batch whose commit outcome was unknown is harmless
+        await db.executemany(
+            """
+            INSERT OR IGNORE INTO audit_logs
+                (id, event_type, action, target, user, details, success)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [_event_params(event) for event in events],
+        )
+
+
+@track_queries
 async def get_recent(
     db: Database,
     limit: int = 50,
@@ -107,24 +213,192 @@ async def get_recent(
     try:
         cursor = await db.execute(query, params)
         rows = await cursor.fetchall()
-        return [
-            {
-                "id": row["id"],
-                "event_type": row["event_type"],
-                "action": row["action"],
-                "target": row["target"],
-                "user": row["user"],
-                "details": json.loads(row["details"]) if row["details"] else None,
-                "success": bool(row["success"]),
-                "created_at": row["created_at"],
-            }
-            for row in rows
-        ]
+        return [_row_to_dict(row) for row in rows]
     except Exception as e:
         logger.warning(f"Failed to get audit logs: {e}")
         return []
 
 
+@track_queries
+async def search(
+    db: Database,
+    term: str,
+    limit: int = 50,
+    event_type: AuditEventType | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Full-text search over audit action, target and details.
+
+    Every word matches as a prefix; results are ranked by bm25 and carry
+    a snippet of the matching text.
+
+    Args:
+        db: Database instance.
+        term: Free-text search terms.
+        limit: Maximum number of events to return (1-1000, default 50).
+        event_type: Filter by event type.
+
+    Returns:
+        List of audit event dictionaries with a "snippet" key, best match first.
+    """
+    query = to_fts_query(term)
+    if query is None:
+        return []
+    limit = max(1, min(limit, MAX_RECENT_LIMIT))
+
+    sql = """
+        SELECT a.*, snippet(audit_fts, -1, '**', '**', '…', 12) AS snippet
+        FROM audit_fts JOIN audit_logs a ON a.id = audit_fts.event_id
+        WHERE audit_fts MATCH ?
+    """
+    params: tuple[Any, ...] = (query,)
+    if event_type:
+        sql += " AND a.event_type = ?"
+        params = (*params, event_type.value)
+    sql += " ORDER BY bm25(audit_fts) LIMIT ?"
+    params = (*params, limit)
+
+    try:
+        async with await db.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+        return [{**_row_to_dict(row), "snippet": row["snippet"]} for row in rows]
+    except Exception as e:
+        logger.warning(f"Failed to search audit logs: {e}")
+        return []
+
+
+def to_db_timestamp(value: datetime) -> str:
+    """Format a datetime like created_at (CURRENT_TIMESTAMP: UTC, 'YYYY-MM-DD HH:MM:SS')."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@track_queries
+async def get_events_page(
+    db: Database,
+    after: tuple[str, str] | None = None,
+    limit: int = EXPORT_PAGE_SIZE,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    target: str | None = None,
+    event_type: AuditEventType | None = None,
+    success: bool | None = None,
+) -> tuple[list[dict[str, Any]], tuple[str, str] | None]:
+    """
+    Get one page of audit events in (created_at, id) order.
+
+    Args:
+        db: Database instance.
+        after: (created_at, id) of the last event of the previous page.
+        limit: Page size (1-1000).
+        since: Only events at or after this time.
+        until: Only events before this time.
+        target: Only events for this target.
+        event_type: Only events of this type.
+        success: Only successful (True) or failed (False) events.
+
+    Returns:
+        Audit event dictionaries (oldest first) and the keyset of the last
+        one, to pass as `after` for the next page (None if the page is empty).
+    """
+    conditions: list[str] = []
+    params: list[Any] = []
+
+    if event_type:
+        conditions.append("event_type = ?")
+        params.append(event_type.value)
+    if target is not None:
+        conditions.append("target = ?")
+        params.append(target)
+    if success is not None:
+        # Literal (not a parameter) so the partial index on failures applies
+        conditions.append(f"success = {1 if success else 0}")
+    if since:
+        conditions.append("created_at >= ?")
+        params.append(to_db_timestamp(since))
+    if until:
+        conditions.append("created_at < ?")
+        params.append(to_db_timestamp(until))
+    if after:
+        conditions.append("(created_at, id) > (?, ?)")
+        params.extend(after)
+
+    # created_at_key: stored text, unconverted, so the keyset compares exactly
+    query = "SELECT *, CAST(created_at AS TEXT) AS created_at_key FROM audit_logs"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY created_at, id LIMIT ?"
+    params.append(max(1, min(limit, MAX_RECENT_LIMIT)))
+
+    async with await db.execute(query, tuple(params)) as cursor:
+        rows = await cursor.fetchall()
+    last = (rows[-1]["created_at_key"], rows[-1]["id"]) if rows else None
+    return [_row_to_dict(row) for row in rows], last
+
+
+async def iter_events(
+    db: Database,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    target: str | None = None,
+    event_type: AuditEventType | None = None,
+    success: bool | None = None,
+    limit: int | None = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Iterate over audit events, oldest first, one page in memory at a time.
+
+    Pages are fetched with keyset pagination on (created_at, id), so each
+    page is an index range scan regardless of how far the export has got.
+
+    Args:
+        db: Database instance.
+        since: Only events at or after this time.
+        until: Only events before this time.
+        target: Only events for this target.
+        event_type: Only events of this type.
+        success: Only successful (True) or failed (False) events.
+        limit: Maximum number of events (None for all).
+        page_size: Rows fetched per query.
+
+    Yields:
+        Audit event dictionaries.
+    """
+    after: tuple[str, str] | None = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        page, after = await get_events_page(
+            db, after, size, since, until, target, event_type, success
+        )
+        for event in page:
+            yield event
+        if len(page) < size:
+            return
+        if remaining is not None:
+            remaining -= len(page)
+
+
+def to_siem_event(event: dict[str, Any]) -> dict[str, Any]:
+    """Format an audit event dictionary for SIEM ingestion (CEF-like structure)."""
+    timestamp = event["created_at"]
+    return {
+        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+        "event_id": event["id"],
+        "event_type": event["event_type"],
+        "action": event["action"],
+        "target": event["target"],
+        "user": event["user"],
+        "success": event["success"],
+        "severity": "INFO" if event["success"] else "WARNING",
+        "source": "merlya",
+        "details": event["details"] or {},
+    }
+
+
+@track_queries
 async def export_json(
     db: Database,
     limit: int = 100,
@@ -153,7 +427,7 @@ async def export_json(
 
     if since:
         conditions.append("created_at >= ?")
-        params.append(since.isoformat())
+        params.append(to_db_timestamp(since))
 
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
@@ -165,22 +439,8 @@ async def export_json(
         cursor = await db.execute(query, tuple(params))
         rows = await cursor.fetchall()
 
-        events = []
-        for row in rows:
-            # Format for SIEM compatibility (CEF-like structure)
-            event = {
-                "timestamp": row["created_at"],
-                "event_id": row["id"],
-                "event_type": row["event_type"],
-                "action": row["action"],
-                "target": row["target"],
-                "user": row["user"],
-                "success": bool(row["success"]),
-                "severity": "INFO" if row["success"] else "WARNING",
-                "source": "merlya",
-                "details": json.loads(row["details"]) if row["details"] else {},
-            }
-            events.append(event)
+        # Format for SIEM compatibility (CEF-like structure)
+        events = [to_siem_event(_row_to_dict(row)) for row in rows]
 
         return json.dumps(
             {
@@ -197,9 +457,16 @@ async def export_json(
 
 
 __all__ = [
+    "EXPORT_PAGE_SIZE",
     "MAX_RECENT_LIMIT",
     "ensure_table",
     "export_json",
+    "get_events_page",
     "get_recent",
+    "iter_events",
+    "search",
     "store_event",
+    "store_events",
+    "to_db_timestamp",
+    "to_siem_event",
 ]
@@ -0,0 +1,253 @@
+"""
+Merlya Audit - Group-commit writer.
+
+Audit events are queued and written in batches, one transaction (one
+commit) per batch, instead of one commit per event. A batch is flushed
+when it reaches `batch_size` events or `flush_interval` after its first
+event, whichever comes first. The queue is bounded: when it is full,
+callers wait (backpressure) instead of events being dropped, and a batch
+that fails to commit is retried for up to `failure_timeout`. Past that the
+database is considered broken: batches still queued get a single attempt
+(so blocked callers are released), and put() stores each new event itself
+and raises the storage error, as it did before batching, until a write
+succeeds again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from merlya.core.metrics import (
+    track_audit_events_dropped,
+    track_audit_flush,
+    track_audit_queue_depth,
+)
+
+from .storage import store_events
+
+if TYPE_CHECKING:
+    from merlya.persistence.database import Database
+
+    from .models import AuditEvent
+
+DEFAULT_BATCH_SIZE = 100  # Events per transaction
+DEFAULT_FLUSH_INTERVAL = 0.05  # Seconds a queued event may wait for its batch to fill
+DEFAULT_MAX_QUEUE = 1000  # Queued events before log() callers wait
+DEFAULT_RETRY_DELAY = 1.0  # Seconds between attempts to store a failed batch
+DEFAULT_FAILURE_TIMEOUT = 30.0  # Seconds of failed writes before batches are given up
+DEFAULT_CLOSE_TIMEOUT = 10.0  # Seconds close() waits for queued events to be written
+
+
+class AuditWriter:
+    """Batches audit events into group commits from a background task."""
+
+    def __init__(
+        self,
+        db: Database,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        failure_timeout: float = DEFAULT_FAILURE_TIMEOUT,
+    ) -> None:
+        """
+        Initialize the writer.
+
+        Args:
+            db: Database the events are stored in.
+            batch_size: Maximum events per transaction.
+            flush_interval: Seconds to wait for a batch to fill before committing it.
+            max_queue: Queue capacity; put() waits while the queue is full.
+            retry_delay: Seconds between attempts to store a failed batch.
+            failure_timeout: Seconds writes may keep failing before batches are
+                dropped and put() raises instead of queueing.
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.max_queue = max(1, max_queue)
+        self.retry_delay = retry_delay
+        self.failure_timeout = max(0.0, failure_timeout)
+        self._queue: asyncio.Queue[AuditEvent] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._flush_waiters = 0
+        self._in_flight = 0
+        self._failing_since: float | None = None  # First failure of the current streak
+        self._dropped = 0
+
+    @property
+    def pending(self) -> int:
+        """Events queued or being written."""
+        return (self._queue.qsize() if self._queue else 0) + self._in_flight
+
+    @property
+    def failed(self) -> bool:
+        """Whether writes have been failing for longer than failure_timeout."""
+        return (
+            self._failing_since is not None
+            and time.monotonic() - self._failing_since >= self.failure_timeout
+        )
+
+    def _ensure_started(self) -> asyncio.Queue[AuditEvent]:
+        """Start the writer task on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if self._queue is None or task is None or task.done() or task.get_loop() is not loop:
+            if self._queue is not None and self._queue.qsize():
+                logger.error(
+                    f"❌ CRITICAL: {self._queue.qsize()} audit events lost with their event loop"
+                )
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._wakeup = asyncio.Event()
+            self._in_flight = 0
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def put(self, event: AuditEvent) -> None:
+        """
+        Queue an event, waiting while the queue is full.
+
+        Raises:
+            Exception: If the writer has failed and storing the event directly
+                fails too.
+        """
+        if self.failed:
+            await self._store(event)
+            return
+        queue = self._ensure_started()
+        await queue.put(event)
+        track_audit_queue_depth(self.pending)
+        if queue.qsize() >= self.batch_size and self._wakeup:
+            self._wakeup.set()
+
+    async def flush(self, timeout: float | None = None) -> bool:
+        """
+        Write every queued event now and wait until they are committed.
+
+        Args:
+            timeout: Seconds to wait at most (None waits until written).
+
+        Returns:
+            True if everything queued was committed, False on timeout or if
+            events were dropped.
+        """
+        if self._queue is None or not self.pending:
+            return True
+        dropped = self._dropped
+        queue = self._ensure_started()
+        self._flush_waiters += 1
+        try:
+            if self._wakeup:
+                self._wakeup.set()
+            await asyncio.wait_for(queue.join(), timeout)
+        except TimeoutError:
+            return False
+        finally:
+            self._flush_waiters -= 1
+        return self._dropped == dropped
+
+    async def close(self, timeout: float = DEFAULT_CLOSE_TIMEOUT) -> None:
+        """Flush queued events (waiting at most `timeout` seconds) and stop the task."""
+        if not await self.flush(timeout):
+            logger.error(f"❌ CRITICAL: {self.pending} audit events not written before shutdown")
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        with contextlib.suppress(RuntimeError):
+            if task.get_loop() is not asyncio.get_running_loop():
+                return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    async def _run(self) -> None:
+        queue = self._queue
+        wakeup = self._wakeup
+        assert queue is not None and wakeup is not None
+
+        while True:
+            batch = [await queue.get()]
+            self._in_flight = 1
+
+            # Give the batch a chance to fill unless it is full or a flush is waiting
+            wakeup.clear()
+            if (
+                self.flush_interval
+                and not self._flush_waiters
+                and queue.qsize() + 1 < self.batch_size
+            ):
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(wakeup.wait(), self.flush_interval)
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            self._in_flight = len(batch)
+
+            await self._write(batch)
+
+            self._in_flight = 0
+            for _ in batch:
+                queue.task_done()
+            track_audit_queue_depth(self.pending)
+
+    async def _store(self, event: AuditEvent) -> None:
+        """Store one event directly, raising on failure (used once failed)."""
+        started = time.perf_counter()
+        try:
+            await store_events(self.db, [event])
+        except Exception:
+            track_audit_flush(time.perf_counter() - started, 1, status="error")
+            track_audit_events_dropped(1)
+            raise
+        track_audit_flush(time.perf_counter() - started, 1)
+        self._failing_since = None
+        logger.info("📝 Audit database writable again, resuming batched writes")
+
+    async def _write(self, batch: list[AuditEvent]) -> None:
+        """Store a batch, retrying until it is committed or failure_timeout passes."""
+        while True:
+            started = time.perf_counter()
+            try:
+                await store_events(self.db, batch)
+            except Exception as e:
+                track_audit_flush(time.perf_counter() - started, len(batch), status="error")
+                if self._failing_since is None:
+                    self._failing_since = time.monotonic()
+                if self.failed:
+                    self._dropped += len(batch)
+                    track_audit_events_dropped(len(batch))
+                    failing_for = time.monotonic() - self._failing_since
+                    logger.error(
+                        f"❌ CRITICAL: {len(batch)} audit events lost, database writes "
+                        f"failing for {failing_for:.0f}s: {e}"
+                    )
+                    return
+                logger.error(
+                    f"❌ CRITICAL: Failed to persist {len(batch)} audit events, "
+                    f"retrying in {self.retry_delay}s: {e}"
+                )
+                await asyncio.sleep(self.retry_delay)
+                continue
+            self._failing_since = None
+            track_audit_flush(time.perf_counter() - started, len(batch))
+            logger.debug(f"📝 Audit batch written: {len(batch)} events")
+            return
+
+
+__all__ = [
+    "DEFAULT_BATCH_SIZE",
+    "DEFAULT_CLOSE_TIMEOUT",
+    "DEFAULT_FAILURE_TIMEOUT",
+    "DEFAULT_FLUSH_INTERVAL",
+    "DEFAULT_MAX_QUEUE",
+    "AuditWriter",
+]
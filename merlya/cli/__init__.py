@@ -87,6 +87,7 @@ Examples:
   merlya config set model.provider openai   Set LLM provider
   merlya config set model.model gpt-4o      Set LLM model
   merlya config show                        Show all settings
+  merlya daemon start                       Keep SSH connections warm between runs
 
 LLM Providers: openrouter (default), anthropic, openai, mistral, groq, ollama
 Documentation: https://merlya.m-kis.fr/
@@ -156,6 +157,18 @@ Documentation: https://merlya.m-kis.fr/
         help="Model role to use: 'brain' (complex reasoning) or 'fast' (quick tasks)",
     )
 
+    # daemon subcommand
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Manage the SSH connection daemon",
+        description="Keep SSH connections warm across merlya invocations",
+    )
+    daemon_subparsers = daemon_parser.add_subparsers(dest="daemon_action")
+    daemon_subparsers.add_parser("start", help="Start the daemon in the background")
+    daemon_subparsers.add_parser("stop", help="Stop the running daemon")
+    daemon_subparsers.add_parser("status", help="Show daemon status")
+    daemon_subparsers.add_parser("serve", help="Run the daemon in the foreground")
+
     # config subcommand
     config_parser = subparsers.add_parser(
         "config",
@@ -478,6 +491,10 @@ def main() -> None:
             run_batch_mode(args)
         elif args.command == "config":
             run_config_command(args)
+        elif args.command == "daemon":
+            from merlya.cli.daemon import run_daemon_command
+
+            run_daemon_command(args)
         else:
             # Default: interactive REPL mode
             run_repl_mode(
@@ -0,0 +1,132 @@
+"""
+SSH daemon management for Merlya.
+
+Handles `merlya daemon {start,stop,status,serve}`. A running daemon keeps
+SSH connections warm across `merlya run` invocations and REPL sessions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from merlya.ssh.daemon_client import SSHDaemonClient
+from merlya.ssh.daemon_protocol import DEFAULT_SOCKET_PATH
+
+if TYPE_CHECKING:
+    import argparse
+    from pathlib import Path
+
+START_TIMEOUT = 10.0  # Seconds to wait for a spawned daemon to answer
+
+
+async def daemon_status(socket_path: Path = DEFAULT_SOCKET_PATH) -> dict[str, Any] | None:
+    """Get stats from the running daemon, or None if it is not running."""
+    client = await SSHDaemonClient.connect(socket_path)
+    if client is None:
+        return None
+    try:
+        return await client.stats()
+    except Exception as e:
+        logger.debug(f"🔌 SSH daemon status failed: {e}")
+        return None
+    finally:
+        await client.close()
+
+
+async def stop_daemon(socket_path: Path = DEFAULT_SOCKET_PATH) -> bool:
+    """Ask the running daemon to exit. Returns False if none was running."""
+    client = await SSHDaemonClient.connect(socket_path)
+    if client is None:
+        return False
+    try:
+        await client.shutdown()
+    except ConnectionError:
+        pass  # Daemon closed the socket while answering
+    finally:
+        await client.close()
+    return True
+
+
+def start_daemon(socket_path: Path = DEFAULT_SOCKET_PATH) -> int | None:
+    """Spawn a detached daemon and wait until it answers. Returns its pid."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "merlya.cli.daemon", "--socket", str(socket_path)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return None
+        stats = asyncio.run(daemon_status(socket_path))
+        if stats is not None:
+            return process.pid
+        time.sleep(0.1)
+    return None
+
+
+def run_daemon_command(args: argparse.Namespace) -> None:
+    """Handle daemon subcommand."""
+    from merlya.core.logging import configure_logging
+
+    configure_logging(console_level="DEBUG" if getattr(args, "verbose", False) else "INFO")
+
+    if args.daemon_action == "start":
+        stats = asyncio.run(daemon_status())
+        if stats is not None:
+            logger.info(f"ℹ️ SSH daemon already running (pid {stats['pid']})")
+            return
+        pid = start_daemon()
+        if pid is None:
+            logger.error("❌ SSH daemon failed to start (run `merlya daemon serve` to see why)")
+            sys.exit(1)
+        logger.info(f"✅ SSH daemon started (pid {pid}, socket {DEFAULT_SOCKET_PATH})")
+    elif args.daemon_action == "stop":
+        if asyncio.run(stop_daemon()):
+            logger.info("✅ SSH daemon stopped")
+        else:
+            logger.info("ℹ️ SSH daemon is not running")
+    elif args.daemon_action == "status":
+        stats = asyncio.run(daemon_status())
+        if stats is None:
+            logger.info("ℹ️ SSH daemon is not running")
+            sys.exit(1)
+        logger.info(
+            f"✅ SSH daemon running (pid {stats['pid']}, up {stats['uptime']}s, "
+            f"{stats['requests']} requests, {stats['registry']['connections']} connections)"
+        )
+    elif args.daemon_action == "serve":
+        from merlya.ssh.daemon import serve
+
+        asyncio.run(serve())
+    else:
+        logger.error("❌ Usage: merlya daemon {start,stop,status,serve}")
+        sys.exit(1)
+
+
+def main() -> None:
+    """Entry point for the detached daemon process (`python -m merlya.cli.daemon`)."""
+    import argparse
+    from pathlib import Path
+
+    from merlya.core.logging import configure_logging
+    from merlya.ssh.daemon import serve
+
+    parser = argparse.ArgumentParser(prog="merlya-daemon")
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET_PATH))
+    args = parser.parse_args()
+
+    configure_logging(console_level="WARNING")
+    asyncio.run(serve(Path(args.socket)))
+
+
+if __name__ == "__main__":
+    main()
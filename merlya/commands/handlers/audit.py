@@ -8,12 +8,14 @@ from __future__ import annotations
 
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
+from merlya.audit.export import EXPORT_FORMATS
 from merlya.audit.logger import AuditEventType, get_audit_logger
 from merlya.commands.registry import CommandResult, command, subcommand
 
 if TYPE_CHECKING:
+    from merlya.audit.export import ExportFormat
     from merlya.core.context import SharedContext
 
 
@@ -28,8 +30,9 @@ async def cmd_audit(ctx: SharedContext, args: list[str]) -> CommandResult:
         message=(
             "**Audit Commands:**\n\n"
             "  `/audit recent [limit]` - Show recent audit events\n"
-            "  `/audit export [file]` - Export logs to JSON file\n"
+            "  `/audit export [file]` - Export logs to JSON, NDJSON or CSV\n"
             "  `/audit filter <type>` - Filter by event type\n"
+            "  `/audit search <query>` - Search actions, targets and details\n"
             "  `/audit stats` - Show audit statistics\n"
         ),
         show_help=True,
@@ -68,12 +71,36 @@ async def cmd_audit_recent(_ctx: SharedContext, args: list[str]) -> CommandResul
     return CommandResult(success=True, message="\n".join(lines), data=events)
 
 
-@subcommand("audit", "export", "Export audit logs to JSON", "/audit export [file]")
+EXPORT_USAGE = (
+    "/audit export [file] [--format json|ndjson|csv] [--gzip] [--since <hours>] "
+    "[--target <host>] [--type <type>] [--status success|failed] [--limit <n>]"
+)
+
+# Flags taking a value, with the value's description for error messages
+_EXPORT_VALUE_FLAGS = {
+    "--format": "json|ndjson|csv",
+    "--since": "hours",
+    "--target": "host",
+    "--type": "type",
+    "--status": "success|failed",
+    "--limit": "n",
+}
+
+
+def _format_from_path(path: Path) -> str | None:
+    """Export format implied by a file name (audit.csv, audit.ndjson.gz...)."""
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes.pop()
+    suffix = suffixes[-1] if suffixes else ""
+    return {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}.get(suffix)
+
+
+@subcommand("audit", "export", "Export audit logs (JSON, NDJSON or CSV)", EXPORT_USAGE)
 async def cmd_audit_export(_ctx: SharedContext, args: list[str]) -> CommandResult:
-    """Export audit logs to JSON file."""
-    # Default filter values
-    limit = 1000
-    since = None
+    """Export audit logs to a JSON, NDJSON or CSV file."""
+    values: dict[str, str] = {}
+    compress = False
     positional_args: list[str] = []
 
     # Parse flags first, then collect remaining positional arguments
@@ -81,46 +108,87 @@ async def cmd_audit_export(_ctx: SharedContext, args: list[str]) -> CommandResul
     i = 0
     while i < len(args):
         arg = args[i]
-        if arg == "--since":
+        if arg in _EXPORT_VALUE_FLAGS:
             if i + 1 >= len(args):
                 return CommandResult(
                     success=False,
-                    message="Missing value for `--since` flag. Usage: `--since <hours>`",
-                )
-            try:
-                hours = int(args[i + 1])
-                since = datetime.now(UTC) - timedelta(hours=hours)
-            except ValueError:
-                return CommandResult(
-                    success=False,
-                    message=f"Invalid value for `--since`: `{args[i + 1]}`. Expected an integer (hours).",
-                )
-            i += 2
-        elif arg == "--limit":
-            if i + 1 >= len(args):
-                return CommandResult(
-                    success=False,
-                    message="Missing value for `--limit` flag. Usage: `--limit <n>`",
-                )
-            try:
-                limit = int(args[i + 1])
-            except ValueError:
-                return CommandResult(
-                    success=False,
-                    message=f"Invalid value for `--limit`: `{args[i + 1]}`. Expected an integer.",
+                    message=(
+                        f"Missing value for `{arg}` flag. "
+                        f"Usage: `{arg} <{_EXPORT_VALUE_FLAGS[arg]}>`"
+                    ),
                 )
+            values[arg] = args[i + 1]
             i += 2
+        elif arg == "--gzip":
+            compress = True
+            i += 1
         else:
             # Not a recognized flag, treat as positional argument
             positional_args.append(arg)
             i += 1
 
-    # Determine output path from first positional arg or use default
-    if positional_args:
-        output_path = Path(positional_args[0]).expanduser()
-    else:
+    since = None
+    if "--since" in values:
+        try:
+            since = datetime.now(UTC) - timedelta(hours=int(values["--since"]))
+        except ValueError:
+            return CommandResult(
+                success=False,
+                message=f"Invalid value for `--since`: `{values['--since']}`. Expected an integer (hours).",
+            )
+
+    limit: int | None = None
+    if "--limit" in values:
+        try:
+            limit = int(values["--limit"])
+        except ValueError:
+            return CommandResult(
+                success=False,
+                message=f"Invalid value for `--limit`: `{values['--limit']}`. Expected an integer.",
+            )
+
+    event_type = None
+    if "--type" in values:
+        event_type = next((t for t in AuditEventType if t.value == values["--type"].lower()), None)
+        if event_type is None:
+            return CommandResult(
+                success=False,
+                message=f"Unknown event type: `{values['--type']}`\n\nUse `/audit filter` to see available types.",
+            )
+
+    status = values.get("--status", "").lower()
+    if status not in ("", "success", "failed"):
+        return CommandResult(
+            success=False,
+            message=f"Invalid value for `--status`: `{values['--status']}`. Expected `success` or `failed`.",
+        )
+    success = None if not status else status == "success"
+    target = values.get("--target")
+
+    # Determine output path and format (explicit flag, file extension, then JSON)
+    output_path = Path(positional_args[0]).expanduser() if positional_args else None
+    fmt = values.get("--format", "").lower() or (
+        _format_from_path(output_path) if output_path else None
+    )
+    fmt = fmt or "json"
+    compress = compress or (output_path is not None and output_path.suffix.lower() == ".gz")
+    if fmt not in ("json", *EXPORT_FORMATS):
+        return CommandResult(
+            success=False,
+            message=f"Invalid value for `--format`: `{fmt}`. Expected `json`, `ndjson` or `csv`.",
+        )
+    if fmt == "json" and (compress or target is not None or success is not None):
+        return CommandResult(
+            success=False,
+            message=(
+                "`--gzip`, `--target` and `--status` need a streaming format: "
+                "use `--format ndjson` or `--format csv`."
+            ),
+        )
+    if output_path is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = Path.home() / ".merlya" / "exports" / f"audit_{timestamp}.json"
+        suffix = f".{fmt}.gz" if compress else f".{fmt}"
+        output_path = Path.home() / ".merlya" / "exports" / f"audit_{timestamp}{suffix}"
 
     # Ensure parent directory exists
     try:
@@ -132,25 +200,41 @@ async def cmd_audit_export(_ctx: SharedContext, args: list[str]) -> CommandResul
         )
 
     audit = await get_audit_logger()
-    json_data = await audit.export_json(limit=limit, since=since)
-
-    # Write to file with error handling
     try:
-        output_path.write_text(json_data)
+        if fmt == "json":
+            # Single JSON document, capped at MAX_RECENT_LIMIT events
+            json_data = await audit.export_json(
+                limit=limit or 1000, event_type=event_type, since=since
+            )
+            output_path.write_text(json_data)
+            count = None
+        else:
+            count = await audit.export_events(
+                output_path,
+                cast("ExportFormat", fmt),
+                compress,
+                since=since,
+                target=target,
+                event_type=event_type,
+                success=success,
+                limit=limit,
+            )
     except OSError as e:
         return CommandResult(
             success=False,
             message=f"Failed to write audit logs to `{output_path}`: {e}",
         )
 
+    exported = f"{count} audit events" if count is not None else "Audit logs"
     return CommandResult(
         success=True,
         message=(
-            f"✅ Audit logs exported to: `{output_path}`\n\n"
-            f"Use `--since <hours>` to filter by time\n"
-            f"Use `--limit <n>` to limit number of events"
+            f"✅ {exported} exported to: `{output_path}`\n\n"
+            f"Use `--format ndjson|csv` to stream every event (add `--gzip` to compress)\n"
+            f"Use `--since <hours>`, `--target <host>`, `--type <type>` or "
+            f"`--status success|failed` to filter"
         ),
-        data={"path": str(output_path)},
+        data={"path": str(output_path), "count": count},
     )
 
 
@@ -202,6 +286,29 @@ async def cmd_audit_filter(_ctx: SharedContext, args: list[str]) -> CommandResul
     return CommandResult(success=True, message="\n".join(lines), data=events)
 
 
+@subcommand("audit", "search", "Search audit events", "/audit search <query>")
+async def cmd_audit_search(_ctx: SharedContext, args: list[str]) -> CommandResult:
+    """Full-text search in audit events."""
+    if not args:
+        return CommandResult(success=False, message="Usage: `/audit search <query>`")
+
+    query = " ".join(args)
+    audit = await get_audit_logger()
+    events = await audit.search(query, limit=20)
+
+    if not events:
+        return CommandResult(success=True, message=f"No audit events matching `{query}`")
+
+    lines = [f"**Audit events matching `{query}`** ({len(events)})\n"]
+    for event in events:
+        status = "✓" if event["success"] else "✗"
+        time_str = str(event["created_at"])[:19] if event.get("created_at") else ""
+        snippet = " ".join((event.get("snippet") or event["action"]).split())
+        lines.append(f"  {status} `{time_str}` **{event['event_type']}**: {snippet}")
+
+    return CommandResult(success=True, message="\n".join(lines), data=events)
+
+
 @subcommand("audit", "stats", "Show audit statistics", "/audit stats")
 async def cmd_audit_stats(_ctx: SharedContext, _args: list[str]) -> CommandResult:
     """Show audit statistics."""
@@ -51,8 +51,9 @@ async def cmd_conv_list(ctx: SharedContext, args: list[str]) -> CommandResult:
     for conv in conversations:
         date_str = conv.updated_at.strftime("%Y-%m-%d %H:%M") if conv.updated_at else "?"
         title = conv.title or "(untitled)"
-        msg_count = len(conv.messages) if conv.messages else 0
-        rows.append([f"`{conv.id[:8]}`", f"[bold]{title}[/bold]", str(msg_count), date_str])
+        rows.append(
+            [f"`{conv.id[:8]}`", f"[bold]{title}[/bold]", str(conv.message_count), date_str]
+        )
 
     ctx.ui.table(
         headers=["ID", "Title", "Messages", "Updated"],
@@ -81,15 +82,17 @@ async def cmd_conv_show(ctx: SharedContext, args: list[str]) -> CommandResult:
         f"**Conversation: {conv.title or '(untitled)'}**\n",
         f"  ID: `{conv.id}`",
         f"  Created: `{conv.created_at}`",
-        f"  Messages: `{len(conv.messages) if conv.messages else 0}`",
+        f"  Messages: `{conv.message_count}`",
     ]
 
     if conv.summary:
         lines.append(f"\n**Summary:**\n{conv.summary}")
 
-    if conv.messages:
+    # Only the last page of messages is loaded
+    last_messages = await ctx.conversations.get_messages(conv.id, offset=conv.message_count - 5)
+    if last_messages:
         lines.append("\n**Last messages:**")
-        for msg in conv.messages[-5:]:
+        for msg in last_messages:
             role = msg.get("role", "?")
             content = msg.get("content", "")[:100]
             lines.append(f"  [{role}] {content}...")
@@ -107,6 +110,9 @@ async def cmd_conv_load(ctx: SharedContext, args: list[str]) -> CommandResult:
     if isinstance(conv, CommandResult):
         return conv
 
+    # Message bodies are only read when a conversation is resumed
+    conv.messages = await ctx.conversations.get_messages(conv.id)
+
     return CommandResult(
         success=True,
         message=f"✅ Loaded conversation: {conv.title or conv.id[:8]}",
@@ -167,6 +173,8 @@ async def cmd_conv_search(ctx: SharedContext, args: list[str]) -> CommandResult:
     for conv in results[:10]:
         title = conv.title or "(untitled)"
         lines.append(f"  `{conv.id[:8]}` - {title}")
+        if conv.snippet:
+            lines.append(f"    {' '.join(conv.snippet.split())}")
 
     return CommandResult(success=True, message="\n".join(lines))
 
@@ -183,7 +191,7 @@ async def cmd_conv_export(ctx: SharedContext, args: list[str]) -> CommandResult:
     conv_id = args[0]
     file_path = Path(args[1]).expanduser()
 
-    conv = await ctx.conversations.get_by_id(conv_id)
+    conv = await ctx.conversations.get_by_id(conv_id, include_messages=True)
     if not conv:
         return CommandResult(success=False, message=f"Conversation `{conv_id}` not found.")
 
@@ -200,8 +208,7 @@ async def _find_conversation(ctx: SharedContext, conv_id: str) -> Any:
     conv = await ctx.conversations.get_by_id(conv_id)
 
     if not conv:
-        all_convs = await ctx.conversations.get_recent(limit=100)
-        matches = [c for c in all_convs if c.id.startswith(conv_id)]
+        matches = await ctx.conversations.get_by_prefix(conv_id)
         if len(matches) == 1:
             return matches[0]
         elif len(matches) > 1:
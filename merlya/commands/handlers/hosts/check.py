@@ -6,7 +6,6 @@ Implements /hosts check subcommand with SSH connectivity testing.
 
 from __future__ import annotations
 
-import asyncio
 import time
 from typing import TYPE_CHECKING, TypedDict
 
@@ -16,8 +15,11 @@ from merlya.commands.registry import CommandResult, subcommand
 from merlya.core.types import HostStatus
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from merlya.core.context import SharedContext
     from merlya.persistence.models import Host
+    from merlya.ssh import SSHExecuteOptions, SSHResult
 
 
 class SSHConnectionTestResult(TypedDict):
@@ -36,6 +38,48 @@ class HostCheckResult(TypedDict):
     result: SSHConnectionTestResult
 
 
+CHECK_COMMAND = "echo ok && uname -s 2>/dev/null || echo unknown"
+
+
+def _check_exec_options(port: int, username: str | None, timeout: int) -> SSHExecuteOptions:
+    """Build execution options for a connectivity check."""
+    from merlya.ssh import SSHConnectionOptions, SSHExecuteOptions
+
+    return SSHExecuteOptions(
+        timeout=timeout,
+        username=username,
+        options=SSHConnectionOptions(port=port, connect_timeout=timeout),
+        retry=False,  # Don't retry for connection test
+    )
+
+
+def _to_check_result(outcome: SSHResult | Exception, latency: int) -> SSHConnectionTestResult:
+    """Convert an execute() outcome into a connection test result."""
+    if isinstance(outcome, Exception):
+        logger.debug(f"Connection test failed: {outcome}")
+        return {
+            "success": False,
+            "latency_ms": None,
+            "os_info": None,
+            "error": str(outcome),
+        }
+
+    if outcome.exit_code == 0:
+        os_info = outcome.stdout.strip().split("\n")[-1] if outcome.stdout else "unknown"
+        return {
+            "success": True,
+            "latency_ms": latency,
+            "os_info": os_info,
+            "error": None,
+        }
+    return {
+        "success": False,
+        "latency_ms": latency,
+        "os_info": None,
+        "error": outcome.stderr or "Command failed",
+    }
+
+
 async def test_ssh_connection(
     ctx: SharedContext,
     hostname: str,
@@ -48,50 +92,16 @@ async def test_ssh_connection(
 
     Returns dict with: success, latency_ms, error, os_info
     """
-    from merlya.ssh import SSHConnectionOptions
-
     try:
         ssh_pool = await ctx.get_ssh_pool()
-        opts = SSHConnectionOptions(port=port, connect_timeout=timeout)
-
         start = time.monotonic()
-
-        # Try to execute a simple command
         result = await ssh_pool.execute(
-            host=hostname,
-            command="echo ok && uname -s 2>/dev/null || echo unknown",
-            timeout=timeout,
-            username=username,
-            options=opts,
-            retry=False,  # Don't retry for connection test
+            hostname, CHECK_COMMAND, _check_exec_options(port, username, timeout)
         )
-
-        latency = int((time.monotonic() - start) * 1000)
-
-        if result.exit_code == 0:
-            os_info = result.stdout.strip().split("\n")[-1] if result.stdout else "unknown"
-            return {
-                "success": True,
-                "latency_ms": latency,
-                "os_info": os_info,
-                "error": None,
-            }
-        else:
-            return {
-                "success": False,
-                "latency_ms": latency,
-                "os_info": None,
-                "error": result.stderr or "Command failed",
-            }
-
     except Exception as e:
-        logger.debug(f"Connection test failed: {e}")
-        return {
-            "success": False,
-            "latency_ms": None,
-            "os_info": None,
-            "error": str(e),
-        }
+        return _to_check_result(e, 0)
+
+    return _to_check_result(result, int((time.monotonic() - start) * 1000))
 
 
 def parse_check_options(args: list[str]) -> tuple[bool, str | None, str | None]:
@@ -148,17 +158,44 @@ async def check_hosts_parallel(
     ctx: SharedContext,
     hosts: list[Host],
     max_concurrent: int = 10,
+    timeout: int = 10,
 ) -> list[HostCheckResult]:
-    """Check hosts in parallel with semaphore-limited concurrency."""
-    semaphore = asyncio.Semaphore(max_concurrent)
+    """
+    Check hosts in parallel through SSHPool.execute_many().
 
-    async def check_one(host: Host) -> HostCheckResult:
-        async with semaphore:
-            result = await test_ssh_connection(ctx, host.hostname, host.port, host.username)
-            return {"host": host, "result": result}
+    Progress is shown as each host finishes; results keep the input order.
+    """
+    from merlya.ssh import FanoutOptions, SSHTarget
 
-    tasks = [check_one(h) for h in hosts]
-    return await asyncio.gather(*tasks)
+    try:
+        ssh_pool = await ctx.get_ssh_pool()
+    except Exception as e:
+        return [{"host": h, "result": _to_check_result(e, 0)} for h in hosts]
+
+    started: dict[str, float] = {}
+
+    def targets() -> Iterator[SSHTarget]:
+        # execute_many() pulls targets lazily, so this is when each check starts
+        for i, host in enumerate(hosts):
+            started[str(i)] = time.monotonic()
+            yield SSHTarget(
+                host=host.hostname,
+                exec_options=_check_exec_options(host.port, host.username, timeout),
+                label=str(i),
+            )
+
+    results: dict[int, SSHConnectionTestResult] = {}
+    async for key, outcome in ssh_pool.execute_many(
+        targets(), CHECK_COMMAND, fanout=FanoutOptions(max_concurrency=max_concurrent)
+    ):
+        latency = int((time.monotonic() - started[key]) * 1000)
+        result = _to_check_result(outcome, latency)
+        results[int(key)] = result
+        host = hosts[int(key)]
+        status = "ok" if result["success"] else "unreachable"
+        ctx.ui.muted(f"  [{len(results)}/{len(hosts)}] {host.name}: {status}")
+
+    return [{"host": h, "result": results[i]} for i, h in enumerate(hosts)]
 
 
 async def check_hosts_sequential(
@@ -265,6 +302,7 @@ async def cmd_hosts_check(ctx: SharedContext, args: list[str]) -> CommandResult:
 
 
 __all__ = [
+    "CHECK_COMMAND",
     "HostCheckResult",
     "SSHConnectionTestResult",
     "check_hosts_parallel",
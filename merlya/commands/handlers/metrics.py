@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from merlya.commands.registry import CommandResult, command
+from merlya.commands.registry import CommandResult, command, subcommand
 from merlya.core.metrics import get_metrics_summary
 
 if TYPE_CHECKING:
@@ -48,3 +48,80 @@ async def cmd_metrics(ctx: SharedContext, _args: list[str]) -> CommandResult:
     ctx.ui.panel(summary, title="📊 Metrics Summary", style="success")
 
     return CommandResult(success=True, message="")
+
+
+@command("cache", "Show SSH result cache stats", "/cache [clear]")
+async def cmd_cache(ctx: SharedContext, args: list[str]) -> CommandResult:
+    """
+    Show the read-only command result cache.
+
+    Usage:
+        /cache
+        /cache clear
+
+    Displays:
+        - Cached results and hosts
+        - Hits, misses and hit rate (overall and per command class)
+        - Invalidations caused by mutating commands
+    """
+    if args:
+        return CommandResult(
+            success=False,
+            message="Unknown subcommand. Use `/help cache` for available commands.",
+            show_help=True,
+        )
+
+    summary = ctx.result_cache.summary()
+    status = "enabled" if ctx.config.ssh.result_cache else "disabled (ssh.result_cache = false)"
+
+    lines = [
+        f"Status: {status}",
+        f"Entries: {summary['entries']} ({summary['hosts']} hosts)",
+        f"Hits: {summary['hits']}  Misses: {summary['misses']}  "
+        f"Hit rate: {summary['hit_rate']:.0%}",
+        f"Invalidations: {summary['invalidations']}",
+    ]
+    if summary["by_class"]:
+        lines.append("")
+        lines.append("By command class:")
+        for name, counts in sorted(summary["by_class"].items()):
+            lines.append(f"  {name}: {counts['hits']} hits, {counts['misses']} misses")
+
+    ctx.ui.panel("\n".join(lines), title="⚡ SSH Result Cache", style="info")
+    return CommandResult(success=True, message="")
+
+
+@subcommand("cache", "clear", "Drop all cached results", "/cache clear")
+async def cmd_cache_clear(ctx: SharedContext, _args: list[str]) -> CommandResult:
+    """Drop all cached results and reset counters."""
+    entries = len(ctx.result_cache)
+    ctx.result_cache.clear()
+    return CommandResult(success=True, message=f"✅ Cleared {entries} cached result(s)")
+
+
+@subcommand("metrics", "db", "Show database query latency per method", "/metrics db")
+async def cmd_metrics_db(ctx: SharedContext, _args: list[str]) -> CommandResult:
+    """
+    Show SQLite query latency and lock waits per repository method.
+
+    Usage:
+        /metrics db
+    """
+    try:
+        db = ctx.db
+    except RuntimeError:
+        return CommandResult(success=False, message="❌ Database not initialized")
+
+    stats = db.get_query_stats()
+    lines = [f"Read connections: {db.read_pool_size}", ""]
+    if not stats:
+        lines.append("No queries recorded yet.")
+    for operation, op in list(stats.items())[:20]:
+        lines.append(
+            f"{operation}: {op['queries']} queries, avg {op['avg_ms']:.2f}ms, "
+            f"max {op['max_ms']:.2f}ms, lock wait avg {op['lock_wait_avg_ms']:.2f}ms "
+            f"(max {op['lock_wait_max_ms']:.2f}ms)"
+        )
+
+    ctx.ui.panel("\n".join(lines), title="🗄️ Database Queries", style="info")
+    return CommandResult(success=True, message="")
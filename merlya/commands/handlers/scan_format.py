@@ -7,6 +7,7 @@ Formatting utilities for scan command output.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from datetime import UTC, datetime
 from typing import Any
 
 
@@ -24,6 +25,8 @@ class ScanOptions:
     include_services: bool = True  # Running services list
     include_cron: bool = True  # Cron jobs list
     show_all: bool = False  # Show all ports/users (no truncation)
+    probe_bundle: bool = True  # Run system checks as one script (one round-trip)
+    fresh: bool = False  # Ignore cached sections and rescan
 
 
 @dataclass
@@ -35,6 +38,7 @@ class ScanResult:
     severity_score: int = 0  # 0-100, higher = more issues
     critical_count: int = 0
     warning_count: int = 0
+    cached: dict[str, str] = field(default_factory=dict)  # Section -> cached_at (ISO, UTC)
 
 
 def parse_scan_options(args: list[str]) -> ScanOptions:
@@ -66,6 +70,10 @@ def parse_scan_options(args: list[str]) -> ScanOptions:
             opts.include_cron = False
         elif arg == "--show-all":
             opts.show_all = True
+        elif arg == "--no-bundle":
+            opts.probe_bundle = False
+        elif arg == "--fresh":
+            opts.fresh = True
 
     return opts
 
@@ -94,6 +102,7 @@ def scan_to_dict(result: ScanResult, host: Any) -> dict[str, Any]:
         "warning_count": result.warning_count,
         "sections": result.sections,
         "issues": result.issues,
+        "cached": result.cached,
     }
 
 
@@ -118,6 +127,13 @@ def format_scan_output(result: ScanResult, host: Any, opts: ScanOptions | None =
     lines.append(f"**Critical:** {result.critical_count} | **Warnings:** {result.warning_count}")
     lines.append("")
 
+    if result.cached:
+        ages = ", ".join(
+            f"{section} {_format_age(cached_at)}" for section, cached_at in result.cached.items()
+        )
+        lines.append(f"🗂️ _Cached results ({ages}) - use `--fresh` to rescan_")
+        lines.append("")
+
     # System section
     if "system" in result.sections:
         _format_system_section(lines, result.sections["system"], show_all)
@@ -129,6 +145,19 @@ def format_scan_output(result: ScanResult, host: Any, opts: ScanOptions | None =
     return "\n".join(lines)
 
 
+def _format_age(cached_at: str) -> str:
+    """Age of a cached section ("2m ago")."""
+    try:
+        seconds = int((datetime.now(UTC) - datetime.fromisoformat(cached_at)).total_seconds())
+    except (TypeError, ValueError):
+        return "cached"
+    if seconds < 60:
+        return f"{max(seconds, 0)}s ago"
+    if seconds < 3600:
+        return f"{seconds // 60}m ago"
+    return f"{seconds // 3600}h ago"
+
+
 def _format_system_section(lines: list[str], sys_data: dict[str, Any], show_all: bool) -> None:
     """Format system section of scan output."""
     lines.append("### 🖥️ System")
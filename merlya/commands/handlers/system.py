@@ -8,8 +8,12 @@ from __future__ import annotations
 
 import asyncio
 import json
+import time
+from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any, TypedDict
 
+from loguru import logger
+
 from merlya.commands.handlers.scan_format import (
     ScanOptions,
     ScanResult,
@@ -21,6 +25,8 @@ from merlya.commands.registry import CommandResult, command
 from merlya.ssh.pool import SSHConnectionOptions
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     from merlya.core.context import SharedContext
     from merlya.persistence.models import Host
 
@@ -33,8 +39,18 @@ class _ScanHostResult(TypedDict):
     host: Host | None
 
 
-# Limit concurrent SSH channels to avoid MaxSessions limit (default 10 in OpenSSH)
-MAX_CONCURRENT_SSH_CHANNELS = 6
+# Upper bound on concurrent checks per host; the SSH pool's adaptive channel
+# limiter enforces what each host actually accepts (MaxSessions).
+MAX_CONCURRENT_SSH_CHANNELS = 10
+
+# Seconds a scanned section is served from the scan cache (--fresh bypasses it)
+SCAN_CACHE_TTL = {"quick": 60, "system": 300, "security": 1800}
+
+# Minimum seconds between background purges of expired scan cache rows
+SCAN_CACHE_PURGE_INTERVAL = 600.0
+
+_last_cache_purge = 0.0
+_purge_tasks: set[asyncio.Task[Any]] = set()
 
 
 async def _get_recent_errors(ctx: SharedContext, host: str) -> dict[str, Any]:
@@ -82,6 +98,8 @@ async def cmd_scan(ctx: SharedContext, args: list[str]) -> CommandResult:
       --no-network  Skip network diagnostics
       --no-services Skip services list
       --no-cron     Skip cron jobs list
+      --no-bundle   Run each check on its own SSH channel
+      --fresh       Ignore cached results and rescan
       --parallel    Scan multiple hosts in parallel
       --tag=<tag>   Scan all hosts with a specific tag
       --all         Scan all hosts in inventory
@@ -128,6 +146,8 @@ async def cmd_scan(ctx: SharedContext, args: list[str]) -> CommandResult:
             show_help=True,
         )
 
+    _schedule_cache_purge(ctx)
+
     # Parallel execution for multiple hosts
     if parallel_mode and len(host_names) > 1:
         return await _scan_hosts_parallel(ctx, host_names, opts)
@@ -162,37 +182,26 @@ async def _scan_hosts_parallel(
                 }
 
             try:
-                # Establish connection
-                ssh_pool = await ctx.get_ssh_pool()
-                connect_timeout = min(ctx.config.ssh.connect_timeout, 15)
-                options = SSHConnectionOptions(
-                    port=host.port,
-                    jump_host=host.jump_host,
-                    connect_timeout=connect_timeout,
-                )
-                await ssh_pool.get_connection(
-                    host=host.hostname,
-                    username=host.username,
-                    private_key=host.private_key,
-                    options=options,
-                    host_name=host.name,
-                )
+                # Establish connection (not needed when every section is cached)
+                if not await _all_sections_cached(ctx, host, opts):
+                    ssh_pool = await ctx.get_ssh_pool()
+                    connect_timeout = min(ctx.config.ssh.connect_timeout, 15)
+                    options = SSHConnectionOptions(
+                        port=host.port,
+                        jump_host=host.jump_host,
+                        connect_timeout=connect_timeout,
+                    )
+                    await ssh_pool.get_connection(
+                        host=host.hostname,
+                        username=host.username,
+                        private_key=host.private_key,
+                        options=options,
+                        host_name=host.name,
+                    )
 
                 # Run scan
                 scan_result = ScanResult()
-                ssh_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SSH_CHANNELS)
-
-                if opts.scan_type == "quick":
-                    await _scan_quick(ctx, host, scan_result)
-                elif opts.scan_type == "system":
-                    await _scan_system_parallel(ctx, host, scan_result, opts, ssh_semaphore)
-                elif opts.scan_type == "security":
-                    await _scan_security_parallel(ctx, host, scan_result, opts, ssh_semaphore)
-                else:  # full
-                    await asyncio.gather(
-                        _scan_system_parallel(ctx, host, scan_result, opts, ssh_semaphore),
-                        _scan_security_parallel(ctx, host, scan_result, opts, ssh_semaphore),
-                    )
+                await _run_scan(ctx, host, scan_result, opts)
 
                 await _calculate_severity_score(ctx, scan_result)
 
@@ -269,45 +278,33 @@ async def _scan_hosts_sequential(
 
         ctx.ui.info(f"Scanning {host.name} ({host.hostname})...")
 
-        # Establish connection once
-        try:
-            with ctx.ui.spinner(f"Connecting to {host.hostname}..."):
-                ssh_pool = await ctx.get_ssh_pool()
-                connect_timeout = min(ctx.config.ssh.connect_timeout, 15)
-                options = SSHConnectionOptions(
-                    port=host.port,
-                    jump_host=host.jump_host,
-                    connect_timeout=connect_timeout,
-                )
-                await ssh_pool.get_connection(
-                    host=host.hostname,
-                    username=host.username,
-                    private_key=host.private_key,
-                    options=options,
-                    host_name=host.name,  # Pass inventory name for credential lookup
-                )
-        except Exception as e:
-            outputs.append(f"❌ Unable to connect to `{host.name}` ({host.hostname}): {e}")
-            continue
+        # Establish connection once (not needed when every section is cached)
+        if not await _all_sections_cached(ctx, host, opts):
+            try:
+                with ctx.ui.spinner(f"Connecting to {host.hostname}..."):
+                    ssh_pool = await ctx.get_ssh_pool()
+                    connect_timeout = min(ctx.config.ssh.connect_timeout, 15)
+                    options = SSHConnectionOptions(
+                        port=host.port,
+                        jump_host=host.jump_host,
+                        connect_timeout=connect_timeout,
+                    )
+                    await ssh_pool.get_connection(
+                        host=host.hostname,
+                        username=host.username,
+                        private_key=host.private_key,
+                        options=options,
+                        host_name=host.name,  # Pass inventory name for credential lookup
+                    )
+            except Exception as e:
+                outputs.append(f"❌ Unable to connect to `{host.name}` ({host.hostname}): {e}")
+                continue
 
         # Run scan based on type
         scan_result = ScanResult()
 
-        # Shared semaphore to limit total concurrent SSH channels
-        ssh_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SSH_CHANNELS)
-
         with ctx.ui.spinner(f"Scanning {host.name}..."):
-            if opts.scan_type == "quick":
-                await _scan_quick(ctx, host, scan_result)
-            elif opts.scan_type == "system":
-                await _scan_system_parallel(ctx, host, scan_result, opts, ssh_semaphore)
-            elif opts.scan_type == "security":
-                await _scan_security_parallel(ctx, host, scan_result, opts, ssh_semaphore)
-            else:  # full
-                await asyncio.gather(
-                    _scan_system_parallel(ctx, host, scan_result, opts, ssh_semaphore),
-                    _scan_security_parallel(ctx, host, scan_result, opts, ssh_semaphore),
-                )
+            await _run_scan(ctx, host, scan_result, opts)
 
         # Calculate severity score using embeddings if available
         await _calculate_severity_score(ctx, scan_result)
@@ -327,20 +324,215 @@ async def _scan_hosts_sequential(
     )
 
 
-async def _scan_quick(ctx: SharedContext, host: Any, result: ScanResult) -> None:
+def _scan_sections(opts: ScanOptions) -> list[str]:
+    """Sections a scan type runs."""
+    if opts.scan_type in ("quick", "system", "security"):
+        return [opts.scan_type]
+    return ["system", "security"]
+
+
+def _scan_cache_key(section: str, opts: ScanOptions) -> str:
+    """scan_cache.scan_type of a section: its name plus the options that shape its data."""
+    if section == "system":
+        flags = {
+            "all_disks": opts.all_disks,
+            "docker": opts.include_docker,
+            "services": opts.include_services,
+            "network": opts.include_network,
+            "cron": opts.include_cron,
+            "full": opts.scan_type == "full",  # Adds processes and recent errors
+        }
+    elif section == "security":
+        flags = {"logins": opts.include_logins, "updates": opts.include_updates}
+    else:
+        flags = {}
+    return ":".join([section, *(name for name, enabled in flags.items() if enabled)])
+
+
+async def _get_cached_section(
+    ctx: SharedContext, host: Any, section: str, opts: ScanOptions
+) -> Any:
+    """Unexpired scan cache entry of a section, or None (also when the cache is unavailable)."""
+    if opts.fresh:
+        return None
+    try:
+        return await ctx.scan_cache.get(host.id, _scan_cache_key(section, opts))
+    except Exception as e:
+        logger.debug(f"Scan cache lookup failed: {e}")
+        return None
+
+
+async def _all_sections_cached(ctx: SharedContext, host: Any, opts: ScanOptions) -> bool:
+    """Whether every section of this scan can be served from the cache."""
+    for section in _scan_sections(opts):
+        if await _get_cached_section(ctx, host, section, opts) is None:
+            return False
+    return True
+
+
+def _merge_section(result: ScanResult, data: dict[str, Any]) -> None:
+    """Add a section's sections, issues and counts to a scan result."""
+    result.sections.update(data.get("sections", {}))
+    result.issues.extend(data.get("issues", []))
+    result.critical_count += data.get("critical_count", 0)
+    result.warning_count += data.get("warning_count", 0)
+
+
+async def _scan_section(
+    ctx: SharedContext,
+    host: Any,
+    section: str,
+    result: ScanResult,
+    opts: ScanOptions,
+    scan: Callable[[ScanResult], Awaitable[None]],
+) -> None:
+    """
+    Run one scan section, or serve it from the scan cache.
+
+    Fresh results are cached for SCAN_CACHE_TTL[section] seconds under a key
+    that includes the options shaping the section, so `--no-docker` never
+    reuses a scan that included Docker.
+    """
+    entry = await _get_cached_section(ctx, host, section, opts)
+    if entry is not None:
+        _merge_section(result, entry.data)
+        result.cached[section] = entry.data.get("cached_at", "")
+        logger.debug(f"🗂️ Scan cache hit: {section} for {host.name}")
+        return
+
+    partial = ScanResult()
+    await scan(partial)
+    data = {
+        "sections": partial.sections,
+        "issues": partial.issues,
+        "critical_count": partial.critical_count,
+        "warning_count": partial.warning_count,
+        "cached_at": datetime.now(UTC).isoformat(),
+    }
+    _merge_section(result, data)
+
+    # Don't cache a section whose checks all failed (e.g. host unreachable)
+    if not any(partial.sections.values()):
+        return
+    try:
+        await ctx.scan_cache.set(
+            host.id, _scan_cache_key(section, opts), data, SCAN_CACHE_TTL[section]
+        )
+    except Exception as e:
+        logger.debug(f"Scan cache store failed: {e}")
+
+
+async def _run_scan(ctx: SharedContext, host: Any, result: ScanResult, opts: ScanOptions) -> None:
+    """Run the sections of a scan type, sharing one channel semaphore."""
+    # Shared semaphore to limit total concurrent SSH channels
+    sem = asyncio.Semaphore(MAX_CONCURRENT_SSH_CHANNELS)
+    scanners: dict[str, Callable[[ScanResult], Awaitable[None]]] = {
+        "quick": lambda r: _scan_quick(ctx, host, r, opts),
+        "system": lambda r: _scan_system_parallel(ctx, host, r, opts, sem),
+        "security": lambda r: _scan_security_parallel(ctx, host, r, opts, sem),
+    }
+    await asyncio.gather(
+        *[
+            _scan_section(ctx, host, section, result, opts, scanners[section])
+            for section in _scan_sections(opts)
+        ]
+    )
+
+
+def _schedule_cache_purge(ctx: SharedContext) -> None:
+    """Purge expired scan cache rows in the background (at most every interval)."""
+    global _last_cache_purge
+
+    now = time.monotonic()
+    if _last_cache_purge and now - _last_cache_purge < SCAN_CACHE_PURGE_INTERVAL:
+        return
+    _last_cache_purge = now
+
+    async def purge() -> None:
+        try:
+            await ctx.scan_cache.purge_expired()
+        except Exception as e:
+            logger.debug(f"Scan cache purge failed: {e}")
+
+    task = asyncio.get_running_loop().create_task(purge())
+    _purge_tasks.add(task)
+    task.add_done_callback(_purge_tasks.discard)
+
+
+async def _run_checks(
+    ctx: SharedContext,
+    host: Any,
+    checks: dict[str, Callable[[], Awaitable[Any]]],
+    opts: ScanOptions,
+    semaphore: asyncio.Semaphore,
+) -> dict[str, Any]:
+    """
+    Run scan checks, bundling those the probe bundle supports into one channel.
+
+    Checks the bundle cannot serve run on their own channels alongside it;
+    bundled checks missing from its output or failed are retried on their own.
+
+    Returns:
+        Results (or exceptions) by check name.
+    """
+    from merlya.tools.system.probe_bundle import PROBES, run_probe_bundle
+
+    async def run_with_sem(name: str) -> Any:
+        async with semaphore:
+            return await checks[name]()
+
+    async def run_bundle(names: list[str]) -> dict[str, Any]:
+        if not names:
+            return {}
+        async with semaphore:
+            return await run_probe_bundle(ctx, host.name, names)
+
+    bundled = [name for name in checks if opts.probe_bundle and name in PROBES]
+    others = [name for name in checks if name not in bundled]
+
+    bundle_results, *other_results = await asyncio.gather(
+        run_bundle(bundled),
+        *[run_with_sem(name) for name in others],
+        return_exceptions=True,
+    )
+    results: dict[str, Any] = dict(zip(others, other_results, strict=True))
+    if isinstance(bundle_results, dict):
+        results.update(
+            (name, res) for name, res in bundle_results.items() if getattr(res, "success", False)
+        )
+
+    retry = [name for name in bundled if name not in results]
+    retry_results = await asyncio.gather(
+        *[run_with_sem(name) for name in retry], return_exceptions=True
+    )
+    results.update(zip(retry, retry_results, strict=True))
+    return results
+
+
+async def _scan_quick(
+    ctx: SharedContext, host: Any, result: ScanResult, opts: ScanOptions | None = None
+) -> None:
     """Quick scan: CPU, memory, disk, ports only (parallel)."""
     from merlya.tools.security import check_open_ports
     from merlya.tools.system import check_cpu, check_disk_usage, check_memory
 
     # Run all checks in parallel
-    mem_task = check_memory(ctx, host.name)
-    cpu_task = check_cpu(ctx, host.name)
-    disk_task = check_disk_usage(ctx, host.name, "/")
-    ports_task = check_open_ports(ctx, host.name)
-
-    mem_result, cpu_result, disk_result, ports_result = await asyncio.gather(
-        mem_task, cpu_task, disk_task, ports_task
+    checks: dict[str, Callable[[], Awaitable[Any]]] = {
+        "memory": lambda: check_memory(ctx, host.name),
+        "cpu": lambda: check_cpu(ctx, host.name),
+        "disk": lambda: check_disk_usage(ctx, host.name, "/"),
+        "ports": lambda: check_open_ports(ctx, host.name),
+    }
+    check_results = await _run_checks(
+        ctx, host, checks, opts or ScanOptions(), asyncio.Semaphore(MAX_CONCURRENT_SSH_CHANNELS)
     )
+    for res in check_results.values():
+        if isinstance(res, BaseException):
+            raise res
+    mem_result = check_results["memory"]
+    cpu_result = check_results["cpu"]
+    disk_result = check_results["disk"]
+    ports_result = check_results["ports"]
 
     # Process results
     if mem_result.success and mem_result.data:
@@ -404,51 +596,46 @@ async def _scan_system_parallel(
         list_services,
     )
 
-    sem = semaphore or asyncio.Semaphore(MAX_CONCURRENT_SSH_CHANNELS)
-
-    async def run_with_sem(coro: Any) -> Any:
-        async with sem:
-            return await coro
-
-    # Build task list based on options
-    tasks = {
-        "system_info": run_with_sem(get_system_info(ctx, host.name)),
-        "memory": run_with_sem(check_memory(ctx, host.name)),
-        "cpu": run_with_sem(check_cpu(ctx, host.name)),
-        "health": run_with_sem(health_summary(ctx, [host.name])),  # list of hosts
+    # Build check list based on options
+    checks: dict[str, Callable[[], Awaitable[Any]]] = {
+        "system_info": lambda: get_system_info(ctx, host.name),
+        "memory": lambda: check_memory(ctx, host.name),
+        "cpu": lambda: check_cpu(ctx, host.name),
+        "health": lambda: health_summary(ctx, [host.name]),  # list of hosts
     }
 
     if opts.all_disks:
-        tasks["disks"] = run_with_sem(check_all_disks(ctx, host.name))
+        checks["disks"] = lambda: check_all_disks(ctx, host.name)
     else:
         from merlya.tools.system import check_disk_usage
 
-        tasks["disk"] = run_with_sem(check_disk_usage(ctx, host.name, "/"))
+        checks["disk"] = lambda: check_disk_usage(ctx, host.name, "/")
 
     if opts.include_docker:
-        tasks["docker"] = run_with_sem(check_docker(ctx, host.name))
+        checks["docker"] = lambda: check_docker(ctx, host.name)
 
     if opts.include_services:
-        tasks["services"] = run_with_sem(list_services(ctx, host.name, filter_state="running"))
+        checks["services"] = lambda: list_services(ctx, host.name, filter_state="running")
 
     if opts.include_network:
-        tasks["network"] = run_with_sem(check_network(ctx, host.name))
+        checks["network"] = lambda: check_network(ctx, host.name)
 
     if opts.include_cron:
-        tasks["cron"] = run_with_sem(list_cron(ctx, host.name))
+        checks["cron"] = lambda: list_cron(ctx, host.name)
 
     # Full scan only: top processes and recent errors
     if opts.scan_type == "full":
-        tasks["processes"] = run_with_sem(list_processes(ctx, host.name, limit=10, sort_by="cpu"))
-        tasks["logs"] = run_with_sem(_get_recent_errors(ctx, host.name))
+        checks["processes"] = lambda: list_processes(ctx, host.name, limit=10, sort_by="cpu")
+        checks["logs"] = lambda: _get_recent_errors(ctx, host.name)
 
-    # Execute all tasks in parallel (semaphore limits concurrency)
+    # Execute all checks (bundled checks share one channel, semaphore limits the rest)
+    sem = semaphore or asyncio.Semaphore(MAX_CONCURRENT_SSH_CHANNELS)
+    check_results = await _run_checks(ctx, host, checks, opts, sem)
     results_dict = {}
-    task_list = list(tasks.items())
-    task_results = await asyncio.gather(*[t[1] for t in task_list], return_exceptions=True)
 
-    for (name, _), res in zip(task_list, task_results, strict=False):
-        if isinstance(res, BaseException):
+    for name in checks:
+        res = check_results.get(name)
+        if res is None or isinstance(res, BaseException):
             continue
         if hasattr(res, "success") and res.success and hasattr(res, "data") and res.data:
             results_dict[name] = res.data
@@ -118,6 +118,23 @@ class SSHConfig(BaseModel):
     )
     default_user: str | None = Field(default=None, description="Default SSH username")
     default_key: Path | None = Field(default=None, description="Default private key path")
+    prewarm: bool = Field(
+        default=True,
+        description="Pre-establish connections to hosts mentioned in a request",
+    )
+    result_cache: bool = Field(
+        default=True,
+        description="Reuse recent results of read-only commands (os-release, df, ...)",
+    )
+    daemon: bool = Field(
+        default=True,
+        description="Route SSH through a running `merlya daemon` when one is available",
+    )
+    daemon_idle_timeout: int = Field(
+        default=1800,
+        ge=0,
+        description="Seconds without requests before the daemon exits (0 = never)",
+    )
 
 
 class UIConfig(BaseModel):
@@ -41,11 +41,13 @@ if TYPE_CHECKING:
         ConversationRepository,
         Database,
         HostRepository,
+        ScanCacheRepository,
         VariableRepository,
     )
     from merlya.router import IntentRouter
     from merlya.security import ElevationManager
     from merlya.ssh import SSHPool
+    from merlya.tools.core.result_cache import CommandResultCache
     from merlya.tools.core.user_input import AskUserCache
     from merlya.ui import ConsoleUI
 
@@ -89,6 +91,7 @@ class SharedContext:
     _host_repo: HostRepository | None = field(default=None, repr=False)
     _var_repo: VariableRepository | None = field(default=None, repr=False)
     _conv_repo: ConversationRepository | None = field(default=None, repr=False)
+    _scan_cache_repo: ScanCacheRepository | None = field(default=None, repr=False)
 
     # SSH Pool (lazy init)
     _ssh_pool: SSHPool | None = field(default=None, repr=False)
@@ -110,6 +113,9 @@ class SharedContext:
     # Ask user cache for input deduplication
     _ask_user_cache: AskUserCache | None = field(default=None, repr=False)
 
+    # Read-only command result cache
+    _result_cache: CommandResultCache | None = field(default=None, repr=False)
+
     # Non-interactive mode flags
     auto_confirm: bool = field(default=False)
     quiet: bool = field(default=False)
@@ -137,6 +143,7 @@ class SharedContext:
                 _host_repo=self._host_repo,
                 _var_repo=self._var_repo,
                 _conv_repo=self._conv_repo,
+                _scan_cache_repo=self._scan_cache_repo,
             )
         return self._data_ctx
 
@@ -211,6 +218,13 @@ class SharedContext:
             raise RuntimeError("Database not initialized. Call init_async() first.")
         return self._conv_repo
 
+    @property
+    def scan_cache(self) -> ScanCacheRepository:
+        """Get scan cache repository."""
+        if self._scan_cache_repo is None:
+            raise RuntimeError("Database not initialized. Call init_async() first.")
+        return self._scan_cache_repo
+
     async def get_ssh_pool(self) -> SSHPool:
         """Get SSH connection pool (async)."""
         if self._ssh_pool is None:
@@ -226,6 +240,14 @@ class SharedContext:
             if auth_manager:
                 self._ssh_pool.set_auth_manager(auth_manager)
 
+            if self.config.ssh.daemon and not self._ssh_pool.daemon_attached:
+                from merlya.ssh.daemon_client import SSHDaemonClient
+
+                client = await SSHDaemonClient.connect()
+                if client is not None:
+                    self._ssh_pool.attach_daemon(client)
+                    logger.debug("🔌 Attached to SSH daemon")
+
         return self._ssh_pool
 
     async def get_auth_manager(self) -> object | None:
@@ -304,6 +326,15 @@ class SharedContext:
             self._ask_user_cache = AskUserCache()
         return self._ask_user_cache
 
+    @property
+    def result_cache(self) -> CommandResultCache:
+        """Get the read-only command result cache (lazy init)."""
+        if self._result_cache is None:
+            from merlya.tools.core.result_cache import CommandResultCache
+
+            self._result_cache = CommandResultCache()
+        return self._result_cache
+
     async def init_async(self) -> None:
         """
         Initialize async components (database, etc).
@@ -313,6 +344,7 @@ class SharedContext:
         from merlya.persistence import (
             ConversationRepository,
             HostRepository,
+            ScanCacheRepository,
             VariableRepository,
             get_database,
         )
@@ -321,6 +353,7 @@ class SharedContext:
         self._host_repo = HostRepository(self._db)
         self._var_repo = VariableRepository(self._db)
         self._conv_repo = ConversationRepository(self._db)
+        self._scan_cache_repo = ScanCacheRepository(self._db)
 
         logger.debug("✅ SharedContext async components initialized")
 
@@ -370,6 +403,14 @@ class SharedContext:
         if SharedContext._instance is None:
             return
 
+        # Write queued audit events while the database is still open
+        try:
+            from merlya.audit.logger import close_audit_logger
+
+            await close_audit_logger()
+        except Exception as e:
+            logger.debug(f"Audit logger close error: {e}")
+
         if self._db:
             try:
                 await self._db.close()
@@ -380,6 +421,7 @@ class SharedContext:
         if self._ssh_pool:
             try:
                 await self._ssh_pool.disconnect_all()
+                await self._ssh_pool.detach_daemon()
             except Exception as e:
                 logger.debug(f"SSH pool close error: {e}")
             self._ssh_pool = None
@@ -25,6 +25,7 @@ if TYPE_CHECKING:
         ConversationRepository,
         Database,
         HostRepository,
+        ScanCacheRepository,
         VariableRepository,
     )
     from merlya.router import IntentRouter
@@ -78,6 +79,7 @@ class DataContext:
     _host_repo: HostRepository | None = field(default=None, repr=False)
     _var_repo: VariableRepository | None = field(default=None, repr=False)
     _conv_repo: ConversationRepository | None = field(default=None, repr=False)
+    _scan_cache_repo: ScanCacheRepository | None = field(default=None, repr=False)
 
     @property
     def db(self) -> Database:
@@ -107,11 +109,19 @@ class DataContext:
             raise RuntimeError("Database not initialized. Call init_async() first.")
         return self._conv_repo
 
+    @property
+    def scan_cache(self) -> ScanCacheRepository:
+        """Get scan cache repository."""
+        if self._scan_cache_repo is None:
+            raise RuntimeError("Database not initialized. Call init_async() first.")
+        return self._scan_cache_repo
+
     async def init_async(self) -> None:
         """Initialize async components (database, repositories)."""
         from merlya.persistence import (
             ConversationRepository,
             HostRepository,
+            ScanCacheRepository,
             VariableRepository,
             get_database,
         )
@@ -120,6 +130,7 @@ class DataContext:
         self._host_repo = HostRepository(self._db)
         self._var_repo = VariableRepository(self._db)
         self._conv_repo = ConversationRepository(self._db)
+        self._scan_cache_repo = ScanCacheRepository(self._db)
 
         logger.debug("✅ DataContext initialized")
 
@@ -7,6 +7,12 @@ NO external backends in MVP (Prometheus/Grafana deferred to V2.0).
 Metrics:
 - merlya_commands_total: Total commands executed
 - merlya_ssh_duration_seconds: SSH operation duration
+- merlya_ssh_pool_lock_wait_seconds: Time spent waiting on the SSH pool lock
+- merlya_ssh_connections_active / _idle: Pooled SSH connections (hot / cold)
+- merlya_ssh_connections_reaped_total: Connections removed by pool maintenance
+- merlya_db_query_seconds / merlya_db_lock_wait_seconds: SQLite statement latency and
+  time spent waiting for the writer or a read connection
+- merlya_db_queries_total: SQLite statements per repository method
 - merlya_llm_calls_total: LLM API calls
 - merlya_pipeline_executions: Pipeline executions
 """
@@ -329,6 +335,139 @@ def track_ssh_duration(duration: float, host: str, status: str = "success") -> N
     _registry.counter("merlya_ssh_operations_total").inc(host=host, status=status)
 
 
+def track_ssh_pool_lock_wait(duration: float) -> None:
+    """
+    Track time spent waiting to acquire the SSH pool lock.
+
+    Args:
+        duration: Wait duration in seconds
+    """
+    _registry.histogram(
+        "merlya_ssh_pool_lock_wait_seconds",
+        buckets=[0.0001, 0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+    ).observe(duration)
+
+
+def track_ssh_prompt_wait(duration: float, outcome: str) -> None:
+    """
+    Track time spent waiting for a sudo/su password prompt.
+
+    Args:
+        duration: Wait duration in seconds
+        outcome: How the wait ended ("prompt", "eof" or "timeout")
+    """
+    _registry.histogram(
+        "merlya_ssh_prompt_wait_seconds",
+        buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+    ).observe(duration)
+    _registry.counter("merlya_ssh_prompt_waits_total").inc(outcome=outcome)
+
+
+def track_ssh_pool_state(active: int, idle: int) -> None:
+    """
+    Track pooled SSH connections after a maintenance sweep.
+
+    Args:
+        active: Connections used recently (kept warm)
+        idle: Connections pooled but cold
+    """
+    _registry.gauge("merlya_ssh_connections_active").set(active)
+    _registry.gauge("merlya_ssh_connections_idle").set(idle)
+
+
+def track_ssh_connections_reaped(reason: str, count: int = 1) -> None:
+    """
+    Track SSH connections removed by pool maintenance.
+
+    Args:
+        reason: Why the connection was reaped (e.g., "expired", "closed")
+        count: Number of connections
+    """
+    _registry.counter("merlya_ssh_connections_reaped_total").inc(count, reason=reason)
+
+
+def track_result_cache(outcome: str, command_class: str) -> None:
+    """
+    Track a read-only command result cache lookup.
+
+    Args:
+        outcome: "hit" or "miss"
+        command_class: Command class (e.g., "static", "status")
+    """
+    _registry.counter("merlya_ssh_result_cache_total").inc(
+        outcome=outcome, command_class=command_class
+    )
+
+
+def track_db_query(operation: str, duration: float, lock_wait: float, connection: str) -> None:
+    """
+    Track one SQLite statement.
+
+    Args:
+        operation: Repository method that ran it (e.g., "HostRepository.get_by_name")
+        duration: Execution time in seconds
+        lock_wait: Time spent waiting for the connection in seconds
+        connection: "read" (read pool) or "write" (writer)
+    """
+    _registry.histogram(
+        "merlya_db_query_seconds",
+        buckets=[0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0],
+    ).observe(duration)
+    _registry.counter("merlya_db_queries_total").inc(operation=operation, connection=connection)
+    track_db_lock_wait(lock_wait)
+
+
+def track_db_lock_wait(duration: float) -> None:
+    """
+    Track time spent waiting for the SQLite writer or a read connection.
+
+    Args:
+        duration: Wait duration in seconds
+    """
+    _registry.histogram(
+        "merlya_db_lock_wait_seconds",
+        buckets=[0.0001, 0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+    ).observe(duration)
+
+
+def track_audit_flush(duration: float, events: int, status: str = "success") -> None:
+    """
+    Track one audit writer flush (a batch committed in one transaction).
+
+    Args:
+        duration: Flush duration in seconds
+        events: Number of events in the batch
+        status: "success" or "error"
+    """
+    _registry.histogram(
+        "merlya_audit_flush_seconds",
+        buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0],
+    ).observe(duration)
+    _registry.counter("merlya_audit_flushes_total").inc(status=status)
+    if status == "success":
+        _registry.counter("merlya_audit_events_written_total").inc(events)
+
+
+def track_audit_events_dropped(events: int) -> None:
+    """
+    Track audit events the writer gave up on (database failing too long).
+
+    Args:
+        events: Number of events not written
+    """
+    _registry.counter("merlya_audit_events_dropped_total").inc(events)
+
+
+def track_audit_queue_depth(depth: int) -> None:
+    """
+    Track audit events waiting to be written.
+
+    Args:
+        depth: Events queued or in the batch being flushed
+    """
+    _registry.gauge("merlya_audit_queue_depth").set(depth)
+
+
 def track_llm_call(
     provider: str, model: str, duration: float, _tokens: int, status: str = "success"
 ) -> None:
@@ -447,6 +586,42 @@ def get_metrics_summary() -> str:
             )
             lines.append("")
 
+    # SSH pool
+    if "merlya_ssh_connections_active" in data["gauges"]:
+        reaped = data["counters"].get("merlya_ssh_connections_reaped_total", {}).get("labels", {})
+        lines.append(
+            f"**SSH Pool:** {int(data['gauges']['merlya_ssh_connections_active'])} active, "
+            f"{int(data['gauges'].get('merlya_ssh_connections_idle', 0))} idle, "
+            f"{sum(reaped.values())} reaped"
+        )
+        lines.append("")
+
+    # Database
+    if "merlya_db_query_seconds" in data["histograms"]:
+        db_stats = data["histograms"]["merlya_db_query_seconds"]
+        wait_stats = data["histograms"].get("merlya_db_lock_wait_seconds", {"max": 0.0})
+        if db_stats["count"] > 0:
+            lines.append(
+                f"**Database:** {db_stats['count']} statements, "
+                f"avg={db_stats['avg'] * 1000:.2f}ms, "
+                f"max lock wait={wait_stats['max'] * 1000:.2f}ms (/metrics db)"
+            )
+            lines.append("")
+
+    # Audit writer
+    if "merlya_audit_flush_seconds" in data["histograms"]:
+        flush_stats = data["histograms"]["merlya_audit_flush_seconds"]
+        if flush_stats["count"] > 0:
+            written = data["counters"].get("merlya_audit_events_written_total", {"value": 0})
+            dropped = data["counters"].get("merlya_audit_events_dropped_total", {"value": 0})
+            lines.append(
+                f"**Audit Writer:** {written['value']} events in {flush_stats['count']} flushes, "
+                f"avg={flush_stats['avg'] * 1000:.2f}ms, "
+                f"queued={int(data['gauges'].get('merlya_audit_queue_depth', 0))}"
+                + (f", dropped={dropped['value']}" if dropped["value"] else "")
+            )
+            lines.append("")
+
     # LLM calls
     if "merlya_llm_calls_total" in data["counters"]:
         llm_data = data["counters"]["merlya_llm_calls_total"]
@@ -15,6 +15,7 @@ from merlya.persistence.models import (
 from merlya.persistence.repositories import (
     ConversationRepository,
     HostRepository,
+    ScanCacheRepository,
     VariableRepository,
 )
 
@@ -26,6 +27,7 @@ __all__ = [
     "HostRepository",
     "OSInfo",
     "ScanCache",
+    "ScanCacheRepository",
     "Variable",
     "VariableRepository",
     "get_database",
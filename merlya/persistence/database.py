@@ -2,23 +2,34 @@
 Merlya Persistence - Database connection.
 
 SQLite database with async support via aiosqlite.
+
+The database runs in WAL mode with one writer connection and a small pool
+of read-only connections. SELECTs go to the read pool, so they are not
+queued behind a long write transaction; writes and transactions are
+queued on the writer. Query latency and lock waits are recorded per
+repository method (see `track_queries`).
 """
 
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import sqlite3
+import time
+import zlib
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
 
 import aiosqlite
 from loguru import logger
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
 
 
 # =============================================================================
@@ -52,11 +63,239 @@ DEFAULT_DB_PATH = Path.home() / ".merlya" / "merlya.db"
 # v2: Added ON DELETE SET NULL/CASCADE to foreign keys
 # v3: Added session_messages table for message history persistence
 # v4: Added elevation_method to hosts table
-SCHEMA_VERSION = 4
+# v5: Moved conversation messages to conversation_messages rows
+# v6: Added FTS5 search index for conversations
+# v7: Added host_tags table (indexed copy of hosts.tags)
+# v8: Moved raw log output to compressed raw_log_chunks
+SCHEMA_VERSION = 9
+
+# Raw log output is stored as zlib-compressed chunks of whole lines. A chunk
+# is closed once it holds LOG_CHUNK_SIZE characters; its start_line and
+# line_count index it, so a slice only decompresses the chunks it overlaps.
+LOG_CHUNK_SIZE = 64 * 1024
+
+# Searchable text of a serialized ModelMessage: text/tool-return content and
+# tool-call arguments of every part (plain dicts fall back to "content")
+MESSAGE_TEXT_SQL = """coalesce(
+    CASE WHEN json_valid({column}) THEN (
+        SELECT group_concat(
+            coalesce(json_extract(part.value, '$.content'), json_extract(part.value, '$.args')),
+            ' '
+        )
+        FROM json_each({column}, '$.parts') AS part
+    ) END,
+    CASE WHEN json_valid({column}) THEN json_extract({column}, '$.content') END,
+    ''
+)"""
+
+
+def encode_log_chunks(
+    output: str, chunk_size: int = LOG_CHUNK_SIZE
+) -> list[tuple[int, int, bytes]]:
+    """
+    Split a log into (start_line, line_count, data) chunks of whole lines.
+
+    Lines are `output.split("\\n")` (0-based), so joining every decoded
+    chunk with "\\n" gives the output back. There is always one chunk.
+    """
+    lines = output.split("\n")
+    chunks: list[tuple[int, int, bytes]] = []
+    start = size = 0
+    for end, line in enumerate(lines, start=1):
+        size += len(line) + 1
+        if size >= chunk_size or end == len(lines):
+            data = zlib.compress("\n".join(lines[start:end]).encode("utf-8"))
+            chunks.append((start, end - start, data))
+            start, size = end, 0
+    return chunks
+
+
+def decode_log_chunk(data: bytes) -> list[str]:
+    """Lines of a chunk produced by encode_log_chunks()."""
+    return zlib.decompress(data).decode("utf-8").split("\n")
+
+
+# FTS5 index over conversations, kept in sync by triggers. Conversation rows
+# are matched by id (their rowid is not stable across VACUUM); message rows
+# share the INTEGER PRIMARY KEY of conversation_messages.
+# conversation_id is UNINDEXED, so the update scans conversation_fts: only
+# run it when the title or summary really changed, not on every saved turn.
+CONVERSATION_FTS_UPDATE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS conversations_fts_update
+AFTER UPDATE OF title, summary ON conversations
+WHEN old.title IS NOT new.title OR old.summary IS NOT new.summary BEGIN
+    UPDATE conversation_fts SET title = new.title, summary = new.summary
+    WHERE conversation_id = new.id;
+END;
+"""
+
+SEARCH_INDEX_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS conversation_fts USING fts5(
+    title, summary, conversation_id UNINDEXED
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS conversation_message_fts USING fts5(
+    text, conversation_id UNINDEXED
+);
+
+CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+    INSERT INTO conversation_fts (title, summary, conversation_id)
+    VALUES (new.title, new.summary, new.id);
+END;
+{CONVERSATION_FTS_UPDATE_TRIGGER}
+CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+    DELETE FROM conversation_fts WHERE conversation_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS conversation_messages_fts_insert
+AFTER INSERT ON conversation_messages BEGIN
+    INSERT INTO conversation_message_fts (rowid, text, conversation_id)
+    VALUES (new.id, {MESSAGE_TEXT_SQL.format(column="new.message_data")}, new.conversation_id);
+END;
+CREATE TRIGGER IF NOT EXISTS conversation_messages_fts_delete
+AFTER DELETE ON conversation_messages BEGIN
+    DELETE FROM conversation_message_fts WHERE rowid = old.id;
+END;
+"""
 
 # Migration lock timeout in seconds
 MIGRATION_LOCK_TIMEOUT = 30
 
+# Read-only connections serving SELECTs next to the writer
+DEFAULT_READ_POOL_SIZE = 4
+
+# Applied to every connection (journal_mode=WAL is set once, on the writer).
+# synchronous=NORMAL is safe in WAL mode: a power loss can only lose the
+# last commits, never corrupt the database.
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",  # 16 MiB
+    "PRAGMA mmap_size = 268435456",  # 256 MiB
+    "PRAGMA temp_store = MEMORY",
+)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Database whose writer the current task holds (inside transaction())
+_writer_owner: ContextVar[Database | None] = ContextVar("merlya_db_writer_owner", default=None)
+# Repository method the current queries are attributed to
+_operation: ContextVar[str] = ContextVar("merlya_db_operation", default="other")
+
+
+def track_queries(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """
+    Attribute the queries run by a repository method to it in query stats.
+
+    Methods are named by their qualified name (`HostRepository.get_by_name`),
+    module-level functions by module and name (`storage.store_event`).
+    """
+    name = func.__qualname__
+    if "." not in name:
+        name = f"{func.__module__.rsplit('.', 1)[-1]}.{name}"
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        token = _operation.set(name)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _operation.reset(token)
+
+    return wrapper
+
+
+@dataclass
+class QueryStats:
+    """Query latency and lock waits of one repository method."""
+
+    queries: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    lock_waits: int = 0
+    lock_wait_time: float = 0.0
+    max_lock_wait: float = 0.0
+
+    def record(self, duration: float, lock_wait: float) -> None:
+        """Record one statement."""
+        self.queries += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.record_wait(lock_wait)
+
+    def record_wait(self, lock_wait: float) -> None:
+        """Record a wait for a connection."""
+        self.lock_waits += 1
+        self.lock_wait_time += lock_wait
+        self.max_lock_wait = max(self.max_lock_wait, lock_wait)
+
+    def as_dict(self) -> dict[str, float | int]:
+        """Stats in milliseconds."""
+        return {
+            "queries": self.queries,
+            "avg_ms": round(self.total_time / self.queries * 1000, 3) if self.queries else 0.0,
+            "max_ms": round(self.max_time * 1000, 3),
+            "total_ms": round(self.total_time * 1000, 3),
+            "lock_wait_avg_ms": (
+                round(self.lock_wait_time / self.lock_waits * 1000, 3) if self.lock_waits else 0.0
+            ),
+            "lock_wait_max_ms": round(self.max_lock_wait * 1000, 3),
+        }
+
+
+class ReadCursor:
+    """
+    Rows of a SELECT run on a pooled read connection.
+
+    Rows are fetched before the connection goes back to the pool; the
+    cursor API (fetchone/fetchall/fetchmany, async iteration, async with)
+    matches aiosqlite.Cursor.
+    """
+
+    rowcount = -1
+    lastrowid: int | None = None
+
+    def __init__(self, rows: list[sqlite3.Row], description: Any) -> None:
+        self._rows: Iterator[sqlite3.Row] = iter(rows)
+        self.description = description
+
+    async def fetchone(self) -> sqlite3.Row | None:
+        """Next row, or None."""
+        return next(self._rows, None)
+
+    async def fetchmany(self, size: int = 1) -> list[sqlite3.Row]:
+        """Up to `size` next rows."""
+        return [row for _, row in zip(range(size), self._rows, strict=False)]
+
+    async def fetchall(self) -> list[sqlite3.Row]:
+        """All remaining rows."""
+        return list(self._rows)
+
+    async def close(self) -> None:
+        """Drop remaining rows."""
+        self._rows = iter(())
+
+    def __aiter__(self) -> ReadCursor:
+        return self
+
+    async def __anext__(self) -> sqlite3.Row:
+        row = next(self._rows, None)
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    async def __aenter__(self) -> ReadCursor:
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        await self.close()
+
+
+def _is_read_query(query: str) -> bool:
+    """Whether a statement can run on a read-only connection."""
+    return query.lstrip()[:6].upper() == "SELECT"
+
 
 class DatabaseError(Exception):
     """Base database error."""
@@ -87,37 +326,73 @@ class Database:
     _instance: Database | None = None
     _lock: asyncio.Lock = asyncio.Lock()
 
-    def __init__(self, path: Path | None = None) -> None:
+    def __init__(
+        self, path: Path | None = None, read_pool_size: int = DEFAULT_READ_POOL_SIZE
+    ) -> None:
         """
         Initialize database.
 
         Args:
             path: Database file path.
+            read_pool_size: Read-only connections for SELECTs (0 = use the writer).
         """
         self.path = path or DEFAULT_DB_PATH
+        self.read_pool_size = 0 if str(self.path) == ":memory:" else read_pool_size
         self._connection: aiosqlite.Connection | None = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._read_pool: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._write_lock = asyncio.Lock()  # Writers queue here (FIFO)
+        self.query_stats: dict[str, QueryStats] = {}
 
-    async def connect(self) -> None:
-        """Open database connection and initialize schema."""
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+    async def _open(self, read_only: bool = False) -> aiosqlite.Connection:
+        """Open a connection with the shared pragmas."""
+        target: str | Path = self.path
+        if read_only:
+            target = f"{self.path.resolve().as_uri()}?mode=ro"
 
         # Use detect_types for datetime conversion
-        self._connection = await aiosqlite.connect(
-            self.path,
+        conn = await aiosqlite.connect(
+            target,
             detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            uri=read_only,
         )
-        self._connection.row_factory = aiosqlite.Row
+        conn.row_factory = aiosqlite.Row
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        if read_only:
+            await conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    async def connect(self) -> None:
+        """Open the writer and read connections and initialize schema."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Enable foreign keys
-        await self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection = await self._open()
+        if self.read_pool_size:
+            async with self._connection.execute("PRAGMA journal_mode = WAL") as cursor:
+                row = await cursor.fetchone()
+            if row is None or row[0].lower() != "wal":
+                logger.warning("⚠️ SQLite WAL mode unavailable, reads will use the writer")
+                self.read_pool_size = 0
 
         # Initialize schema
         await self._init_schema()
 
-        logger.debug(f"🗄️ Database connected: {self.path}")
+        if self.read_pool_size:
+            self._read_pool = asyncio.Queue()
+            for _ in range(self.read_pool_size):
+                reader = await self._open(read_only=True)
+                self._readers.append(reader)
+                self._read_pool.put_nowait(reader)
+
+        logger.debug(f"🗄️ Database connected: {self.path} ({self.read_pool_size} readers)")
 
     async def close(self) -> None:
-        """Close database connection."""
+        """Close all connections."""
+        for reader in self._readers:
+            await reader.close()
+        self._readers.clear()
+        self._read_pool = None
         if self._connection:
             await self._connection.close()
             self._connection = None
@@ -125,7 +400,7 @@ class Database:
 
     @property
     def connection(self) -> aiosqlite.Connection:
-        """Get current connection."""
+        """Get the writer connection."""
         if not self._connection:
             raise RuntimeError("Database not connected")
         return self._connection
@@ -154,6 +429,15 @@ class Database:
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
 
+            -- Host tags table (indexed copy of hosts.tags, kept in sync by HostRepository)
+            CREATE TABLE IF NOT EXISTS host_tags (
+                host_id TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (host_id, tag),
+                -- ON DELETE CASCADE: Delete tags when host is deleted
+                FOREIGN KEY (host_id) REFERENCES hosts(id) ON DELETE CASCADE
+            ) WITHOUT ROWID;
+
             -- Variables table
             CREATE TABLE IF NOT EXISTS variables (
                 name TEXT PRIMARY KEY,
@@ -166,12 +450,25 @@ class Database:
             CREATE TABLE IF NOT EXISTS conversations (
                 id TEXT PRIMARY KEY,
                 title TEXT,
-                messages TEXT,
+                messages TEXT,  -- Legacy JSON blob, moved to conversation_messages (v5)
                 summary TEXT,
+                message_count INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
 
+            -- Conversation messages table (one row per message, append-only)
+            CREATE TABLE IF NOT EXISTS conversation_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                sequence_num INTEGER NOT NULL,
+                message_data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                -- ON DELETE CASCADE: Delete messages when conversation is deleted
+                FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
+                UNIQUE (conversation_id, sequence_num)
+            );
+
             -- Scan cache table
             CREATE TABLE IF NOT EXISTS scan_cache (
                 host_id TEXT,
@@ -186,7 +483,6 @@ class Database:
                 id TEXT PRIMARY KEY,
                 host_id TEXT,
                 command TEXT NOT NULL,
-                output TEXT NOT NULL,
                 exit_code INTEGER,
                 line_count INTEGER NOT NULL,
                 byte_size INTEGER NOT NULL,
@@ -196,6 +492,15 @@ class Database:
                 FOREIGN KEY (host_id) REFERENCES hosts(id) ON DELETE SET NULL
             );
 
+            -- Raw log output (see encode_log_chunks), deleted with its log
+            CREATE TABLE IF NOT EXISTS raw_log_chunks (
+                log_id TEXT NOT NULL,
+                start_line INTEGER NOT NULL,
+                line_count INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (log_id, start_line)
+            );
+
             -- Sessions table (for context management)
             CREATE TABLE IF NOT EXISTS sessions (
                 id TEXT PRIMARY KEY,
@@ -232,6 +537,7 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_hosts_name ON hosts(name);
             CREATE INDEX IF NOT EXISTS idx_hosts_health ON hosts(health_status);
             CREATE INDEX IF NOT EXISTS idx_hosts_last_seen ON hosts(last_seen DESC);
+            CREATE INDEX IF NOT EXISTS idx_host_tags_tag ON host_tags(tag, host_id);
             CREATE INDEX IF NOT EXISTS idx_scan_cache_expires ON scan_cache(expires_at);
             CREATE INDEX IF NOT EXISTS idx_conversations_updated ON conversations(updated_at DESC);
             CREATE INDEX IF NOT EXISTS idx_variables_is_env ON variables(is_env);
@@ -244,6 +550,7 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_session_messages_order ON session_messages(session_id, sequence_num);
             """
         )
+        await conn.executescript(SEARCH_INDEX_SCHEMA)
         await conn.commit()
 
         # Check schema version and run migrations if needed
@@ -371,8 +678,43 @@ class Database:
                 if from_version < 4:
                     logger.info("📦 Running database migration v3 -> v4...")
                     await self._migrate_add_elevation_method_v4_internal()
+                    from_version = 4
                     logger.info("✅ Migration v3 -> v4 complete")
 
+                # Migration v4 -> v5: Split conversation messages into rows
+                if from_version < 5:
+                    logger.info("📦 Running database migration v4 -> v5...")
+                    await self._migrate_conversation_messages_v5_internal()
+                    from_version = 5
+                    logger.info("✅ Migration v4 -> v5 complete")
+
+                # Migration v5 -> v6: Backfill the conversation search index
+                if from_version < 6:
+                    logger.info("📦 Running database migration v5 -> v6...")
+                    await self._migrate_search_index_v6_internal()
+                    from_version = 6
+                    logger.info("✅ Migration v5 -> v6 complete")
+
+                # Migration v6 -> v7: Fill host_tags from the JSON tags column
+                if from_version < 7:
+                    logger.info("📦 Running database migration v6 -> v7...")
+                    await self._migrate_host_tags_v7_internal()
+                    from_version = 7
+                    logger.info("✅ Migration v6 -> v7 complete")
+
+                # Migration v7 -> v8: Compress raw log output into chunks
+                if from_version < 8:
+                    logger.info("📦 Running database migration v7 -> v8...")
+                    await self._migrate_raw_log_chunks_v8_internal()
+                    from_version = 8
+                    logger.info("✅ Migration v7 -> v8 complete")
+
+                # Migration v8 -> v9: Only reindex titles/summaries that changed
+                if from_version < 9:
+                    logger.info("📦 Running database migration v8 -> v9...")
+                    await self._migrate_fts_update_trigger_v9_internal()
+                    logger.info("✅ Migration v8 -> v9 complete")
+
                 # Update schema version (within the same transaction)
                 await conn.execute(
                     "UPDATE config SET value = ? WHERE key = 'schema_version'",
@@ -548,48 +890,265 @@ class Database:
         await conn.execute("ALTER TABLE hosts ADD COLUMN elevation_method TEXT")
         logger.debug("  → elevation_method column added to hosts")
 
-    async def execute(self, query: str, params: tuple[Any, ...] | None = None) -> aiosqlite.Cursor:
-        """Execute a query."""
+    async def _migrate_conversation_messages_v5_internal(self) -> None:
+        """Move conversation JSON blobs to conversation_messages (called within transaction)."""
+        conn = self.connection
+
+        async with conn.execute("PRAGMA table_info(conversations)") as cursor:
+            columns = [row["name"] for row in await cursor.fetchall()]
+        if "message_count" not in columns:
+            await conn.execute(
+                "ALTER TABLE conversations ADD COLUMN message_count INTEGER DEFAULT 0"
+            )
+
+        # One row per element of the legacy JSON array, in order
+        await conn.execute(
+            """
+            INSERT OR IGNORE INTO conversation_messages
+                (conversation_id, sequence_num, message_data)
+            SELECT c.id, m.key, m.value
+            FROM conversations c, json_each(c.messages) m
+            WHERE c.messages IS NOT NULL AND json_valid(c.messages)
+              AND json_type(c.messages) = 'array'
+            ORDER BY c.id, m.key
+            """
+        )
+        await conn.execute(
+            """
+            UPDATE conversations SET
+                message_count = (
+                    SELECT COUNT(*) FROM conversation_messages m
+                    WHERE m.conversation_id = conversations.id
+                ),
+                messages = NULL
+            """
+        )
+        logger.debug("  → conversation messages moved to conversation_messages")
+
+    async def _migrate_search_index_v6_internal(self) -> None:
+        """Rebuild the FTS5 conversation index from existing rows (called within transaction)."""
+        conn = self.connection
+
+        await conn.execute("DELETE FROM conversation_fts")
+        await conn.execute(
+            """
+            INSERT INTO conversation_fts (title, summary, conversation_id)
+            SELECT title, summary, id FROM conversations
+            """
+        )
+        await conn.execute("DELETE FROM conversation_message_fts")
+        await conn.execute(
+            f"""
+            INSERT INTO conversation_message_fts (rowid, text, conversation_id)
+            SELECT id, {MESSAGE_TEXT_SQL.format(column="message_data")}, conversation_id
+            FROM conversation_messages
+            """
+        )
+        logger.debug("  → conversation search index backfilled")
+
+    async def _migrate_fts_update_trigger_v9_internal(self) -> None:
+        """Recreate the conversation FTS update trigger (called within transaction)."""
+        conn = self.connection
+
+        await conn.execute("DROP TRIGGER IF EXISTS conversations_fts_update")
+        await conn.execute(CONVERSATION_FTS_UPDATE_TRIGGER)
+        logger.debug("  → conversations_fts_update only fires on real changes")
+
+    async def _migrate_host_tags_v7_internal(self) -> None:
+        """Fill host_tags from hosts.tags JSON arrays (called within transaction)."""
+        conn = self.connection
+
+        await conn.execute(
+            """
+            INSERT OR IGNORE INTO host_tags (host_id, tag)
+            SELECT h.id, t.value
+            FROM hosts h, json_each(h.tags) AS t
+            WHERE h.tags IS NOT NULL AND json_valid(h.tags) AND json_type(h.tags) = 'array'
+              AND t.type = 'text'
+            """
+        )
+        logger.debug("  → host_tags filled from hosts.tags")
+
+    async def _migrate_raw_log_chunks_v8_internal(self) -> None:
+        """Move raw_logs.output into raw_log_chunks (called within transaction)."""
+        conn = self.connection
+
+        async with conn.execute("PRAGMA table_info(raw_logs)") as cursor:
+            columns = [row["name"] for row in await cursor.fetchall()]
+        if "output" not in columns:
+            return
+
+        # One log at a time, so memory is bounded by the largest log
+        migrated = 0
+        async with conn.execute("SELECT id, output FROM raw_logs") as cursor:
+            async for row in cursor:
+                await conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO raw_log_chunks (log_id, start_line, line_count, data)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [(row["id"], *chunk) for chunk in encode_log_chunks(row["output"] or "")],
+                )
+                migrated += 1
+
+        # Rebuild raw_logs without the output column
+        await conn.execute(
+            """
+            CREATE TABLE raw_logs_new (
+                id TEXT PRIMARY KEY,
+                host_id TEXT,
+                command TEXT NOT NULL,
+                exit_code INTEGER,
+                line_count INTEGER NOT NULL,
+                byte_size INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP,
+                FOREIGN KEY (host_id) REFERENCES hosts(id) ON DELETE SET NULL
+            )
+            """
+        )
+        await conn.execute(
+            """
+            INSERT INTO raw_logs_new
+            SELECT id, host_id, command, exit_code, line_count, byte_size, created_at, expires_at
+            FROM raw_logs
+            """
+        )
+        await conn.execute("DROP TABLE raw_logs")
+        await conn.execute("ALTER TABLE raw_logs_new RENAME TO raw_logs")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_raw_logs_host ON raw_logs(host_id)")
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_raw_logs_created ON raw_logs(created_at DESC)"
+        )
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_raw_logs_expires ON raw_logs(expires_at)"
+        )
+        logger.debug(f"  → {migrated} raw logs compressed into raw_log_chunks")
+
+    def _record(self, duration: float, lock_wait: float, connection: str) -> None:
+        from merlya.core.metrics import track_db_query  # merlya.core imports persistence
+
+        operation = _operation.get()
+        self.query_stats.setdefault(operation, QueryStats()).record(duration, lock_wait)
+        track_db_query(operation, duration, lock_wait, connection)
+
+    def _record_wait(self, lock_wait: float) -> None:
+        from merlya.core.metrics import track_db_lock_wait
+
+        self.query_stats.setdefault(_operation.get(), QueryStats()).record_wait(lock_wait)
+        track_db_lock_wait(lock_wait)
+
+    def get_query_stats(self) -> dict[str, dict[str, float | int]]:
+        """Query latency and lock waits per repository method, slowest first."""
+        ranked = sorted(self.query_stats.items(), key=lambda item: -item[1].total_time)
+        return {operation: stats.as_dict() for operation, stats in ranked}
+
+    @asynccontextmanager
+    async def _write_access(self) -> AsyncIterator[float]:
+        """Hold the writer, queued behind other writers; yields the wait."""
+        if _writer_owner.get() is self:
+            yield 0.0  # Already inside this task's transaction
+            return
+        started = time.perf_counter()
+        async with self._write_lock:
+            waited = time.perf_counter() - started
+            token = _writer_owner.set(self)
+            try:
+                yield waited
+            finally:
+                _writer_owner.reset(token)
+
+    def _reads_use_writer(self) -> bool:
+        """Reads must see this task's uncommitted writes."""
+        if self._read_pool is None or _writer_owner.get() is self:
+            return True
+        # A bare write (outside transaction()) left a transaction open
+        return self.connection.in_transaction and not self._write_lock.locked()
+
+    async def _execute_read(self, query: str, params: tuple[Any, ...]) -> ReadCursor:
+        """Run a SELECT on a pooled read connection."""
+        assert self._read_pool is not None
+        started = time.perf_counter()
+        conn = await self._read_pool.get()
+        waited = time.perf_counter() - started
         try:
-            return await self.connection.execute(query, params or ())
-        except aiosqlite.IntegrityError as e:
-            raise IntegrityError(str(e)) from e
+            started = time.perf_counter()
+            async with conn.execute(query, params) as cursor:
+                rows = list(await cursor.fetchall())
+                description = cursor.description
         except aiosqlite.OperationalError as e:
             raise DatabaseError(f"Database operation failed: {e}") from e
+        finally:
+            self._read_pool.put_nowait(conn)
+        self._record(time.perf_counter() - started, waited, "read")
+        return ReadCursor(rows, description)
+
+    async def execute(
+        self, query: str, params: tuple[Any, ...] | None = None
+    ) -> aiosqlite.Cursor | ReadCursor:
+        """Execute a query (SELECTs on the read pool, other statements on the writer)."""
+        if _is_read_query(query) and not self._reads_use_writer():
+            return await self._execute_read(query, params or ())
+
+        async with self._write_access() as waited:
+            started = time.perf_counter()
+            try:
+                cursor = await self.connection.execute(query, params or ())
+            except aiosqlite.IntegrityError as e:
+                raise IntegrityError(str(e)) from e
+            except aiosqlite.OperationalError as e:
+                raise DatabaseError(f"Database operation failed: {e}") from e
+            self._record(time.perf_counter() - started, waited, "write")
+            return cursor
 
     async def executemany(self, query: str, params: list[tuple[Any, ...]]) -> aiosqlite.Cursor:
         """Execute a query with multiple parameter sets."""
-        try:
-            return await self.connection.executemany(query, params)
-        except aiosqlite.IntegrityError as e:
-            raise IntegrityError(str(e)) from e
-        except aiosqlite.OperationalError as e:
-            raise DatabaseError(f"Database operation failed: {e}") from e
+        async with self._write_access() as waited:
+            started = time.perf_counter()
+            try:
+                cursor = await self.connection.executemany(query, params)
+            except aiosqlite.IntegrityError as e:
+                raise IntegrityError(str(e)) from e
+            except aiosqlite.OperationalError as e:
+                raise DatabaseError(f"Database operation failed: {e}") from e
+            self._record(time.perf_counter() - started, waited, "write")
+            return cursor
 
     async def commit(self) -> None:
         """Commit current transaction."""
-        await self.connection.commit()
+        async with self._write_access() as waited:
+            started = time.perf_counter()
+            await self.connection.commit()
+            self._record(time.perf_counter() - started, waited, "write")
 
     async def rollback(self) -> None:
         """Rollback current transaction."""
-        await self.connection.rollback()
+        async with self._write_access():
+            await self.connection.rollback()
 
     @asynccontextmanager
     async def transaction(self) -> AsyncIterator[Database]:
         """
         Transaction context manager with automatic rollback on error.
 
+        Holds the writer for the whole block, so statements of concurrent
+        transactions never interleave; reads from other tasks keep going
+        to the read pool.
+
         Usage:
             async with db.transaction():
                 await db.execute(...)
                 await db.execute(...)
         """
-        try:
-            yield self
-            await self.commit()
-        except Exception:
-            await self.rollback()
-            raise
+        async with self._write_access() as waited:
+            if waited:
+                self._record_wait(waited)
+            try:
+                yield self
+                await self.commit()
+            except Exception:
+                await self.rollback()
+                raise
 
     @classmethod
     async def get_instance(cls, path: Path | None = None) -> Database:
@@ -618,6 +1177,19 @@ async def get_database(path: Path | None = None) -> Database:
     return await Database.get_instance(path)
 
 
+def to_fts_query(term: str) -> str | None:
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix.
+
+    Words are quoted, so FTS5 operators in user input are matched literally.
+    Returns None when the term has no searchable words.
+    """
+    words = [word.replace('"', '""') for word in term.split()]
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
 # JSON serialization helpers
 def to_json(data: Any) -> str:
     """Serialize data to JSON string."""
@@ -177,10 +177,12 @@ class Conversation(BaseModel):
 
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str | None = None
-    messages: list[dict[str, Any]] = Field(default_factory=list)
+    messages: list[dict[str, Any]] = Field(default_factory=list)  # Loaded on demand
     summary: str | None = None
+    message_count: int = 0
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    snippet: str | None = None  # Matching excerpt, set by search()
 
 
 class ScanCache(BaseModel):
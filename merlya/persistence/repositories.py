@@ -6,7 +6,7 @@ Data access layer for database entities.
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from loguru import logger
@@ -16,9 +16,26 @@ from merlya.persistence.database import (
     Database,
     IntegrityError,
     from_json,
+    to_fts_query,
     to_json,
+    track_queries,
 )
-from merlya.persistence.models import Conversation, Host, OSInfo, Variable
+from merlya.persistence.models import Conversation, Host, OSInfo, ScanCache, Variable
+
+
+def _host_filters(tag: str | None, status: str | None) -> tuple[str, str, tuple[Any, ...]]:
+    """SQL join, WHERE clause and params restricting hosts h to a tag and status."""
+    joins = ""
+    conditions: list[str] = []
+    params: list[Any] = []
+    if tag:
+        joins = "JOIN host_tags ft ON ft.host_id = h.id AND ft.tag = ?"
+        params.append(tag)
+    if status:
+        conditions.append("lower(h.health_status) = lower(?)")
+        params.append(status)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return joins, where, tuple(params)
 
 
 class HostRepository:
@@ -28,6 +45,7 @@ class HostRepository:
         """Initialize with database connection."""
         self.db = db
 
+    @track_queries
     async def create(self, host: Host) -> Host:
         """
         Create a new host.
@@ -63,18 +81,21 @@ class HostRepository:
                         host.updated_at,
                     ),
                 )
+                await self._insert_tags(host)
             logger.debug(f"🖥️ Host created: {host.name}")
             return host
         except IntegrityError as e:
             logger.error(f"❌ Host '{host.name}' already exists")
             raise ValueError(f"Host name '{host.name}' must be unique") from e
 
+    @track_queries
     async def get_by_id(self, host_id: str) -> Host | None:
         """Get host by ID."""
         async with await self.db.execute("SELECT * FROM hosts WHERE id = ?", (host_id,)) as cursor:
             row = await cursor.fetchone()
             return self._row_to_host(row) if row else None
 
+    @track_queries
     async def get_by_name(self, name: str) -> Host | None:
         """Get host by name."""
         async with await self.db.execute(
@@ -84,6 +105,7 @@ class HostRepository:
             row = await cursor.fetchone()
             return self._row_to_host(row) if row else None
 
+    @track_queries
     async def get_by_hostname(self, hostname: str) -> Host | None:
         """Get host by hostname (IP or DNS name)."""
         async with await self.db.execute(
@@ -93,31 +115,30 @@ class HostRepository:
             row = await cursor.fetchone()
             return self._row_to_host(row) if row else None
 
+    @track_queries
     async def get_all(self) -> list[Host]:
         """Get all hosts."""
         async with await self.db.execute("SELECT * FROM hosts ORDER BY lower(name)") as cursor:
             rows = await cursor.fetchall()
             return [self._row_to_host(row) for row in rows]
 
+    @track_queries
     async def get_by_tag(self, tag: str) -> list[Host]:
         """
         Get hosts with specific tag.
 
-        Uses JSON functions to safely search in the tags array.
+        Uses the indexed host_tags table.
         """
         # Validate tag to prevent injection (only allow alphanumeric, dash, underscore)
         if not tag or not all(c.isalnum() or c in "-_" for c in tag):
             logger.warning(f"⚠️ Invalid tag format: {tag}")
             return []
 
-        # Use JSON_EACH to safely search in the JSON array
         async with await self.db.execute(
             """
-            SELECT DISTINCT h.* FROM hosts h
-            WHERE EXISTS (
-                SELECT 1 FROM json_each(h.tags) AS t
-                WHERE t.value = ?
-            )
+            SELECT h.* FROM host_tags t
+            JOIN hosts h ON h.id = t.host_id
+            WHERE t.tag = ?
             ORDER BY h.name
             """,
             (tag,),
@@ -125,6 +146,91 @@ class HostRepository:
             rows = await cursor.fetchall()
             return [self._row_to_host(row) for row in rows]
 
+    @track_queries
+    async def count_by_status(
+        self, tag: str | None = None, status: str | None = None
+    ) -> dict[str, int]:
+        """Count hosts per health status (optionally within a tag and status)."""
+        joins, where, params = _host_filters(tag, status)
+        async with await self.db.execute(
+            f"""
+            SELECT h.health_status AS status, COUNT(*) AS host_count
+            FROM hosts h {joins} {where}
+            GROUP BY h.health_status
+            """,
+            params,
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return {row["status"]: row["host_count"] for row in rows}
+
+    @track_queries
+    async def count_by_tag(
+        self, tag: str | None = None, status: str | None = None
+    ) -> dict[str, int]:
+        """Count hosts per tag, most used first (optionally within a tag and status)."""
+        joins, where, params = _host_filters(tag, status)
+        async with await self.db.execute(
+            f"""
+            SELECT t.tag, COUNT(*) AS host_count
+            FROM hosts h JOIN host_tags t ON t.host_id = h.id {joins} {where}
+            GROUP BY t.tag
+            ORDER BY host_count DESC, t.tag
+            """,
+            params,
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return {row["tag"]: row["host_count"] for row in rows}
+
+    @track_queries
+    async def get_names(
+        self, tag: str | None = None, status: str | None = None, limit: int = DEFAULT_LIST_LIMIT
+    ) -> list[str]:
+        """Get host names in name order (optionally within a tag and status)."""
+        joins, where, params = _host_filters(tag, status)
+        async with await self.db.execute(
+            f"SELECT h.name FROM hosts h {joins} {where} ORDER BY lower(h.name) LIMIT ?",
+            (*params, max(1, min(limit, MAX_LIST_LIMIT))),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [row["name"] for row in rows]
+
+    @track_queries
+    async def get_tag_groups(self, sample_size: int = 3) -> list[dict[str, Any]]:
+        """
+        Summarize hosts per tag, largest group first.
+
+        Returns:
+            Dicts with tag, host_count, healthy_count and sample_hosts
+            (the first names of the group).
+        """
+        async with await self.db.execute(
+            """
+            SELECT tag,
+                   COUNT(*) AS host_count,
+                   SUM(lower(coalesce(health_status, '')) = 'healthy') AS healthy_count,
+                   json_group_array(name) FILTER (WHERE position <= ?) AS sample_hosts
+            FROM (
+                SELECT t.tag, h.name, h.health_status,
+                       ROW_NUMBER() OVER (PARTITION BY t.tag ORDER BY lower(h.name)) AS position
+                FROM host_tags t JOIN hosts h ON h.id = t.host_id
+            )
+            GROUP BY tag
+            ORDER BY host_count DESC, tag
+            """,
+            (sample_size,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [
+                {
+                    "tag": row["tag"],
+                    "host_count": row["host_count"],
+                    "healthy_count": row["healthy_count"],
+                    "sample_hosts": from_json(row["sample_hosts"]) or [],
+                }
+                for row in rows
+            ]
+
+    @track_queries
     async def update(self, host: Host) -> Host:
         """Update an existing host."""
         host.updated_at = datetime.now()
@@ -153,9 +259,12 @@ class HostRepository:
                     host.id,
                 ),
             )
+            await self.db.execute("DELETE FROM host_tags WHERE host_id = ?", (host.id,))
+            await self._insert_tags(host)
         logger.debug(f"🖥️ Host updated: {host.name}")
         return host
 
+    @track_queries
     async def update_metadata(self, host_id: str, metadata: dict[str, Any]) -> bool:
         """Update only the metadata field for a host.
 
@@ -180,6 +289,7 @@ class HostRepository:
                 logger.debug(f"🖥️ Host metadata updated: {host_id}")
             return updated
 
+    @track_queries
     async def delete(self, host_id: str) -> bool:
         """Delete a host."""
         async with (
@@ -191,16 +301,26 @@ class HostRepository:
                 logger.debug(f"🖥️ Host deleted: {host_id}")
             return deleted
 
+    @track_queries
     async def count(self) -> int:
         """Count total hosts."""
         async with await self.db.execute("SELECT COUNT(*) FROM hosts") as cursor:
             row = await cursor.fetchone()
             return row[0] if row else 0
 
+    @track_queries
     async def list(self) -> list[Host]:
         """Alias for get_all() for API compatibility."""
         return await self.get_all()
 
+    async def _insert_tags(self, host: Host) -> None:
+        """Index the host's tags in host_tags (within transaction)."""
+        if host.tags:
+            await self.db.executemany(
+                "INSERT OR IGNORE INTO host_tags (host_id, tag) VALUES (?, ?)",
+                [(host.id, tag) for tag in host.tags],
+            )
+
     def _row_to_host(self, row: Any) -> Host:
         """Convert database row to Host model."""
         from merlya.persistence.models import ElevationMethod
@@ -235,6 +355,7 @@ class VariableRepository:
         """Initialize with database connection."""
         self.db = db
 
+    @track_queries
     async def set(self, name: str, value: str, is_env: bool = False) -> Variable:
         """Set a variable (insert or update)."""
         async with self.db.transaction():
@@ -250,6 +371,7 @@ class VariableRepository:
         logger.debug("📋 Variable set")
         return Variable(name=name, value=value, is_env=is_env)
 
+    @track_queries
     async def get(self, name: str) -> Variable | None:
         """Get a variable by name."""
         async with await self.db.execute(
@@ -265,6 +387,7 @@ class VariableRepository:
                 )
             return None
 
+    @track_queries
     async def get_all(self) -> list[Variable]:
         """Get all variables."""
         async with await self.db.execute("SELECT * FROM variables ORDER BY name") as cursor:
@@ -279,6 +402,7 @@ class VariableRepository:
                 for row in rows
             ]
 
+    @track_queries
     async def delete(self, name: str) -> bool:
         """Delete a variable."""
         async with (
@@ -291,65 +415,132 @@ class VariableRepository:
             return deleted
 
 
+def _escape_like(term: str) -> str:
+    """Escape LIKE special characters (backslash first, then % and _)."""
+    return term.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+
+
+# Conversation metadata (listings never touch message bodies)
+CONVERSATION_COLUMNS = "id, title, summary, message_count, created_at, updated_at"
+
+
 class ConversationRepository:
-    """Repository for Conversation entities."""
+    """
+    Repository for Conversation entities.
+
+    Messages are stored one row per message in conversation_messages and
+    appended incrementally. Listings return metadata only; message bodies
+    are loaded on demand with get_messages() or include_messages=True.
+    """
 
     def __init__(self, db: Database) -> None:
         """Initialize with database connection."""
         self.db = db
 
+    @track_queries
     async def create(self, conv: Conversation) -> Conversation:
         """Create a new conversation."""
+        conv.message_count = len(conv.messages)
         async with self.db.transaction():
             await self.db.execute(
                 """
-                INSERT INTO conversations (id, title, messages, summary, created_at, updated_at)
+                INSERT INTO conversations (id, title, summary, message_count, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?)
                 """,
                 (
                     conv.id,
                     conv.title,
-                    to_json(conv.messages),
                     conv.summary,
+                    conv.message_count,
                     conv.created_at,
                     conv.updated_at,
                 ),
             )
+            await self._insert_messages(conv.id, conv.messages, 0)
         logger.debug(f"💬 Conversation created: {conv.id[:8]}...")
         return conv
 
-    async def get_by_id(self, conv_id: str) -> Conversation | None:
-        """Get conversation by ID."""
+    @track_queries
+    async def get_by_id(self, conv_id: str, include_messages: bool = False) -> Conversation | None:
+        """Get conversation by ID (metadata only unless include_messages)."""
         async with await self.db.execute(
-            "SELECT * FROM conversations WHERE id = ?", (conv_id,)
+            f"SELECT {CONVERSATION_COLUMNS} FROM conversations WHERE id = ?", (conv_id,)
         ) as cursor:
             row = await cursor.fetchone()
-            return self._row_to_conversation(row) if row else None
+        if not row:
+            return None
+        conv = self._row_to_conversation(row)
+        if include_messages:
+            conv.messages = await self.get_messages(conv.id)
+        return conv
+
+    @track_queries
+    async def get_by_prefix(self, prefix: str, limit: int = 2) -> list[Conversation]:
+        """Get conversations whose ID starts with prefix (metadata only)."""
+        async with await self.db.execute(
+            f"""
+            SELECT {CONVERSATION_COLUMNS} FROM conversations
+            WHERE id LIKE ? ESCAPE '\\'
+            ORDER BY updated_at DESC LIMIT ?
+            """,
+            (f"{_escape_like(prefix)}%", max(1, min(limit, MAX_LIST_LIMIT))),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [self._row_to_conversation(row) for row in rows]
 
+    @track_queries
     async def get_recent(self, limit: int = DEFAULT_LIST_LIMIT) -> list[Conversation]:
-        """Get recent conversations."""
+        """Get recent conversations (metadata only)."""
         # Validate limit
         limit = max(1, min(limit, MAX_LIST_LIMIT))
         async with await self.db.execute(
-            "SELECT * FROM conversations ORDER BY updated_at DESC LIMIT ?",
+            f"SELECT {CONVERSATION_COLUMNS} FROM conversations ORDER BY updated_at DESC LIMIT ?",
             (limit,),
         ) as cursor:
             rows = await cursor.fetchall()
             return [self._row_to_conversation(row) for row in rows]
 
+    @track_queries
+    async def get_messages(
+        self, conv_id: str, offset: int = 0, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Load a page of messages in conversation order.
+
+        Args:
+            conv_id: Conversation ID.
+            offset: Index of the first message to return.
+            limit: Maximum number of messages (None for all).
+        """
+        async with await self.db.execute(
+            """
+            SELECT message_data FROM conversation_messages
+            WHERE conversation_id = ? AND sequence_num >= ?
+            ORDER BY sequence_num ASC LIMIT ?
+            """,
+            (conv_id, max(0, offset), -1 if limit is None else max(0, limit)),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        messages: list[dict[str, Any]] = []
+        for row in rows:
+            message = from_json(row["message_data"])
+            if isinstance(message, dict):
+                messages.append(message)
+        return messages
+
+    @track_queries
     async def update(self, conv: Conversation) -> Conversation:
-        """Update a conversation."""
+        """Update conversation metadata (title, summary); messages are appended separately."""
         conv.updated_at = datetime.now()
         async with self.db.transaction():
             await self.db.execute(
                 """
                 UPDATE conversations SET
-                    title = ?, messages = ?, summary = ?, updated_at = ?
+                    title = ?, summary = ?, updated_at = ?
                 WHERE id = ?
                 """,
                 (
                     conv.title,
-                    to_json(conv.messages),
                     conv.summary,
                     conv.updated_at,
                     conv.id,
@@ -357,6 +548,58 @@ class ConversationRepository:
             )
         return conv
 
+    @track_queries
+    async def append_messages(
+        self, conv: Conversation, messages: list[dict[str, Any]]
+    ) -> Conversation:
+        """Append messages after the stored ones and update metadata."""
+        conv.updated_at = datetime.now()
+        async with self.db.transaction():
+            await self._insert_messages(conv.id, messages, conv.message_count)
+            await self._update_counts(conv, conv.message_count + len(messages))
+        return conv
+
+    @track_queries
+    async def replace_messages(
+        self, conv: Conversation, messages: list[dict[str, Any]]
+    ) -> Conversation:
+        """Rewrite the stored messages (history was truncated or edited)."""
+        conv.updated_at = datetime.now()
+        async with self.db.transaction():
+            await self.db.execute(
+                "DELETE FROM conversation_messages WHERE conversation_id = ?", (conv.id,)
+            )
+            await self._insert_messages(conv.id, messages, 0)
+            await self._update_counts(conv, len(messages))
+        return conv
+
+    async def _insert_messages(
+        self, conv_id: str, messages: list[dict[str, Any]], start: int
+    ) -> None:
+        """Insert messages with consecutive sequence numbers (within transaction)."""
+        if not messages:
+            return
+        await self.db.executemany(
+            """
+            INSERT INTO conversation_messages (conversation_id, sequence_num, message_data)
+            VALUES (?, ?, ?)
+            """,
+            [(conv_id, start + i, to_json(message)) for i, message in enumerate(messages)],
+        )
+
+    async def _update_counts(self, conv: Conversation, message_count: int) -> None:
+        """Store metadata and the new message count (within transaction)."""
+        await self.db.execute(
+            """
+            UPDATE conversations SET
+                title = ?, summary = ?, message_count = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (conv.title, conv.summary, message_count, conv.updated_at, conv.id),
+        )
+        conv.message_count = message_count
+
+    @track_queries
     async def delete(self, conv_id: str) -> bool:
         """Delete a conversation."""
         async with (
@@ -365,42 +608,144 @@ class ConversationRepository:
         ):
             return bool(cursor.rowcount and cursor.rowcount > 0)
 
+    @track_queries
     async def search(self, term: str, limit: int = DEFAULT_LIST_LIMIT) -> list[Conversation]:
         """
-        Search conversations by content.
+        Search conversations by title, summary and message content.
 
-        Uses parameterized LIKE query (safe from SQL injection).
+        Uses the FTS5 index: every word matches as a prefix, results are
+        ranked by bm25 (title and summary hits weigh more) and carry a
+        snippet of the best match. Returns metadata only.
         """
         # Validate and sanitize
         if not term or len(term) > 200:
             return []
+        query = to_fts_query(term)
+        if query is None:
+            return []
 
         limit = max(1, min(limit, MAX_LIST_LIMIT))
 
-        # Escape LIKE special characters (backslash first, then % and _)
-        escaped_term = term.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
-        search_pattern = f"%{escaped_term}%"
-
+        # The bare snippet column comes from the row with the best (lowest) rank
         async with await self.db.execute(
             """
-            SELECT * FROM conversations
-            WHERE messages LIKE ? ESCAPE '\\'
-               OR title LIKE ? ESCAPE '\\'
-               OR summary LIKE ? ESCAPE '\\'
-            ORDER BY updated_at DESC LIMIT ?
+            SELECT c.id, c.title, c.summary, c.message_count, c.created_at, c.updated_at,
+                   hits.snippet, MIN(hits.rank) AS rank
+            FROM (
+                SELECT conversation_id, bm25(conversation_fts, 4.0, 2.0) AS rank,
+                       snippet(conversation_fts, -1, '**', '**', '…', 12) AS snippet
+                FROM conversation_fts WHERE conversation_fts MATCH ?
+                UNION ALL
+                SELECT conversation_id, bm25(conversation_message_fts) AS rank,
+                       snippet(conversation_message_fts, 0, '**', '**', '…', 12) AS snippet
+                FROM conversation_message_fts WHERE conversation_message_fts MATCH ?
+            ) AS hits
+            JOIN conversations c ON c.id = hits.conversation_id
+            GROUP BY c.id
+            ORDER BY rank LIMIT ?
             """,
-            (search_pattern, search_pattern, search_pattern, limit),
+            (query, query, limit),
         ) as cursor:
             rows = await cursor.fetchall()
-            return [self._row_to_conversation(row) for row in rows]
+        results = []
+        for row in rows:
+            conv = self._row_to_conversation(row)
+            conv.snippet = row["snippet"]
+            results.append(conv)
+        return results
 
     def _row_to_conversation(self, row: Any) -> Conversation:
-        """Convert database row to Conversation model."""
+        """Convert database row to Conversation model (without messages)."""
         return Conversation(
             id=row["id"],
             title=row["title"],
-            messages=from_json(row["messages"]) or [],
             summary=row["summary"],
+            message_count=row["message_count"] or 0,
             created_at=row["created_at"],
             updated_at=row["updated_at"],
         )
+
+
+class ScanCacheRepository:
+    """
+    Repository for cached scan results.
+
+    Entries are keyed by (host_id, scan_type) and expire at expires_at;
+    expired entries are never returned and are removed by purge_expired().
+    """
+
+    def __init__(self, db: Database) -> None:
+        """Initialize with database connection."""
+        self.db = db
+
+    @track_queries
+    async def get(self, host_id: str, scan_type: str) -> ScanCache | None:
+        """Get an unexpired cache entry."""
+        async with await self.db.execute(
+            "SELECT * FROM scan_cache WHERE host_id = ? AND scan_type = ? AND expires_at > ?",
+            (host_id, scan_type, datetime.now(UTC)),
+        ) as cursor:
+            row = await cursor.fetchone()
+            return self._row_to_entry(row) if row else None
+
+    @track_queries
+    async def get_for_host(self, host_id: str) -> list[ScanCache]:
+        """Get every unexpired cache entry of a host."""
+        async with await self.db.execute(
+            """
+            SELECT * FROM scan_cache WHERE host_id = ? AND expires_at > ?
+            ORDER BY scan_type
+            """,
+            (host_id, datetime.now(UTC)),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [self._row_to_entry(row) for row in rows]
+
+    @track_queries
+    async def set(self, host_id: str, scan_type: str, data: dict[str, Any], ttl: int) -> ScanCache:
+        """Store (or replace) a cache entry valid for ttl seconds."""
+        expires_at = datetime.now(UTC) + timedelta(seconds=ttl)
+        async with self.db.transaction():
+            await self.db.execute(
+                """
+                INSERT INTO scan_cache (host_id, scan_type, data, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(host_id, scan_type) DO UPDATE SET
+                    data = excluded.data, expires_at = excluded.expires_at
+                """,
+                (host_id, scan_type, to_json(data), expires_at),
+            )
+        logger.debug(f"🗂️ Scan cached: {scan_type} for {host_id} ({ttl}s)")
+        return ScanCache(host_id=host_id, scan_type=scan_type, data=data, expires_at=expires_at)
+
+    @track_queries
+    async def delete_for_host(self, host_id: str) -> int:
+        """Drop every cache entry of a host."""
+        async with (
+            self.db.transaction(),
+            await self.db.execute("DELETE FROM scan_cache WHERE host_id = ?", (host_id,)) as cursor,
+        ):
+            return cursor.rowcount or 0
+
+    @track_queries
+    async def purge_expired(self) -> int:
+        """Delete expired entries (uses idx_scan_cache_expires)."""
+        async with (
+            self.db.transaction(),
+            await self.db.execute(
+                "DELETE FROM scan_cache WHERE expires_at <= ?", (datetime.now(UTC),)
+            ) as cursor,
+        ):
+            purged = cursor.rowcount or 0
+        if purged:
+            logger.debug(f"🧹 Purged {purged} expired scan cache entries")
+        return purged
+
+    def _row_to_entry(self, row: Any) -> ScanCache:
+        """Convert database row to ScanCache model."""
+        return ScanCache(
+            host_id=row["host_id"],
+            scan_type=row["scan_type"],
+            data=from_json(row["data"]) or {},
+            expires_at=row["expires_at"],
+        )
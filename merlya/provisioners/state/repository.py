@@ -3,17 +3,26 @@ Merlya Provisioners State - Repository.
 
 SQLite persistence for resource state.
 
+The repository owns one long-lived connection in WAL mode, opened on first
+use and released by close(), or when its event loop shuts down if close()
+is never called (asyncio.run() exits normally either way). Writes run one
+transaction at a time; batch methods (save_resources, get_resources) touch
+thousands of resources in a single statement and transaction.
+
 v0.9.0: Initial implementation.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
 import re
 import uuid
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Self
 
 import aiosqlite
 from loguru import logger
@@ -25,8 +34,23 @@ from merlya.provisioners.state.models import (
 )
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable
+
     from merlya.core.context import SharedContext
 
+# Applied to the repository connection when it is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",  # Durable across app crashes in WAL mode
+    "PRAGMA busy_timeout = 5000",  # Wait for other processes' writes
+)
+
+RESOURCE_COLUMNS = """
+    resource_id, resource_type, name, provider, region,
+    status, expected_config, actual_config, tags, outputs,
+    created_at, updated_at, last_checked_at, previous_config
+"""
+
 
 class MissingResourcesError(LookupError):
     """Raised when a snapshot references resources that are not present."""
@@ -41,7 +65,8 @@ class StateRepository:
     """
     SQLite-based state persistence.
 
-    Stores resource states and snapshots in a local database.
+    Stores resource states and snapshots in a local database. Call close()
+    (or use `async with`) when done to release the connection.
     """
 
     SCHEMA_VERSION = 1
@@ -61,6 +86,10 @@ class StateRepository:
 
         self._db_path = db_path
         self._initialized = False
+        self._conn: aiosqlite.Connection | None = None
+        self._closer: asyncio.Task[None] | None = None
+        self._init_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()  # One write transaction at a time
 
     @property
     def db_path(self) -> Path:
@@ -68,32 +97,98 @@ class StateRepository:
         return self._db_path
 
     async def initialize(self) -> None:
-        """Initialize the database schema."""
+        """Open the connection and initialize the database schema."""
         if self._initialized:
             return
 
-        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        async with self._init_lock:
+            if self._initialized:
+                return
 
-        async with aiosqlite.connect(self._db_path) as db:
-            # Create schema version table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS schema_version (
-                    version INTEGER PRIMARY KEY
-                )
-            """)
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Check current version
-            cursor = await db.execute("SELECT version FROM schema_version LIMIT 1")
-            row = await cursor.fetchone()
-            current_version = row[0] if row else 0
+            db = aiosqlite.connect(self._db_path)
+            # A forgotten connection must never keep the interpreter alive
+            db.daemon = True
+            await db
+            try:
+                db.row_factory = aiosqlite.Row
+                for pragma in CONNECTION_PRAGMAS:
+                    await db.execute(pragma)
+
+                # Create schema version table
+                await db.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY
+                    )
+                """)
+
+                # Check current version
+                cursor = await db.execute("SELECT version FROM schema_version LIMIT 1")
+                row = await cursor.fetchone()
+                current_version = row[0] if row else 0
+
+                if current_version < self.SCHEMA_VERSION:
+                    await self._migrate(db, current_version)
+
+                await db.commit()
+            except BaseException:
+                await db.close()
+                raise
 
-            if current_version < self.SCHEMA_VERSION:
-                await self._migrate(db, current_version)
+            self._conn = db
+            self._initialized = True
+            self._closer = asyncio.get_running_loop().create_task(self._close_on_shutdown(db))
+            logger.debug(f"🗄️ State repository initialized at {self._db_path}")
+
+    async def _close_on_shutdown(self, db: aiosqlite.Connection) -> None:
+        """Wait until cancelled (close() or loop shutdown), then close the connection."""
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if self._conn is db:
+                self._conn = None
+                self._initialized = False
+            await db.close()
+
+    async def close(self) -> None:
+        """Close the connection (it is reopened on next use)."""
+        conn, self._conn = self._conn, None
+        closer, self._closer = self._closer, None
+        self._initialized = False
+        if closer is not None and not closer.done():
+            closer.cancel()
+            if closer.get_loop() is asyncio.get_running_loop():
+                with contextlib.suppress(asyncio.CancelledError):
+                    await closer
+                return
+        if conn is not None:
+            await conn.close()
+
+    async def __aenter__(self) -> Self:
+        await self.initialize()
+        return self
 
-            await db.commit()
+    async def __aexit__(self, *_exc: object) -> None:
+        await self.close()
 
-        self._initialized = True
-        logger.debug(f"🗄️ State repository initialized at {self._db_path}")
+    async def _connection(self) -> aiosqlite.Connection:
+        """Get the repository connection, opening it if needed."""
+        await self.initialize()
+        assert self._conn is not None
+        return self._conn
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run statements in one write transaction (rolled back on error)."""
+        db = await self._connection()
+        async with self._write_lock:
+            try:
+                yield db
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
 
     async def _migrate(self, db: aiosqlite.Connection, from_version: int) -> None:
         """Run database migrations."""
@@ -150,64 +245,70 @@ class StateRepository:
 
     async def save_resource(self, resource: ResourceState) -> None:
         """Save or update a resource state."""
-        await self.initialize()
+        await self.save_resources([resource])
 
-        async with aiosqlite.connect(self._db_path) as db:
-            await db.execute(
-                """
-                INSERT OR REPLACE INTO resources (
-                    resource_id, resource_type, name, provider, region,
-                    status, expected_config, actual_config, tags, outputs,
-                    created_at, updated_at, last_checked_at, previous_config
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    resource.resource_id,
-                    resource.resource_type,
-                    resource.name,
-                    resource.provider,
-                    resource.region,
-                    resource.status.value,
-                    json.dumps(resource.expected_config),
-                    json.dumps(resource.actual_config),
-                    json.dumps(resource.tags),
-                    json.dumps(resource.outputs),
-                    resource.created_at.isoformat(),
-                    resource.updated_at.isoformat(),
-                    resource.last_checked_at.isoformat() if resource.last_checked_at else None,
-                    json.dumps(resource.previous_config) if resource.previous_config else None,
-                ),
+    async def save_resources(self, resources: Iterable[ResourceState]) -> int:
+        """
+        Save or update many resource states in one transaction.
+
+        Returns:
+            Number of resources saved.
+        """
+        rows = [self._resource_to_row(resource) for resource in resources]
+        if not rows:
+            return 0
+
+        async with self._transaction() as db:
+            await db.executemany(
+                f"INSERT OR REPLACE INTO resources ({RESOURCE_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
             )
-            await db.commit()
+        return len(rows)
 
     async def get_resource(self, resource_id: str) -> ResourceState | None:
         """Get a resource by ID."""
-        await self.initialize()
-
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT * FROM resources WHERE resource_id = ?",
-                (resource_id,),
-            )
+        db = await self._connection()
+        async with db.execute(
+            "SELECT * FROM resources WHERE resource_id = ?",
+            (resource_id,),
+        ) as cursor:
             row = await cursor.fetchone()
 
-            if row is None:
-                return None
+        if row is None:
+            return None
+
+        return self._row_to_resource(row)
+
+    async def get_resources(self, resource_ids: Iterable[str]) -> dict[str, ResourceState]:
+        """
+        Get many resources by ID in one query.
+
+        Returns:
+            Mapping of resource_id -> ResourceState; unknown IDs are absent.
+        """
+        ids = list(resource_ids)
+        if not ids:
+            return {}
+
+        db = await self._connection()
+        # IDs are passed as one JSON array, so there is no bound-parameter limit
+        async with db.execute(
+            "SELECT * FROM resources WHERE resource_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(ids),),
+        ) as cursor:
+            rows = await cursor.fetchall()
 
-            return self._row_to_resource(row)
+        return {row["resource_id"]: self._row_to_resource(row) for row in rows}
 
     async def delete_resource(self, resource_id: str) -> bool:
         """Delete a resource by ID."""
-        await self.initialize()
-
-        async with aiosqlite.connect(self._db_path) as db:
+        async with self._transaction() as db:
             cursor = await db.execute(
                 "DELETE FROM resources WHERE resource_id = ?",
                 (resource_id,),
             )
-            await db.commit()
-            return cursor.rowcount > 0
+        return cursor.rowcount > 0
 
     def _validate_filter_param(self, name: str, value: str | None) -> None:
         """Validate a filter parameter against injection attempts."""
@@ -224,8 +325,6 @@ class StateRepository:
         resource_type: str | None = None,
     ) -> list[ResourceState]:
         """List resources with optional filters."""
-        await self.initialize()
-
         # Validate inputs
         self._validate_filter_param("provider", provider)
         self._validate_filter_param("resource_type", resource_type)
@@ -245,12 +344,11 @@ class StateRepository:
 
         query += " ORDER BY updated_at DESC"
 
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(query, params)
+        db = await self._connection()
+        async with db.execute(query, params) as cursor:
             rows = await cursor.fetchall()
 
-            return [self._row_to_resource(row) for row in rows]
+        return [self._row_to_resource(row) for row in rows]
 
     async def save_snapshot(self, snapshot: StateSnapshot) -> None:
         """
@@ -261,13 +359,11 @@ class StateRepository:
         creating a snapshot. This method only saves snapshot metadata,
         not resource data, to avoid overwriting live resource states.
         """
-        await self.initialize()
-
         resource_ids = list(snapshot.resources.keys())
 
-        async with aiosqlite.connect(self._db_path) as db:
-            try:
-                # Save snapshot metadata only (resources are referenced, not copied)
+        try:
+            # Save snapshot metadata only (resources are referenced, not copied)
+            async with self._transaction() as db:
                 await db.execute(
                     """
                     INSERT OR REPLACE INTO snapshots (
@@ -284,15 +380,10 @@ class StateRepository:
                         snapshot.description,
                     ),
                 )
-
-                await db.commit()
-                logger.debug(
-                    f"🗄️ Saved snapshot {snapshot.snapshot_id} with {len(resource_ids)} resources"
-                )
-            except Exception as e:
-                await db.rollback()
-                logger.error(f"❌ Failed to save snapshot {snapshot.snapshot_id}: {e}")
-                raise
+        except Exception as e:
+            logger.error(f"❌ Failed to save snapshot {snapshot.snapshot_id}: {e}")
+            raise
+        logger.debug(f"🗄️ Saved snapshot {snapshot.snapshot_id} with {len(resource_ids)} resources")
 
     async def get_snapshot(self, snapshot_id: str) -> StateSnapshot | None:
         """Get a snapshot by ID.
@@ -300,46 +391,34 @@ class StateRepository:
         Raises:
             MissingResourcesError: If the snapshot references resources that cannot be loaded.
         """
-        await self.initialize()
-
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT * FROM snapshots WHERE snapshot_id = ?",
-                (snapshot_id,),
-            )
+        db = await self._connection()
+        async with db.execute(
+            "SELECT * FROM snapshots WHERE snapshot_id = ?",
+            (snapshot_id,),
+        ) as cursor:
             row = await cursor.fetchone()
 
-            if row is None:
-                return None
-
-            # Load resources
-            resource_ids = json.loads(row["resource_ids"])
-            resources: dict[str, ResourceState] = {}
-            missing_resource_ids: list[str] = []
+        if row is None:
+            return None
 
-            for resource_id in resource_ids:
-                resource = await self.get_resource(resource_id)
-                if resource is not None:
-                    resources[resource_id] = resource
-                else:
-                    missing_resource_ids.append(resource_id)
+        # Load resources
+        resources, missing_resource_ids = await self._load_snapshot_resources(row)
 
-            if missing_resource_ids:
-                raise MissingResourcesError(
-                    snapshot_id=row["snapshot_id"],
-                    missing_resource_ids=missing_resource_ids,
-                )
-
-            return StateSnapshot(
+        if missing_resource_ids:
+            raise MissingResourcesError(
                 snapshot_id=row["snapshot_id"],
-                provider=row["provider"],
-                session_id=row["session_id"],
-                resources=resources,
-                created_at=self._parse_datetime(row["created_at"]),
-                description=row["description"],
+                missing_resource_ids=missing_resource_ids,
             )
 
+        return StateSnapshot(
+            snapshot_id=row["snapshot_id"],
+            provider=row["provider"],
+            session_id=row["session_id"],
+            resources=resources,
+            created_at=self._parse_datetime(row["created_at"]),
+            description=row["description"],
+        )
+
     async def list_snapshots(
         self,
         provider: str | None = None,
@@ -357,8 +436,6 @@ class StateRepository:
                              for better performance. Use get_snapshot() to load full
                              resource data for specific snapshots.
         """
-        await self.initialize()
-
         # Validate inputs
         self._validate_filter_param("provider", provider)
 
@@ -372,43 +449,44 @@ class StateRepository:
         query += " ORDER BY created_at DESC LIMIT ?"
         params.append(limit)
 
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(query, params)
+        db = await self._connection()
+        async with db.execute(query, params) as cursor:
             rows = await cursor.fetchall()
 
-            snapshots = []
-            for row in rows:
-                resources: dict[str, ResourceState] = {}
-
-                # Only load resources if explicitly requested
-                if include_resources:
-                    resource_ids = json.loads(row["resource_ids"])
-                    missing_resource_ids: list[str] = []
-                    for resource_id in resource_ids:
-                        resource = await self.get_resource(resource_id)
-                        if resource is not None:
-                            resources[resource_id] = resource
-                        else:
-                            missing_resource_ids.append(resource_id)
-
-                    if missing_resource_ids:
-                        logger.warning(
-                            f"⚠️ Snapshot {row['snapshot_id']}: missing resources {missing_resource_ids}"
-                        )
-
-                snapshots.append(
-                    StateSnapshot(
-                        snapshot_id=row["snapshot_id"],
-                        provider=row["provider"],
-                        session_id=row["session_id"],
-                        resources=resources,
-                        created_at=self._parse_datetime(row["created_at"]),
-                        description=row["description"],
+        snapshots = []
+        for row in rows:
+            resources: dict[str, ResourceState] = {}
+
+            # Only load resources if explicitly requested
+            if include_resources:
+                resources, missing_resource_ids = await self._load_snapshot_resources(row)
+                if missing_resource_ids:
+                    logger.warning(
+                        f"⚠️ Snapshot {row['snapshot_id']}: missing resources {missing_resource_ids}"
                     )
+
+            snapshots.append(
+                StateSnapshot(
+                    snapshot_id=row["snapshot_id"],
+                    provider=row["provider"],
+                    session_id=row["session_id"],
+                    resources=resources,
+                    created_at=self._parse_datetime(row["created_at"]),
+                    description=row["description"],
                 )
+            )
+
+        return snapshots
 
-            return snapshots
+    async def _load_snapshot_resources(
+        self, row: aiosqlite.Row
+    ) -> tuple[dict[str, ResourceState], list[str]]:
+        """Load the resources a snapshot row references, in snapshot order."""
+        resource_ids: list[str] = json.loads(row["resource_ids"])
+        found = await self.get_resources(resource_ids)
+        resources = {rid: found[rid] for rid in resource_ids if rid in found}
+        missing_resource_ids = [rid for rid in resource_ids if rid not in found]
+        return resources, missing_resource_ids
 
     async def create_snapshot(
         self,
@@ -417,8 +495,6 @@ class StateRepository:
         description: str | None = None,
     ) -> StateSnapshot:
         """Create a snapshot of current resources."""
-        await self.initialize()
-
         # Get all resources (optionally filtered by provider)
         resources = await self.list_resources(provider=provider)
 
@@ -435,12 +511,9 @@ class StateRepository:
 
     async def clear_all(self) -> None:
         """Clear all state data (for testing)."""
-        await self.initialize()
-
-        async with aiosqlite.connect(self._db_path) as db:
+        async with self._transaction() as db:
             await db.execute("DELETE FROM resources")
             await db.execute("DELETE FROM snapshots")
-            await db.commit()
 
     def _parse_datetime(self, value: str) -> datetime:
         """Parse ISO datetime string with timezone awareness."""
@@ -449,6 +522,25 @@ class StateRepository:
             dt = dt.replace(tzinfo=UTC)
         return dt
 
+    def _resource_to_row(self, resource: ResourceState) -> tuple[Any, ...]:
+        """Convert a ResourceState to resources column values (RESOURCE_COLUMNS order)."""
+        return (
+            resource.resource_id,
+            resource.resource_type,
+            resource.name,
+            resource.provider,
+            resource.region,
+            resource.status.value,
+            json.dumps(resource.expected_config),
+            json.dumps(resource.actual_config),
+            json.dumps(resource.tags),
+            json.dumps(resource.outputs),
+            resource.created_at.isoformat(),
+            resource.updated_at.isoformat(),
+            resource.last_checked_at.isoformat() if resource.last_checked_at else None,
+            json.dumps(resource.previous_config) if resource.previous_config else None,
+        )
+
     def _row_to_resource(self, row: aiosqlite.Row) -> ResourceState:
         """Convert a database row to ResourceState."""
         return ResourceState(
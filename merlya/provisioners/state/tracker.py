@@ -58,6 +58,10 @@ class StateTracker:
         """Get the underlying repository."""
         return self._repo
 
+    async def close(self) -> None:
+        """Close the repository connection."""
+        await self._repo.close()
+
     # Resource Lifecycle Methods
 
     async def track_resource(
@@ -256,27 +260,9 @@ class StateTracker:
         if resource is None:
             return DriftResult.from_error(resource_id, "Resource not found in state")
 
-        # Update actual config and check time
-        resource.actual_config = actual_config
-        resource.mark_checked()
+        result = self._record_drift(resource, actual_config)
         await self._repo.save_resource(resource)
-
-        # Compare expected vs actual
-        if not resource.expected_config:
-            return DriftResult.no_drift(resource_id)
-
-        differences = self._compare_configs(
-            resource.expected_config,
-            actual_config,
-        )
-
-        if differences:
-            logger.warning(
-                f"Drift detected for resource {resource_id}: {len(differences)} differences"
-            )
-            return DriftResult.drifted(resource_id, differences)
-
-        return DriftResult.no_drift(resource_id)
+        return result
 
     async def check_all_drift(
         self,
@@ -296,21 +282,49 @@ class StateTracker:
         """
         resources = await self.list_active_resources(provider=provider)
         results = []
+        checked: list[ResourceState] = []
 
         for resource in resources:
             if actual_configs and resource.resource_id in actual_configs:
-                result = await self.check_drift(
-                    resource.resource_id,
-                    actual_configs[resource.resource_id],
-                )
+                result = self._record_drift(resource, actual_configs[resource.resource_id])
+                checked.append(resource)
             else:
                 # Resource not found in actual configs - might be missing
                 result = DriftResult.missing(resource.resource_id)
 
             results.append(result)
 
+        # Persist the checked resources in one transaction
+        await self._repo.save_resources(checked)
         return results
 
+    def _record_drift(
+        self,
+        resource: ResourceState,
+        actual_config: dict[str, Any],
+    ) -> DriftResult:
+        """Record a resource's actual config and check time, and compare it to expected."""
+        resource.actual_config = actual_config
+        resource.mark_checked()
+
+        # Compare expected vs actual
+        if not resource.expected_config:
+            return DriftResult.no_drift(resource.resource_id)
+
+        differences = self._compare_configs(
+            resource.expected_config,
+            actual_config,
+        )
+
+        if differences:
+            logger.warning(
+                f"Drift detected for resource {resource.resource_id}: "
+                f"{len(differences)} differences"
+            )
+            return DriftResult.drifted(resource.resource_id, differences)
+
+        return DriftResult.no_drift(resource.resource_id)
+
     def _compare_configs(
         self,
         expected: dict[str, Any],
@@ -401,10 +415,10 @@ class StateTracker:
             logger.warning(f"Snapshot not found: {snapshot_id}")
             return None
 
-        # Save each resource from snapshot
+        # Save every resource from snapshot in one transaction
         for resource in snapshot.resources.values():
             resource.mark_updated()
-            await self._repo.save_resource(resource)
+        await self._repo.save_resources(snapshot.resources.values())
 
         logger.info(f"Restored state from snapshot: {snapshot_id}")
         return snapshot
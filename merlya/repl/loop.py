@@ -269,6 +269,8 @@ class REPL:
                                 break
                             if result.data.get("new_conversation"):
                                 self.agent.clear_history()
+                            if result.data.get("load_conversation"):
+                                self.agent.load_conversation(result.data["load_conversation"])
                             if result.data.get("reload_agent"):
                                 self._reload_agent()
 
@@ -18,6 +18,7 @@ from loguru import logger
 from pydantic_ai import ModelMessagesTypeAdapter
 from pydantic_ai.messages import ModelMessage, ModelRequest, SystemPromptPart
 
+from merlya.persistence.database import track_queries
 from merlya.session.context_tier import (
     TIER_CONFIG,
     ContextTier,
@@ -59,6 +60,11 @@ class SessionState:
     message_count: int = 0
     created_at: datetime = field(default_factory=_utc_now)
     updated_at: datetime = field(default_factory=_utc_now)
+    # Persistence high-water mark: messages[:persisted_count] are stored with
+    # sequence numbers below next_sequence. Compaction forces a full rewrite.
+    persisted_count: int = 0
+    next_sequence: int = 0
+    needs_rewrite: bool = False
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for persistence."""
@@ -249,9 +255,11 @@ class SessionManager:
                     logger.info(f"🎯 Tier adjusted: {self._session.tier.value} → {new_tier.value}")
                     self._session.tier = new_tier
 
-            # Check if summarization needed
+            # Check if summarization needed (it persists the compacted history)
             if self._should_summarize():
                 await self._trigger_summarization()
+            elif self.db:
+                await self._persist_session()
 
             logger.debug(
                 f"📋 Message added: {self._session.message_count} messages, "
@@ -315,8 +323,9 @@ class SessionManager:
         else:
             self._session.summary = result.summary
 
-        # Replace messages with kept ones
+        # Replace messages with kept ones (stored history must be rewritten)
         self._session.messages = to_keep
+        self._session.needs_rewrite = True
 
         # Recalculate token count
         self._session.token_count = self.token_estimator.estimate_tokens(
@@ -426,49 +435,70 @@ class SessionManager:
 
         return result
 
+    @track_queries
     async def _persist_session(self) -> None:
-        """Persist session and messages to database using UPSERT."""
+        """
+        Persist session metadata and new messages to database.
+
+        Messages are append-only: only those past the high-water mark are
+        serialized. The stored history is rewritten after summarization
+        has compacted it.
+        """
         if not self.db or not self._session:
             return
 
+        session = self._session
         try:
             # Use transaction context manager for automatic rollback on error
             async with self.db.transaction():
-                # Persist session metadata
+                # Persist session metadata (UPSERT: REPLACE would cascade to messages)
                 await self.db.execute(
                     """
-                    INSERT OR REPLACE INTO sessions (
+                    INSERT INTO sessions (
                         id, conversation_id, summary, token_count, message_count,
                         context_tier, created_at, updated_at
                     )
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        conversation_id = excluded.conversation_id,
+                        summary = excluded.summary,
+                        token_count = excluded.token_count,
+                        message_count = excluded.message_count,
+                        context_tier = excluded.context_tier,
+                        updated_at = excluded.updated_at
                     """,
                     (
-                        self._session.id,
-                        self._session.conversation_id,
-                        self._session.summary,
-                        self._session.token_count,
-                        self._session.message_count,
-                        self._session.tier.value,
-                        self._session.created_at,
+                        session.id,
+                        session.conversation_id,
+                        session.summary,
+                        session.token_count,
+                        session.message_count,
+                        session.tier.value,
+                        session.created_at,
                         _utc_now(),
                     ),
                 )
 
-                # Persist messages - delete existing and insert current state
-                await self.db.execute(
-                    "DELETE FROM session_messages WHERE session_id = ?",
-                    (self._session.id,),
-                )
-
-                if self._session.messages:
-                    # Serialize each message individually for granular storage
-                    message_rows = []
-                    for seq_num, msg in enumerate(self._session.messages):
-                        # Serialize single message to JSON
-                        msg_data = ModelMessagesTypeAdapter.dump_json([msg]).decode("utf-8")
-                        message_rows.append((self._session.id, seq_num, msg_data))
-
+                if session.needs_rewrite:
+                    await self.db.execute(
+                        "DELETE FROM session_messages WHERE session_id = ?",
+                        (session.id,),
+                    )
+                    start, sequence = 0, 0
+                else:
+                    start, sequence = session.persisted_count, session.next_sequence
+
+                # Serialize each new message individually for granular storage
+                new_messages = session.messages[start:]
+                if new_messages:
+                    message_rows = [
+                        (
+                            session.id,
+                            sequence + offset,
+                            ModelMessagesTypeAdapter.dump_json([msg]).decode("utf-8"),
+                        )
+                        for offset, msg in enumerate(new_messages)
+                    ]
                     await self.db.executemany(
                         """
                         INSERT INTO session_messages (session_id, sequence_num, message_data)
@@ -478,10 +508,15 @@ class SessionManager:
                     )
                 # Commit is handled by transaction context manager
 
+            session.persisted_count = len(session.messages)
+            session.next_sequence = sequence + len(new_messages)
+            session.needs_rewrite = False
+
         except Exception as e:
             logger.error(f"❌ Failed to persist session: {e}", exc_info=True)
             # Don't re-raise - session loss is recoverable but log as error
 
+    @track_queries
     async def load_session(self, session_id: str) -> SessionState | None:
         """
         Load a session from database, including message history.
@@ -541,6 +576,15 @@ class SessionManager:
                 self._session.messages = self._session.messages[-MAX_MESSAGES_IN_MEMORY:]
                 logger.debug(f"📋 Trimmed loaded messages to {MAX_MESSAGES_IN_MEMORY}")
 
+            # Resume appending after the last stored message
+            async with await self.db.execute(
+                "SELECT MAX(sequence_num) FROM session_messages WHERE session_id = ?",
+                (session_id,),
+            ) as cursor:
+                last = await cursor.fetchone()
+            self._session.persisted_count = len(self._session.messages)
+            self._session.next_sequence = last[0] + 1 if last and last[0] is not None else 0
+
             logger.info(
                 f"📋 Session loaded: {session_id[:8]}... ({len(self._session.messages)} messages)"
             )
@@ -554,6 +598,7 @@ class SessionManager:
             logger.error(f"❌ Database I/O error: {e}")
             return None
 
+    @track_queries
     async def _load_session_messages(self, session_id: str) -> list[ModelMessage]:
         """
         Load messages for a session from database.
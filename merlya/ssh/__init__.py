@@ -5,14 +5,28 @@ Uses asyncssh for async SSH operations.
 Features retry, circuit breaker, and connection health checks.
 """
 
-from merlya.ssh.pool import SSHConnectionOptions, SSHPool, SSHResult
+from merlya.ssh.pool import (
+    FanoutOptions,
+    SSHConnectionOptions,
+    SSHExecuteOptions,
+    SSHPool,
+    SSHResult,
+    SSHTarget,
+    StreamOptions,
+)
+from merlya.ssh.sftp import SFTPTransfer
 from merlya.ssh.types import CircuitBreaker, CircuitState, is_transient_error
 
 __all__ = [
     "CircuitBreaker",
     "CircuitState",
+    "FanoutOptions",
+    "SFTPTransfer",
     "SSHConnectionOptions",
+    "SSHExecuteOptions",
     "SSHPool",
     "SSHResult",
+    "SSHTarget",
+    "StreamOptions",
     "is_transient_error",
 ]
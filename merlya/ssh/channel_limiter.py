@@ -0,0 +1,136 @@
+"""
+Merlya SSH - Adaptive per-host channel limiter.
+
+Replaces a fixed per-host semaphore with an AIMD limit: channel-open
+rejections (MaxSessions reached) halve the limit, sustained success at
+capacity raises it by one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+DEFAULT_MIN_CHANNELS = 1
+DEFAULT_MAX_CHANNELS = 10  # OpenSSH MaxSessions default
+
+
+class AdaptiveChannelLimiter:
+    """Semaphore-like limiter whose capacity adapts to what the host accepts.
+
+    - Rejection: limit = max(min_limit, limit // 2) (multiplicative decrease)
+    - `limit` successes while running at capacity: limit += 1 (additive increase)
+
+    Successes only count towards an increase when the limiter was actually
+    saturated, so a host that is only ever used sequentially keeps its limit.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = DEFAULT_MIN_CHANNELS,
+        max_limit: int = DEFAULT_MAX_CHANNELS,
+        name: str = "",
+    ) -> None:
+        """Initialize limiter with starting capacity and bounds."""
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min(max(initial, min_limit), max_limit)
+        self.name = name
+        self.in_use = 0
+        self.rejections = 0
+        self._successes_at_capacity = 0
+        self._saturated = False
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    # =========================================================================
+    # Acquire / release
+    # =========================================================================
+
+    async def acquire(self) -> None:
+        """Wait for a free channel slot."""
+        if self.in_use < self.limit and not self._waiters:
+            self._take_slot()
+            return
+
+        self._saturated = True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just before cancellation: give it back
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Return a channel slot."""
+        self.in_use = max(0, self.in_use - 1)
+        self._wake_waiters()
+
+    def locked(self) -> bool:
+        """Whether a new acquire() would have to wait."""
+        return self.in_use >= self.limit
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.release()
+
+    def _take_slot(self) -> None:
+        self.in_use += 1
+        if self.in_use >= self.limit:
+            self._saturated = True
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_use < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take_slot()
+                waiter.set_result(None)
+
+    # =========================================================================
+    # Feedback
+    # =========================================================================
+
+    def record_success(self) -> None:
+        """Record a channel that opened and completed normally."""
+        if not self._saturated or self.limit >= self.max_limit:
+            return
+        self._successes_at_capacity += 1
+        if self._successes_at_capacity >= self.limit:
+            self.limit += 1
+            self._successes_at_capacity = 0
+            self._saturated = False
+            logger.debug(f"📈 Channel limit for {self.name} raised to {self.limit}")
+            self._wake_waiters()
+
+    def record_rejection(self) -> None:
+        """Record a channel-open rejection (host refused another session)."""
+        self.rejections += 1
+        self._successes_at_capacity = 0
+        self._saturated = False
+        new_limit = max(self.min_limit, self.limit // 2)
+        if new_limit != self.limit:
+            logger.info(f"📉 Channel limit for {self.name} lowered to {new_limit}")
+            self.limit = new_limit
+
+
+__all__ = ["DEFAULT_MAX_CHANNELS", "DEFAULT_MIN_CHANNELS", "AdaptiveChannelLimiter"]
@@ -0,0 +1,318 @@
+"""
+Merlya SSH - Connection daemon.
+
+A long-lived local process that owns an SSHPool and serves exec and SFTP
+requests over a Unix socket (like OpenSSH ControlMaster), so short-lived
+`merlya run` invocations reuse warm connections instead of redoing every
+handshake. The socket is only accessible to the current user.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import os
+import signal
+import time
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from merlya.ssh.daemon_protocol import (
+    DEFAULT_SOCKET_PATH,
+    ERROR_VALUE,
+    MAX_MESSAGE_BYTES,
+    MAX_OUTPUT_CHARS,
+    decode_conn_kwargs,
+    decode_message,
+    encode_message,
+    error_kind,
+)
+from merlya.ssh.pool import SSHExecuteOptions
+from merlya.ssh.sftp_transfer import SFTPTransferOptions
+from merlya.ssh.streaming import OutputCapture
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from merlya.ssh.pool import SSHPool
+
+DEFAULT_IDLE_TIMEOUT = 1800  # Seconds without requests before the daemon exits
+
+
+def _forget_task(
+    tasks: dict[int, asyncio.Task[None]], request_id: int, _task: asyncio.Task[None]
+) -> None:
+    tasks.pop(request_id, None)
+
+
+class SSHDaemon:
+    """Serve an SSHPool over a Unix socket."""
+
+    def __init__(
+        self,
+        pool: SSHPool,
+        socket_path: Path = DEFAULT_SOCKET_PATH,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        """
+        Initialize daemon.
+
+        Args:
+            pool: Pool that owns the connections.
+            socket_path: Unix socket to listen on.
+            idle_timeout: Exit after this many seconds without requests (0 = never).
+        """
+        self.pool = pool
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self._server: asyncio.Server | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._stopped = asyncio.Event()
+        self._started_at = time.monotonic()
+        self._last_activity = time.monotonic()
+        self._requests = 0
+
+    async def start(self) -> None:
+        """Bind the socket (replacing a stale one)."""
+        from merlya.ssh.daemon_client import SSHDaemonClient
+
+        self.socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            client = await SSHDaemonClient.connect(self.socket_path)
+            if client is not None:
+                await client.close()
+                raise RuntimeError(f"SSH daemon already running on {self.socket_path}")
+            self.socket_path.unlink()
+
+        old_umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(
+                self._handle_client, path=str(self.socket_path), limit=MAX_MESSAGE_BYTES
+            )
+        finally:
+            os.umask(old_umask)
+        logger.info(f"🔌 SSH daemon listening on {self.socket_path} (pid {os.getpid()})")
+
+    async def serve_forever(self) -> None:
+        """Serve until stop() is called or the idle timeout expires."""
+        if self._server is None:
+            await self.start()
+        try:
+            while not self._stopped.is_set():
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self._check_interval())
+                if self._idle_expired():
+                    logger.info(f"🔌 SSH daemon idle for {self.idle_timeout}s, exiting")
+                    break
+        finally:
+            await self.close()
+
+    def stop(self) -> None:
+        """Ask serve_forever() to return."""
+        self._stopped.set()
+
+    async def close(self) -> None:
+        """Stop listening, close pooled connections and remove the socket."""
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+            for writer in list(self._clients):
+                writer.close()
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(server.wait_closed(), timeout=5.0)
+        await self.pool.stop_maintenance()
+        await self.pool.disconnect_all()
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+
+    def stats(self) -> dict[str, Any]:
+        """Daemon and pool statistics."""
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.monotonic() - self._started_at, 1),
+            "requests": self._requests,
+            "registry": self.pool.get_registry_stats(),
+            "jump_tunnels": self.pool.get_jump_tunnel_stats(),
+        }
+
+    def _check_interval(self) -> float:
+        if self.idle_timeout <= 0:
+            return 60.0
+        return min(60.0, self.idle_timeout)
+
+    def _idle_expired(self) -> bool:
+        if self.idle_timeout <= 0:
+            return False
+        return time.monotonic() - self._last_activity >= self.idle_timeout
+
+    # =========================================================================
+    # Client handling
+    # =========================================================================
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        tasks: dict[int, asyncio.Task[None]] = {}
+        self._clients.add(writer)
+
+        def send(message: dict[str, Any]) -> None:
+            if writer.is_closing():
+                return
+            data = encode_message(message)
+            if len(data) > MAX_MESSAGE_BYTES:
+                # The client could not read it and would drop every request in flight
+                logger.warning(f"⚠️ SSH daemon: {len(data)} byte response not sent")
+                error = {"kind": ERROR_VALUE, "message": "Response too large for the SSH daemon"}
+                data = encode_message({"id": message.get("id"), "error": error})
+            writer.write(data)
+
+        try:
+            while line := await reader.readline():
+                self._last_activity = time.monotonic()
+                try:
+                    message = decode_message(line)
+                except ValueError as e:
+                    logger.warning(f"⚠️ SSH daemon: invalid message ({e})")
+                    break
+
+                request_id = message.get("id")
+                op = message.get("op")
+                if op == "cancel":
+                    task = tasks.get(message.get("params", {}).get("id"))
+                    if task is not None:
+                        task.cancel()
+                    continue
+                if not isinstance(request_id, int):
+                    continue
+
+                self._requests += 1
+                task = asyncio.create_task(
+                    self._run_request(request_id, op, message.get("params") or {}, send)
+                )
+                tasks[request_id] = task
+                task.add_done_callback(functools.partial(_forget_task, tasks, request_id))
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            for task in list(tasks.values()):
+                task.cancel()
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _run_request(
+        self,
+        request_id: int,
+        op: Any,
+        params: dict[str, Any],
+        send: Callable[[dict[str, Any]], None],
+    ) -> None:
+        try:
+            result = await self._dispatch(op, params, lambda data: send({"id": request_id, **data}))
+            send({"id": request_id, "result": result})
+        except asyncio.CancelledError:
+            send({"id": request_id, "error": {"kind": "cancelled", "message": "Cancelled"}})
+        except Exception as e:
+            logger.debug(f"🔌 SSH daemon {op} failed: {type(e).__name__}: {e}")
+            send({"id": request_id, "error": {"kind": error_kind(e), "message": str(e)}})
+        finally:
+            self._last_activity = time.monotonic()
+
+    async def _dispatch(
+        self, op: Any, params: dict[str, Any], send: Callable[[dict[str, Any]], None]
+    ) -> Any:
+        if op == "ping":
+            return {"pid": os.getpid()}
+        if op == "stats":
+            return self.stats()
+        if op == "shutdown":
+            self.stop()
+            return {"pid": os.getpid()}
+        if op == "execute":
+            return await self._execute(params)
+        if op in ("upload", "download"):
+            return await self._transfer(op, params, send)
+        if op == "connect":
+            await self.pool.get_connection(params["host"], **decode_conn_kwargs(params))
+            return True
+        if op == "disconnect":
+            await self.pool.disconnect(params["host"])
+            return None
+        raise ValueError(f"Unknown SSH daemon operation: {op}")
+
+    async def _execute(self, params: dict[str, Any]) -> dict[str, Any]:
+        conn = decode_conn_kwargs(params)
+        result = await self.pool.execute(
+            params["host"],
+            params["command"],
+            SSHExecuteOptions(
+                timeout=params.get("timeout", 60),
+                input_data=params.get("input_data"),
+                retry=params.get("retry", True),
+                **conn,
+            ),
+        )
+        response = asdict(result)
+        for name in ("stdout", "stderr"):
+            if len(response[name]) > MAX_OUTPUT_CHARS:
+                capture = OutputCapture(MAX_OUTPUT_CHARS)
+                capture.write(response[name])
+                response[name] = capture.getvalue()
+                response["truncated"] = True
+        return response
+
+    async def _transfer(
+        self, op: str, params: dict[str, Any], send: Callable[[dict[str, Any]], None]
+    ) -> dict[str, Any]:
+        transfer = SFTPTransferOptions(
+            block_size=params.get("block_size"),
+            max_requests=params.get("max_requests"),
+            resume=params.get("resume", False),
+        )
+        if params.get("progress"):
+            transfer.on_progress = lambda done, total: send({"progress": [done, total]})
+
+        conn = decode_conn_kwargs(params)
+        if op == "upload":
+            stats = await self.pool.upload_file(
+                params["host"], params["local_path"], params["remote_path"], transfer, **conn
+            )
+        else:
+            stats = await self.pool.download_file(
+                params["host"], params["remote_path"], params["local_path"], transfer, **conn
+            )
+        return asdict(stats)
+
+
+async def serve(
+    socket_path: Path = DEFAULT_SOCKET_PATH,
+    idle_timeout: float | None = None,
+) -> None:
+    """Run the SSH daemon until stopped or idle, using the user's SSH config."""
+    from merlya.config import get_config
+    from merlya.ssh.pool import SSHPool
+
+    config = get_config()
+    pool = SSHPool(
+        timeout=config.ssh.pool_timeout,
+        connect_timeout=config.ssh.connect_timeout,
+    )
+    if idle_timeout is None:
+        idle_timeout = config.ssh.daemon_idle_timeout
+    daemon = SSHDaemon(pool, socket_path, idle_timeout)
+    await daemon.start()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, daemon.stop)
+
+    await daemon.serve_forever()
+
+
+__all__ = ["DEFAULT_IDLE_TIMEOUT", "SSHDaemon", "serve"]
@@ -0,0 +1,255 @@
+"""
+Merlya SSH - Connection daemon client.
+
+Attaches a CLI process to a running SSH daemon. Requests are multiplexed
+over one socket connection by id, so concurrent executions share it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from merlya.ssh.daemon_protocol import (
+    DEFAULT_SOCKET_PATH,
+    ERROR_AUTH,
+    MAX_MESSAGE_BYTES,
+    decode_message,
+    encode_conn_kwargs,
+    encode_message,
+    error_from_kind,
+)
+from merlya.ssh.sftp_transfer import SFTPTransferStats
+from merlya.ssh.types import SSHResult
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from merlya.ssh.pool import SSHExecuteOptions
+    from merlya.ssh.sftp_transfer import SFTPTransferOptions
+
+DEFAULT_ATTACH_TIMEOUT = 0.5  # Seconds to wait for the daemon socket
+
+
+class SSHDaemonUnavailable(Exception):
+    """The daemon could not be reached; the request was not sent."""
+
+
+class SSHDaemonAuthRequired(Exception):
+    """The daemon needs credentials it cannot prompt for; nothing was run."""
+
+
+class SSHDaemonClient:
+    """Client side of the SSH daemon socket."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Initialize client on an open socket connection (use connect())."""
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._progress: dict[int, Callable[[int, int], None]] = {}
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(
+        cls,
+        socket_path: Path = DEFAULT_SOCKET_PATH,
+        timeout: float = DEFAULT_ATTACH_TIMEOUT,
+    ) -> SSHDaemonClient | None:
+        """Attach to the daemon, or return None if it is not running."""
+        if not Path(socket_path).exists():
+            return None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(str(socket_path), limit=MAX_MESSAGE_BYTES),
+                timeout=timeout,
+            )
+        except (OSError, TimeoutError) as e:
+            logger.debug(f"🔌 SSH daemon not reachable on {socket_path}: {e}")
+            return None
+        return cls(reader, writer)
+
+    @property
+    def connected(self) -> bool:
+        """Whether the socket connection is still open."""
+        return not self._reader_task.done() and not self._writer.is_closing()
+
+    async def close(self) -> None:
+        """Detach from the daemon (the daemon keeps running)."""
+        self._writer.close()
+        self._reader_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await self._reader_task
+        with contextlib.suppress(Exception):
+            await self._writer.wait_closed()
+
+    # =========================================================================
+    # Operations
+    # =========================================================================
+
+    async def ping(self) -> dict[str, Any]:
+        """Check the daemon is alive."""
+        result: dict[str, Any] = await self.request("ping")
+        return result
+
+    async def stats(self) -> dict[str, Any]:
+        """Daemon uptime, request count and pool registry stats."""
+        result: dict[str, Any] = await self.request("stats")
+        return result
+
+    async def shutdown(self) -> None:
+        """Stop the daemon."""
+        await self.request("shutdown")
+
+    async def execute(self, host: str, command: str, options: SSHExecuteOptions) -> SSHResult:
+        """Run a command through the daemon's pool (no streaming)."""
+        result = await self.request(
+            "execute",
+            {
+                "host": host,
+                "command": command,
+                "timeout": options.timeout,
+                "input_data": options.input_data,
+                "retry": options.retry,
+                **encode_conn_kwargs(
+                    options.username, options.private_key, options.options, options.host_name
+                ),
+            },
+        )
+        return SSHResult(**result)
+
+    async def prewarm(self, host: str, conn_kwargs: dict[str, Any]) -> bool:
+        """Open (or reuse) a connection in the daemon's pool without running anything."""
+        return bool(
+            await self.request("connect", {"host": host, **encode_conn_kwargs(**conn_kwargs)})
+        )
+
+    async def transfer(
+        self,
+        op: str,
+        host: str,
+        local_path: str | Path,
+        remote_path: str,
+        transfer: SFTPTransferOptions | None,
+        conn_kwargs: dict[str, Any],
+    ) -> SFTPTransferStats:
+        """Upload ("upload") or download ("download") a file through the daemon."""
+        params: dict[str, Any] = {
+            "host": host,
+            "local_path": str(Path(local_path).expanduser().absolute()),
+            "remote_path": remote_path,
+            **encode_conn_kwargs(**conn_kwargs),
+        }
+        on_progress = None
+        if transfer is not None:
+            params.update(
+                block_size=transfer.block_size,
+                max_requests=transfer.max_requests,
+                resume=transfer.resume,
+                progress=transfer.on_progress is not None,
+            )
+            on_progress = transfer.on_progress
+        result = await self.request(op, params, on_progress=on_progress)
+        return SFTPTransferStats(**result)
+
+    # =========================================================================
+    # Transport
+    # =========================================================================
+
+    async def request(
+        self,
+        op: str,
+        params: dict[str, Any] | None = None,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> Any:
+        """
+        Send a request and wait for its result.
+
+        Raises:
+            SSHDaemonUnavailable: If the request could not be sent.
+            SSHDaemonAuthRequired: If the daemon lacks credentials for the host.
+            ConnectionError: If the daemon went away after the request was sent.
+        """
+        if not self.connected:
+            raise SSHDaemonUnavailable("SSH daemon connection is closed")
+
+        request_id = next(self._ids)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        if on_progress is not None:
+            self._progress[request_id] = on_progress
+
+        try:
+            try:
+                self._writer.write(
+                    encode_message({"id": request_id, "op": op, "params": params or {}})
+                )
+                await self._writer.drain()
+            except OSError as e:
+                raise SSHDaemonUnavailable(f"SSH daemon write failed: {e}") from e
+            return await future
+        except asyncio.CancelledError:
+            self._send_cancel(request_id)
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+            self._progress.pop(request_id, None)
+
+    def _send_cancel(self, request_id: int) -> None:
+        if self._writer.is_closing():
+            return
+        with contextlib.suppress(Exception):
+            self._writer.write(encode_message({"op": "cancel", "params": {"id": request_id}}))
+
+    async def _read_loop(self) -> None:
+        error: Exception = ConnectionError("SSH daemon closed the connection")
+        try:
+            while line := await self._reader.readline():
+                self._dispatch(decode_message(line))
+        except asyncio.CancelledError:
+            error = ConnectionError("SSH daemon client closed")
+            raise
+        except (OSError, ValueError) as e:
+            error = ConnectionError(f"SSH daemon connection lost: {e}")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        request_id = message.get("id")
+        if not isinstance(request_id, int):
+            return
+
+        if "progress" in message:
+            callback = self._progress.get(request_id)
+            if callback is not None:
+                done, total = message["progress"]
+                callback(done, total)
+            return
+
+        future = self._pending.get(request_id)
+        if future is None or future.done():
+            return
+        if "error" in message:
+            kind = message["error"].get("kind", "")
+            text = message["error"].get("message", "")
+            if kind == ERROR_AUTH:
+                future.set_exception(SSHDaemonAuthRequired(text))
+            else:
+                future.set_exception(error_from_kind(kind, text))
+        else:
+            future.set_result(message.get("result"))
+
+
+__all__ = [
+    "SSHDaemonAuthRequired",
+    "SSHDaemonClient",
+    "SSHDaemonUnavailable",
+]
@@ -0,0 +1,123 @@
+"""
+Merlya SSH - Daemon wire protocol.
+
+Newline-delimited JSON over a Unix socket. Requests carry an `id`, an `op`
+and `params`; the daemon answers each id with either `result` or `error`,
+and may send `progress` messages for the same id before that (SFTP).
+Exceptions cross the socket as an error kind the client maps back to a
+Python exception type.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import asyncssh
+
+from merlya.ssh.types import SSHConnectionOptions
+
+DEFAULT_SOCKET_PATH = Path.home() / ".merlya" / "ssh.sock"
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024  # Stream reader limit (one JSON line)
+# Characters of stdout/stderr sent back per stream; JSON escaping can grow
+# text up to 6x, so both streams together always fit in one message
+MAX_OUTPUT_CHARS = MAX_MESSAGE_BYTES // 16
+
+# Error kinds
+ERROR_AUTH = "auth"  # Needs credentials the daemon cannot prompt for
+ERROR_TIMEOUT = "timeout"
+ERROR_NOT_FOUND = "not_found"
+ERROR_PERMISSION = "permission"
+ERROR_VALUE = "value"
+ERROR_CONNECTION = "connection"
+ERROR_OTHER = "error"
+
+_AUTH_ERROR_PATTERNS = ("passphrase", "authentication", "mfa")
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    """Serialize one protocol message."""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_message(line: bytes) -> dict[str, Any]:
+    """Parse one protocol message."""
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Protocol message must be a JSON object")
+    return message
+
+
+def encode_conn_kwargs(
+    username: str | None = None,
+    private_key: str | None = None,
+    options: SSHConnectionOptions | None = None,
+    host_name: str | None = None,
+) -> dict[str, Any]:
+    """Serialize get_connection() arguments."""
+    return {
+        "username": username,
+        "private_key": private_key,
+        "options": asdict(options) if options is not None else None,
+        "host_name": host_name,
+    }
+
+
+def decode_conn_kwargs(params: dict[str, Any]) -> dict[str, Any]:
+    """Rebuild get_connection() arguments."""
+    options = params.get("options")
+    return {
+        "username": params.get("username"),
+        "private_key": params.get("private_key"),
+        "options": SSHConnectionOptions(**options) if options is not None else None,
+        "host_name": params.get("host_name"),
+    }
+
+
+def error_kind(error: BaseException) -> str:
+    """Classify an exception raised in the daemon."""
+    auth_errors = asyncssh.PermissionDenied | asyncssh.KeyImportError | asyncssh.KeyEncryptionError
+    if isinstance(error, auth_errors):
+        return ERROR_AUTH
+    if isinstance(error, TimeoutError):
+        return ERROR_TIMEOUT
+    if isinstance(error, FileNotFoundError | asyncssh.SFTPNoSuchFile):
+        return ERROR_NOT_FOUND
+    if isinstance(error, PermissionError | asyncssh.SFTPPermissionDenied):
+        return ERROR_PERMISSION
+    if isinstance(error, ValueError):
+        return ERROR_VALUE
+    if isinstance(error, OSError | asyncssh.Error):
+        return ERROR_CONNECTION
+    # e.g. MFA or passphrase prompts the daemon has no callback for
+    if any(pattern in str(error).lower() for pattern in _AUTH_ERROR_PATTERNS):
+        return ERROR_AUTH
+    return ERROR_OTHER
+
+
+def error_from_kind(kind: str, message: str) -> Exception:
+    """Rebuild a client-side exception for a daemon error."""
+    types: dict[str, type[Exception]] = {
+        ERROR_TIMEOUT: TimeoutError,
+        ERROR_NOT_FOUND: FileNotFoundError,
+        ERROR_PERMISSION: PermissionError,
+        ERROR_VALUE: ValueError,
+        ERROR_CONNECTION: ConnectionError,
+    }
+    return types.get(kind, RuntimeError)(message)
+
+
+__all__ = [
+    "DEFAULT_SOCKET_PATH",
+    "ERROR_AUTH",
+    "MAX_MESSAGE_BYTES",
+    "MAX_OUTPUT_CHARS",
+    "decode_conn_kwargs",
+    "decode_message",
+    "encode_conn_kwargs",
+    "encode_message",
+    "error_from_kind",
+    "error_kind",
+]
@@ -13,6 +13,7 @@ from typing import TYPE_CHECKING
 from loguru import logger
 
 from merlya.ssh.pty_handler import execute_with_pty, needs_pty_for_command
+from merlya.ssh.streaming import StreamOptions, execute_streaming
 from merlya.ssh.types import (
     SSHConnection,
     SSHConnectionOptions,
@@ -39,6 +40,7 @@ class ExecuteParams:
     input_data: str | None = None
     options: SSHConnectionOptions | None = None
     host_name: str | None = None  # Inventory name for credential lookup
+    stream: StreamOptions | None = None  # Stream output with bounded capture
 
 
 async def execute_command(
@@ -82,6 +84,9 @@ async def execute_command(
             )
             return result
 
+        if params.stream is not None:
+            return await execute_streaming(params, conn, params.stream)
+
         # Standard execution (no PTY)
         completed: SSHCompletedProcess
         if params.input_data is not None:
@@ -0,0 +1,202 @@
+"""
+Merlya SSH - Shared jump-host tunnels.
+
+Pools bastion connections so every target behind the same jump host
+tunnels through a single, reference-counted transport instead of paying
+its own bastion handshake and authentication.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from merlya.ssh.circuit_breaker import CircuitBreaker
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from merlya.ssh.types import SSHConnectionOptions
+
+# (jump_host, jump_port, jump_username, jump_private_key)
+JumpKey = tuple[str, int, str | None, str | None]
+
+
+def jump_key_for(opts: SSHConnectionOptions) -> JumpKey | None:
+    """Build the pooling key for a target's jump host (None if direct).
+
+    The key file is part of the key: targets reaching the same bastion
+    with different identities must not share a tunnel authenticated with
+    someone else's key.
+    """
+    if not opts.jump_host:
+        return None
+    private_key = str(Path(opts.jump_private_key).expanduser()) if opts.jump_private_key else None
+    return (opts.jump_host, opts.jump_port or 22, opts.jump_username, private_key)
+
+
+@dataclass
+class JumpTunnel:
+    """A pooled bastion connection and its dependents count."""
+
+    key: JumpKey
+    connection: Any
+    refs: int = 0
+
+    def is_alive(self) -> bool:
+        """Check that the bastion transport is still open."""
+        is_closed = getattr(self.connection, "is_closed", None)
+        if callable(is_closed):
+            return not is_closed()
+        return self.connection is not None
+
+    async def close(self) -> None:
+        """Close the bastion transport."""
+        with contextlib.suppress(Exception):
+            self.connection.close()
+        with contextlib.suppress(Exception):
+            wait_closed = getattr(self.connection, "wait_closed", None)
+            if callable(wait_closed):
+                await asyncio.wait_for(wait_closed(), timeout=10.0)
+
+
+@dataclass
+class JumpLease:
+    """One target connection's reference on a pooled tunnel."""
+
+    tunnel: JumpTunnel
+    _pool: JumpTunnelPool = field(repr=False)
+    _released: bool = False
+
+    @property
+    def connection(self) -> Any:
+        """The bastion connection to pass as asyncssh `tunnel=`."""
+        return self.tunnel.connection
+
+    async def release(self) -> None:
+        """Drop this reference (idempotent)."""
+        if self._released:
+            return
+        self._released = True
+        await self._pool._release(self.tunnel)
+
+
+class JumpTunnelPool:
+    """Reference-counted pool of jump-host connections.
+
+    Keyed by (jump_host, jump_port, jump_username). A bastion is closed
+    only when its last dependent target connection is closed. Each bastion
+    has its own circuit breaker so a dead jump host fails fast for all of
+    the targets behind it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty tunnel pool."""
+        self._tunnels: dict[JumpKey, JumpTunnel] = {}
+        self._locks: dict[JumpKey, asyncio.Lock] = {}
+        self._circuit_breakers: dict[JumpKey, CircuitBreaker] = {}
+
+    def _get_circuit_breaker(self, key: JumpKey) -> CircuitBreaker:
+        if key not in self._circuit_breakers:
+            self._circuit_breakers[key] = CircuitBreaker()
+        return self._circuit_breakers[key]
+
+    async def acquire(
+        self,
+        opts: SSHConnectionOptions,
+        connect: Callable[[SSHConnectionOptions], Awaitable[Any]],
+    ) -> JumpLease | None:
+        """Get a lease on the tunnel for `opts`, connecting if needed.
+
+        Args:
+            opts: Target connection options (jump_* fields).
+            connect: Factory opening a new bastion connection.
+
+        Returns:
+            JumpLease, or None when the target has no jump host.
+
+        Raises:
+            RuntimeError: If the bastion's circuit breaker is open.
+        """
+        key = jump_key_for(opts)
+        if key is None:
+            return None
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            tunnel = self._tunnels.get(key)
+            if tunnel is not None and not tunnel.is_alive():
+                logger.debug(f"🔌 Jump tunnel {key[0]}:{key[1]} is closed, reconnecting")
+                del self._tunnels[key]
+                tunnel = None
+
+            if tunnel is None:
+                circuit = self._get_circuit_breaker(key)
+                if not circuit.can_execute():
+                    raise RuntimeError(
+                        f"Circuit breaker open for jump host {key[0]}. "
+                        f"Retry in {circuit.time_until_retry():.0f}s"
+                    )
+                try:
+                    connection = await connect(opts)
+                except Exception:
+                    circuit.record_failure()
+                    raise
+                circuit.record_success()
+                tunnel = JumpTunnel(key=key, connection=connection)
+                self._tunnels[key] = tunnel
+                logger.info(f"🌐 Jump host connected: {key[0]}:{key[1]}")
+
+            tunnel.refs += 1
+            return JumpLease(tunnel=tunnel, _pool=self)
+
+    async def _release(self, tunnel: JumpTunnel) -> None:
+        tunnel.refs = max(0, tunnel.refs - 1)
+        if tunnel.refs > 0:
+            return
+        if self._tunnels.get(tunnel.key) is tunnel:
+            del self._tunnels[tunnel.key]
+        await tunnel.close()
+        logger.debug(f"🔌 Jump tunnel closed: {tunnel.key[0]}:{tunnel.key[1]}")
+
+    async def close_all(self) -> None:
+        """Close every pooled tunnel regardless of references."""
+        tunnels = list(self._tunnels.values())
+        self._tunnels.clear()
+        await asyncio.gather(*(t.close() for t in tunnels), return_exceptions=True)
+
+    def get_circuit_status(self, jump_host: str) -> list[dict[str, Any]]:
+        """Get circuit breaker status for every pooled key of a jump host."""
+        return [
+            {
+                "jump_host": key[0],
+                "port": key[1],
+                "username": key[2],
+                "state": cb.state.value,
+                "failure_count": cb.failure_count,
+                "time_until_retry": cb.time_until_retry(),
+            }
+            for key, cb in self._circuit_breakers.items()
+            if key[0] == jump_host
+        ]
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Get one entry per pooled bastion with its dependents count."""
+        return [
+            {
+                "jump_host": key[0],
+                "port": key[1],
+                "username": key[2],
+                "dependents": tunnel.refs,
+                "alive": tunnel.is_alive(),
+            }
+            for key, tunnel in self._tunnels.items()
+        ]
+
+
+__all__ = ["JumpLease", "JumpTunnel", "JumpTunnelPool", "jump_key_for"]
@@ -9,31 +9,45 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import threading
+import time
 import warnings
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from loguru import logger
 
+from merlya.core.metrics import track_ssh_pool_lock_wait
+from merlya.ssh.channel_limiter import DEFAULT_MAX_CHANNELS, AdaptiveChannelLimiter
 from merlya.ssh.circuit_breaker import CircuitBreaker
 from merlya.ssh.connection_builder import SSHConnectionBuilder
 from merlya.ssh.executor import ExecuteParams, execute_command
+from merlya.ssh.jump_pool import JumpTunnelPool
 from merlya.ssh.mfa_auth import MFAAuthHandler
 from merlya.ssh.pool_connect_mixin import SSHPoolConnectMixin
+from merlya.ssh.pool_fanout_mixin import FanoutOptions, SSHPoolFanoutMixin, SSHTarget
+from merlya.ssh.pool_maintenance_mixin import (
+    DEFAULT_HOT_WINDOW,
+    DEFAULT_KEEPALIVE_INTERVAL,
+    DEFAULT_MAINTENANCE_INTERVAL,
+    SSHPoolMaintenanceMixin,
+)
+from merlya.ssh.registry import ConnectionKey, ConnectionRegistry
 from merlya.ssh.sftp import SFTPOperations
+from merlya.ssh.streaming import StreamOptions
 from merlya.ssh.types import (
     SSHConnection,
     SSHConnectionOptions,
     SSHResult,
+    is_channel_limit_error,
     is_transient_error,
 )
 from merlya.ssh.validation import validate_private_key as _validate_private_key
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import AsyncIterator, Awaitable, Callable
     from pathlib import Path
 
-    from asyncssh import SSHClientConnection
+    from merlya.ssh.daemon_client import SSHDaemonClient
 
 
 # Re-export types for backwards compatibility
@@ -41,12 +55,15 @@ from merlya.ssh.prompt_detection import PASSWORD_PROMPT_PATTERNS
 
 __all__ = [
     "PASSWORD_PROMPT_PATTERNS",
+    "FanoutOptions",
     "PoolConfig",
     "SSHConnection",
     "SSHConnectionOptions",
     "SSHExecuteOptions",
     "SSHPool",
     "SSHResult",
+    "SSHTarget",
+    "StreamOptions",
 ]
 
 
@@ -67,6 +84,9 @@ class PoolConfig:
     max_channels_per_host: int = 4
 
 
+T = TypeVar("T")
+
+
 @dataclass
 class SSHExecuteOptions:
     """Options for SSH command execution.
@@ -81,9 +101,10 @@ class SSHExecuteOptions:
     options: SSHConnectionOptions | None = None
     host_name: str | None = None
     retry: bool = True
+    stream: StreamOptions | None = None
 
 
-class SSHPool(SSHPoolConnectMixin, SFTPOperations):
+class SSHPool(SSHPoolConnectMixin, SSHPoolFanoutMixin, SSHPoolMaintenanceMixin, SFTPOperations):
     """SSH connection pool with reuse, retry, and circuit breaker.
 
     Maintains connections for reuse and handles MFA prompts.
@@ -92,11 +113,14 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
 
     Features:
     - Protocol-level Multiplexing (multiple channels over a single SSH transport)
-    - Concurrent Execution Throttling (Semaphores prevent MaxSessions exhaustion)
+    - Concurrent Execution Throttling (adaptive per-host limits learn MaxSessions)
     - Connection reuse with timeout management
     - Circuit breaker per host (prevents cascade failures)
+    - Shared, reference-counted jump-host tunnels (one bastion transport per jump host)
     - Automatic retry for transient errors
     - Health checks for zombie connection detection
+    - Fleet fan-out with streamed, as-completed results (execute_many)
+    - Background maintenance: idle reaping, keepalives for hot connections
     """
 
     DEFAULT_TIMEOUT = 600
@@ -104,7 +128,8 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
     DEFAULT_MAX_CONNECTIONS = 50
     DEFAULT_MAX_RETRIES = 3
     DEFAULT_RETRY_DELAY = 1.0
-    DEFAULT_MAX_CHANNELS_PER_HOST = 4
+    DEFAULT_MAX_CHANNELS_PER_HOST = 4  # Starting point, adapted per host
+    DEFAULT_MAX_CHANNELS_CEILING = DEFAULT_MAX_CHANNELS
 
     _instance: SSHPool | None = None
     _instance_lock: threading.Lock = threading.Lock()
@@ -129,12 +154,24 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
         self.very_verbose_debug = very_verbose_debug
 
         # Internal state
-        self._connections: dict[str, SSHConnection] = {}
-        self._connection_locks: dict[str, asyncio.Lock] = {}
-        self._host_run_semaphores: dict[str, asyncio.Semaphore] = {}
+        # The registry iterates in LRU order and indexes entries by host and
+        # inventory name, so lookups and evictions are O(1) and exact.
+        self._connections = ConnectionRegistry()
+        self._connection_locks: dict[ConnectionKey, asyncio.Lock] = {}
+        # Learned per-host channel limits survive connection eviction/reconnects
+        self._channel_limiters: dict[str, AdaptiveChannelLimiter] = {}
         self._circuit_breakers: dict[str, CircuitBreaker] = {}
+        self._jump_tunnels = JumpTunnelPool()
         self._pool_lock = asyncio.Lock()
+        self._pending_closes: set[asyncio.Task[None]] = set()
         self._max_channels_per_host = SSHPool.DEFAULT_MAX_CHANNELS_PER_HOST
+        self._max_channels_ceiling = SSHPool.DEFAULT_MAX_CHANNELS_CEILING
+
+        # Background maintenance (started lazily on first connection)
+        self.maintenance_interval = DEFAULT_MAINTENANCE_INTERVAL
+        self.keepalive_interval = DEFAULT_KEEPALIVE_INTERVAL
+        self.hot_window = DEFAULT_HOT_WINDOW
+        self._maintenance_task: asyncio.Task[None] | None = None
 
         # Modular components
         self._builder = SSHConnectionBuilder(
@@ -148,6 +185,9 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
         self._passphrase_callback: Callable[[str], str] | None = None
         self._auth_manager: object | None = None
 
+        # Optional shared SSH daemon (see merlya.ssh.daemon)
+        self._daemon: SSHDaemonClient | None = None
+
     # =========================================================================
     # Callback setters
     # =========================================================================
@@ -175,23 +215,78 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
         """Set the SSH authentication manager."""
         self._auth_manager = manager
 
+    # =========================================================================
+    # Daemon
+    # =========================================================================
+
+    def attach_daemon(self, client: SSHDaemonClient) -> None:
+        """Route exec and SFTP requests through a running SSH daemon."""
+        self._daemon = client
+
+    async def detach_daemon(self) -> None:
+        """Stop using the SSH daemon (it keeps running for other processes)."""
+        client, self._daemon = self._daemon, None
+        if client is not None:
+            await client.close()
+
+    @property
+    def daemon_attached(self) -> bool:
+        """Whether requests go through an SSH daemon."""
+        return self._daemon is not None
+
+    async def _via_daemon(self, call: Callable[[SSHDaemonClient], Awaitable[T]]) -> T | None:
+        """Run a request on the daemon; None means fall back to this process.
+
+        Falls back when the daemon is unreachable (and detaches from it) or
+        needs a passphrase/MFA prompt, which only this process can show.
+        """
+        from merlya.ssh.daemon_client import SSHDaemonAuthRequired, SSHDaemonUnavailable
+
+        client = self._daemon
+        if client is None:
+            return None
+        try:
+            return await call(client)
+        except SSHDaemonAuthRequired as e:
+            logger.debug(f"🔌 SSH daemon needs interactive auth, running locally: {e}")
+        except SSHDaemonUnavailable as e:
+            logger.debug(f"🔌 SSH daemon unavailable, using in-process pool: {e}")
+            await self.detach_daemon()
+        return None
+
     # =========================================================================
     # Lock management
     # =========================================================================
 
-    async def _get_connection_lock(self, key: str) -> asyncio.Lock:
-        """Get or create a lock for a connection key."""
+    @contextlib.asynccontextmanager
+    async def _pool_locked(self) -> AsyncIterator[None]:
+        """Acquire the global pool lock, recording how long we waited for it."""
+        start = time.monotonic()
         async with self._pool_lock:
+            track_ssh_pool_lock_wait(time.monotonic() - start)
+            yield
+
+    async def _get_connection_lock(self, key: ConnectionKey) -> asyncio.Lock:
+        """Get or create a lock for a connection key."""
+        async with self._pool_locked():
             if key not in self._connection_locks:
                 self._connection_locks[key] = asyncio.Lock()
             return self._connection_locks[key]
 
-    async def _get_host_run_semaphore(self, key: str) -> asyncio.Semaphore:
-        """Get or create a per-host semaphore to limit concurrent channels."""
-        async with self._pool_lock:
-            if key not in self._host_run_semaphores:
-                self._host_run_semaphores[key] = asyncio.Semaphore(self._max_channels_per_host)
-            return self._host_run_semaphores[key]
+    async def _get_channel_limiter(self, key: str) -> AdaptiveChannelLimiter:
+        """Get or create the adaptive limiter for concurrent channels on a host."""
+        async with self._pool_locked():
+            if key not in self._channel_limiters:
+                self._channel_limiters[key] = AdaptiveChannelLimiter(
+                    initial=self._max_channels_per_host,
+                    max_limit=max(self._max_channels_ceiling, self._max_channels_per_host),
+                    name=key,
+                )
+            return self._channel_limiters[key]
+
+    def get_channel_limits(self) -> dict[str, int]:
+        """Get the learned concurrent-channel limit per host:port."""
+        return {key: limiter.limit for key, limiter in self._channel_limiters.items()}
 
     def _host_run_key(self, host: str, options: SSHConnectionOptions | None) -> str:
         """Build a stable key for per-host channel throttling."""
@@ -218,6 +313,10 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
             "time_until_retry": cb.time_until_retry(),
         }
 
+    def get_jump_tunnel_stats(self) -> list[dict[str, Any]]:
+        """Get pooled jump-host tunnels with their dependents count."""
+        return self._jump_tunnels.stats()
+
     def reset_circuit(self, host: str) -> None:
         """Reset circuit breaker for a host (manual recovery)."""
         if host in self._circuit_breakers:
@@ -228,19 +327,44 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
     # Connection management
     # =========================================================================
 
+    def _touch_connection(self, key: ConnectionKey) -> None:
+        """Mark a connection as most recently used (O(1) LRU update)."""
+        self._connections.touch(key)
+
     async def _evict_lru_connection(self) -> None:
-        """Evict the least recently used connection."""
-        if not self._connections:
+        """Evict the least recently used connection.
+
+        The entry is removed from the registry immediately; the actual
+        teardown is handed to the background closer so a slow TCP close
+        never stalls other pool operations.
+        """
+        lru_key = self._connections.oldest()
+        if lru_key is None:
             return
 
-        lru_key = min(
-            self._connections.keys(),
-            key=lambda k: self._connections[k].last_used,
-        )
         conn = self._connections.pop(lru_key)
-        await conn.close()
+        self._schedule_close(conn)
         logger.debug(f"🔌 Evicted LRU connection: {lru_key}")
 
+    def _schedule_close(self, conn: SSHConnection) -> None:
+        """Close a connection in the background, outside of any pool lock."""
+        task = asyncio.get_running_loop().create_task(self._close_quietly(conn))
+        self._pending_closes.add(task)
+        task.add_done_callback(self._pending_closes.discard)
+
+    @staticmethod
+    async def _close_quietly(conn: SSHConnection) -> None:
+        """Close a connection, logging (not raising) teardown errors."""
+        try:
+            await conn.close()
+        except Exception as e:
+            logger.debug(f"🔌 Background close failed for {conn.host}: {e}")
+
+    async def _drain_pending_closes(self) -> None:
+        """Wait for all background closes to finish."""
+        if self._pending_closes:
+            await asyncio.gather(*list(self._pending_closes), return_exceptions=True)
+
     async def get_connection(
         self,
         host: str,
@@ -255,26 +379,28 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
         if not (1 <= opts.port <= 65535):
             raise ValueError(f"Invalid port number: {opts.port} (must be 1-65535)")
 
-        key = f"{username or 'default'}@{host}:{opts.port}"
+        key = ConnectionKey.for_target(host, username, opts)
         lock = await self._get_connection_lock(key)
+        self._ensure_maintenance()
 
         async with lock:
             if key in self._connections:
                 conn = self._connections[key]
                 if conn.is_alive():
                     conn.refresh_timeout()
+                    self._touch_connection(key)
                     logger.debug(f"🔄 Reusing SSH connection to {host}")
                     return conn
                 else:
                     await conn.close()
                     del self._connections[key]
 
-            async with self._pool_lock:
+            async with self._pool_locked():
                 if len(self._connections) >= self.max_connections:
                     await self._evict_lru_connection()
 
             conn = await self._create_connection(host, username, private_key, opts, host_name)
-            self._connections[key] = conn
+            self._connections.add(key, conn, host_name)
 
             logger.info(f"🌐 SSH connected to {host}")
             return conn
@@ -287,14 +413,17 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
         opts: SSHConnectionOptions,
         host_name: str | None = None,
     ) -> SSHConnection:
-        """Create a new SSH connection."""
-        tunnel: SSHClientConnection | None = None
-        try:
-            options = await self._build_ssh_options(host, username, private_key, opts, host_name)
+        """Create a new SSH connection.
 
-            tunnel = await self._setup_jump_tunnel(opts)
-            if tunnel:
-                options["tunnel"] = tunnel
+        Targets behind a jump host share one pooled bastion connection; the
+        returned SSHConnection releases its reference when closed.
+        """
+        options = await self._build_ssh_options(host, username, private_key, opts, host_name)
+
+        lease = await self._jump_tunnels.acquire(opts, self._setup_jump_tunnel)
+        try:
+            if lease and lease.connection:
+                options["tunnel"] = lease.connection
 
             client_factory = self._create_mfa_client()
             timeout_val = opts.connect_timeout or self.connect_timeout
@@ -304,32 +433,29 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
                 host=host,
                 connection=ssh_conn,
                 timeout=self.timeout,
+                _on_close=lease.release if lease else None,
             )
-        except Exception:
-            if tunnel:
-                with contextlib.suppress(Exception):
-                    tunnel.close()
-                with contextlib.suppress(Exception):
-                    wait_closed = getattr(tunnel, "wait_closed", None)
-                    if callable(wait_closed):
-                        await wait_closed()
+        except BaseException:
+            if lease:
+                await lease.release()
             raise
 
     def has_connection(
         self, host: str, port: int | None = None, username: str | None = None
     ) -> bool:
-        """Check if an active connection exists for the target."""
-        for key, conn in self._connections.items():
-            if not conn.is_alive():
-                continue
-            user_part, rest = key.split("@", 1)
-            host_part, port_part = rest.split(":", 1)
-            host_matches = host_part == host or conn.host == host
-            port_matches = port is None or int(port_part) == port
-            user_matches = username is None or user_part == (username or "default")
-            if host_matches and port_matches and user_matches:
-                return True
-        return False
+        """Check if an active connection exists for the target.
+
+        `host` matches the connection's hostname or the inventory name it
+        was opened for, exactly.
+        """
+        return any(
+            self._connections[key].is_alive()
+            for key in self._connections.find(host, port, username)
+        )
+
+    def get_registry_stats(self) -> dict[str, Any]:
+        """Get connection registry size and approximate memory use."""
+        return self._connections.stats()
 
     # =========================================================================
     # Command execution
@@ -381,6 +507,7 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
             _options = exec_options.options
             _host_name = exec_options.host_name
             _retry = exec_options.retry
+            _stream = exec_options.stream
         else:
             # Legacy mode - emit deprecation warning if using individual params
             legacy_params = [timeout, input_data, username, private_key, options, host_name, retry]
@@ -398,6 +525,23 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
             _options = options
             _host_name = host_name
             _retry = retry if retry is not None else True
+            _stream = None
+
+        if self._daemon is not None and _stream is None:
+            daemon_options = SSHExecuteOptions(
+                timeout=_timeout,
+                input_data=_input_data,
+                username=_username,
+                private_key=_private_key,
+                options=_options,
+                host_name=_host_name,
+                retry=_retry,
+            )
+            result = await self._via_daemon(
+                lambda client: client.execute(host, command, daemon_options)
+            )
+            if result is not None:
+                return result
 
         circuit = self._get_circuit_breaker(host)
         if not circuit.can_execute():
@@ -414,6 +558,7 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
             input_data=_input_data,
             options=_options,
             host_name=_host_name,
+            stream=_stream,
         )
 
         max_attempts = self.max_retries if _retry else 1
@@ -429,7 +574,9 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
                     logger.warning(
                         f"Transient error on {host} (attempt {attempt + 1}/{max_attempts}): {e}"
                     )
-                    await self._invalidate_connection(host, _username, _options)
+                    # A refused channel does not mean the transport is broken
+                    if not is_channel_limit_error(e):
+                        await self._invalidate_connection(host, _username, _options)
                     delay = self.retry_delay * (2**attempt)
                     await asyncio.sleep(delay)
                     continue
@@ -458,10 +605,17 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
         )
 
         run_key = self._host_run_key(params.host, params.options)
-        semaphore = await self._get_host_run_semaphore(run_key)
-
-        async with semaphore:
-            result = await execute_command(params, conn, self.very_verbose_debug)
+        limiter = await self._get_channel_limiter(run_key)
+
+        with conn.use():
+            async with limiter:
+                try:
+                    result = await execute_command(params, conn, self.very_verbose_debug)
+                except Exception as e:
+                    if is_channel_limit_error(e):
+                        limiter.record_rejection()
+                    raise
+                limiter.record_success()
 
         circuit.record_success()
         return result
@@ -473,42 +627,46 @@ class SSHPool(SSHPoolConnectMixin, SFTPOperations):
         options: SSHConnectionOptions | None,
     ) -> None:
         """Invalidate a connection for reconnection on next attempt."""
-        opts = options or SSHConnectionOptions()
-        key = f"{username or 'default'}@{host}:{opts.port}"
+        key = ConnectionKey.for_target(host, username, options or SSHConnectionOptions())
 
-        async with self._pool_lock:
-            if key in self._connections:
-                conn = self._connections.pop(key)
-                conn.mark_unhealthy()
-                with contextlib.suppress(Exception):
-                    await conn.close()
-                logger.debug(f"🔌 Invalidated connection: {key}")
+        async with self._pool_locked():
+            conn = self._connections.pop(key, None)
+
+        if conn is not None:
+            conn.mark_unhealthy()
+            self._schedule_close(conn)
+            logger.debug(f"🔌 Invalidated connection: {key}")
 
     # =========================================================================
     # Disconnect methods
     # =========================================================================
 
     async def disconnect(self, host: str) -> None:
-        """Disconnect from a specific host."""
-        async with self._pool_lock:
-            to_remove = [k for k in self._connections if host in k]
-            for key in to_remove:
-                conn = self._connections.pop(key)
-                await conn.close()
-                logger.debug(f"🔌 Disconnected from {host}")
+        """Disconnect every connection to a host (hostname or inventory name)."""
+        await self._via_daemon(lambda client: client.request("disconnect", {"host": host}))
+        async with self._pool_locked():
+            to_remove = self._connections.keys_for(host)
+            removed = [self._connections.pop(k) for k in to_remove]
+
+        # Close outside the lock so other hosts are not blocked on teardown
+        for conn in removed:
+            await conn.close()
+            logger.debug(f"🔌 Disconnected from {host}")
 
     async def disconnect_all(self) -> None:
         """Disconnect all connections."""
-        async with self._pool_lock:
-            for conn in self._connections.values():
-                await conn.close()
-
-            count = len(self._connections)
+        await self.stop_maintenance()
+        async with self._pool_locked():
+            removed = list(self._connections.values())
             self._connections.clear()
             self._connection_locks.clear()
 
-            if count:
-                logger.debug(f"🔌 Disconnected {count} SSH connection(s)")
+        await asyncio.gather(*(conn.close() for conn in removed), return_exceptions=True)
+        await self._drain_pending_closes()
+        await self._jump_tunnels.close_all()
+
+        if removed:
+            logger.debug(f"🔌 Disconnected {len(removed)} SSH connection(s)")
 
     # =========================================================================
     # Singleton
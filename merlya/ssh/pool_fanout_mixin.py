@@ -0,0 +1,239 @@
+"""
+Merlya SSH - Fleet fan-out for SSHPool.
+
+Runs one command on many hosts with a global concurrency cap and yields
+results as each host finishes, instead of gathering everything at the end.
+Also pre-establishes connections to hosts that are about to be used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from loguru import logger
+
+from merlya.ssh.types import SSHResult
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+
+    from merlya.ssh.daemon_client import SSHDaemonClient
+    from merlya.ssh.pool import SSHExecuteOptions
+    from merlya.ssh.types import SSHConnection, SSHConnectionOptions
+
+FanoutOutcome = SSHResult | Exception
+T = TypeVar("T")
+
+DEFAULT_FANOUT_CONCURRENCY = 20
+DEFAULT_PREWARM_CONCURRENCY = 10
+
+
+@dataclass
+class SSHTarget:
+    """A single fan-out target.
+
+    `exec_options` overrides the shared options passed to execute_many()
+    (credentials, port, jump host...). `label` is what gets yielded back;
+    it defaults to `host` and is typically the inventory name.
+    """
+
+    host: str
+    exec_options: SSHExecuteOptions | None = None
+    label: str | None = None
+
+    @property
+    def key(self) -> str:
+        """Identifier yielded alongside the result."""
+        return self.label or self.host
+
+
+@dataclass
+class FanoutOptions:
+    """Fan-out behaviour for SSHPool.execute_many().
+
+    A host counts as failed when execute() raises or the command exits
+    non-zero.
+    """
+
+    max_concurrency: int = DEFAULT_FANOUT_CONCURRENCY
+    fail_fast: bool = False  # Cancel remaining hosts on first failure
+    quorum: int | None = None  # Cancel remaining hosts once N hosts succeeded
+
+
+class SSHPoolFanoutMixin:
+    """Mixin providing execute_many() for SSHPool."""
+
+    if TYPE_CHECKING:
+        _daemon: SSHDaemonClient | None
+
+        async def _via_daemon(
+            self, call: Callable[[SSHDaemonClient], Awaitable[T]]
+        ) -> T | None: ...
+
+        async def execute(
+            self,
+            host: str,
+            command: str,
+            exec_options: SSHExecuteOptions | None = None,
+        ) -> SSHResult: ...
+
+        async def get_connection(
+            self,
+            host: str,
+            username: str | None = None,
+            private_key: str | None = None,
+            options: SSHConnectionOptions | None = None,
+            host_name: str | None = None,
+        ) -> SSHConnection: ...
+
+    async def execute_many(
+        self,
+        targets: Iterable[str | SSHTarget],
+        command: str,
+        exec_options: SSHExecuteOptions | None = None,
+        fanout: FanoutOptions | None = None,
+    ) -> AsyncIterator[tuple[str, FanoutOutcome]]:
+        """Execute a command on many hosts, yielding results as they complete.
+
+        Targets are consumed lazily and at most `max_concurrency` commands are
+        in flight, so memory stays bounded regardless of inventory size.
+        Per-host channel semaphores still apply through execute().
+
+        Args:
+            targets: Host names or SSHTarget entries.
+            command: Command to execute on every target.
+            exec_options: Shared execution options (per-target options win).
+            fanout: Concurrency and cancellation policy.
+
+        Yields:
+            (target key, SSHResult or the exception raised for that host).
+        """
+        if not command or not command.strip():
+            raise ValueError("Command cannot be empty")
+        fan = fanout or FanoutOptions()
+        if fan.max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        if fan.quorum is not None and fan.quorum < 1:
+            raise ValueError("quorum must be >= 1")
+
+        target_iter = iter(targets)
+        pending: set[asyncio.Task[tuple[str, FanoutOutcome]]] = set()
+        exhausted = False
+        stop = False
+        successes = 0
+
+        try:
+            while True:
+                while not exhausted and len(pending) < fan.max_concurrency:
+                    target = next(target_iter, None)
+                    if target is None:
+                        exhausted = True
+                        break
+                    if isinstance(target, str):
+                        target = SSHTarget(host=target)
+                    pending.add(
+                        asyncio.create_task(self._execute_target(target, command, exec_options))
+                    )
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key, outcome = task.result()
+                    ok = isinstance(outcome, SSHResult) and outcome.exit_code == 0
+                    successes += ok
+                    if (fan.fail_fast and not ok) or (fan.quorum and successes >= fan.quorum):
+                        stop = True
+                    yield key, outcome
+
+                if stop:
+                    logger.debug(
+                        f"⚡ Fan-out stopped early ({successes} succeeded, "
+                        f"{len(pending)} cancelled)"
+                    )
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def prewarm(
+        self,
+        targets: Iterable[str | SSHTarget],
+        max_concurrency: int = DEFAULT_PREWARM_CONCURRENCY,
+    ) -> int:
+        """Establish connections to targets ahead of their first command.
+
+        Meant to run in the background (e.g. while the LLM is thinking) so
+        the first tool call finds a ready connection in get_connection().
+        When an SSH daemon is attached the connections are opened in the
+        daemon's pool, which is where execute() will send the commands.
+        Failures are logged and ignored: the real command will retry and
+        report them.
+
+        Args:
+            targets: Host names or SSHTarget entries (credentials, port, jump).
+            max_concurrency: Maximum simultaneous handshakes.
+
+        Returns:
+            Number of targets with a ready connection.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def warm(target: str | SSHTarget) -> bool:
+            if isinstance(target, str):
+                target = SSHTarget(host=target)
+            opts = target.exec_options
+            conn_kwargs: dict[str, Any] = {
+                "username": opts.username if opts else None,
+                "private_key": opts.private_key if opts else None,
+                "options": opts.options if opts else None,
+                "host_name": opts.host_name if opts else None,
+            }
+            host = target.host
+            async with semaphore:
+                try:
+                    # Like execute(), only warm locally if the daemon can't do it
+                    if self._daemon is not None and await self._via_daemon(
+                        lambda client: client.prewarm(host, conn_kwargs)
+                    ):
+                        return True
+                    await self.get_connection(host, **conn_kwargs)
+                except Exception as e:
+                    logger.debug(f"🔥 Prewarm failed for {target.key}: {e}")
+                    return False
+            return True
+
+        results = await asyncio.gather(*(warm(t) for t in targets))
+        ready = sum(results)
+        if results:
+            logger.debug(f"🔥 Prewarmed {ready}/{len(results)} SSH connection(s)")
+        return ready
+
+    async def _execute_target(
+        self,
+        target: SSHTarget,
+        command: str,
+        exec_options: SSHExecuteOptions | None,
+    ) -> tuple[str, FanoutOutcome]:
+        """Run the command on one target, capturing errors as values."""
+        try:
+            result = await self.execute(target.host, command, target.exec_options or exec_options)
+        except Exception as e:
+            logger.debug(f"⚡ Fan-out error on {target.key}: {e}")
+            return target.key, e
+        return target.key, result
+
+
+__all__ = [
+    "DEFAULT_FANOUT_CONCURRENCY",
+    "DEFAULT_PREWARM_CONCURRENCY",
+    "FanoutOptions",
+    "FanoutOutcome",
+    "SSHPoolFanoutMixin",
+    "SSHTarget",
+]
@@ -0,0 +1,133 @@
+"""
+Merlya SSH - Background maintenance for SSHPool.
+
+A pool-owned task periodically reaps expired and dead connections, keeps
+recently used ones warm with SSH-level keepalives and closes idle SFTP
+sessions, instead of waiting for get_connection() to stumble on a stale
+entry.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from merlya.core.metrics import track_ssh_connections_reaped, track_ssh_pool_state
+
+if TYPE_CHECKING:
+    from contextlib import AbstractAsyncContextManager
+
+    from merlya.ssh.registry import ConnectionKey, ConnectionRegistry
+    from merlya.ssh.types import SSHConnection
+
+DEFAULT_MAINTENANCE_INTERVAL = 30.0  # Seconds between sweeps
+DEFAULT_KEEPALIVE_INTERVAL = 30  # Seconds between keepalive requests on hot connections
+DEFAULT_HOT_WINDOW = 300  # Connections used within this many seconds are kept warm
+
+
+@dataclass
+class MaintenanceStats:
+    """Outcome of one maintenance sweep."""
+
+    active: int = 0  # Used within the hot window (kept warm)
+    idle: int = 0  # Pooled but cold (no keepalives, reaped on expiry)
+    reaped: int = 0  # Removed this sweep (expired, unhealthy or closed)
+    sftp_closed: int = 0  # Idle SFTP sessions closed this sweep
+
+
+class SSHPoolMaintenanceMixin:
+    """Mixin providing the idle reaper / keepalive scheduler for SSHPool."""
+
+    _connections: ConnectionRegistry
+    maintenance_interval: float
+    keepalive_interval: int
+    hot_window: int
+    _maintenance_task: asyncio.Task[None] | None
+
+    if TYPE_CHECKING:
+
+        def _pool_locked(self) -> AbstractAsyncContextManager[None]: ...
+
+        def _schedule_close(self, conn: SSHConnection) -> None: ...
+
+    def _ensure_maintenance(self) -> None:
+        """Start the maintenance task on the running loop if needed."""
+        if self.maintenance_interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        task = self._maintenance_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._maintenance_task = loop.create_task(self._maintenance_loop())
+
+    async def stop_maintenance(self) -> None:
+        """Stop the maintenance task."""
+        task, self._maintenance_task = self._maintenance_task, None
+        if task is None or task.done():
+            return
+        with contextlib.suppress(RuntimeError):
+            if task.get_loop() is not asyncio.get_running_loop():
+                return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval)
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logger.warning(f"⚠️ SSH pool maintenance failed: {e}")
+
+    async def run_maintenance(self) -> MaintenanceStats:
+        """Run one sweep: reap dead/expired connections, keep hot ones warm."""
+        stats = MaintenanceStats()
+        reaped: list[tuple[ConnectionKey, SSHConnection, str]] = []
+
+        async with self._pool_locked():
+            for key, conn in list(self._connections.items()):
+                if conn.is_transport_closed():
+                    reason = "closed"
+                elif not conn.is_alive():
+                    reason = "expired"
+                else:
+                    continue
+                del self._connections[key]
+                reaped.append((key, conn, reason))
+            remaining = list(self._connections.values())
+
+        now = datetime.now(UTC)
+        for conn in remaining:
+            idle_for = (now - conn.last_used).total_seconds()
+            if idle_for <= self.hot_window:
+                stats.active += 1
+                conn.set_keepalive(self.keepalive_interval)
+            else:
+                stats.idle += 1
+                conn.set_keepalive(0)
+            if await conn.close_sftp(idle_only=True):
+                stats.sftp_closed += 1
+
+        for key, conn, reason in reaped:
+            self._schedule_close(conn)
+            track_ssh_connections_reaped(reason)
+            logger.debug(f"🧹 Reaped SSH connection {key} ({reason})")
+        stats.reaped = len(reaped)
+
+        track_ssh_pool_state(stats.active, stats.idle)
+        return stats
+
+
+__all__ = [
+    "DEFAULT_HOT_WINDOW",
+    "DEFAULT_KEEPALIVE_INTERVAL",
+    "DEFAULT_MAINTENANCE_INTERVAL",
+    "MaintenanceStats",
+    "SSHPoolMaintenanceMixin",
+]
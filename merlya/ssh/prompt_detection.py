@@ -8,7 +8,9 @@ from __future__ import annotations
 
 import asyncio
 import re
+import secrets
 import time
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from loguru import logger
@@ -48,64 +50,95 @@ def sanitize_for_logging(text: str) -> str:
     return _SANITIZE_PATTERN.sub("•", text)
 
 
+@dataclass
+class PromptWait:
+    """Outcome of waiting for a password prompt."""
+
+    found: bool  # A prompt (sentinel or known pattern) was seen
+    buffer: str  # Output read while waiting
+    eof: bool  # The process closed stdout before any prompt
+    elapsed: float  # Seconds spent waiting
+
+    @property
+    def outcome(self) -> str:
+        """Short label for metrics: prompt, eof or timeout."""
+        if self.found:
+            return "prompt"
+        return "eof" if self.eof else "timeout"
+
+
+def make_prompt_sentinel() -> str:
+    """Build a unique, shell-safe prompt for `sudo -p`."""
+    return f"merlya-sudo-{secrets.token_hex(4)}:"
+
+
 async def wait_for_prompt(
     process: SSHClientProcess[str],
     patterns: tuple[str, ...] = PASSWORD_PROMPT_PATTERNS,
     timeout: float = 5.0,
     very_verbose: bool = False,
-) -> tuple[bool, str]:
+    sentinel: str | None = None,
+) -> PromptWait:
     """Wait for password prompt to appear in stdout.
 
-    Reads stdout incrementally until a password prompt pattern is detected
-    or timeout is reached. This replaces the unreliable fixed sleep.
+    Reads stdout incrementally and returns as soon as a prompt is detected
+    or stdout reaches EOF (passwordless sudo, command already finished).
+    `timeout` only bounds commands that keep running without prompting.
 
     Args:
         process: SSH process with stdout.
         patterns: Tuple of patterns to match (case-insensitive).
         timeout: Maximum time to wait for prompt.
         very_verbose: If True, include sanitized buffer content in logs.
+        sentinel: Exact prompt requested with `sudo -p` (matched as-is).
 
     Returns:
-        Tuple of (prompt_found, buffer_content).
+        PromptWait with the buffered output and how the wait ended.
     """
     buffer = ""
+    eof = False
     start = time.monotonic()
 
-    while time.monotonic() - start < timeout:
-        try:
-            # Read with short timeout to allow cancellation
-            if process.stdout:
-                chunk = await asyncio.wait_for(
-                    process.stdout.read(1024),
-                    timeout=0.3,
-                )
-                if chunk:
-                    if isinstance(chunk, bytes):
-                        chunk = chunk.decode("utf-8", errors="replace")
-                    buffer += chunk
-
-                    # Check if any prompt pattern matches
-                    buffer_lower = buffer.lower()
-                    if any(p in buffer_lower for p in patterns):
-                        if very_verbose:
-                            sanitized = sanitize_for_logging(buffer[-50:])
-                            logger.debug(f"🔑 Password prompt detected (sanitized): {sanitized!r}")
-                        else:
-                            logger.debug("🔑 Password prompt detected")
-                        return True, buffer
-            else:
-                # No stdout available, can't detect prompt
-                break
-        except TimeoutError:
-            # Read timeout, continue waiting
-            continue
-        except asyncio.CancelledError:
-            # Propagate cancellation
-            raise
-
+    def _matches() -> bool:
+        if sentinel and sentinel in buffer:
+            return True
+        buffer_lower = buffer.lower()
+        return any(p in buffer_lower for p in patterns)
+
+    try:
+        async with asyncio.timeout(timeout):
+            while process.stdout:
+                chunk = await process.stdout.read(1024)
+                if not chunk:
+                    eof = True
+                    break
+                if isinstance(chunk, bytes):
+                    chunk = chunk.decode("utf-8", errors="replace")
+                buffer += chunk
+
+                if _matches():
+                    elapsed = time.monotonic() - start
+                    if very_verbose:
+                        sanitized = sanitize_for_logging(buffer[-50:])
+                        logger.debug(
+                            f"🔑 Password prompt detected after {elapsed:.3f}s "
+                            f"(sanitized): {sanitized!r}"
+                        )
+                    else:
+                        logger.debug(f"🔑 Password prompt detected after {elapsed:.3f}s")
+                    return PromptWait(found=True, buffer=buffer, eof=False, elapsed=elapsed)
+    except TimeoutError:
+        pass
+
+    elapsed = time.monotonic() - start
+    reason = "EOF" if eof else "timeout"
     if very_verbose:
         sanitized = sanitize_for_logging(buffer[-100:])
-        logger.debug(f"⚠️ No prompt detected after {timeout}s (sanitized): {sanitized!r}")
+        logger.debug(
+            f"⚠️ No prompt detected ({reason} after {elapsed:.3f}s, sanitized): {sanitized!r}"
+        )
     else:
-        logger.debug(f"⚠️ No prompt detected after {timeout}s (buffer length: {len(buffer)} chars)")
-    return False, buffer
+        logger.debug(
+            f"⚠️ No prompt detected ({reason} after {elapsed:.3f}s, buffer length: {len(buffer)} chars)"
+        )
+    return PromptWait(found=False, buffer=buffer, eof=eof, elapsed=elapsed)
@@ -8,12 +8,15 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import re
 from typing import TYPE_CHECKING
 
 from loguru import logger
 
+from merlya.core.metrics import track_ssh_prompt_wait
 from merlya.ssh.prompt_detection import (
     PASSWORD_PROMPT_PATTERNS,
+    make_prompt_sentinel,
     sanitize_for_logging,
     wait_for_prompt,
 )
@@ -22,6 +25,31 @@ from merlya.ssh.types import SSHConnection, SSHResult
 if TYPE_CHECKING:
     from asyncssh.process import SSHClientProcess
 
+# Upper bound for commands that keep running without prompting nor exiting
+PROMPT_WAIT_TIMEOUT = 5.0
+
+# `sudo -S ...` (same prefix as needs_pty_for_command) and an explicit -p/--prompt
+_SUDO_STDIN_PATTERN = re.compile(r"^(\s*sudo\s+-S)(?=\s)")
+_SUDO_PROMPT_OPTION = re.compile(r"^\s*sudo(?:\s+-\S+)*?\s+(?:-[a-zA-Z]*p|--prompt)")
+
+
+def with_prompt_sentinel(command: str) -> tuple[str, str | None]:
+    """Make `sudo -S` print a unique prompt we can match exactly.
+
+    Commands that already set their own prompt (-p/--prompt), and
+    su/doas, are returned unchanged.
+
+    Args:
+        command: Command about to run in a PTY.
+
+    Returns:
+        Tuple of (command, sentinel or None).
+    """
+    if not _SUDO_STDIN_PATTERN.match(command) or _SUDO_PROMPT_OPTION.match(command):
+        return command, None
+    sentinel = make_prompt_sentinel()
+    return _SUDO_STDIN_PATTERN.sub(rf"\1 -p {sentinel}", command, count=1), sentinel
+
 
 def has_sudo_password_indicators(buffer: str) -> bool:
     """Check if buffer contains explicit sudo-password indicators.
@@ -72,8 +100,8 @@ async def execute_with_pty(
     We need to create a process and manually write to stdin.
 
     This function:
-    1. Creates a PTY process
-    2. Waits for the password prompt (instead of fixed sleep)
+    1. Creates a PTY process (`sudo -S` gets a unique `-p` sentinel prompt)
+    2. Waits for the password prompt, or EOF when no password is asked
     3. Writes the password when prompt is detected
     4. Handles CancelledError for Ctrl+C support
 
@@ -103,21 +131,26 @@ async def execute_with_pty(
         nonlocal process
         assert conn.connection is not None  # For type checker
 
+        pty_command, sentinel = with_prompt_sentinel(command)
+
         # Create process with PTY
         async with conn.connection.create_process(
-            command,
+            pty_command,
             term_type="xterm",
             term_size=(80, 24),
         ) as proc:
             process = proc
 
-            # Wait for password prompt instead of fixed sleep
-            prompt_found, prompt_buffer = await wait_for_prompt(
+            # Returns on prompt or EOF; the timeout only bounds long-running commands
+            wait = await wait_for_prompt(
                 proc,
                 PASSWORD_PROMPT_PATTERNS,
-                timeout=5.0,
+                timeout=PROMPT_WAIT_TIMEOUT,
                 very_verbose=very_verbose_debug,
+                sentinel=sentinel,
             )
+            track_ssh_prompt_wait(wait.elapsed, wait.outcome)
+            prompt_found, prompt_buffer = wait.found, wait.buffer
 
             # Smart password handling based on prompt detection and buffer analysis
             password_needed = False
@@ -128,7 +161,8 @@ async def execute_with_pty(
                 logger.debug("🔑 Main prompt detection confirmed - sending password")
             else:
                 # No main prompt found - check buffer for explicit sudo-password indicators
-                if has_sudo_password_indicators(prompt_buffer):
+                # (pointless once the process has exited)
+                if not wait.eof and has_sudo_password_indicators(prompt_buffer):
                     password_needed = True
                     logger.debug(
                         "🔑 Buffer analysis found sudo password indicators - sending password"
@@ -170,7 +204,7 @@ async def execute_with_pty(
 
             # Collect remaining stdout (stderr is merged into stdout with PTY)
             stdout_bytes = b""
-            if proc.stdout:
+            if proc.stdout and not wait.eof:
                 stdout_bytes = await proc.stdout.read()
 
             # Wait for process to complete
@@ -183,6 +217,8 @@ async def execute_with_pty(
                     stdout_str += stdout_bytes.decode("utf-8", errors="replace")
                 else:
                     stdout_str += str(stdout_bytes)
+            if sentinel:
+                stdout_str = stdout_str.replace(sentinel, "")
 
             return SSHResult(
                 stdout=stdout_str,
@@ -0,0 +1,171 @@
+"""
+Merlya SSH - Connection registry.
+
+Typed store for pooled connections, keyed by (user, host, port, jump) with
+secondary indexes by host and by inventory name so lookups from the agent
+and target resolver are exact and O(1).
+"""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator, MutableMapping
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from merlya.ssh.jump_pool import JumpKey, jump_key_for
+
+if TYPE_CHECKING:
+    from merlya.ssh.types import SSHConnection, SSHConnectionOptions
+
+DEFAULT_USER = "default"  # Key user when the SSH config/agent picks the username
+
+
+class ConnectionKey(NamedTuple):
+    """Identity of a pooled connection."""
+
+    user: str
+    host: str
+    port: int = 22
+    jump: JumpKey | None = None
+
+    @classmethod
+    def for_target(
+        cls, host: str, username: str | None, options: SSHConnectionOptions
+    ) -> ConnectionKey:
+        """Build the key get_connection() uses for a target."""
+        return cls(username or DEFAULT_USER, host, options.port, jump_key_for(options))
+
+    def __str__(self) -> str:
+        """Render as user@host:port (via jump:port)."""
+        base = f"{self.user}@{self.host}:{self.port}"
+        if self.jump is None:
+            return base
+        return f"{base} via {self.jump[0]}:{self.jump[1]}"
+
+
+class ConnectionRegistry(MutableMapping[ConnectionKey, "SSHConnection"]):
+    """Connections by key, in LRU order, with host and inventory-name indexes.
+
+    Iteration order is least to most recently used: touch() moves an entry
+    to the end and oldest() returns the eviction candidate.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._entries: dict[ConnectionKey, SSHConnection] = {}
+        self._names: dict[ConnectionKey, str] = {}
+        self._by_host: dict[str, set[ConnectionKey]] = {}
+        self._by_name: dict[str, set[ConnectionKey]] = {}
+
+    # =========================================================================
+    # Mapping protocol
+    # =========================================================================
+
+    def __getitem__(self, key: ConnectionKey) -> SSHConnection:
+        return self._entries[key]
+
+    def __setitem__(self, key: ConnectionKey, conn: SSHConnection) -> None:
+        self.add(key, conn)
+
+    def __delitem__(self, key: ConnectionKey) -> None:
+        del self._entries[key]
+        self._unindex(key)
+
+    def __iter__(self) -> Iterator[ConnectionKey]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        """Remove every entry (O(1), unlike MutableMapping's default)."""
+        self._entries.clear()
+        self._names.clear()
+        self._by_host.clear()
+        self._by_name.clear()
+
+    # =========================================================================
+    # Registry operations
+    # =========================================================================
+
+    def add(self, key: ConnectionKey, conn: SSHConnection, name: str | None = None) -> None:
+        """Register a connection as most recently used.
+
+        Args:
+            key: Connection identity.
+            conn: Connection to store.
+            name: Inventory name the connection was opened for, if any.
+        """
+        if key in self._entries:
+            del self[key]
+        self._entries[key] = conn
+        self._by_host.setdefault(key.host, set()).add(key)
+        if name and name != key.host:
+            self._names[key] = name
+            self._by_name.setdefault(name, set()).add(key)
+
+    def touch(self, key: ConnectionKey) -> None:
+        """Mark an entry as most recently used."""
+        conn = self._entries.pop(key, None)
+        if conn is not None:
+            self._entries[key] = conn
+
+    def oldest(self) -> ConnectionKey | None:
+        """Least recently used key."""
+        return next(iter(self._entries), None)
+
+    def keys_for(self, host: str) -> set[ConnectionKey]:
+        """Keys whose host or inventory name is exactly `host`."""
+        return self._by_host.get(host, set()) | self._by_name.get(host, set())
+
+    def find(
+        self, host: str, port: int | None = None, username: str | None = None
+    ) -> list[ConnectionKey]:
+        """Keys for a host or inventory name, optionally filtered."""
+        return [
+            key
+            for key in self.keys_for(host)
+            if (port is None or key.port == port) and (username is None or key.user == username)
+        ]
+
+    def name_of(self, key: ConnectionKey) -> str | None:
+        """Inventory name a connection was opened for."""
+        return self._names.get(key)
+
+    def stats(self) -> dict[str, Any]:
+        """Size of the registry and its indexes.
+
+        `registry_bytes` approximates the memory held by the registry
+        structures themselves (keys and indexes, not the connections).
+        """
+        containers: list[Any] = [self._entries, self._names, self._by_host, self._by_name]
+        memory = sum(sys.getsizeof(c) for c in containers)
+        memory += sum(sys.getsizeof(key) for key in self._entries)
+        memory += sum(sys.getsizeof(keys) for keys in self._by_host.values())
+        memory += sum(sys.getsizeof(keys) for keys in self._by_name.values())
+        return {
+            "connections": len(self._entries),
+            "hosts": len(self._by_host),
+            "names": len(self._by_name),
+            "registry_bytes": memory,
+        }
+
+    def _unindex(self, key: ConnectionKey) -> None:
+        keys = self._by_host.get(key.host)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_host[key.host]
+        name = self._names.pop(key, None)
+        if name is not None:
+            keys = self._by_name.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_name[name]
+
+
+__all__ = ["DEFAULT_USER", "ConnectionKey", "ConnectionRegistry"]
@@ -1,31 +1,118 @@
 """
 Merlya SSH - SFTP helper mixin.
 
-Provides SFTP operations reused by the SSH pool.
+Provides SFTP operations reused by the SSH pool. Operations share one SFTP
+session per pooled connection (see SSHConnection.get_sftp_client) instead of
+negotiating a new subsystem for every call.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
+from merlya.ssh.sftp_transfer import (
+    SFTPTransferOptions,
+    SFTPTransferStats,
+    TransferTimer,
+    download_resumable,
+)
+
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
     from pathlib import Path
 
+    from asyncssh import SFTPClient, SFTPName
+
+    from merlya.ssh.daemon_client import SSHDaemonClient
     from merlya.ssh.pool import SSHPool
 
+DEFAULT_SFTP_BATCH_CONCURRENCY = 4  # Concurrent transfers on one SFTP session
+DEFAULT_WALK_MAX_DEPTH = 3
+DEFAULT_WALK_MAX_ENTRIES = 10_000
+
+SFTP_TYPE_DIRECTORY = 2  # SSH_FILEXFER_TYPE_DIRECTORY
+
+
+@dataclass
+class SFTPTransfer:
+    """Outcome of one file in a batch upload/download."""
+
+    source: str
+    destination: str
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the transfer succeeded."""
+        return self.error is None
+
+
+def _entry_info(entry: SFTPName) -> dict[str, Any]:
+    """Convert an SFTP directory entry to the dict returned by listings."""
+    return {
+        "name": entry.filename,
+        "size": entry.attrs.size,
+        "is_dir": entry.attrs.type == SFTP_TYPE_DIRECTORY,
+        "permissions": oct(entry.attrs.permissions) if entry.attrs.permissions else None,
+        "mtime": entry.attrs.mtime,
+    }
+
+
+def _breaks_session(error: BaseException) -> bool:
+    """Whether an error means the SFTP session itself is unusable."""
+    import asyncssh
+
+    if isinstance(error, asyncssh.SFTPConnectionLost):
+        return True
+    return not isinstance(error, (asyncssh.SFTPError, FileNotFoundError, PermissionError))
+
 
 class SFTPOperations:
     """SFTP operations shared by the SSH pool."""
 
+    _daemon: SSHDaemonClient | None = None  # Transfers go through it when attached
+
+    @contextlib.asynccontextmanager
+    async def _sftp_session(  # type: ignore[misc]
+        self: SSHPool,
+        host: str,
+        **conn_kwargs: Any,
+    ) -> AsyncIterator[SFTPClient]:
+        """Yield the pooled connection's SFTP session.
+
+        The session is marked in use while the caller holds it, so idle
+        cleanup never closes it mid-transfer. Remote file errors (SFTPError)
+        leave the session in place; a lost channel or any other failure
+        drops it so the next operation opens a fresh one.
+        """
+        conn = await self.get_connection(host, **conn_kwargs)
+        if conn.connection is None:
+            raise RuntimeError(f"Connection to {host} is closed")
+
+        with conn.use():
+            sftp = await conn.acquire_sftp()
+            try:
+                yield sftp
+            except Exception as e:
+                if _breaks_session(e):
+                    await conn.close_sftp()
+                raise
+            finally:
+                conn.release_sftp()
+
     async def upload_file(  # type: ignore[misc]
         self: SSHPool,
         host: str,
         local_path: str | Path,
         remote_path: str,
+        transfer: SFTPTransferOptions | None = None,
         **conn_kwargs: Any,
-    ) -> None:
+    ) -> SFTPTransferStats:
         """
         Upload a file to remote host via SFTP.
 
@@ -33,8 +120,12 @@ class SFTPOperations:
             host: Target host.
             local_path: Local file path.
             remote_path: Remote destination path.
+            transfer: Block size, parallel requests and progress callback.
             **conn_kwargs: Connection options (port, username, etc.).
 
+        Returns:
+            Transfer stats (size, duration, MB/s).
+
         Raises:
             FileNotFoundError: If local file doesn't exist.
             asyncssh.SFTPError: If upload fails.
@@ -45,30 +136,50 @@ class SFTPOperations:
         if not local.exists():
             raise FileNotFoundError(f"Local file not found: {local}")
 
-        conn = await self.get_connection(host, **conn_kwargs)
-        if conn.connection is None:
-            raise RuntimeError(f"Connection to {host} is closed")
-
-        async with conn.connection.start_sftp_client() as sftp:
-            await sftp.put(str(local), remote_path)
-            logger.info(f"📤 Uploaded {local.name} -> {host}:{remote_path}")
+        if self._daemon is not None:
+            daemon_stats = await self._via_daemon(
+                lambda client: client.transfer(
+                    "upload", host, local, remote_path, transfer, conn_kwargs
+                )
+            )
+            if daemon_stats is not None:
+                return daemon_stats
+
+        size = local.stat().st_size
+        kwargs = transfer.asyncssh_kwargs() if transfer else {}
+        async with self._sftp_session(host, **conn_kwargs) as sftp:
+            timer = TransferTimer()
+            await sftp.put(str(local), remote_path, **kwargs)
+            stats = timer.stats(size, size)
+            logger.info(
+                f"📤 Uploaded {local.name} -> {host}:{remote_path} ({stats.mb_per_s:.1f} MB/s)"
+            )
+        return stats
 
     async def download_file(  # type: ignore[misc]
         self: SSHPool,
         host: str,
         remote_path: str,
         local_path: str | Path,
+        transfer: SFTPTransferOptions | None = None,
         **conn_kwargs: Any,
-    ) -> None:
+    ) -> SFTPTransferStats:
         """
         Download a file from remote host via SFTP.
 
+        With `transfer.resume`, an interrupted download continues from its
+        `.part` file when size and checksum still match the remote file.
+
         Args:
             host: Target host.
             remote_path: Remote file path.
             local_path: Local destination path.
+            transfer: Block size, parallel requests, progress callback, resume.
             **conn_kwargs: Connection options (port, username, etc.).
 
+        Returns:
+            Transfer stats (size, duration, MB/s, resume offset).
+
         Raises:
             asyncssh.SFTPError: If download fails.
         """
@@ -77,13 +188,132 @@ class SFTPOperations:
         local = PathlibPath(local_path).expanduser()
         local.parent.mkdir(parents=True, exist_ok=True)
 
+        if self._daemon is not None:
+            daemon_stats = await self._via_daemon(
+                lambda client: client.transfer(
+                    "download", host, local, remote_path, transfer, conn_kwargs
+                )
+            )
+            if daemon_stats is not None:
+                return daemon_stats
+
+        async with self._sftp_session(host, **conn_kwargs) as sftp:
+            if transfer and transfer.resume:
+                stats = await download_resumable(sftp, remote_path, local, transfer)
+            else:
+                timer = TransferTimer()
+                kwargs = transfer.asyncssh_kwargs() if transfer else {}
+                await sftp.get(remote_path, str(local), **kwargs)
+                size = local.stat().st_size if local.exists() else 0
+                stats = timer.stats(size, size)
+            logger.info(
+                f"📥 Downloaded {host}:{remote_path} -> {local.name} ({stats.mb_per_s:.1f} MB/s)"
+            )
+        return stats
+
+    async def upload_files(  # type: ignore[misc]
+        self: SSHPool,
+        host: str,
+        files: Iterable[tuple[str | Path, str]],
+        max_concurrency: int = DEFAULT_SFTP_BATCH_CONCURRENCY,
+        **conn_kwargs: Any,
+    ) -> list[SFTPTransfer]:
+        """
+        Upload several files to one host over a single SFTP session.
+
+        A failed file does not stop the others.
+
+        Args:
+            host: Target host.
+            files: (local path, remote path) pairs.
+            max_concurrency: Maximum simultaneous transfers.
+            **conn_kwargs: Connection options.
+
+        Returns:
+            One SFTPTransfer per file, in input order.
+        """
+        from pathlib import Path as PathlibPath
+
+        async def put_one(sftp: SFTPClient, local: str, remote: str) -> None:
+            if not PathlibPath(local).exists():
+                raise FileNotFoundError(f"Local file not found: {local}")
+            await sftp.put(local, remote)
+
+        pairs = [(str(PathlibPath(local).expanduser()), remote) for local, remote in files]
+        results = await self._run_batch(host, pairs, put_one, max_concurrency, conn_kwargs)
+        ok = sum(t.ok for t in results)
+        logger.info(f"📤 Uploaded {ok}/{len(results)} file(s) -> {host}")
+        return results
+
+    async def download_files(  # type: ignore[misc]
+        self: SSHPool,
+        host: str,
+        files: Iterable[tuple[str, str | Path]],
+        max_concurrency: int = DEFAULT_SFTP_BATCH_CONCURRENCY,
+        **conn_kwargs: Any,
+    ) -> list[SFTPTransfer]:
+        """
+        Download several files from one host over a single SFTP session.
+
+        A failed file does not stop the others.
+
+        Args:
+            host: Target host.
+            files: (remote path, local path) pairs.
+            max_concurrency: Maximum simultaneous transfers.
+            **conn_kwargs: Connection options.
+
+        Returns:
+            One SFTPTransfer per file, in input order.
+        """
+        from pathlib import Path as PathlibPath
+
+        async def get_one(sftp: SFTPClient, remote: str, local: str) -> None:
+            PathlibPath(local).parent.mkdir(parents=True, exist_ok=True)
+            await sftp.get(remote, local)
+
+        pairs = [(remote, str(PathlibPath(local).expanduser())) for remote, local in files]
+        results = await self._run_batch(host, pairs, get_one, max_concurrency, conn_kwargs)
+        ok = sum(t.ok for t in results)
+        logger.info(f"📥 Downloaded {ok}/{len(results)} file(s) <- {host}")
+        return results
+
+    async def _run_batch(  # type: ignore[misc]
+        self: SSHPool,
+        host: str,
+        pairs: list[tuple[str, str]],
+        transfer: Callable[[SFTPClient, str, str], Awaitable[None]],
+        max_concurrency: int,
+        conn_kwargs: dict[str, Any],
+    ) -> list[SFTPTransfer]:
+        """Run per-file transfers on one session, collecting errors per file."""
         conn = await self.get_connection(host, **conn_kwargs)
         if conn.connection is None:
             raise RuntimeError(f"Connection to {host} is closed")
 
-        async with conn.connection.start_sftp_client() as sftp:
-            await sftp.get(remote_path, str(local))
-            logger.info(f"📥 Downloaded {host}:{remote_path} -> {local.name}")
+        sftp = await conn.acquire_sftp()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        session_broken = False
+
+        async def run_one(source: str, destination: str) -> SFTPTransfer:
+            nonlocal session_broken
+            result = SFTPTransfer(source=source, destination=destination)
+            async with semaphore:
+                try:
+                    await transfer(sftp, source, destination)
+                except Exception as e:
+                    result.error = str(e)
+                    session_broken = session_broken or _breaks_session(e)
+            return result
+
+        with conn.use():
+            try:
+                results = await asyncio.gather(*(run_one(src, dst) for src, dst in pairs))
+                if session_broken:
+                    await conn.close_sftp()
+            finally:
+                conn.release_sftp()
+        return list(results)
 
     async def list_remote_dir(  # type: ignore[misc]
         self: SSHPool,
@@ -102,24 +332,77 @@ class SFTPOperations:
         Returns:
             List of file info dicts with name, size, is_dir, permissions.
         """
-        conn = await self.get_connection(host, **conn_kwargs)
-        if conn.connection is None:
-            raise RuntimeError(f"Connection to {host} is closed")
+        async with self._sftp_session(host, **conn_kwargs) as sftp:
+            return [_entry_info(entry) async for entry in sftp.scandir(remote_path)]
 
-        result = []
-        async with conn.connection.start_sftp_client() as sftp:
-            async for entry in sftp.scandir(remote_path):
-                result.append(
-                    {
-                        "name": entry.filename,
-                        "size": entry.attrs.size,
-                        "is_dir": entry.attrs.type == 2,  # SSH_FILEXFER_TYPE_DIRECTORY
-                        "permissions": oct(entry.attrs.permissions)
-                        if entry.attrs.permissions
-                        else None,
-                        "mtime": entry.attrs.mtime,
-                    }
-                )
+    async def walk_remote_dir(  # type: ignore[misc]
+        self: SSHPool,
+        host: str,
+        remote_path: str = ".",
+        max_depth: int = DEFAULT_WALK_MAX_DEPTH,
+        max_entries: int = DEFAULT_WALK_MAX_ENTRIES,
+        max_concurrency: int = DEFAULT_SFTP_BATCH_CONCURRENCY,
+        **conn_kwargs: Any,
+    ) -> list[dict[str, Any]]:
+        """
+        List a remote directory tree via SFTP (breadth-first).
+
+        Symlinks are reported but not followed. Unreadable subdirectories
+        are skipped.
+
+        Args:
+            host: Target host.
+            remote_path: Root directory.
+            max_depth: Levels to descend (1 = like list_remote_dir).
+            max_entries: Stop after this many entries.
+            max_concurrency: Maximum directories listed at once.
+            **conn_kwargs: Connection options.
+
+        Returns:
+            File info dicts as in list_remote_dir, plus "path" and "depth".
+        """
+        import asyncssh
+
+        if max_depth < 1:
+            raise ValueError("max_depth must be >= 1")
+
+        result: list[dict[str, Any]] = []
+        level = [remote_path.rstrip("/") or "/"]
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async with self._sftp_session(host, **conn_kwargs) as sftp:
+
+            async def scan(directory: str) -> list[SFTPName]:
+                try:
+                    async with semaphore:
+                        return [
+                            entry
+                            async for entry in sftp.scandir(directory)
+                            if entry.filename not in (".", "..")
+                        ]
+                except asyncssh.SFTPError as e:
+                    if directory == level[0] and not result:
+                        raise
+                    logger.debug(f"📂 Skipping {host}:{directory}: {e}")
+                    return []
+
+            for depth in range(1, max_depth + 1):
+                listings = await asyncio.gather(*(scan(d) for d in level))
+                next_level: list[str] = []
+                for directory, entries in zip(level, listings, strict=True):
+                    for entry in entries:
+                        info = _entry_info(entry)
+                        info["path"] = f"{directory.rstrip('/')}/{info['name']}"
+                        info["depth"] = depth
+                        result.append(info)
+                        if info["is_dir"]:
+                            next_level.append(info["path"])
+                        if len(result) >= max_entries:
+                            logger.debug(f"📂 Walk of {host}:{remote_path} capped at {max_entries}")
+                            return result
+                if not next_level:
+                    break
+                level = next_level
 
         return result
 
@@ -140,11 +423,10 @@ class SFTPOperations:
         Returns:
             File content as string.
         """
-        conn = await self.get_connection(host, **conn_kwargs)
-        if conn.connection is None:
-            raise RuntimeError(f"Connection to {host} is closed")
-
-        async with conn.connection.start_sftp_client() as sftp, sftp.open(remote_path, "r") as f:
+        async with (
+            self._sftp_session(host, **conn_kwargs) as sftp,
+            sftp.open(remote_path, "r") as f,
+        ):
             content = await f.read()
             return content.decode("utf-8") if isinstance(content, bytes) else content
 
@@ -164,11 +446,15 @@ class SFTPOperations:
             content: Content to write.
             **conn_kwargs: Connection options.
         """
-        conn = await self.get_connection(host, **conn_kwargs)
-        if conn.connection is None:
-            raise RuntimeError(f"Connection to {host} is closed")
-
-        async with conn.connection.start_sftp_client() as sftp:
+        async with self._sftp_session(host, **conn_kwargs) as sftp:
             async with sftp.open(remote_path, "w") as f:
                 await f.write(content)
             logger.debug(f"📝 Wrote {len(content)} bytes to {host}:{remote_path}")
+
+
+__all__ = [
+    "SFTPOperations",
+    "SFTPTransfer",
+    "SFTPTransferOptions",
+    "SFTPTransferStats",
+]
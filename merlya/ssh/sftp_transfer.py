@@ -0,0 +1,235 @@
+"""
+Merlya SSH - Tunable and resumable SFTP transfers.
+
+Exposes asyncssh's parallel-request knobs (block size, outstanding requests),
+progress reporting and throughput stats. Resumable downloads are written to a
+`<name>.part` file strictly in order, so an interrupted transfer always leaves
+a valid prefix that can be verified (size + checksum) and continued. Finished
+downloads carry the remote mtime, which is what lets a later resume recognise
+an unchanged file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from asyncssh import SFTPClient
+
+PART_SUFFIX = ".part"
+RESUME_CHECK_BYTES = 1024 * 1024  # Window compared per sampled region
+DEFAULT_RESUME_BLOCK_SIZE = 256 * 1024
+DEFAULT_RESUME_MAX_REQUESTS = 32
+
+
+@dataclass
+class SFTPTransferOptions:
+    """Tuning for a single-file SFTP transfer.
+
+    `block_size` / `max_requests` default to asyncssh's own values (sized
+    from the server's limits); raise `max_requests` on high-latency links.
+    `resume` only applies to downloads.
+    """
+
+    block_size: int | None = None
+    max_requests: int | None = None
+    on_progress: Callable[[int, int], None] | None = None  # (bytes done, total bytes)
+    resume: bool = False
+
+    def asyncssh_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for SFTPClient.get/put/open."""
+        kwargs: dict[str, Any] = {}
+        if self.block_size is not None:
+            kwargs["block_size"] = self.block_size
+        if self.max_requests is not None:
+            kwargs["max_requests"] = self.max_requests
+        if self.on_progress is not None:
+            on_progress = self.on_progress
+            kwargs["progress_handler"] = lambda _src, _dst, done, total: on_progress(done, total)
+        return kwargs
+
+
+@dataclass
+class SFTPTransferStats:
+    """Outcome of a single-file SFTP transfer."""
+
+    size: int  # Final file size
+    transferred: int  # Bytes actually sent over the wire this time
+    elapsed: float  # Seconds
+    resumed_from: int = 0  # Offset the transfer restarted from
+
+    @property
+    def mb_per_s(self) -> float:
+        """Throughput in MB/s (bytes transferred this time)."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.transferred / self.elapsed / (1024 * 1024)
+
+
+class TransferTimer:
+    """Measure a transfer and build its stats."""
+
+    def __init__(self) -> None:
+        """Start the clock."""
+        self._start = time.monotonic()
+
+    def stats(self, size: int, transferred: int, resumed_from: int = 0) -> SFTPTransferStats:
+        """Stop the clock and return stats."""
+        return SFTPTransferStats(
+            size=size,
+            transferred=transferred,
+            elapsed=time.monotonic() - self._start,
+            resumed_from=resumed_from,
+        )
+
+
+def _tail_region(size: int) -> list[tuple[int, int]]:
+    return [(max(0, size - RESUME_CHECK_BYTES), size)]
+
+
+def _sample_regions(size: int) -> list[tuple[int, int]]:
+    """Head, middle and tail windows of a file (merged when they overlap)."""
+    starts = sorted(
+        {0, max(0, size // 2 - RESUME_CHECK_BYTES // 2), max(0, size - RESUME_CHECK_BYTES)}
+    )
+    regions: list[tuple[int, int]] = []
+    for start in starts:
+        end = min(size, start + RESUME_CHECK_BYTES)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def _local_digest(path: Path, regions: list[tuple[int, int]]) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for start, end in regions:
+            f.seek(start)
+            digest.update(f.read(end - start))
+    return digest.hexdigest()
+
+
+async def _remote_digest(sftp: SFTPClient, remote_path: str, regions: list[tuple[int, int]]) -> str:
+    digest = hashlib.sha256()
+    async with sftp.open(remote_path, "rb") as f:
+        for start, end in regions:
+            data = await f.read(end - start, start)
+            digest.update(data if isinstance(data, bytes) else data.encode())
+    return digest.hexdigest()
+
+
+async def _matches_remote(
+    sftp: SFTPClient, remote_path: str, local: Path, regions: list[tuple[int, int]]
+) -> bool:
+    """Whether the given byte ranges of local match the remote file's."""
+    if not regions or regions[-1][1] == 0:
+        return True
+    return _local_digest(local, regions) == await _remote_digest(sftp, remote_path, regions)
+
+
+def _is_complete(local: Path, size: int, mtime: int | None) -> bool:
+    """Whether local looks like a finished download of a remote file of this size/mtime.
+
+    Finished downloads are stamped with the remote mtime, so an in-place
+    rewrite of the remote file (same size, new mtime) is downloaded again.
+    """
+    if mtime is None or not local.exists():
+        return False
+    stat = local.stat()
+    return stat.st_size == size and int(stat.st_mtime) == mtime
+
+
+async def download_resumable(
+    sftp: SFTPClient,
+    remote_path: str,
+    local: Path,
+    options: SFTPTransferOptions,
+) -> SFTPTransferStats:
+    """Download a file, continuing from a previous partial download.
+
+    A local file with the remote's size and mtime whose head, middle and
+    tail checksums match is not downloaded again. Otherwise data goes to
+    `<local>.part` (continued when its tail matches the remote, restarted
+    when it does not) and the part file is renamed once complete and
+    stamped with the remote mtime.
+
+    Args:
+        sftp: Open SFTP session.
+        remote_path: Remote file path.
+        local: Local destination path.
+        options: Block size, parallel requests and progress callback.
+
+    Returns:
+        Transfer stats (resumed_from > 0 when a partial file was reused).
+    """
+    timer = TransferTimer()
+    attrs = await sftp.stat(remote_path)
+    total = attrs.size or 0
+    mtime = attrs.mtime if isinstance(attrs.mtime, int) else None
+    local.parent.mkdir(parents=True, exist_ok=True)
+
+    if _is_complete(local, total, mtime) and await _matches_remote(
+        sftp, remote_path, local, _sample_regions(total)
+    ):
+        logger.debug(f"📥 {local.name} already complete, skipping download")
+        if options.on_progress:
+            options.on_progress(total, total)
+        return timer.stats(total, 0, resumed_from=total)
+
+    part = local.with_name(local.name + PART_SUFFIX)
+    offset = part.stat().st_size if part.exists() else 0
+    if offset > total or not await _matches_remote(sftp, remote_path, part, _tail_region(offset)):
+        logger.debug(f"📥 Partial {part.name} does not match remote, restarting")
+        offset = 0
+    elif offset:
+        logger.info(f"📥 Resuming {remote_path} at {offset}/{total} bytes")
+
+    open_kwargs = {
+        "block_size": options.block_size or DEFAULT_RESUME_BLOCK_SIZE,
+        "max_requests": options.max_requests or DEFAULT_RESUME_MAX_REQUESTS,
+    }
+    written = offset
+    pending: dict[int, bytes] = {}  # Out-of-order blocks waiting for their turn
+
+    with part.open("r+b" if offset else "wb") as out:
+        out.truncate(offset)
+        out.seek(offset)
+        async with sftp.open(remote_path, "rb", **open_kwargs) as remote:
+            blocks = await remote.read_parallel(total - offset, offset)
+            async for block_offset, data in blocks:
+                pending[block_offset] = data
+                # Only ever append contiguous data so the part file stays a valid prefix
+                while written in pending:
+                    chunk = pending.pop(written)
+                    out.write(chunk)
+                    written += len(chunk)
+                if options.on_progress:
+                    options.on_progress(written, total)
+        if pending or written != total:
+            out.flush()
+            raise OSError(f"Incomplete download of {remote_path}: {written}/{total} bytes")
+
+    part.replace(local)
+    if mtime is not None:
+        os.utime(local, (time.time(), mtime))
+    return timer.stats(total, total - offset, resumed_from=offset)
+
+
+__all__ = [
+    "PART_SUFFIX",
+    "SFTPTransferOptions",
+    "SFTPTransferStats",
+    "TransferTimer",
+    "download_resumable",
+]
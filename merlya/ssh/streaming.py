@@ -0,0 +1,280 @@
+"""
+Merlya SSH - Streaming command execution.
+
+Reads remote output incrementally via asyncssh create_process() instead of
+buffering the whole result with run(). Captured output is bounded: the first
+and last bytes are kept, the middle is dropped and counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from loguru import logger
+
+from merlya.ssh.types import SSHConnection, SSHResult
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+
+    from asyncssh import SSHReader
+    from asyncssh.process import SSHClientProcess
+
+    from merlya.ssh.executor import ExecuteParams
+
+StreamName = Literal["stdout", "stderr"]
+
+DEFAULT_MAX_CAPTURE_BYTES = 1024 * 1024  # 1 MiB per stream
+DEFAULT_CHUNK_SIZE = 32 * 1024
+
+
+@dataclass
+class StreamChunk:
+    """A decoded piece of remote output."""
+
+    stream: StreamName
+    data: str
+
+
+@dataclass
+class StreamOptions:
+    """Options for streaming execution (opt-in via SSHExecuteOptions.stream).
+
+    `on_chunk` receives every chunk as it arrives (live display, spilling
+    the full output to storage...); it may be sync or async.
+    """
+
+    max_capture_bytes: int = DEFAULT_MAX_CAPTURE_BYTES
+    head_ratio: float = 0.5  # Share of the capture budget kept from the start
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    on_chunk: Callable[[StreamChunk], Awaitable[None] | None] | None = None
+
+
+class OutputCapture:
+    """Bounded output buffer keeping the head and a tail ring buffer.
+
+    Sizes are counted in characters of decoded text, which is close enough
+    to bytes for log-like output and avoids re-encoding every chunk.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_CAPTURE_BYTES, head_ratio: float = 0.5):
+        """Initialize capture with a total budget split between head and tail."""
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self._head_limit = int(max_bytes * min(max(head_ratio, 0.0), 1.0))
+        self._tail_limit = max_bytes - self._head_limit
+        self._head: list[str] = []
+        self._head_size = 0
+        self._tail: deque[str] = deque()
+        self._tail_size = 0
+        self.total_bytes = 0
+
+    @property
+    def dropped_bytes(self) -> int:
+        """Number of bytes discarded between head and tail."""
+        return self.total_bytes - self._head_size - self._tail_size
+
+    @property
+    def truncated(self) -> bool:
+        """Whether any output was discarded."""
+        return self.dropped_bytes > 0
+
+    def write(self, data: str) -> None:
+        """Append decoded output."""
+        if not data:
+            return
+        self.total_bytes += len(data)
+
+        room = self._head_limit - self._head_size
+        if room > 0:
+            taken = data[:room]
+            self._head.append(taken)
+            self._head_size += len(taken)
+            data = data[room:]
+            if not data:
+                return
+
+        if self._tail_limit <= 0:
+            return
+        if len(data) >= self._tail_limit:
+            self._tail.clear()
+            self._tail.append(data[-self._tail_limit :])
+            self._tail_size = self._tail_limit
+            return
+
+        self._tail.append(data)
+        self._tail_size += len(data)
+        while self._tail_size > self._tail_limit:
+            excess = self._tail_size - self._tail_limit
+            oldest = self._tail[0]
+            if len(oldest) <= excess:
+                self._tail.popleft()
+                self._tail_size -= len(oldest)
+            else:
+                self._tail[0] = oldest[excess:]
+                self._tail_size -= excess
+
+    def getvalue(self) -> str:
+        """Return captured text with a marker where output was dropped."""
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if self.truncated:
+            return f"{head}\n... [{self.dropped_bytes} bytes truncated] ...\n{tail}"
+        return head + tail
+
+
+class CommandStream:
+    """Async iterator over the output of a remote command.
+
+    Iterate to receive StreamChunk objects as soon as the remote side sends
+    them; `exit_code` is set once iteration completes.
+    """
+
+    def __init__(
+        self,
+        conn: SSHConnection,
+        command: str,
+        input_data: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Prepare a stream (the remote process starts on iteration)."""
+        self._conn = conn
+        self._command = command
+        self._input_data = input_data
+        self._chunk_size = chunk_size
+        self.exit_code: int | None = None
+
+    def __aiter__(self) -> AsyncIterator[StreamChunk]:
+        """Start the remote process and yield its output."""
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[StreamChunk]:
+        if self._conn.connection is None:
+            raise RuntimeError(f"Connection to {self._conn.host} is closed")
+
+        process: SSHClientProcess[str] = await self._conn.connection.create_process(
+            self._command,
+            input=self._input_data,
+            encoding="utf-8",
+            errors="replace",
+        )
+        queue: asyncio.Queue[StreamChunk | None] = asyncio.Queue(maxsize=16)
+        readers = [
+            asyncio.create_task(self._pump("stdout", process.stdout, queue)),
+            asyncio.create_task(self._pump("stderr", process.stderr, queue)),
+        ]
+        try:
+            if self._input_data is None:
+                process.stdin.write_eof()
+
+            open_streams = len(readers)
+            while open_streams:
+                chunk = await queue.get()
+                if chunk is None:
+                    open_streams -= 1
+                    continue
+                yield chunk
+
+            # Surface reader errors (e.g. connection lost mid-stream)
+            for reader in readers:
+                reader.result()
+
+            completed = await process.wait()
+            self.exit_code = completed.exit_status or 0
+        finally:
+            for reader in readers:
+                reader.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+            if self.exit_code is None:
+                with contextlib.suppress(Exception):
+                    process.close()
+
+    async def _pump(
+        self,
+        name: StreamName,
+        reader: SSHReader[str],
+        queue: asyncio.Queue[StreamChunk | None],
+    ) -> None:
+        """Forward one remote stream into the shared queue (backpressured)."""
+        try:
+            while True:
+                data = await reader.read(self._chunk_size)
+                if not data:
+                    break
+                await queue.put(StreamChunk(stream=name, data=data))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+
+async def execute_streaming(
+    params: ExecuteParams,
+    conn: SSHConnection,
+    stream: StreamOptions,
+) -> SSHResult:
+    """Execute a command, streaming output through bounded captures.
+
+    Args:
+        params: Execution parameters.
+        conn: Active SSH connection.
+        stream: Capture limits and chunk callback.
+
+    Returns:
+        SSHResult whose stdout/stderr hold the retained head/tail.
+
+    Raises:
+        RuntimeError: If connection is closed.
+        TimeoutError: If command times out.
+        asyncio.CancelledError: If execution is cancelled.
+    """
+    captures: dict[StreamName, OutputCapture] = {
+        "stdout": OutputCapture(stream.max_capture_bytes, stream.head_ratio),
+        "stderr": OutputCapture(stream.max_capture_bytes, stream.head_ratio),
+    }
+    command_stream = CommandStream(conn, params.command, params.input_data, stream.chunk_size)
+
+    try:
+        async with asyncio.timeout(params.timeout):
+            async for chunk in command_stream:
+                captures[chunk.stream].write(chunk.data)
+                if stream.on_chunk is not None:
+                    outcome = stream.on_chunk(chunk)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+    except TimeoutError:
+        logger.warning(f"⚠️ Command timeout on {params.host}")
+        raise
+    except asyncio.CancelledError:
+        logger.debug(f"🛑 SSH streaming execution cancelled on {params.host}")
+        raise
+
+    stdout, stderr = captures["stdout"], captures["stderr"]
+    logger.debug(
+        f"⚡ Streamed command on {params.host} (length: {len(params.command)} chars, "
+        f"exit: {command_stream.exit_code}, out: {stdout.total_bytes}B, "
+        f"err: {stderr.total_bytes}B)"
+    )
+
+    return SSHResult(
+        stdout=stdout.getvalue(),
+        stderr=stderr.getvalue(),
+        exit_code=command_stream.exit_code or 0,
+        truncated=stdout.truncated or stderr.truncated,
+    )
+
+
+__all__ = [
+    "CommandStream",
+    "OutputCapture",
+    "StreamChunk",
+    "StreamOptions",
+    "execute_streaming",
+]
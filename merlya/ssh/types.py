@@ -7,6 +7,7 @@ Common types used across SSH modules.
 from __future__ import annotations
 
 import asyncio
+import contextlib
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from enum import Enum
@@ -15,7 +16,9 @@ from typing import TYPE_CHECKING
 from loguru import logger
 
 if TYPE_CHECKING:
-    from asyncssh import SSHClientConnection
+    from collections.abc import Awaitable, Callable, Iterator
+
+    from asyncssh import SFTPClient, SSHClientConnection
 
 
 class CircuitState(Enum):
@@ -105,6 +108,7 @@ class SSHResult:
     stdout: str
     stderr: str
     exit_code: int
+    truncated: bool = False  # True when streamed output exceeded the capture limit
 
 
 @dataclass
@@ -119,6 +123,16 @@ class SSHConnectionOptions:
     connect_timeout: int | None = None
 
 
+# Channel-open rejections: the transport is fine but the host refused
+# another session (OpenSSH MaxSessions, appliance limits)
+CHANNEL_LIMIT_ERROR_PATTERNS = (
+    "open failed",
+    "channel open failed",
+    "administratively prohibited",
+    "resource shortage",
+    "maxsessions",
+)
+
 # Transient error patterns that warrant retry
 TRANSIENT_ERROR_PATTERNS = (
     "connection reset",
@@ -135,6 +149,9 @@ TRANSIENT_ERROR_PATTERNS = (
 )
 
 
+DEFAULT_SFTP_IDLE_TIMEOUT = 120  # Seconds before an unused SFTP session is closed
+
+
 @dataclass
 class SSHConnection:
     """Wrapper for an SSH connection with timeout management."""
@@ -147,6 +164,33 @@ class SSHConnection:
     _health_check_interval: int = 30  # Seconds between health checks
     _last_health_check: datetime | None = None
     _is_healthy: bool = True
+    _on_close: Callable[[], Awaitable[None]] | None = field(default=None, repr=False)
+    _keepalive_interval: int = 0  # 0 = SSH keepalives disabled
+    _users: int = 0  # Commands, streams and SFTP operations running on it
+    _sftp: SFTPClient | None = field(default=None, repr=False)
+    _sftp_last_used: datetime | None = None
+    _sftp_users: int = 0  # Operations currently holding the SFTP session
+    _sftp_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    sftp_idle_timeout: int = DEFAULT_SFTP_IDLE_TIMEOUT
+
+    @property
+    def in_use(self) -> bool:
+        """Whether a command, stream or SFTP operation is running on it."""
+        return self._users > 0
+
+    @contextlib.contextmanager
+    def use(self) -> Iterator[None]:
+        """Mark the connection busy for the duration of an operation.
+
+        A busy connection never times out, however long the operation runs;
+        the timeout restarts when the last operation finishes.
+        """
+        self._users += 1
+        try:
+            yield
+        finally:
+            self._users -= 1
+            self.refresh_timeout()
 
     def is_alive(self) -> bool:
         """
@@ -158,6 +202,8 @@ class SSHConnection:
             return False
         if not self._is_healthy:
             return False
+        if self.in_use:
+            return True
         now = datetime.now(UTC)
         return not now - self.last_used > timedelta(seconds=self.timeout)
 
@@ -174,7 +220,7 @@ class SSHConnection:
 
         # Check timeout first (fast path)
         now = datetime.now(UTC)
-        if now - self.last_used > timedelta(seconds=self.timeout):
+        if not self.in_use and now - self.last_used > timedelta(seconds=self.timeout):
             return False
 
         # Skip health check if recently verified
@@ -204,6 +250,107 @@ class SSHConnection:
             self._last_health_check = datetime.now(UTC)
             return False
 
+    def is_transport_closed(self) -> bool:
+        """Check whether the underlying SSH transport has gone away."""
+        if self.connection is None:
+            return True
+        return bool(self.connection.is_closed())
+
+    def set_keepalive(self, interval: int, count_max: int = 3) -> None:
+        """Enable (interval > 0) or disable SSH-level keepalives.
+
+        Keepalives are global requests on the existing transport, much
+        cheaper than the channel opened by is_alive_async(). asyncssh closes
+        the connection after `count_max` unanswered requests, which lets the
+        pool detect zombies via is_transport_closed().
+        """
+        if self.connection is None or interval == self._keepalive_interval:
+            return
+        try:
+            self.connection.set_keepalive(interval=interval, count_max=count_max)
+        except Exception as e:
+            logger.debug(f"🔌 Could not set keepalive for {self.host}: {e}")
+            return
+        self._keepalive_interval = interval
+
+    async def get_sftp_client(self) -> SFTPClient:
+        """Get this connection's SFTP session, opening it if needed.
+
+        The session is reused across SFTP operations and reopened after
+        `sftp_idle_timeout` seconds without use.
+
+        Raises:
+            RuntimeError: If connection is closed.
+        """
+        async with self._sftp_lock:
+            return await self._get_sftp_locked()
+
+    async def acquire_sftp(self) -> SFTPClient:
+        """Get the SFTP session and mark it in use until release_sftp().
+
+        A session in use is never treated as idle, however long the
+        operation holding it runs.
+
+        Raises:
+            RuntimeError: If connection is closed.
+        """
+        async with self._sftp_lock:
+            sftp = await self._get_sftp_locked()
+            self._sftp_users += 1
+            return sftp
+
+    def release_sftp(self) -> None:
+        """Release a session obtained with acquire_sftp()."""
+        self._sftp_users = max(0, self._sftp_users - 1)
+        if self._sftp is not None:
+            self._sftp_last_used = datetime.now(UTC)
+
+    async def _get_sftp_locked(self) -> SFTPClient:
+        if self.connection is None:
+            raise RuntimeError(f"Connection to {self.host} is closed")
+        if self._sftp is not None and self._sftp_expired():
+            await self._close_sftp_locked()
+        if self._sftp is None:
+            self._sftp = await self.connection.start_sftp_client()
+            logger.debug(f"📂 SFTP session opened on {self.host}")
+        self._sftp_last_used = datetime.now(UTC)
+        return self._sftp
+
+    async def close_sftp(self, idle_only: bool = False) -> bool:
+        """Close the cached SFTP session.
+
+        Args:
+            idle_only: Only close it if it has been idle past its timeout
+                (a session in use is never idle).
+
+        Returns:
+            True if a session was closed.
+        """
+        async with self._sftp_lock:
+            if self._sftp is None or (idle_only and not self._sftp_expired()):
+                return False
+            await self._close_sftp_locked()
+            return True
+
+    def _sftp_expired(self) -> bool:
+        if self._sftp_users > 0 or self._sftp_last_used is None:
+            return False
+        idle_for = (datetime.now(UTC) - self._sftp_last_used).total_seconds()
+        return idle_for > self.sftp_idle_timeout
+
+    async def _close_sftp_locked(self) -> None:
+        sftp, self._sftp = self._sftp, None
+        self._sftp_last_used = None
+        if sftp is None:
+            return
+        try:
+            sftp.exit()
+            await asyncio.wait_for(sftp.wait_closed(), timeout=5.0)
+        except Exception as e:
+            logger.debug(f"📂 SFTP session close failed on {self.host}: {e}")
+        else:
+            logger.debug(f"📂 SFTP session closed on {self.host}")
+
     def mark_unhealthy(self) -> None:
         """Mark connection as unhealthy (for cleanup)."""
         self._is_healthy = False
@@ -214,6 +361,7 @@ class SSHConnection:
 
     async def close(self) -> None:
         """Close the connection."""
+        await self.close_sftp()
         if self.connection:
             self.connection.close()
             try:
@@ -222,9 +370,27 @@ class SSHConnection:
                 logger.warning("⚠️ Connection close timeout after 10s")
             self.connection = None
             self._is_healthy = False
+        if self._on_close is not None:
+            # Release resources this connection depends on (e.g. jump tunnel)
+            on_close, self._on_close = self._on_close, None
+            await on_close()
 
 
 def is_transient_error(error: Exception) -> bool:
     """Check if an error is transient and worth retrying."""
     error_str = str(error).lower()
     return any(pattern in error_str for pattern in TRANSIENT_ERROR_PATTERNS)
+
+
+def is_channel_limit_error(error: Exception) -> bool:
+    """Check if an error means the host rejected an additional channel."""
+    import asyncssh
+
+    if isinstance(error, asyncssh.ChannelOpenError):
+        # asyncssh also raises OPEN_CONNECT_FAILED once the transport is gone
+        return error.code in (
+            asyncssh.OPEN_ADMINISTRATIVELY_PROHIBITED,
+            asyncssh.OPEN_RESOURCE_SHORTAGE,
+        )
+    error_str = str(error).lower()
+    return any(pattern in error_str for pattern in CHANNEL_LIMIT_ERROR_PATTERNS)
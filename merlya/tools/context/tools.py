@@ -136,38 +136,19 @@ async def list_hosts_summary(
         #    🏷️ Tags: production:42, web:20, db:10
         #    📋 Sample: web-01, web-02, db-01, api-01, cache-01
     """
-    # Use ctx.hosts (injected HostRepository) instead of creating new instance
-    if tag:
-        hosts = await ctx.hosts.get_by_tag(tag)
-    else:
-        hosts = await ctx.hosts.get_all()
-
-    # Apply status filter if specified
-    if status:
-        status_lower = status.lower()
-        hosts = [h for h in hosts if h.health_status.lower() == status_lower]
+    # Aggregate in SQL (ctx.hosts is the injected HostRepository); no Host models are loaded
+    status_counts = await ctx.hosts.count_by_status(tag=tag, status=status)
+    tag_counts = await ctx.hosts.count_by_tag(tag=tag, status=status)
+    sample = await ctx.hosts.get_names(tag=tag, status=status, limit=5)
 
     # Calculate counts (use lowercase for case-insensitive comparison)
-    total = len(hosts)
-    healthy = sum(1 for h in hosts if h.health_status.lower() == "healthy")
-    unhealthy = sum(1 for h in hosts if h.health_status.lower() in ("unhealthy", "failed"))
+    total = sum(status_counts.values())
+    healthy = sum(n for s, n in status_counts.items() if (s or "").lower() == "healthy")
+    unhealthy = sum(
+        n for s, n in status_counts.items() if (s or "").lower() in ("unhealthy", "failed")
+    )
     unknown = total - healthy - unhealthy
 
-    # Count by tag
-    tag_counts: dict[str, int] = {}
-    for host in hosts:
-        for t in host.tags or []:
-            tag_counts[t] = tag_counts.get(t, 0) + 1
-
-    # Count by status
-    status_counts: dict[str, int] = {}
-    for host in hosts:
-        s = host.health_status
-        status_counts[s] = status_counts.get(s, 0) + 1
-
-    # Sample hosts (first 5)
-    sample = [h.name for h in hosts[:5]]
-
     logger.debug(f"📊 Hosts summary: {total} total, {healthy} healthy")
 
     return HostsSummary(
@@ -175,7 +156,7 @@ async def list_hosts_summary(
         healthy_count=healthy,
         unhealthy_count=unhealthy,
         unknown_count=unknown,
-        by_tag=dict(sorted(tag_counts.items(), key=lambda x: -x[1])[:10]),
+        by_tag=dict(list(tag_counts.items())[:10]),
         by_status=status_counts,
         sample_hosts=sample,
     )
@@ -248,31 +229,18 @@ async def list_groups(
         # 📁 production: 42 hosts (90% healthy) [web-01, db-01, api-01]
         # 📁 staging: 10 hosts (100% healthy) [stg-web-01, stg-db-01]
     """
-    # Use ctx.hosts (injected HostRepository) instead of creating new instance
-    all_hosts = await ctx.hosts.get_all()
-
-    # Group hosts by tags
-    groups: dict[str, list[Any]] = {}
-    for host in all_hosts:
-        for tag in host.tags or []:
-            if tag not in groups:
-                groups[tag] = []
-            groups[tag].append(host)
-
-    # Build summaries
-    summaries = []
-    for tag, hosts in sorted(groups.items(), key=lambda x: -len(x[1])):
-        healthy = sum(1 for h in hosts if (h.health_status or "").lower() == "healthy")
-        sample = [h.name for h in hosts[:3]]
-
-        summaries.append(
-            GroupSummary(
-                name=tag,
-                host_count=len(hosts),
-                healthy_count=healthy,
-                sample_hosts=sample,
-            )
+    # Aggregate per tag in SQL (ctx.hosts is the injected HostRepository)
+    groups = await ctx.hosts.get_tag_groups(sample_size=3)
+
+    summaries = [
+        GroupSummary(
+            name=group["tag"],
+            host_count=group["host_count"],
+            healthy_count=group["healthy_count"],
+            sample_hosts=group["sample_hosts"],
         )
+        for group in groups
+    ]
 
     logger.debug(f"📁 Found {len(summaries)} groups")
 
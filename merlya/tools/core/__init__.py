@@ -1,7 +1,7 @@
 """
 Merlya Tools - Core tools (always active).
 
-Includes: list_hosts, get_host, ssh_execute, bash_execute, ask_user, request_confirmation.
+Includes: list_hosts, get_host, get_cached_scan, ssh_execute, bash_execute, ask_user, request_confirmation.
 """
 
 # Models
@@ -9,7 +9,7 @@ Includes: list_hosts, get_host, ssh_execute, bash_execute, ask_user, request_con
 from merlya.tools.core.bash import bash_execute
 
 # Host tools
-from merlya.tools.core.hosts import get_host, list_hosts
+from merlya.tools.core.hosts import get_cached_scan, get_host, list_hosts
 from merlya.tools.core.models import ToolResult
 
 # Resolution
@@ -67,9 +67,10 @@ __all__ = [
     "clear_credential_hints",
     # Security functions
     "detect_unsafe_password",
+    # Host tools
+    "get_cached_scan",
     # Credential hints
     "get_credential_hint",
-    # Host tools
     "get_host",
     # Resolution functions
     "get_resolved_host_names",
@@ -138,3 +138,41 @@ async def get_host(
     except Exception as e:
         logger.error(f"❌ Failed to get host: {e}")
         return ToolResult(success=False, data=None, error=str(e))
+
+
+async def get_cached_scan(ctx: SharedContext, name: str) -> ToolResult[Any]:
+    """
+    Get the unexpired /scan results cached for a host.
+
+    Args:
+        ctx: Shared context.
+        name: Host name.
+
+    Returns:
+        ToolResult with cached sections keyed by scan type (empty if none).
+    """
+    if not name or not name.strip():
+        return ToolResult(
+            success=False,
+            data=None,
+            error="Host name cannot be empty",
+        )
+
+    try:
+        host = await ctx.hosts.get_by_name(name)
+        if not host:
+            return ToolResult(
+                success=False,
+                data=None,
+                error=f"Host '{name}' not found",
+            )
+
+        scans = {
+            entry.scan_type: {**entry.data, "expires_at": entry.expires_at.isoformat()}
+            for entry in await ctx.scan_cache.get_for_host(host.id)
+        }
+        return ToolResult(success=True, data={"host": host.name, "scans": scans})
+
+    except Exception as e:
+        logger.error(f"❌ Failed to get cached scan: {e}")
+        return ToolResult(success=False, data=None, error=str(e))
@@ -0,0 +1,323 @@
+"""
+Merlya Tools - Read-only command result cache.
+
+The agent and specialists re-run the same probes many times per session
+(`cat /etc/os-release`, `uname -r`, `df -h`, `systemctl is-active ...`).
+Successful results of read-only, idempotent commands are cached per host
+with a TTL per command class; any command that is not known to be
+read-only invalidates the host's entries.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from merlya.core.metrics import track_result_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from merlya.tools.core.ssh_models import SSHResultProtocol
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+@dataclass(frozen=True)
+class CommandClass:
+    """A family of read-only commands sharing a cache TTL."""
+
+    name: str
+    ttl: float  # Seconds; 0 = read-only but too volatile to cache
+    pattern: re.Pattern[str]
+
+
+# First match wins, so the more specific (longer TTL) classes come first
+COMMAND_CLASSES = (
+    CommandClass(
+        "static",
+        3600,
+        re.compile(
+            r"^(?:uname|arch|nproc|lscpu|lsb_release|getconf)(?:\s|$)"
+            # hostname NAME / hostname -F FILE / hostnamectl set-* change the hostname
+            r"|^hostname(?:\s+(?:-[fsdiIA]|--(?:fqdn|long|short|domain|ip-addresses?|all-\S+)))*$"
+            r"|^hostnamectl(?:\s+status)?$"
+            r"|^cat\s+/etc/(?:os-release|lsb-release|redhat-release|debian_version|machine-id)$"
+            r"|^cat\s+/proc/(?:cpuinfo|version)$"
+        ),
+    ),
+    CommandClass(
+        "status",
+        10,
+        re.compile(
+            r"^systemctl\s+(?:is-active|is-enabled|is-failed|status|show|list-units|list-unit-files)\b"
+            r"|^service\s+\S+\s+status$"
+            r"|^(?:docker|podman)\s+(?:ps|images|inspect|info|version)\b"
+            r"|^kubectl\s+(?:get|describe|version)\b"
+        ),
+    ),
+    CommandClass(
+        "metrics",
+        15,
+        re.compile(
+            r"^(?:df|free|uptime|ps|vmstat|iostat|mpstat|netstat|lsblk|who|w)(?:\s|$)"
+            r"|^ss(?!.*\s(?:-[a-zA-Z]*K|--kill)\b)(?:\s|$)"  # -K kills sockets
+            r"|^(?:mount|findmnt)$"  # With arguments, mount mounts
+            # Only listing forms: `ip addr add`, `ip link set`, `ip route del` change the host
+            r"|^ip\s+(?:-\w+\s+)*(?:a|addr|address|r|route|l|link)"
+            r"(?:\s+(?:show|sh|list|ls)(?:\s.*)?)?$"
+            r"|^top\s+-bn\s*1\b"
+            r"|^cat\s+/proc/(?:loadavg|meminfo|stat|mounts|diskstats|uptime)$"
+        ),
+    ),
+    CommandClass(
+        "config",
+        60,
+        re.compile(
+            r"^(?:cat|ls|stat|readlink|id|groups|getent|which|whereis)(?:\s|$)"
+            r"|^(?:env|printenv)$"  # env CMD runs CMD
+            r"|^(?:dpkg\s+-l|rpm\s+-q\w*|apt\s+list|crontab\s+-l)\b"
+            r"|^sysctl\s+(?:-a|-n\s+[\w.]+|[\w.]+)$"
+        ),
+    ),
+    CommandClass(
+        "volatile",
+        0,
+        re.compile(
+            r"^(?:journalctl|dmesg|tail|head|grep|egrep|wc|du|last|lsof)(?:\s|$)"
+            r"|^find\s+(?!.*\s-(?:delete|exec|execdir|ok|fprint\w*|fls)\b)"
+        ),
+    ),
+)
+
+# Commands allowed after a pipe in a read-only pipeline
+_FILTER_PATTERN = re.compile(
+    r"^(?:grep|egrep|fgrep|head|wc|sort|uniq|cut|tr|column)(?:\s|$)"
+    r"|^tail(?!.*\s(?:-f|-F|--follow)\b)(?:\s|$)"
+)
+_STDERR_REDIRECT = re.compile(r"\s+2>(?:&1|/dev/null)")
+_UNSAFE_PATTERN = re.compile(r"[;&<>`\n]|\$\(")
+
+
+def normalize_command(command: str) -> str:
+    """Normalize a command like the loop tracker does (elevation prefixes, spaces)."""
+    from merlya.agent.tracker import _normalize_command_for_fingerprint
+
+    return " ".join(_normalize_command_for_fingerprint(command).split())
+
+
+def classify_command(command: str) -> CommandClass | None:
+    """
+    Classify a command as read-only.
+
+    Args:
+        command: Command as sent to the host.
+
+    Returns:
+        The command's class, or None if it may change the host.
+    """
+    body = normalize_command(command).removeprefix("ELEV:")
+    body = _STDERR_REDIRECT.sub("", body)
+    if not body or _UNSAFE_PATTERN.search(body):
+        return None
+
+    first, *filters = (segment.strip() for segment in body.split("|"))
+    if not all(_FILTER_PATTERN.match(segment) for segment in filters):
+        return None
+    for command_class in COMMAND_CLASSES:
+        if command_class.pattern.match(first):
+            return command_class
+    return None
+
+
+@dataclass
+class CachedResult:
+    """A cached command result."""
+
+    stdout: str
+    stderr: str
+    exit_code: int
+    command_class: str
+    expires_at: float
+    stored_at: float
+
+
+@dataclass
+class CacheStats:
+    """Result cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    by_class: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    def count(self, outcome: str, command_class: str) -> None:
+        """Record a hit or a miss."""
+        key = "hits" if outcome == "hit" else "misses"
+        setattr(self, key, getattr(self, key) + 1)
+        counts = self.by_class.setdefault(command_class, {"hits": 0, "misses": 0})
+        counts[key] += 1
+        track_result_cache(outcome, command_class)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of cacheable lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CommandResultCache:
+    """Per-host TTL cache for read-only command results."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum cached results (least recently used are dropped).
+            clock: Time source (for tests).
+        """
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str, str], CachedResult] = OrderedDict()
+        self._aliases: dict[str, str] = {}  # Inventory name -> hostname
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, host: str, command: str, username: str | None = None) -> CachedResult | None:
+        """
+        Look up a cached result.
+
+        Args:
+            host: Resolved hostname.
+            command: Command as sent to the host.
+            username: Username override, if any.
+
+        Returns:
+            The cached result, or None on a miss or a non-cacheable command.
+        """
+        command_class = classify_command(command)
+        if command_class is None or command_class.ttl <= 0:
+            return None
+
+        key = (host, username or "", normalize_command(command))
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.stats.count("miss", command_class.name)
+            return None
+        self._entries.move_to_end(key)
+        self.stats.count("hit", command_class.name)
+        logger.debug(f"⚡ Cached result for '{command[:40]}' on {host}")
+        return entry
+
+    def record(
+        self,
+        host: str,
+        command: str,
+        result: SSHResultProtocol,
+        username: str | None = None,
+        alias: str | None = None,
+        store: bool = True,
+    ) -> None:
+        """
+        Record an executed command.
+
+        Successful read-only results are stored; any other command
+        invalidates every cached result for the host.
+
+        Args:
+            host: Resolved hostname.
+            command: Command as sent to the host.
+            result: Execution result.
+            username: Username override, if any.
+            alias: Name the host was requested by (e.g. inventory name).
+            store: False to never store this result (e.g. it used stdin).
+        """
+        if alias and alias != host:
+            self._aliases[alias] = host
+
+        command_class = classify_command(command)
+        if command_class is None:
+            self.invalidate_host(host)
+            return
+        if not store or command_class.ttl <= 0 or result.exit_code != 0:
+            return
+
+        now = self._clock()
+        key = (host, username or "", normalize_command(command))
+        self._entries[key] = CachedResult(
+            stdout=result.stdout,
+            stderr=result.stderr,
+            exit_code=result.exit_code,
+            command_class=command_class.name,
+            expires_at=now + command_class.ttl,
+            stored_at=now,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_host(self, host: str) -> int:
+        """
+        Drop every cached result for a host.
+
+        Args:
+            host: Hostname or the name it was requested by.
+
+        Returns:
+            Number of entries dropped.
+        """
+        host = self._aliases.get(host, host)
+        keys = [key for key in self._entries if key[0] == host]
+        for key in keys:
+            del self._entries[key]
+        if keys:
+            self.stats.invalidations += 1
+            logger.debug(f"⚡ Invalidated {len(keys)} cached result(s) for {host}")
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all cached results and reset counters."""
+        self._entries.clear()
+        self._aliases.clear()
+        self.stats = CacheStats()
+
+    def age(self, entry: CachedResult) -> float:
+        """Seconds since a result was cached."""
+        return self._clock() - entry.stored_at
+
+    def summary(self) -> dict[str, Any]:
+        """Cache size and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "hosts": len({key[0] for key in self._entries}),
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_rate": round(self.stats.hit_rate, 3),
+            "invalidations": self.stats.invalidations,
+            "by_class": self.stats.by_class,
+        }
+
+
+__all__ = [
+    "COMMAND_CLASSES",
+    "CachedResult",
+    "CommandClass",
+    "CommandResultCache",
+    "classify_command",
+]
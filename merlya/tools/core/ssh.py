@@ -18,6 +18,7 @@ from loguru import logger
 
 from merlya.tools.core.models import ToolResult
 from merlya.tools.core.resolve import resolve_all_references
+from merlya.tools.core.result_cache import CommandResultCache
 from merlya.tools.core.security import detect_unsafe_password
 from merlya.tools.core.ssh_connection import (
     ensure_callbacks,
@@ -307,6 +308,17 @@ async def ssh_execute(
             ctx, resolved_host, command, timeout, connect_timeout, via, host_entry
         )
 
+        # Serve repeated read-only probes from the per-host result cache
+        cache = _get_result_cache(ctx)
+        if cache is not None and input_data is None:
+            cached = cache.get(exec_ctx.host, command, username)
+            if cached is not None:
+                cached_result = _build_result(cached, exec_ctx, safe_command)
+                if isinstance(cached_result.data, dict):
+                    cached_result.data["cached"] = True
+                    cached_result.data["cache_age"] = round(cache.age(cached), 1)
+                return cached_result
+
         # Execute command (input_data enables PTY for su/sudo -S automatically)
         result = await execute_ssh_command(
             exec_ctx.ssh_pool,
@@ -318,6 +330,15 @@ async def ssh_execute(
             exec_ctx.ssh_opts,
             username_override=username,
         )
+        if cache is not None:
+            cache.record(
+                exec_ctx.host,
+                command,
+                result,
+                username=username,
+                alias=host.lstrip("@"),
+                store=input_data is None,
+            )
 
         # Update session context for follow-up questions
         # This allows "check memory" after "check disk on pine64" to target pine64
@@ -532,6 +553,14 @@ async def _prepare_command(
     return resolved, safe, None
 
 
+def _get_result_cache(ctx: SharedContext) -> CommandResultCache | None:
+    """Get the session's result cache, or None if disabled."""
+    cache = ctx.result_cache
+    if not ctx.config.ssh.result_cache or not isinstance(cache, CommandResultCache):
+        return None
+    return cache
+
+
 async def _build_context(
     ctx: SharedContext,
     host: str,
@@ -17,7 +17,7 @@ from loguru import logger
 if TYPE_CHECKING:
     from merlya.core.context import SharedContext
     from merlya.persistence.models import Host
-    from merlya.ssh import SSHConnectionOptions, SSHPool
+    from merlya.ssh import SSHConnectionOptions, SSHPool, SSHTarget
 
 
 @dataclass(frozen=True)
@@ -157,3 +157,74 @@ async def execute_ssh_command(
         options=ssh_opts,
         host_name=host,
     )
+
+
+async def build_ssh_target(ctx: SharedContext, host_entry: Host) -> SSHTarget:
+    """
+    Build the pool target for an inventory host.
+
+    Uses the same hostname, username, port and jump host as
+    execute_ssh_command(), so the connection lands on the same pool key.
+
+    Args:
+        ctx: Shared context.
+        host_entry: Host from inventory.
+
+    Returns:
+        SSHTarget labelled with the inventory name.
+    """
+    from merlya.ssh import SSHConnectionOptions, SSHExecuteOptions, SSHTarget
+
+    opts = SSHConnectionOptions(port=host_entry.port)
+    if host_entry.jump_host:
+        cfg = await resolve_jump_host(ctx, host_entry.jump_host)
+        opts.jump_host = cfg.host
+        opts.jump_port = cfg.port
+        opts.jump_username = cfg.username
+        opts.jump_private_key = cfg.private_key
+
+    return SSHTarget(
+        host=host_entry.hostname,
+        exec_options=SSHExecuteOptions(
+            username=host_entry.username,
+            private_key=host_entry.private_key,
+            options=opts,
+            host_name=host_entry.name,
+        ),
+        label=host_entry.name,
+    )
+
+
+async def prewarm_hosts(ctx: SharedContext, host_names: list[str]) -> int:
+    """
+    Pre-establish SSH connections to inventory hosts.
+
+    Only inventory hosts are warmed; local aliases and unknown names are
+    skipped (no DNS lookups or guesses in the background).
+
+    Args:
+        ctx: Shared context.
+        host_names: Host names as extracted by the router.
+
+    Returns:
+        Number of hosts with a ready connection.
+    """
+    from merlya.hosts.target_resolver import is_local_target
+
+    targets: list[SSHTarget] = []
+    seen: set[str] = set()
+    for raw_name in host_names:
+        name = raw_name.strip().lstrip("@")
+        if not name or name in seen or is_local_target(name):
+            continue
+        seen.add(name)
+        host_entry = await ctx.hosts.get_by_name(name)
+        if host_entry is not None:
+            targets.append(await build_ssh_target(ctx, host_entry))
+
+    if not targets:
+        return 0
+
+    ssh_pool = await ctx.get_ssh_pool()
+    ensure_callbacks(ctx, ssh_pool)
+    return await ssh_pool.prewarm(targets)
@@ -127,7 +127,7 @@ async def read_file(
 
 
 async def write_file(
-    _ctx: SharedContext,
+    ctx: SharedContext,
     host_name: str,
     path: str,
     content: str,
@@ -178,6 +178,7 @@ async def write_file(
         encoded = base64.b64encode(content.encode("utf-8")).decode("ascii")
         write_cmd = f"echo {shlex.quote(encoded)} | base64 -d > {quoted_path}"
         result = await ssh_pool.execute(host_name, write_cmd)
+        ctx.result_cache.invalidate_host(host_name)
 
         if result.exit_code != 0:
             return FileResult(
@@ -445,7 +446,7 @@ async def search_files(
 
 
 async def delete_file(
-    _ctx: SharedContext,
+    ctx: SharedContext,
     host_name: str,
     path: str,
     force: bool = False,
@@ -483,6 +484,7 @@ async def delete_file(
         # Build rm command
         cmd = f"rm -f {quoted_path}" if force else f"rm {quoted_path}"
         result = await ssh_pool.execute(host_name, cmd)
+        ctx.result_cache.invalidate_host(host_name)
 
         if result.exit_code != 0:
             return FileResult(
@@ -555,8 +557,17 @@ async def upload_file(
         )
 
     try:
+        from merlya.ssh.sftp import SFTPTransferOptions
+
         ssh_pool = await ctx.get_ssh_pool()
-        await ssh_pool.upload_file(host_name, local, remote_path)
+        with ctx.ui.transfer_progress(f"📤 {local.name}", size) as on_progress:
+            stats = await ssh_pool.upload_file(
+                host_name,
+                local,
+                remote_path,
+                transfer=SFTPTransferOptions(on_progress=on_progress),
+            )
+        ctx.result_cache.invalidate_host(host_name)
 
         # File size already computed above
         size_str = _format_size(size)
@@ -567,7 +578,8 @@ async def upload_file(
                 "local": str(local),
                 "remote": f"{host_name}:{remote_path}",
                 "size": size,
-                "message": f"Transfer complete ({size_str})",
+                "throughput_mbps": round(stats.mb_per_s, 2),
+                "message": f"Transfer complete ({size_str}, {stats.mb_per_s:.1f} MB/s)",
             },
         )
 
@@ -583,6 +595,7 @@ async def download_file(
     host_name: str,
     remote_path: str,
     local_path: str | None = None,
+    resume: bool = False,
 ) -> FileResult:
     """
     Download a file from a remote host via SFTP.
@@ -592,6 +605,8 @@ async def download_file(
         host_name: Source host name.
         remote_path: Remote file path.
         local_path: Local destination path (default: current directory with remote filename).
+        resume: Continue an interrupted download (verified by size and checksum)
+            and skip files already downloaded unchanged (size, mtime, checksums).
 
     Returns:
         FileResult with transfer status.
@@ -619,12 +634,23 @@ async def download_file(
     local = Path(local_path).expanduser()
 
     try:
+        from merlya.ssh.sftp import SFTPTransferOptions
+
         ssh_pool = await ctx.get_ssh_pool()
-        await ssh_pool.download_file(host_name, remote_path, local)
+        with ctx.ui.transfer_progress(f"📥 {local.name}", 0) as on_progress:
+            stats = await ssh_pool.download_file(
+                host_name,
+                remote_path,
+                local,
+                transfer=SFTPTransferOptions(on_progress=on_progress, resume=resume),
+            )
 
         # Get file size for reporting
         size = local.stat().st_size
         size_str = _format_size(size)
+        message = f"Saved to: {local} ({size_str}, {stats.mb_per_s:.1f} MB/s)"
+        if stats.resumed_from:
+            message += f", resumed at {_format_size(stats.resumed_from)}"
 
         return FileResult(
             success=True,
@@ -632,7 +658,9 @@ async def download_file(
                 "remote": f"{host_name}:{remote_path}",
                 "local": str(local.absolute()),
                 "size": size,
-                "message": f"Saved to: {local} ({size_str})",
+                "throughput_mbps": round(stats.mb_per_s, 2),
+                "resumed_from": stats.resumed_from,
+                "message": message,
             },
         )
 
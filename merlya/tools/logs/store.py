@@ -3,6 +3,10 @@ Merlya Tools - Log Store implementation.
 
 Stores raw command outputs in SQLite for later retrieval.
 Provides slicing capabilities to extract specific portions of logs.
+
+Outputs are stored zlib-compressed in chunks of whole lines
+(raw_log_chunks) indexed by their first line, so a slice only reads and
+decompresses the chunks it overlaps, whatever the size of the log.
 """
 
 from __future__ import annotations
@@ -14,6 +18,8 @@ from typing import TYPE_CHECKING
 
 from loguru import logger
 
+from merlya.persistence.database import decode_log_chunk, encode_log_chunks, track_queries
+
 if TYPE_CHECKING:
     from merlya.persistence.database import Database
 
@@ -45,6 +51,7 @@ class RawLogEntry:
     expires_at: datetime | None
 
 
+@track_queries
 async def store_raw_log(
     db: Database,
     command: str,
@@ -84,17 +91,27 @@ async def store_raw_log(
     line_count = output.count("\n") + (1 if output and not output.endswith("\n") else 0)
     byte_size = len(output.encode("utf-8"))
 
-    await db.execute(
-        """
-        INSERT INTO raw_logs (id, host_id, command, output, exit_code,
-                             line_count, byte_size, created_at, expires_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (log_id, host_id, command, output, exit_code, line_count, byte_size, now, expires_at),
-    )
-    await db.connection.commit()
+    chunks = encode_log_chunks(output)
+
+    async with db.transaction():
+        await db.execute(
+            """
+            INSERT INTO raw_logs (id, host_id, command, exit_code,
+                                 line_count, byte_size, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (log_id, host_id, command, exit_code, line_count, byte_size, now, expires_at),
+        )
+        await db.executemany(
+            "INSERT INTO raw_log_chunks (log_id, start_line, line_count, data) VALUES (?, ?, ?, ?)",
+            [(log_id, *chunk) for chunk in chunks],
+        )
 
-    logger.debug(f"📝 Stored log {log_id[:8]}... ({line_count} lines, {byte_size} bytes)")
+    compressed = sum(len(data) for _, _, data in chunks)
+    logger.debug(
+        f"📝 Stored log {log_id[:8]}... ({line_count} lines, {byte_size} bytes, "
+        f"{compressed} compressed in {len(chunks)} chunks)"
+    )
 
     return LogRef(
         id=log_id,
@@ -106,6 +123,7 @@ async def store_raw_log(
     )
 
 
+@track_queries
 async def get_raw_log(db: Database, log_id: str) -> RawLogEntry | None:
     """
     Retrieve a complete raw log by ID.
@@ -126,19 +144,26 @@ async def get_raw_log(db: Database, log_id: str) -> RawLogEntry | None:
             logger.warning(f"⚠️ Log not found: {log_id[:8]}...")
             return None
 
-        return RawLogEntry(
-            id=row["id"],
-            host_id=row["host_id"],
-            command=row["command"],
-            output=row["output"],
-            exit_code=row["exit_code"],
-            line_count=row["line_count"],
-            byte_size=row["byte_size"],
-            created_at=row["created_at"],
-            expires_at=row["expires_at"],
-        )
+    async with await db.execute(
+        "SELECT data FROM raw_log_chunks WHERE log_id = ? ORDER BY start_line",
+        (log_id,),
+    ) as cursor:
+        lines = [line for chunk in await cursor.fetchall() for line in decode_log_chunk(chunk[0])]
+
+    return RawLogEntry(
+        id=row["id"],
+        host_id=row["host_id"],
+        command=row["command"],
+        output="\n".join(lines),
+        exit_code=row["exit_code"],
+        line_count=row["line_count"],
+        byte_size=row["byte_size"],
+        created_at=row["created_at"],
+        expires_at=row["expires_at"],
+    )
 
 
+@track_queries
 async def get_raw_log_slice(
     db: Database,
     log_id: str,
@@ -174,12 +199,19 @@ async def get_raw_log_slice(
             db, log_ref.id, start_line=100, end_line=200
         )
     """
-    log_entry = await get_raw_log(db, log_id)
-    if not log_entry:
+    # The last chunk's end is the line count of the log
+    async with await db.execute(
+        """
+        SELECT start_line + line_count FROM raw_log_chunks
+        WHERE log_id = ? ORDER BY start_line DESC LIMIT 1
+        """,
+        (log_id,),
+    ) as cursor:
+        row = await cursor.fetchone()
+    if not row:
+        logger.warning(f"⚠️ Log not found: {log_id[:8]}...")
         return None
-
-    lines = log_entry.output.split("\n")
-    total_lines = len(lines)
+    total_lines = int(row[0])
 
     # Determine slice bounds
     if around_line is not None:
@@ -196,8 +228,27 @@ async def get_raw_log_slice(
         start_idx = 0
         end_idx = min(total_lines, window * 2)
 
-    # Extract slice
-    sliced_lines = lines[start_idx:end_idx]
+    # Decompress only the chunks overlapping [start_idx, end_idx): the one
+    # holding start_idx (found through the primary key) and those after it
+    sliced_lines: list[str] = []
+    if start_idx < end_idx:
+        async with await db.execute(
+            """
+            SELECT start_line, data FROM raw_log_chunks
+            WHERE log_id = ? AND start_line < ? AND start_line >= (
+                SELECT COALESCE(MAX(start_line), 0) FROM raw_log_chunks
+                WHERE log_id = ? AND start_line <= ?
+            )
+            ORDER BY start_line
+            """,
+            (log_id, end_idx, log_id, start_idx),
+        ) as cursor:
+            for chunk in await cursor.fetchall():
+                chunk_start = chunk["start_line"]
+                chunk_lines = decode_log_chunk(chunk["data"])
+                sliced_lines.extend(
+                    chunk_lines[max(0, start_idx - chunk_start) : end_idx - chunk_start]
+                )
     sliced_output = "\n".join(sliced_lines)
 
     # Return 1-indexed line numbers for display
@@ -211,6 +262,7 @@ async def get_raw_log_slice(
     return sliced_output, actual_start, actual_end
 
 
+@track_queries
 async def cleanup_expired_logs(db: Database) -> int:
     """
     Remove expired log entries.
@@ -223,13 +275,19 @@ async def cleanup_expired_logs(db: Database) -> int:
     """
     now = datetime.now()
 
-    async with await db.execute(
-        "DELETE FROM raw_logs WHERE expires_at < ?",
-        (now,),
-    ) as cursor:
-        deleted = int(cursor.rowcount or 0)
-
-    await db.connection.commit()
+    async with db.transaction():
+        await db.execute(
+            """
+            DELETE FROM raw_log_chunks
+            WHERE log_id IN (SELECT id FROM raw_logs WHERE expires_at < ?)
+            """,
+            (now,),
+        )
+        async with await db.execute(
+            "DELETE FROM raw_logs WHERE expires_at < ?",
+            (now,),
+        ) as cursor:
+            deleted = int(cursor.rowcount or 0)
 
     if deleted > 0:
         logger.info(f"🧹 Cleaned up {deleted} expired logs")
@@ -237,6 +295,7 @@ async def cleanup_expired_logs(db: Database) -> int:
     return deleted
 
 
+@track_queries
 async def get_logs_by_host(
     db: Database,
     host_id: str,
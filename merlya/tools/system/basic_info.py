@@ -14,6 +14,16 @@ from merlya.tools.core import ToolResult, ssh_execute
 if TYPE_CHECKING:
     from merlya.core.context import SharedContext
 
+# All commands are fixed strings - no user input
+SYSTEM_INFO_COMMANDS = {
+    "hostname": "hostname",
+    "os": "grep PRETTY_NAME /etc/os-release 2>/dev/null | cut -d'\"' -f2 || uname -s",
+    "kernel": "uname -r",
+    "arch": "uname -m",
+    "uptime": "uptime -p 2>/dev/null || uptime",
+    "load": "cut -d' ' -f1-3 /proc/loadavg 2>/dev/null || uptime | grep -o 'load.*'",
+}
+
 
 async def get_system_info(
     ctx: SharedContext,
@@ -29,19 +39,9 @@ async def get_system_info(
     Returns:
         ToolResult with system info (OS, kernel, uptime, etc.).
     """
-    # All commands are fixed strings - no user input
-    commands = {
-        "hostname": "hostname",
-        "os": "grep PRETTY_NAME /etc/os-release 2>/dev/null | cut -d'\"' -f2 || uname -s",
-        "kernel": "uname -r",
-        "arch": "uname -m",
-        "uptime": "uptime -p 2>/dev/null || uptime",
-        "load": "cut -d' ' -f1-3 /proc/loadavg 2>/dev/null || uptime | grep -o 'load.*'",
-    }
-
     info: dict[str, str] = {}
 
-    for key, cmd in commands.items():
+    for key, cmd in SYSTEM_INFO_COMMANDS.items():
         result = await ssh_execute(ctx, host, cmd, timeout=10)
         if result.success and result.data:
             info[key] = result.data.get("stdout", "").strip()
@@ -86,7 +86,11 @@ async def list_cron(
         system_entries = await _get_system_crontabs(ctx, host)
         entries.extend(system_entries)
 
-    # Parse and format entries
+    return ToolResult(success=True, data=_cron_jobs_data(entries, host))
+
+
+def _cron_jobs_data(entries: list[CronEntryDict], host: str) -> dict[str, Any]:
+    """Format parsed entries as the list_cron payload."""
     jobs = []
     for entry in entries:
         job = {
@@ -98,14 +102,11 @@ async def list_cron(
         }
         jobs.append(job)
 
-    return ToolResult(
-        success=True,
-        data={
-            "jobs": jobs,
-            "total": len(jobs),
-            "host": host,
-        },
-    )
+    return {
+        "jobs": jobs,
+        "total": len(jobs),
+        "host": host,
+    }
 
 
 async def add_cron(
@@ -282,17 +283,20 @@ async def _get_user_crontab(
     cmd = f"crontab {user_flag} -l 2>/dev/null"
     result = await execute_security_command(ctx, host, cmd, timeout=15)
 
-    entries: list[CronEntryDict] = []
-    effective_user = user or "current"
-
     if result.exit_code == 0 and result.stdout:
-        for line in result.stdout.strip().split("\n"):
-            entry = _parse_cron_line(line)
-            if entry:
-                entry["user"] = effective_user
-                entry["source"] = f"crontab ({effective_user})"
-                entries.append(entry)
+        return _parse_user_crontab(result.stdout, user or "current")
+    return []
 
+
+def _parse_user_crontab(output: str, user: str) -> list[CronEntryDict]:
+    """Parse `crontab -l` output for a user."""
+    entries: list[CronEntryDict] = []
+    for line in output.strip().split("\n"):
+        entry = _parse_cron_line(line)
+        if entry:
+            entry["user"] = user
+            entry["source"] = f"crontab ({user})"
+            entries.append(entry)
     return entries
 
 
@@ -305,26 +309,29 @@ async def _get_system_crontabs(ctx: SharedContext, host: str) -> list[CronEntryD
     result = await execute_security_command(ctx, host, crontab_cmd, timeout=15)
 
     if result.exit_code == 0 and result.stdout:
-        for line in result.stdout.strip().split("\n"):
-            entry = _parse_cron_line(line, has_user_field=True)
-            if entry:
-                entry["source"] = "/etc/crontab"
-                entries.append(entry)
+        entries.extend(_parse_system_crontab(result.stdout, "/etc/crontab"))
 
     # Check /etc/cron.d/
     cron_d_cmd = "cat /etc/cron.d/* 2>/dev/null"
     result = await execute_security_command(ctx, host, cron_d_cmd, timeout=15)
 
     if result.exit_code == 0 and result.stdout:
-        for line in result.stdout.strip().split("\n"):
-            entry = _parse_cron_line(line, has_user_field=True)
-            if entry:
-                entry["source"] = "/etc/cron.d/"
-                entries.append(entry)
+        entries.extend(_parse_system_crontab(result.stdout, "/etc/cron.d/"))
 
     return entries
 
 
+def _parse_system_crontab(output: str, source: str) -> list[CronEntryDict]:
+    """Parse a system crontab (with a user field)."""
+    entries: list[CronEntryDict] = []
+    for line in output.strip().split("\n"):
+        entry = _parse_cron_line(line, has_user_field=True)
+        if entry:
+            entry["source"] = source
+            entries.append(entry)
+    return entries
+
+
 def _parse_cron_line(line: str, has_user_field: bool = False) -> CronEntryDict | None:
     """Parse a crontab line into structured data."""
     line = line.strip()
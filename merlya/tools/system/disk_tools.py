@@ -15,6 +15,9 @@ from merlya.tools.core import ToolResult, ssh_execute
 if TYPE_CHECKING:
     from merlya.core.context import SharedContext
 
+# Pseudo filesystems skipped by check_all_disks
+DEFAULT_EXCLUDE_TYPES = ["tmpfs", "devtmpfs", "squashfs", "overlay", "devfs", "autofs"]
+
 
 def _format_size(bytes_val: int) -> str:
     """Format bytes to human-readable string."""
@@ -103,6 +106,88 @@ def _parse_df_human(output: str, path: str, threshold: int) -> dict[str, object]
         return None
 
 
+def _parse_df_all(output: str, threshold: int) -> dict[str, Any]:
+    """Parse df -Pk output for all mounted filesystems."""
+    disks: list[dict[str, Any]] = []
+    warnings = 0
+
+    lines = output.strip().split("\n")
+
+    for line in lines[1:]:  # Skip header
+        if not line.strip():
+            continue
+
+        parts = line.split()
+        if len(parts) < 5:
+            continue
+
+        # Find percentage column
+        pct_idx = -1
+        for i, part in enumerate(parts):
+            if "%" in part:
+                pct_idx = i
+                break
+
+        if pct_idx < 3:
+            continue
+
+        try:
+            filesystem = parts[0]
+
+            # Filter out excluded types by name patterns (for BSD)
+            if any(excl in filesystem.lower() for excl in ["devfs", "tmpfs", "map ", "autofs"]):
+                continue
+
+            size_raw = parts[pct_idx - 3]
+            used_raw = parts[pct_idx - 2]
+            avail_raw = parts[pct_idx - 1]
+            use_percent = int(parts[pct_idx].rstrip("%"))
+            mount = parts[pct_idx + 1] if len(parts) > pct_idx + 1 else "unknown"
+
+            disk_info: dict[str, Any] = {
+                "filesystem": filesystem,
+                "use_percent": use_percent,
+                "mount": mount,
+                "warning": use_percent >= threshold,
+            }
+
+            # Prefer numeric POSIX df output (-Pk), but gracefully accept human output (tests/mocks).
+            try:
+                size_kb = int(size_raw)
+                used_kb = int(used_raw)
+                avail_kb = int(avail_raw)
+                disk_info.update(
+                    {
+                        "size": _format_size(size_kb * 1024),
+                        "used": _format_size(used_kb * 1024),
+                        "available": _format_size(avail_kb * 1024),
+                        "size_bytes": size_kb * 1024,
+                        "used_bytes": used_kb * 1024,
+                        "available_bytes": avail_kb * 1024,
+                    }
+                )
+            except ValueError:
+                disk_info.update(
+                    {
+                        "size": size_raw,
+                        "used": used_raw,
+                        "available": avail_raw,
+                    }
+                )
+
+            disks.append(disk_info)
+            if disk_info["warning"]:
+                warnings += 1
+        except (ValueError, IndexError):
+            continue
+
+    return {
+        "disks": disks,
+        "total_count": len(disks),
+        "warnings": warnings,
+    }
+
+
 async def check_disk_usage(
     ctx: SharedContext,
     host: str,
@@ -194,7 +279,7 @@ async def check_all_disks(
         return ToolResult(success=False, data=[], error=error)
 
     if exclude_types is None:
-        exclude_types = ["tmpfs", "devtmpfs", "squashfs", "overlay", "devfs", "autofs"]
+        exclude_types = DEFAULT_EXCLUDE_TYPES
 
     # Linux with GNU df (supports --exclude-type)
     excludes = " ".join(f"--exclude-type={t}" for t in exclude_types)
@@ -213,90 +298,9 @@ async def check_all_disks(
     if not result.success:
         return result
 
-    disks: list[dict[str, Any]] = []
-    warnings = 0
-
     try:
-        output = result.data.get("stdout", "").strip()
-        lines = output.split("\n")
-
-        for line in lines[1:]:  # Skip header
-            if not line.strip():
-                continue
-
-            parts = line.split()
-            if len(parts) < 5:
-                continue
-
-            # Find percentage column
-            pct_idx = -1
-            for i, part in enumerate(parts):
-                if "%" in part:
-                    pct_idx = i
-                    break
-
-            if pct_idx < 3:
-                continue
-
-            try:
-                filesystem = parts[0]
-
-                # Filter out excluded types by name patterns (for BSD)
-                if any(excl in filesystem.lower() for excl in ["devfs", "tmpfs", "map ", "autofs"]):
-                    continue
-
-                size_raw = parts[pct_idx - 3]
-                used_raw = parts[pct_idx - 2]
-                avail_raw = parts[pct_idx - 1]
-                use_percent = int(parts[pct_idx].rstrip("%"))
-                mount = parts[pct_idx + 1] if len(parts) > pct_idx + 1 else "unknown"
-
-                disk_info: dict[str, Any] = {
-                    "filesystem": filesystem,
-                    "use_percent": use_percent,
-                    "mount": mount,
-                    "warning": use_percent >= threshold,
-                }
-
-                # Prefer numeric POSIX df output (-Pk), but gracefully accept human output (tests/mocks).
-                try:
-                    size_kb = int(size_raw)
-                    used_kb = int(used_raw)
-                    avail_kb = int(avail_raw)
-                    disk_info.update(
-                        {
-                            "size": _format_size(size_kb * 1024),
-                            "used": _format_size(used_kb * 1024),
-                            "available": _format_size(avail_kb * 1024),
-                            "size_bytes": size_kb * 1024,
-                            "used_bytes": used_kb * 1024,
-                            "available_bytes": avail_kb * 1024,
-                        }
-                    )
-                except ValueError:
-                    disk_info.update(
-                        {
-                            "size": size_raw,
-                            "used": used_raw,
-                            "available": avail_raw,
-                        }
-                    )
-
-                disks.append(disk_info)
-                if disk_info["warning"]:
-                    warnings += 1
-            except (ValueError, IndexError):
-                continue
-
-        return ToolResult(
-            success=True,
-            data={
-                "disks": disks,
-                "total_count": len(disks),
-                "warnings": warnings,
-            },
-        )
-
+        data = _parse_df_all(result.data.get("stdout", ""), threshold)
+        return ToolResult(success=True, data=data)
     except Exception as e:
         from loguru import logger
 
@@ -15,6 +15,26 @@ from merlya.tools.core import ToolResult, ssh_execute
 if TYPE_CHECKING:
     from merlya.core.context import SharedContext
 
+# Docker availability, containers and images in one command
+DOCKER_SCRIPT = """
+if ! command -v docker >/dev/null 2>&1; then
+    echo "DOCKER:not-installed"
+    exit 0
+fi
+
+# Check if Docker daemon is running
+if ! docker info >/dev/null 2>&1; then
+    echo "DOCKER:not-running"
+    exit 0
+fi
+
+echo "DOCKER:running"
+echo "CONTAINERS:"
+docker ps -a --format '{{.Names}}|{{.Status}}|{{.Image}}' 2>/dev/null | head -20
+echo "IMAGES:"
+docker images --format '{{.Repository}}:{{.Tag}}|{{.Size}}' 2>/dev/null | head -10
+"""
+
 
 async def check_docker(
     ctx: SharedContext,
@@ -30,29 +50,9 @@ async def check_docker(
     Returns:
         ToolResult with Docker info.
     """
-    # Check if Docker is available and get container info
-    cmd = """
-    if ! command -v docker >/dev/null 2>&1; then
-        echo "DOCKER:not-installed"
-        exit 0
-    fi
-
-    # Check if Docker daemon is running
-    if ! docker info >/dev/null 2>&1; then
-        echo "DOCKER:not-running"
-        exit 0
-    fi
-
-    echo "DOCKER:running"
-    echo "CONTAINERS:"
-    docker ps -a --format '{{.Names}}|{{.Status}}|{{.Image}}' 2>/dev/null | head -20
-    echo "IMAGES:"
-    docker images --format '{{.Repository}}:{{.Tag}}|{{.Size}}' 2>/dev/null | head -10
-    """
-
     # Sanitize host parameter to prevent command injection
     safe_host = shlex.quote(host)
-    result = await ssh_execute(ctx, safe_host, cmd.strip(), timeout=20)
+    result = await ssh_execute(ctx, safe_host, DOCKER_SCRIPT.strip(), timeout=20)
 
     # If SSH execution failed, return failure with error details
     if not result.success:
@@ -67,13 +67,20 @@ async def check_docker(
             error=result.error or "SSH execution failed",
         )
 
+    data = _parse_docker_output(result.data.get("stdout", "") if result.data else "")
+    data["ssh_exit_code"] = result.data.get("exit_code") if result.data else 0
+    return ToolResult(success=True, data=data)
+
+
+def _parse_docker_output(output: str) -> dict[str, Any]:
+    """Parse DOCKER_SCRIPT output."""
     docker_status = "unknown"
     containers: list[dict[str, str]] = []
     images: list[dict[str, str]] = []
     section = None
 
-    if result.data and result.data.get("stdout"):
-        for line in result.data["stdout"].strip().split("\n"):
+    if output:
+        for line in output.strip().split("\n"):
             if line.startswith("DOCKER:"):
                 docker_status = line.split(":", 1)[1]
             elif line == "CONTAINERS:":
@@ -104,15 +111,11 @@ async def check_docker(
     running = sum(1 for c in containers if "Up" in c.get("status", ""))
     stopped = len(containers) - running
 
-    return ToolResult(
-        success=True,
-        data={
-            "status": docker_status,
-            "containers": containers,
-            "images": images,
-            "running_count": running,
-            "stopped_count": stopped,
-            "total_containers": len(containers),
-            "ssh_exit_code": result.data.get("exit_code") if result.data else 0,
-        },
-    )
+    return {
+        "status": docker_status,
+        "containers": containers,
+        "images": images,
+        "running_count": running,
+        "stopped_count": stopped,
+        "total_containers": len(containers),
+    }
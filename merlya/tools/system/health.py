@@ -7,6 +7,7 @@ Consolidated health view across one or multiple hosts.
 from __future__ import annotations
 
 import asyncio
+import re
 import shlex
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
@@ -70,6 +71,32 @@ CRITICAL_SERVICES = [
     "systemd-journald",
 ]
 
+# All metrics in one command, split into ---SECTION--- blocks
+HEALTH_SCRIPT = """
+LANG=C
+echo "---CPU---"
+grep -c ^processor /proc/cpuinfo 2>/dev/null || echo 1
+cat /proc/loadavg 2>/dev/null | awk '{print $1}'
+echo "---MEM---"
+cat /proc/meminfo 2>/dev/null | grep -E '^(MemTotal|MemAvailable):' | awk '{print $2}'
+echo "---DISK---"
+df -P / 2>/dev/null | tail -1 | awk '{print $5}' | tr -d '%'
+echo "---UPTIME---"
+uptime -p 2>/dev/null || uptime | sed 's/.*up/up/'
+"""
+
+# Prints `service:active|inactive` for enabled critical services
+# (shlex.quote escapes each service name to prevent command injection)
+CRITICAL_SERVICES_SCRIPT = f"""
+for svc in {" ".join(shlex.quote(svc) for svc in CRITICAL_SERVICES)}; do
+    if systemctl is-active --quiet "$svc" 2>/dev/null; then
+        echo "$svc:active"
+    elif systemctl list-unit-files "$svc.service" 2>/dev/null | grep -q enabled; then
+        echo "$svc:inactive"
+    fi
+done
+"""
+
 
 async def health_summary(
     ctx: SharedContext,
@@ -151,34 +178,36 @@ async def health_summary(
         f"{summary.unreachable_hosts} unreachable"
     )
 
-    return ToolResult(
-        success=True,
-        data={
-            "hosts": [
-                {
-                    "name": h.host_name,
-                    "reachable": h.reachable,
-                    "score": h.score,
-                    "cpu_percent": h.cpu_percent,
-                    "memory_percent": h.memory_percent,
-                    "disk_percent": h.disk_percent,
-                    "load_1m": h.load_1m,
-                    "uptime": h.uptime,
-                    "services_down": h.critical_services_down,
-                    "warnings": h.warnings,
-                    "errors": h.errors,
-                }
-                for h in summary.hosts
-            ],
-            "summary": {
-                "total": summary.total_hosts,
-                "healthy": summary.healthy_hosts,
-                "warning": summary.warning_hosts,
-                "critical": summary.critical_hosts,
-                "unreachable": summary.unreachable_hosts,
-            },
+    return ToolResult(success=True, data=_summary_data(summary))
+
+
+def _summary_data(summary: HealthSummary) -> dict[str, Any]:
+    """Convert a health summary to the tool result payload."""
+    return {
+        "hosts": [
+            {
+                "name": h.host_name,
+                "reachable": h.reachable,
+                "score": h.score,
+                "cpu_percent": h.cpu_percent,
+                "memory_percent": h.memory_percent,
+                "disk_percent": h.disk_percent,
+                "load_1m": h.load_1m,
+                "uptime": h.uptime,
+                "services_down": h.critical_services_down,
+                "warnings": h.warnings,
+                "errors": h.errors,
+            }
+            for h in summary.hosts
+        ],
+        "summary": {
+            "total": summary.total_hosts,
+            "healthy": summary.healthy_hosts,
+            "warning": summary.warning_hosts,
+            "critical": summary.critical_hosts,
+            "unreachable": summary.unreachable_hosts,
         },
-    )
+    }
 
 
 async def _check_host_health(
@@ -193,20 +222,7 @@ async def _check_host_health(
 
     try:
         # Single command that gets all metrics at once (efficient)
-        cmd = """
-LANG=C
-echo "---CPU---"
-grep -c ^processor /proc/cpuinfo 2>/dev/null || echo 1
-cat /proc/loadavg 2>/dev/null | awk '{print $1}'
-echo "---MEM---"
-cat /proc/meminfo 2>/dev/null | grep -E '^(MemTotal|MemAvailable):' | awk '{print $2}'
-echo "---DISK---"
-df -P / 2>/dev/null | tail -1 | awk '{print $5}' | tr -d '%'
-echo "---UPTIME---"
-uptime -p 2>/dev/null || uptime | sed 's/.*up/up/'
-"""
-
-        result = await execute_security_command(ctx, host.name, cmd, timeout=timeout)
+        result = await execute_security_command(ctx, host.name, HEALTH_SCRIPT, timeout=timeout)
 
         if result.exit_code != 0 or not result.stdout:
             health.reachable = False
@@ -240,14 +256,11 @@ uptime -p 2>/dev/null || uptime | sed 's/.*up/up/'
 
 def _parse_health_output(health: HostHealth, output: str) -> None:
     """Parse the combined health check output."""
-    sections = output.split("---")
-
-    for section in sections:
-        lines = section.strip().split("\n")
-        if not lines:
-            continue
+    # ["", "CPU", "<cpu lines>", "MEM", "<mem lines>", ...]
+    parts = re.split(r"^---(\w+)---$", output, flags=re.MULTILINE)
 
-        header = lines[0].strip()
+    for header, body in zip(parts[1::2], parts[2::2], strict=False):
+        lines = [header, *body.strip().split("\n")]
 
         if header == "CPU":
             if len(lines) >= 3:
@@ -307,32 +320,27 @@ async def _check_critical_services(
     timeout: int,
 ) -> None:
     """Check status of critical services."""
-    # Use shlex.quote to safely escape each service name and prevent command injection
-    quoted_services = " ".join(shlex.quote(svc) for svc in CRITICAL_SERVICES)
-    cmd = f"""
-for svc in {quoted_services}; do
-    if systemctl is-active --quiet "$svc" 2>/dev/null; then
-        echo "$svc:active"
-    elif systemctl list-unit-files "$svc.service" 2>/dev/null | grep -q enabled; then
-        echo "$svc:inactive"
-    fi
-done
-"""
-
     try:
-        result = await execute_security_command(ctx, host_name, cmd, timeout=timeout)
+        result = await execute_security_command(
+            ctx, host_name, CRITICAL_SERVICES_SCRIPT, timeout=timeout
+        )
 
         if result.exit_code == 0 and result.stdout:
-            for line in result.stdout.strip().split("\n"):
-                if ":" in line:
-                    svc, status = line.split(":", 1)
-                    if status.strip() == "inactive":
-                        health.critical_services_down.append(svc.strip())
-                        health.warnings.append(f"Service '{svc}' is down")
+            _parse_critical_services(health, result.stdout)
     except Exception:
         pass  # Non-critical, don't fail the health check
 
 
+def _parse_critical_services(health: HostHealth, output: str) -> None:
+    """Parse `service:status` lines from the critical services check."""
+    for line in output.strip().split("\n"):
+        if ":" in line:
+            svc, status = line.split(":", 1)
+            if status.strip() == "inactive":
+                health.critical_services_down.append(svc.strip())
+                health.warnings.append(f"Service '{svc}' is down")
+
+
 def _calculate_health_score(health: HostHealth) -> None:
     """Calculate overall health score (0-100)."""
     if not health.reachable:
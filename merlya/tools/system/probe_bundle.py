@@ -0,0 +1,393 @@
+"""
+Merlya Tools - Host probe bundle.
+
+Compiles several system checks into one POSIX shell script with delimited
+sections, runs it over a single SSH channel and dispatches each section to
+the parser of the matching tool. A scan then needs one round-trip per host
+instead of one (or more, with fallbacks) per check.
+"""
+
+from __future__ import annotations
+
+import re
+import secrets
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from merlya.tools.core.models import ToolResult
+from merlya.tools.core.os_detect import OSFamily
+from merlya.tools.security.base import execute_security_command
+
+from .basic_info import SYSTEM_INFO_COMMANDS
+from .cpu_tools import _parse_loadavg_nproc, _parse_sysctl_load, _parse_uptime_load
+from .cron import _cron_jobs_data, _parse_system_crontab, _parse_user_crontab
+from .disk_tools import DEFAULT_EXCLUDE_TYPES, _parse_df_all, _parse_df_posix
+from .docker_tools import DOCKER_SCRIPT, _parse_docker_output
+from .health import (
+    CRITICAL_SERVICES_SCRIPT,
+    HEALTH_SCRIPT,
+    HealthSummary,
+    HostHealth,
+    _calculate_health_score,
+    _parse_critical_services,
+    _parse_health_output,
+    _summary_data,
+)
+from .memory_tools import _parse_free_output, _parse_proc_meminfo, _parse_vm_stat
+from .process_tools import _parse_ps_output
+from .services import _list_services_command, _parse_service_list
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from merlya.core.context import SharedContext
+
+DEFAULT_BUNDLE_TIMEOUT = 60
+
+# Same defaults as the individual tools
+MEMORY_THRESHOLD = 90
+CPU_THRESHOLD = 80.0
+DISK_THRESHOLD = 90
+PROCESS_LIMIT = 10
+
+
+@dataclass(frozen=True)
+class ProbeOutput:
+    """Output of one bundle section."""
+
+    stdout: str
+    exit_code: int
+
+
+@dataclass(frozen=True)
+class Probe:
+    """A check compiled into the bundle: shell snippet and parser."""
+
+    name: str
+    script: str
+    parse: Callable[[ProbeOutput, str], ToolResult[Any]]  # (output, host name)
+
+
+# =============================================================================
+# Section parsers
+# =============================================================================
+
+
+def _fail(error: str, output: ProbeOutput) -> ToolResult[Any]:
+    return ToolResult(success=False, data={"raw": output.stdout[:500]}, error=error)
+
+
+def _parse_system_info(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    info: dict[str, str] = {}
+    for line in output.stdout.splitlines():
+        key, sep, value = line.partition("=")
+        if sep and key in SYSTEM_INFO_COMMANDS:
+            info[key] = value.strip()
+    if info:
+        return ToolResult(success=True, data=info)
+    return _fail("Failed to get system info", output)
+
+
+def _parse_memory(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    for parser in (_parse_proc_meminfo, _parse_free_output, _parse_vm_stat):
+        mem_info = parser(output.stdout, MEMORY_THRESHOLD)
+        if mem_info:
+            return ToolResult(success=True, data=mem_info)
+    return _fail("❌ Failed to parse memory usage", output)
+
+
+def _parse_cpu(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    for parser in (_parse_loadavg_nproc, _parse_sysctl_load, _parse_uptime_load):
+        cpu_info = parser(output.stdout, CPU_THRESHOLD)
+        if cpu_info:
+            return ToolResult(success=True, data=cpu_info)
+    return _fail("❌ Failed to parse CPU usage", output)
+
+
+def _parse_health(output: ProbeOutput, host: str) -> ToolResult[Any]:
+    metrics, _, services = output.stdout.partition("---SERVICES---")
+    if "---CPU---" not in metrics:
+        return _fail("❌ Health check produced no output", output)
+
+    health = HostHealth(host_name=host, reachable=True)
+    _parse_health_output(health, metrics)
+    _parse_critical_services(health, services)
+    _calculate_health_score(health)
+
+    summary = HealthSummary(hosts=[health], total_hosts=1)
+    if health.score < 50:
+        summary.critical_hosts = 1
+    elif health.score < 80:
+        summary.warning_hosts = 1
+    else:
+        summary.healthy_hosts = 1
+    return ToolResult(success=True, data=_summary_data(summary))
+
+
+def _parse_disk(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    disk_info = _parse_df_posix(output.stdout.strip(), "/", DISK_THRESHOLD)
+    if disk_info:
+        return ToolResult(success=True, data=disk_info)
+    return _fail("❌ Failed to parse disk usage", output)
+
+
+def _parse_disks(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    return ToolResult(success=True, data=_parse_df_all(output.stdout, DISK_THRESHOLD))
+
+
+def _parse_docker(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    data = _parse_docker_output(output.stdout)
+    data["ssh_exit_code"] = output.exit_code
+    return ToolResult(success=True, data=data)
+
+
+_INIT_FAMILIES = {
+    "launchd": OSFamily.MACOS,
+    "openrc": OSFamily.LINUX_ALPINE,
+    "systemd": OSFamily.LINUX_GENERIC,
+}
+
+
+def _parse_services(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    init, _, listing = output.stdout.partition("\n")
+    family = _INIT_FAMILIES.get(init.strip())
+    if family is None:
+        return _fail("❌ Failed to list services: no supported init system", output)
+    services = _parse_service_list(listing, family)
+    return ToolResult(
+        success=True,
+        data={"services": services, "total": len(services), "filter": "running"},
+    )
+
+
+def _parse_cron(output: ProbeOutput, host: str) -> ToolResult[Any]:
+    # Each line is prefixed with its source: "<user>|" or "/etc/...|"
+    by_source: dict[str, list[str]] = {}
+    for line in output.stdout.splitlines():
+        source, sep, entry = line.partition("|")
+        if sep:
+            by_source.setdefault(source, []).append(entry)
+
+    entries = []
+    for source, lines in by_source.items():
+        text = "\n".join(lines)
+        if source.startswith("/"):
+            entries.extend(_parse_system_crontab(text, source))
+        else:
+            entries.extend(_parse_user_crontab(text, source))
+    return ToolResult(success=True, data=_cron_jobs_data(entries, host))
+
+
+def _parse_processes(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    processes = _parse_ps_output(
+        output.stdout.strip(), None, None, PROCESS_LIMIT, "cpu", already_sorted=False
+    )
+    if not processes:
+        return _fail("❌ Failed to parse process list", output)
+    return ToolResult(success=True, data=processes)
+
+
+def _parse_logs(output: ProbeOutput, _host: str) -> ToolResult[Any]:
+    source, _, body = output.stdout.partition("\n")
+    lines = [line for line in body.strip().split("\n") if line]
+    return ToolResult(
+        success=True,
+        data={"lines": lines, "count": len(lines), "source": source.strip() or "none"},
+    )
+
+
+# =============================================================================
+# Section scripts
+# =============================================================================
+
+_SYSTEM_INFO_SCRIPT = "\n".join(
+    f"printf '%s=%s\\n' {key} \"$({{ {cmd}; }} 2>/dev/null | head -n 1)\""
+    for key, cmd in SYSTEM_INFO_COMMANDS.items()
+)
+
+_MEMORY_SCRIPT = """
+if [ -r /proc/meminfo ]; then cat /proc/meminfo
+elif command -v free >/dev/null 2>&1; then free -b
+else vm_stat
+fi
+"""
+
+_CPU_SCRIPT = """
+if [ -r /proc/loadavg ]; then
+    cat /proc/loadavg
+    nproc 2>/dev/null || grep -c ^processor /proc/cpuinfo
+elif ! sysctl -n vm.loadavg hw.ncpu 2>/dev/null; then
+    uptime
+    nproc 2>/dev/null || sysctl -n hw.ncpu 2>/dev/null || echo 1
+fi
+"""
+
+_DISKS_SCRIPT = (
+    f"df -Pk {' '.join(f'--exclude-type={t}' for t in DEFAULT_EXCLUDE_TYPES)} 2>/dev/null || df -Pk"
+)
+
+_SERVICES_SCRIPT = f"""
+if command -v systemctl >/dev/null 2>&1; then
+    echo systemd
+    {_list_services_command(OSFamily.LINUX_GENERIC, "running")}
+elif command -v rc-status >/dev/null 2>&1; then
+    echo openrc
+    {_list_services_command(OSFamily.LINUX_ALPINE, "running")}
+elif command -v launchctl >/dev/null 2>&1; then
+    echo launchd
+    {_list_services_command(OSFamily.MACOS, "running")}
+fi
+"""
+
+_CRON_SCRIPT = """
+crontab -l 2>/dev/null | sed 's/^/current|/'
+crontab -u root -l 2>/dev/null | sed 's/^/root|/'
+cat /etc/crontab 2>/dev/null | sed 's|^|/etc/crontab\\||'
+cat /etc/cron.d/* 2>/dev/null | sed 's|^|/etc/cron.d/\\||'
+"""
+
+_PROCESSES_SCRIPT = "ps aux --sort=-%cpu 2>/dev/null || ps aux"
+
+_LOGS_SCRIPT = """
+out=$(journalctl -p err -n 20 --no-pager -q 2>/dev/null)
+if [ -n "$out" ]; then
+    echo journalctl
+    printf '%s\\n' "$out"
+    exit 0
+fi
+for f in /var/log/syslog /var/log/messages; do
+    out=$(tail -n 100 "$f" 2>/dev/null | grep -iE '(error|fail|critical)' | tail -n 20)
+    if [ -n "$out" ]; then
+        echo "$f"
+        printf '%s\\n' "$out"
+        exit 0
+    fi
+done
+echo none
+"""
+
+PROBES: dict[str, Probe] = {
+    probe.name: probe
+    for probe in (
+        Probe("system_info", _SYSTEM_INFO_SCRIPT, _parse_system_info),
+        Probe("memory", _MEMORY_SCRIPT, _parse_memory),
+        Probe("cpu", _CPU_SCRIPT, _parse_cpu),
+        Probe(
+            "health",
+            f"{HEALTH_SCRIPT}echo '---SERVICES---'{CRITICAL_SERVICES_SCRIPT}",
+            _parse_health,
+        ),
+        Probe("disk", "df -Pk / | tail -1", _parse_disk),
+        Probe("disks", _DISKS_SCRIPT, _parse_disks),
+        Probe("docker", DOCKER_SCRIPT, _parse_docker),
+        Probe("services", _SERVICES_SCRIPT, _parse_services),
+        Probe("cron", _CRON_SCRIPT, _parse_cron),
+        Probe("processes", _PROCESSES_SCRIPT, _parse_processes),
+        Probe("logs", _LOGS_SCRIPT, _parse_logs),
+    )
+}
+
+
+# =============================================================================
+# Bundle
+# =============================================================================
+
+
+def build_bundle_script(names: Iterable[str], marker: str) -> str:
+    """
+    Compile probes into one POSIX shell script.
+
+    Each probe runs in its own subshell (so `exit` or a failure only ends
+    that section) between `<marker> begin <name>` and
+    `<marker> end <name> <exit code>` lines.
+
+    Args:
+        names: Probe names (see PROBES).
+        marker: Delimiter token that cannot appear in the probes' output.
+
+    Returns:
+        Shell script.
+    """
+    parts = ["LANG=C; LC_ALL=C; export LANG LC_ALL"]
+    for name in names:
+        parts.append(
+            f"echo '{marker} begin {name}'\n"
+            f"(\n{PROBES[name].script.strip()}\n) 2>/dev/null </dev/null\n"
+            f"printf '\\n{marker} end {name} %s\\n' \"$?\""
+        )
+    return "\n".join(parts) + "\n"
+
+
+def split_bundle_output(output: str, marker: str) -> dict[str, ProbeOutput]:
+    """
+    Split bundle output into per-probe sections.
+
+    Sections cut short (e.g. by a timeout) are left out.
+    """
+    pattern = re.compile(
+        rf"^{re.escape(marker)} begin (\S+)\n(.*?)\n{re.escape(marker)} end \1 (\d+)$",
+        re.MULTILINE | re.DOTALL,
+    )
+    return {
+        match.group(1): ProbeOutput(stdout=match.group(2), exit_code=int(match.group(3)))
+        for match in pattern.finditer(output)
+    }
+
+
+async def run_probe_bundle(
+    ctx: SharedContext,
+    host: str,
+    names: Iterable[str],
+    timeout: int = DEFAULT_BUNDLE_TIMEOUT,
+) -> dict[str, ToolResult[Any]]:
+    """
+    Run several checks on a host over one SSH channel.
+
+    Args:
+        ctx: Shared context.
+        host: Host name.
+        names: Probe names (see PROBES); unknown names are ignored.
+        timeout: Timeout for the whole bundle in seconds.
+
+    Returns:
+        Results by probe name, in the format of the matching tool. Probes
+        missing from the output (bundle failed or timed out) are left out,
+        so the caller can fall back to the individual tools.
+    """
+    selected = [name for name in names if name in PROBES]
+    if not selected:
+        return {}
+
+    marker = f"@@merlya-{secrets.token_hex(6)}"
+    script = build_bundle_script(selected, marker)
+    try:
+        result = await execute_security_command(ctx, host, script, timeout=timeout)
+    except Exception as e:
+        logger.debug(f"📦 Probe bundle failed on {host}: {e}")
+        return {}
+
+    sections = split_bundle_output(result.stdout or "", marker)
+    results: dict[str, ToolResult[Any]] = {}
+    for name in selected:
+        section = sections.get(name)
+        if section is None:
+            continue
+        try:
+            results[name] = PROBES[name].parse(section, host)
+        except Exception as e:
+            logger.debug(f"📦 Probe '{name}' output not parsed on {host}: {e}")
+
+    logger.debug(f"📦 Probe bundle on {host}: {len(results)}/{len(selected)} sections")
+    return results
+
+
+__all__ = [
+    "PROBES",
+    "Probe",
+    "ProbeOutput",
+    "build_bundle_script",
+    "run_probe_bundle",
+    "split_bundle_output",
+]
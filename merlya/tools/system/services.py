@@ -152,36 +152,7 @@ async def list_services(
     """
     os_info = await detect_os(ctx, host)
 
-    if os_info.family == OSFamily.MACOS:
-        # macOS uses launchctl
-        if filter_state == "running":
-            cmd = "launchctl list | grep -v '^-'"
-        elif filter_state == "stopped":
-            cmd = "launchctl list | grep '^-'"
-        elif filter_state == "failed":
-            cmd = "launchctl list"
-        else:
-            cmd = "launchctl list"
-    elif os_info.family in (OSFamily.LINUX_ALPINE,):
-        # Alpine uses OpenRC
-        if filter_state == "running":
-            cmd = "rc-status -a | grep -E '^\\[.*\\]\\s+started'"
-        elif filter_state == "stopped":
-            cmd = "rc-status -a | grep -E '^\\[.*\\]\\s+stopped'"
-        elif filter_state == "failed":
-            cmd = "rc-status -a | grep -E '^\\[.*\\]\\s+failed'"
-        else:
-            cmd = "rc-status -a"
-    else:
-        # systemd
-        if filter_state == "running":
-            cmd = "systemctl list-units --type=service --state=running --no-pager --no-legend"
-        elif filter_state == "stopped":
-            cmd = "systemctl list-units --type=service --state=inactive --no-pager --no-legend"
-        elif filter_state == "failed":
-            cmd = "systemctl list-units --type=service --state=failed --no-pager --no-legend"
-        else:
-            cmd = "systemctl list-units --type=service --no-pager --no-legend"
+    cmd = _list_services_command(os_info.family, filter_state)
 
     result = await execute_security_command(ctx, host, f"LANG=C {cmd}", timeout=30)
 
@@ -204,6 +175,32 @@ async def list_services(
     )
 
 
+def _list_services_command(
+    os_family: OSFamily,
+    filter_state: Literal["running", "stopped", "failed", "all"],
+) -> str:
+    """Build the service listing command for the OS."""
+    if os_family == OSFamily.MACOS:
+        # macOS uses launchctl
+        launchctl_filters = {
+            "running": "launchctl list | grep -v '^-'",
+            "stopped": "launchctl list | grep '^-'",
+        }
+        return launchctl_filters.get(filter_state, "launchctl list")
+
+    if os_family == OSFamily.LINUX_ALPINE:
+        # Alpine uses OpenRC
+        rc_states = {"running": "started", "stopped": "stopped", "failed": "failed"}
+        if filter_state in rc_states:
+            return f"rc-status -a | grep -E '^\\[.*\\]\\s+{rc_states[filter_state]}'"
+        return "rc-status -a"
+
+    # Default: systemd
+    systemd_states = {"running": "running", "stopped": "inactive", "failed": "failed"}
+    state = f" --state={systemd_states[filter_state]}" if filter_state in systemd_states else ""
+    return f"systemctl list-units --type=service{state} --no-pager --no-legend"
+
+
 def _is_valid_service_name(name: str) -> bool:
     """Validate service name to prevent command injection."""
     import re
@@ -8,7 +8,7 @@ from __future__ import annotations
 
 import asyncio
 from contextlib import contextmanager, suppress
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from prompt_toolkit import PromptSession
 from rich.console import Console
@@ -16,16 +16,22 @@ from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.progress import (
     BarColumn,
+    DownloadColumn,
     Progress,
     SpinnerColumn,
     TextColumn,
     TimeElapsedColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
 )
 from rich.table import Table
 from rich.theme import Theme
 
 from merlya.core.types import CheckStatus
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
 # Merlya brand color: #40C4E0 (sky blue)
 ACCENT_COLOR = "sky_blue2"
 MERLYA_THEME = Theme(
@@ -198,6 +204,48 @@ class ConsoleUI:
             expand=True,
         )
 
+    @contextmanager
+    def transfer_progress(
+        self, description: str, total: int
+    ) -> Iterator[Callable[[int, int], None]]:
+        """
+        Show a byte progress bar (size, speed, ETA) for a file transfer.
+
+        Pauses the active spinner while the bar is displayed.
+
+        Usage:
+            with ui.transfer_progress("📥 dump.gz", size) as on_progress:
+                await pool.download_file(..., transfer=SFTPTransferOptions(on_progress=on_progress))
+        """
+        status = self._active_status
+        if status is not None:
+            with suppress(Exception):
+                status.stop()
+
+        progress = Progress(
+            SpinnerColumn(style=ACCENT_COLOR),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(bar_width=None, pulse_style=ACCENT_COLOR),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            TimeRemainingColumn(),
+            console=self.console,
+            transient=True,
+            expand=True,
+        )
+        task = progress.add_task(description, total=total or None)
+
+        def update(done: int, total_bytes: int) -> None:
+            progress.update(task, completed=done, total=total_bytes or None)
+
+        try:
+            with progress:
+                yield update
+        finally:
+            if status is not None and self._active_status is status:
+                with suppress(Exception):
+                    status.start()
+
     async def prompt(self, message: str, default: str | None = "") -> str:
         """Prompt for input (async-safe with mutex to prevent overlap)."""
         # In auto_confirm/non-interactive mode, return default or raise error
@@ -33,7 +33,7 @@ async def test_agent_persists_conversation() -> None:
     """Agent should create and update a conversation with message history."""
     ctx = MagicMock()
     ctx.conversations.create = AsyncMock(side_effect=lambda conv: conv)
-    ctx.conversations.update = AsyncMock(return_value=None)
+    ctx.conversations.append_messages = AsyncMock(return_value=None)
 
     agent = MerlyaAgent(ctx, model="test:model")
     agent._agent.run = AsyncMock(return_value=_StubResult("Hello back"))  # type: ignore[attr-defined]
@@ -43,7 +43,7 @@ async def test_agent_persists_conversation() -> None:
     assert response.message == "Hello back"
     assert agent._active_conversation is not None
     ctx.conversations.create.assert_called_once()
-    ctx.conversations.update.assert_called()
+    ctx.conversations.append_messages.assert_called_once()
     # Now using ModelMessage format - should have request + response
     assert len(agent._message_history) == 2
 
@@ -55,13 +55,13 @@ async def test_agent_load_conversation_reuses_history() -> None:
 
     ctx = MagicMock()
     ctx.conversations.create = AsyncMock()
-    ctx.conversations.update = AsyncMock()
+    ctx.conversations.append_messages = AsyncMock()
 
     # Create messages in the new format (serialized)
     original_messages = _make_messages("hi", "hello there")
     serialized = ModelMessagesTypeAdapter.dump_python(original_messages, mode="json")
 
-    conv = Conversation(title="Existing", messages=serialized)
+    conv = Conversation(title="Existing", messages=serialized, message_count=2)
 
     agent = MerlyaAgent(ctx, model="test:model")
     agent.load_conversation(conv)
@@ -91,18 +91,40 @@ async def test_agent_load_conversation_reuses_history() -> None:
 
     # Should not create a new conversation
     ctx.conversations.create.assert_not_called()
-    ctx.conversations.update.assert_called_once()
+    ctx.conversations.append_messages.assert_called_once()
+    # Only the messages added this turn are written
+    assert len(ctx.conversations.append_messages.call_args.args[1]) == 2
 
     # History should now have 4 messages (original 2 + new 2)
     assert len(agent._message_history) == 4
 
 
+@pytest.mark.asyncio
+async def test_agent_rewrites_truncated_history() -> None:
+    """History shrunk by the history processor should be rewritten, not appended."""
+    ctx = MagicMock()
+    ctx.conversations.create = AsyncMock(side_effect=lambda conv: conv)
+    ctx.conversations.append_messages = AsyncMock()
+    ctx.conversations.replace_messages = AsyncMock()
+
+    agent = MerlyaAgent(ctx, model="test:model")
+    agent._agent.run = AsyncMock(return_value=_StubResult("first", "one"))  # type: ignore[attr-defined]
+    await agent.run("one")
+
+    # Next run returns a history that no longer starts with the stored messages
+    agent._agent.run = AsyncMock(return_value=_StubResult("second", "two"))  # type: ignore[attr-defined]
+    await agent.run("two")
+
+    ctx.conversations.append_messages.assert_called_once()
+    ctx.conversations.replace_messages.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_agent_clear_history() -> None:
     """Clearing history should reset message history and conversation."""
     ctx = MagicMock()
     ctx.conversations.create = AsyncMock(side_effect=lambda conv: conv)
-    ctx.conversations.update = AsyncMock(return_value=None)
+    ctx.conversations.append_messages = AsyncMock(return_value=None)
 
     agent = MerlyaAgent(ctx, model="test:model")
     agent._agent.run = AsyncMock(return_value=_StubResult("Hello"))  # type: ignore[attr-defined]
@@ -2,9 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
+import csv
+import gzip
+import json
+from unittest.mock import patch
+
 import pytest
 
-from merlya.audit.logger import AuditEvent, AuditEventType, AuditLogger
+from merlya.audit import storage
+from merlya.audit.export import export_events
+from merlya.audit.logger import AuditEvent, AuditEventType, AuditLogger, close_audit_logger
+from merlya.audit.writer import AuditWriter
+from merlya.core.metrics import get_registry, reset_metrics
+
+
+def _event(n: int) -> AuditEvent:
+    return AuditEvent(event_type=AuditEventType.COMMAND_EXECUTED, action=f"cmd-{n}")
+
+
+async def _stored_count(database) -> int:
+    async with await database.execute("SELECT COUNT(*) FROM audit_logs") as cursor:
+        row = await cursor.fetchone()
+    return row[0]
 
 
 class TestAuditEvent:
@@ -231,6 +251,40 @@ class TestAuditLoggerWithDatabase:
         assert len(events) == 2
         assert all(e["event_type"] == "command_executed" for e in events)
 
+    @pytest.mark.asyncio
+    async def test_search(self, database) -> None:
+        """Test full-text search over action, target and details."""
+        AuditLogger.reset_instance()
+        logger = AuditLogger(enabled=True)
+        await logger.initialize(db=database)
+
+        await logger.log_command("systemctl restart nginx", "web-01")
+        await logger.log_command("df -h", "db-01")
+        await logger.log_skill("disk_audit", ["db-01"], task="check nginx logs")
+
+        events = await logger.search("ngin")
+        assert {e["event_type"] for e in events} == {"command_executed", "skill_invoked"}
+        assert any("**nginx**" in e["snippet"] for e in events)
+
+        commands = await logger.search("db", event_type=AuditEventType.COMMAND_EXECUTED)
+        assert [e["action"] for e in commands] == ["df -h"]
+
+    @pytest.mark.asyncio
+    async def test_search_backfills_existing_events(self, database) -> None:
+        """Test events stored before the index existed become searchable."""
+        AuditLogger.reset_instance()
+        logger = AuditLogger(enabled=True)
+        await logger.initialize(db=database)
+        await logger.log_command("uptime", "web-01")
+        await logger.flush()
+        await database.execute("DROP TABLE audit_fts")
+
+        AuditLogger.reset_instance()
+        logger = AuditLogger(enabled=True)
+        await logger.initialize(db=database)
+
+        assert [e["target"] for e in await logger.search("uptime")] == ["web-01"]
+
 
 class TestAuditLoggerLimitValidation:
     """Tests for limit validation in get_recent()."""
@@ -276,3 +330,255 @@ class TestAuditLoggerLimitValidation:
         await logger.get_recent(limit=1)
         await logger.get_recent(limit=50)
         await logger.get_recent(limit=1000)
+
+
+class TestAuditWriter:
+    """Tests for the group-commit audit writer."""
+
+    @pytest.fixture
+    async def db(self, database):
+        """Database with the audit tables."""
+        await storage.ensure_table(database)
+        return database
+
+    @pytest.mark.asyncio
+    async def test_events_are_group_committed(self, db) -> None:
+        """Test that queued events are written N per transaction."""
+        reset_metrics()
+        writer = AuditWriter(db, batch_size=10, flush_interval=10.0)
+        with patch("merlya.audit.writer.store_events", wraps=storage.store_events) as spy:
+            for i in range(25):
+                await writer.put(_event(i))
+            assert await writer.flush()
+
+        assert [len(c.args[1]) for c in spy.await_args_list] == [10, 10, 5]
+        assert await _stored_count(db) == 25
+        registry = get_registry().get_all()
+        assert registry["histograms"]["merlya_audit_flush_seconds"]["count"] == 3
+        assert registry["gauges"]["merlya_audit_queue_depth"] == 0
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_interval(self, db) -> None:
+        """Test that a partial batch is written after flush_interval."""
+        writer = AuditWriter(db, batch_size=100, flush_interval=0.01)
+        await writer.put(_event(1))
+
+        for _ in range(50):
+            if await _stored_count(db):
+                break
+            await asyncio.sleep(0.01)
+
+        assert await _stored_count(db) == 1
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_applies_backpressure(self, db) -> None:
+        """Test that put() waits while the queue is full instead of dropping."""
+        release = asyncio.Event()
+
+        async def slow_store(database, events):
+            await release.wait()
+            await storage.store_events(database, events)
+
+        writer = AuditWriter(db, batch_size=1, flush_interval=0, max_queue=2)
+        with patch("merlya.audit.writer.store_events", side_effect=slow_store):
+
+            async def produce() -> None:
+                for i in range(6):
+                    await writer.put(_event(i))
+
+            producer = asyncio.create_task(produce())
+            await asyncio.sleep(0.05)
+            assert not producer.done()
+            assert writer.pending == 3  # One batch in flight plus a full queue
+
+            release.set()
+            await producer
+            await writer.close()
+
+        assert await _stored_count(db) == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried(self, db) -> None:
+        """Test that a batch that fails to commit is retried, not dropped."""
+        calls = 0
+
+        async def flaky_store(database, events):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("database is locked")
+            await storage.store_events(database, events)
+
+        writer = AuditWriter(db, retry_delay=0)
+        with patch("merlya.audit.writer.store_events", side_effect=flaky_store):
+            await writer.put(_event(1))
+            await writer.put(_event(2))
+            assert await writer.flush(timeout=5)
+
+        assert calls == 2
+        assert await _stored_count(db) == 2
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_broken_database_releases_callers_and_raises(self, db) -> None:
+        """Test that a database failing past failure_timeout never blocks put() forever."""
+        reset_metrics()
+        broken = True
+
+        async def store(database, events):
+            if broken:
+                raise RuntimeError("disk I/O error")
+            await storage.store_events(database, events)
+
+        writer = AuditWriter(
+            db, batch_size=1, flush_interval=0, max_queue=2, retry_delay=0.01, failure_timeout=0.1
+        )
+        with patch("merlya.audit.writer.store_events", side_effect=store):
+
+            async def produce() -> int:
+                raised = 0
+                for i in range(6):
+                    try:
+                        await writer.put(_event(i))
+                    except RuntimeError:
+                        raised += 1
+                return raised
+
+            # Callers blocked on the full queue are released once batches are given up
+            raised = await asyncio.wait_for(produce(), timeout=5)
+            await writer.flush(timeout=5)
+            assert writer.failed
+            assert writer.pending == 0
+            counters = get_registry().get_all()["counters"]
+            # Every event was either reported to its caller or counted as lost
+            assert counters["merlya_audit_events_dropped_total"]["value"] == 6
+            assert raised < 6
+
+            # New events surface the storage error to the caller
+            with pytest.raises(RuntimeError, match="disk I/O error"):
+                await writer.put(_event(6))
+
+            # Once the database recovers, put() succeeds and batching resumes
+            broken = False
+            await writer.put(_event(7))
+            assert not writer.failed
+            await writer.put(_event(8))
+            assert await writer.flush(timeout=5)
+
+        assert await _stored_count(db) == 2
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_reports_dropped_events(self, db) -> None:
+        """Test that flush() returns False when queued events were given up."""
+        writer = AuditWriter(db, retry_delay=0.01, failure_timeout=0)
+        with patch("merlya.audit.writer.store_events", side_effect=RuntimeError("readonly")):
+            await writer.put(_event(1))
+            assert not await writer.flush(timeout=5)
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_audit_logger_flushes(self, database) -> None:
+        """Test that shutdown writes events still queued."""
+        AuditLogger.reset_instance()
+        logger = await AuditLogger.get_instance()
+        await logger.initialize(db=database)
+        await logger.log_command("uptime", "web-01")
+        assert await _stored_count(database) == 0  # Still queued
+
+        await close_audit_logger()
+
+        assert await _stored_count(database) == 1
+        AuditLogger.reset_instance()
+
+
+class TestAuditExport:
+    """Tests for keyset-paginated streaming export."""
+
+    @pytest.fixture
+    async def db(self, database):
+        """Database with events for two targets, one of them failed."""
+        await storage.ensure_table(database)
+        events = [
+            AuditEvent(
+                event_type=AuditEventType.COMMAND_EXECUTED,
+                action=f"cmd-{i}",
+                target="web-01" if i % 2 else "db-01",
+                details={"n": i},
+                success=i != 3,
+            )
+            for i in range(7)
+        ]
+        events.append(AuditEvent(event_type=AuditEventType.SKILL_INVOKED, action="disk_audit"))
+        await storage.store_events(database, events)
+        return database
+
+    @pytest.mark.asyncio
+    async def test_iter_events_pages_by_keyset(self, db) -> None:
+        """Test that small pages cover every event once, in (created_at, id) order."""
+        with patch.object(storage, "get_events_page", wraps=storage.get_events_page) as spy:
+            events = [e async for e in storage.iter_events(db, page_size=3)]
+
+        assert spy.await_count == 3
+        keys = [(e["created_at"], e["id"]) for e in events]
+        assert keys == sorted(set(keys))
+        assert len(keys) == 8
+        assert [e["id"] async for e in storage.iter_events(db, limit=5, page_size=2)] == [
+            e["id"] for e in events[:5]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_filters(self, db) -> None:
+        """Test target, event type and success filters."""
+        web = [e async for e in storage.iter_events(db, target="web-01", page_size=2)]
+        failed = [e async for e in storage.iter_events(db, success=False)]
+        skills = [e async for e in storage.iter_events(db, event_type=AuditEventType.SKILL_INVOKED)]
+
+        assert sorted(e["action"] for e in web) == ["cmd-1", "cmd-3", "cmd-5"]
+        assert [e["action"] for e in failed] == ["cmd-3"]
+        assert [e["action"] for e in skills] == ["disk_audit"]
+
+    @pytest.mark.asyncio
+    async def test_filters_use_composite_indexes(self, db) -> None:
+        """Test that filtered pages are index range scans."""
+        async with await db.execute(
+            """
+            EXPLAIN QUERY PLAN
+            SELECT * FROM audit_logs WHERE target = ? AND (created_at, id) > (?, ?)
+            ORDER BY created_at, id LIMIT 10
+            """,
+            ("web-01", "", ""),
+        ) as cursor:
+            plan = " ".join(row["detail"] for row in await cursor.fetchall())
+
+        assert "idx_audit_logs_target_created" in plan
+        assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.asyncio
+    async def test_export_ndjson_gzip(self, db, tmp_path) -> None:
+        """Test NDJSON export with gzip compression."""
+        path = tmp_path / "audit.ndjson.gz"
+
+        count = await export_events(db, path, "ndjson", compress=True, target="db-01")
+
+        with gzip.open(path, "rt") as f:
+            records = [json.loads(line) for line in f]
+        assert count == len(records) == 4
+        assert {r["target"] for r in records} == {"db-01"}
+        assert sorted(r["details"]["n"] for r in records) == [0, 2, 4, 6]
+        assert not (tmp_path / "audit.ndjson.gz.part").exists()
+
+    @pytest.mark.asyncio
+    async def test_export_csv(self, db, tmp_path) -> None:
+        """Test CSV export of failed events."""
+        path = tmp_path / "audit.csv"
+
+        assert await export_events(db, path, "csv", success=False) == 1
+
+        with path.open(newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [(r["action"], r["severity"], json.loads(r["details"])) for r in rows] == [
+            ("cmd-3", "WARNING", {"n": 3})
+        ]
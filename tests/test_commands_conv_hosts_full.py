@@ -75,6 +75,7 @@ def mock_conversations_repo(mock_context: MagicMock) -> MagicMock:
         id="conv-123",
         title="Test conversation",
         messages=[{"role": "user", "content": "Hello"}],
+        message_count=1,
         created_at=datetime.now(),
         updated_at=datetime.now(),
     )
@@ -86,6 +87,8 @@ def mock_conversations_repo(mock_context: MagicMock) -> MagicMock:
     mock_context.conversations.update = AsyncMock(return_value=test_conv)
     mock_context.conversations.delete = AsyncMock(return_value=True)
     mock_context.conversations.search = AsyncMock(return_value=[test_conv])
+    mock_context.conversations.get_messages = AsyncMock(return_value=test_conv.messages)
+    mock_context.conversations.get_by_prefix = AsyncMock(return_value=[test_conv])
 
     return mock_context.conversations
 
@@ -409,3 +412,62 @@ class TestHostsExportCommand:
             # Should fail when there are no hosts to export
             assert result.success is False
             assert "No hosts" in result.message
+
+
+class TestHostsCheckParallel:
+    """Tests for /hosts check --parallel fan-out."""
+
+    async def test_parallel_check_streams_results(self, mock_context: MagicMock):
+        """Progress follows completion order, results keep inventory order."""
+        import asyncio
+
+        from merlya.commands.handlers.hosts.check import check_hosts_parallel
+        from merlya.persistence.models import Host
+        from merlya.ssh import SSHExecuteOptions, SSHPool, SSHResult
+
+        delays = {"10.0.0.1": 0.05, "10.0.0.2": 0.0, "10.0.0.3": 0.01}
+
+        class FakePool(SSHPool):
+            async def execute(  # type: ignore[override]
+                self, host: str, command: str, exec_options: SSHExecuteOptions | None = None
+            ) -> SSHResult:
+                assert exec_options is not None and exec_options.retry is False
+                await asyncio.sleep(delays[host])
+                if host == "10.0.0.3":
+                    raise ConnectionError("refused")
+                return SSHResult(stdout="ok\nLinux", stderr="", exit_code=0)
+
+        mock_context.get_ssh_pool = AsyncMock(return_value=FakePool())
+        hosts = [
+            Host(name=f"h{i}", hostname=f"10.0.0.{i}", port=22, username="admin") for i in (1, 2, 3)
+        ]
+
+        results = await check_hosts_parallel(mock_context, hosts)
+
+        assert [r["host"].name for r in results] == ["h1", "h2", "h3"]
+        assert results[0]["result"]["success"] is True
+        assert results[0]["result"]["os_info"] == "Linux"
+        assert results[2]["result"] == {
+            "success": False,
+            "latency_ms": None,
+            "os_info": None,
+            "error": "refused",
+        }
+        progress = [c.args[0] for c in mock_context.ui.muted.call_args_list]
+        assert progress == [
+            "  [1/3] h2: ok",
+            "  [2/3] h3: unreachable",
+            "  [3/3] h1: ok",
+        ]
+
+    async def test_parallel_check_without_pool(self, mock_context: MagicMock):
+        """Every host is reported unreachable when the pool is unavailable."""
+        from merlya.commands.handlers.hosts.check import check_hosts_parallel
+        from merlya.persistence.models import Host
+
+        mock_context.get_ssh_pool = AsyncMock(side_effect=RuntimeError("no pool"))
+        hosts = [Host(name="h1", hostname="10.0.0.1"), Host(name="h2", hostname="10.0.0.2")]
+
+        results = await check_hosts_parallel(mock_context, hosts)
+
+        assert [r["result"]["error"] for r in results] == ["no pool", "no pool"]
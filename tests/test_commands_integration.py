@@ -133,6 +133,7 @@ def mock_conversations_repo(mock_context: MagicMock) -> MagicMock:
         id="conv-123",
         title="Test conversation",
         messages=[{"role": "user", "content": "Hello"}],
+        message_count=1,
         created_at=datetime.now(),
         updated_at=datetime.now(),
     )
@@ -144,6 +145,8 @@ def mock_conversations_repo(mock_context: MagicMock) -> MagicMock:
     mock_context.conversations.update = AsyncMock(return_value=test_conv)
     mock_context.conversations.delete = AsyncMock(return_value=True)
     mock_context.conversations.search = AsyncMock(return_value=[test_conv])
+    mock_context.conversations.get_messages = AsyncMock(return_value=test_conv.messages)
+    mock_context.conversations.get_by_prefix = AsyncMock(return_value=[test_conv])
 
     return mock_context.conversations
 
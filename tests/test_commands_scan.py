@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from merlya.commands.handlers.scan_format import ScanResult, parse_scan_args
 from merlya.commands.handlers.system import cmd_scan
 from merlya.persistence.models import Host
+from merlya.persistence.repositories import ScanCacheRepository
+
+if TYPE_CHECKING:
+    from merlya.persistence.database import Database
 
 
 class TestScanCommand:
@@ -90,3 +96,70 @@ class TestScanValidation:
 
         # @ stripped becomes empty
         assert not result.success
+
+
+class TestScanCache:
+    """Tests for serving /scan sections from the scan cache."""
+
+    @pytest.fixture
+    def host(self) -> Host:
+        return Host(name="web-01", hostname="10.0.0.1", username="admin")
+
+    @pytest.fixture
+    def ctx(self, host: Host, database: Database) -> MagicMock:
+        ctx = MagicMock()
+        ctx.hosts.get_by_name = AsyncMock(return_value=host)
+        ctx.config.ssh.connect_timeout = 10
+        ctx.get_ssh_pool = AsyncMock()
+        ctx.scan_cache = ScanCacheRepository(database)
+        return ctx
+
+    @pytest.fixture
+    def scanner(self) -> AsyncMock:
+        async def scan(_ctx, _host, result: ScanResult, _opts, _sem) -> None:
+            result.sections["system"] = {"disk": {"use_percent": 95}}
+            result.issues.append({"severity": "critical", "message": "Disk full"})
+            result.critical_count += 1
+
+        with patch(
+            "merlya.commands.handlers.system._scan_system_parallel", side_effect=scan
+        ) as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_second_scan_served_from_cache(self, ctx: MagicMock, scanner: AsyncMock) -> None:
+        """Test a repeated scan neither connects nor rescans."""
+        first = await cmd_scan(ctx, ["web-01", "--system"])
+        ctx.get_ssh_pool.reset_mock()
+        second = await cmd_scan(ctx, ["web-01", "--system"])
+
+        assert scanner.await_count == 1
+        ctx.get_ssh_pool.assert_not_awaited()
+        assert second.data.sections == first.data.sections
+        assert second.data.critical_count == 1
+        assert "system" in second.data.cached
+        assert first.data.cached == {}
+
+    @pytest.mark.asyncio
+    async def test_fresh_bypasses_cache(self, ctx: MagicMock, scanner: AsyncMock) -> None:
+        """Test --fresh rescans and refreshes the cached entry."""
+        await cmd_scan(ctx, ["web-01", "--system"])
+        result = await cmd_scan(ctx, ["web-01", "--system", "--fresh"])
+
+        assert scanner.await_count == 2
+        assert result.data.cached == {}
+
+    @pytest.mark.asyncio
+    async def test_options_are_part_of_the_key(self, ctx: MagicMock, scanner: AsyncMock) -> None:
+        """Test a scan with different options does not reuse the cached section."""
+        await cmd_scan(ctx, ["web-01", "--system"])
+        await cmd_scan(ctx, ["web-01", "--system", "--no-docker"])
+
+        assert scanner.await_count == 2
+
+    def test_fresh_flag_parsed(self) -> None:
+        """Test --fresh is an option, not a host."""
+        hosts, opts = parse_scan_args(["web-01", "--fresh"])
+
+        assert hosts == ["web-01"]
+        assert opts.fresh
@@ -7,10 +7,13 @@ Tests HostsSummary, HostDetails, GroupSummary and async functions.
 from __future__ import annotations
 
 from datetime import UTC
+from typing import TYPE_CHECKING
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from merlya.persistence.models import Host
+from merlya.persistence.repositories import HostRepository
 from merlya.tools.context.tools import (
     GroupSummary,
     HostDetails,
@@ -21,6 +24,9 @@ from merlya.tools.context.tools import (
     list_hosts_summary,
 )
 
+if TYPE_CHECKING:
+    from merlya.persistence.database import Database
+
 
 class TestHostsSummary:
     """Tests for HostsSummary dataclass."""
@@ -305,31 +311,36 @@ class TestGroupSummary:
         # Should not crash on division by zero
 
 
+async def _inventory(database: Database, specs: list[tuple[str, str, list[str]]]) -> MagicMock:
+    """Context whose host repository holds hosts (name, health_status, tags)."""
+    repo = HostRepository(database)
+    for i, (name, status, tags) in enumerate(specs):
+        await repo.create(Host(name=name, hostname=f"10.0.0.{i + 1}", tags=tags))
+        # Raw status values ("unhealthy", "failed") may predate HostStatus
+        await database.execute("UPDATE hosts SET health_status = ? WHERE name = ?", (status, name))
+    await database.commit()
+    ctx = MagicMock()
+    ctx.hosts = repo
+    return ctx
+
+
 class TestListHostsSummary:
     """Tests for list_hosts_summary function."""
 
     @pytest.fixture
-    def mock_hosts(self):
-        """Create mock host objects."""
-        hosts = []
-        for i in range(5):
-            host = MagicMock()
-            host.name = f"web-{i + 1:02d}"
-            host.health_status = "healthy" if i < 4 else "unhealthy"
-            host.tags = ["production", "web"] if i < 3 else ["staging"]
-            hosts.append(host)
-        return hosts
-
-    @pytest.fixture
-    def mock_context(self, mock_hosts):
-        """Create a mock context with hosts repository."""
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=mock_hosts)
-        ctx.hosts.get_by_tag = AsyncMock(
-            return_value=[h for h in mock_hosts if "production" in h.tags]
+    async def mock_context(self, database: Database) -> MagicMock:
+        """Create a context with five hosts in the repository."""
+        return await _inventory(
+            database,
+            [
+                (
+                    f"web-{i + 1:02d}",
+                    "healthy" if i < 4 else "unhealthy",
+                    ["production", "web"] if i < 3 else ["staging"],
+                )
+                for i in range(5)
+            ],
         )
-        return ctx
 
     @pytest.mark.asyncio
     async def test_list_hosts_summary_basic(self, mock_context):
@@ -340,14 +351,16 @@ class TestListHostsSummary:
         assert summary.healthy_count == 4
         assert summary.unhealthy_count == 1
         assert len(summary.sample_hosts) == 5
+        assert summary.by_tag == {"production": 3, "web": 3, "staging": 2}
+        assert summary.by_status == {"healthy": 4, "unhealthy": 1}
 
     @pytest.mark.asyncio
     async def test_list_hosts_summary_with_tag_filter(self, mock_context):
         """Test host summary with tag filter."""
         summary = await list_hosts_summary(mock_context, tag="production")
 
-        mock_context.hosts.get_by_tag.assert_called_once_with("production")
         assert summary.total_count == 3
+        assert summary.sample_hosts == ["web-01", "web-02", "web-03"]
 
     @pytest.mark.asyncio
     async def test_list_hosts_summary_with_status_filter(self, mock_context):
@@ -356,13 +369,12 @@ class TestListHostsSummary:
 
         # Should filter to only healthy hosts
         assert summary.total_count == 4
+        assert summary.by_tag["staging"] == 1
 
     @pytest.mark.asyncio
-    async def test_list_hosts_summary_empty(self):
+    async def test_list_hosts_summary_empty(self, database: Database):
         """Test host summary with no hosts."""
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=[])
+        ctx = await _inventory(database, [])
 
         summary = await list_hosts_summary(ctx)
 
@@ -447,29 +459,18 @@ class TestListGroups:
     """Tests for list_groups function."""
 
     @pytest.fixture
-    def mock_hosts_with_tags(self):
-        """Create mock hosts with various tags."""
-        hosts = []
+    async def mock_context(self, database: Database) -> MagicMock:
+        """Create a context with hosts carrying various tags."""
+        specs = []
         for i in range(10):
-            host = MagicMock()
-            host.name = f"host-{i + 1:02d}"
-            host.health_status = "healthy" if i < 8 else "unhealthy"
             if i < 5:
-                host.tags = ["production", "web"]
+                tags = ["production", "web"]
             elif i < 8:
-                host.tags = ["production", "db"]
+                tags = ["production", "db"]
             else:
-                host.tags = ["staging"]
-            hosts.append(host)
-        return hosts
-
-    @pytest.fixture
-    def mock_context(self, mock_hosts_with_tags):
-        """Create a mock context with hosts repository."""
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=mock_hosts_with_tags)
-        return ctx
+                tags = ["staging"]
+            specs.append((f"host-{i + 1:02d}", "healthy" if i < 8 else "unhealthy", tags))
+        return await _inventory(database, specs)
 
     @pytest.mark.asyncio
     async def test_list_groups_basic(self, mock_context):
@@ -480,6 +481,13 @@ class TestListGroups:
         assert len(groups) >= 3
         group_names = [g.name for g in groups]
         assert "production" in group_names
+        production = groups[0]
+        assert (production.name, production.host_count, production.healthy_count) == (
+            "production",
+            8,
+            8,
+        )
+        assert production.sample_hosts == ["host-01", "host-02", "host-03"]
 
     @pytest.mark.asyncio
     async def test_list_groups_sorted_by_count(self, mock_context):
@@ -491,11 +499,9 @@ class TestListGroups:
             assert groups[i].host_count >= groups[i + 1].host_count
 
     @pytest.mark.asyncio
-    async def test_list_groups_empty(self):
+    async def test_list_groups_empty(self, database: Database):
         """Test with no hosts."""
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=[])
+        ctx = await _inventory(database, [])
 
         groups = await list_groups(ctx)
 
@@ -506,17 +512,9 @@ class TestGetInfrastructureContext:
     """Tests for get_infrastructure_context function."""
 
     @pytest.mark.asyncio
-    async def test_get_context_basic(self):
+    async def test_get_context_basic(self, database: Database):
         """Test basic infrastructure context."""
-        mock_host = MagicMock()
-        mock_host.name = "web-01"
-        mock_host.health_status = "healthy"
-        mock_host.tags = ["production"]
-
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=[mock_host])
-        ctx.hosts.get_by_tag = AsyncMock(return_value=[mock_host])
+        ctx = await _inventory(database, [("web-01", "healthy", ["production"])])
 
         context = await get_infrastructure_context(ctx)
 
@@ -524,54 +522,30 @@ class TestGetInfrastructureContext:
         assert "1 hosts" in context
 
     @pytest.mark.asyncio
-    async def test_get_context_includes_groups(self):
+    async def test_get_context_includes_groups(self, database: Database):
         """Test context includes groups by default."""
-        mock_host = MagicMock()
-        mock_host.name = "web-01"
-        mock_host.health_status = "healthy"
-        mock_host.tags = ["production"]
-
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=[mock_host])
-        ctx.hosts.get_by_tag = AsyncMock(return_value=[mock_host])
+        ctx = await _inventory(database, [("web-01", "healthy", ["production"])])
 
         context = await get_infrastructure_context(ctx, include_groups=True)
 
         assert "📁 Groups:" in context
 
     @pytest.mark.asyncio
-    async def test_get_context_without_groups(self):
+    async def test_get_context_without_groups(self, database: Database):
         """Test context without groups."""
-        mock_host = MagicMock()
-        mock_host.name = "web-01"
-        mock_host.health_status = "healthy"
-        mock_host.tags = []
-
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=[mock_host])
-        ctx.hosts.get_by_tag = AsyncMock(return_value=[])
+        ctx = await _inventory(database, [("web-01", "healthy", [])])
 
         context = await get_infrastructure_context(ctx, include_groups=False)
 
         assert "📁 Groups:" not in context
 
     @pytest.mark.asyncio
-    async def test_get_context_limits_groups(self):
+    async def test_get_context_limits_groups(self, database: Database):
         """Test that groups are limited by max_groups."""
-        hosts = []
-        for i in range(10):
-            host = MagicMock()
-            host.name = f"host-{i}"
-            host.health_status = "healthy"
-            host.tags = [f"tag-{i}"]  # Each host has unique tag
-            hosts.append(host)
-
-        ctx = MagicMock()
-        ctx.hosts = MagicMock()
-        ctx.hosts.get_all = AsyncMock(return_value=hosts)
-        ctx.hosts.get_by_tag = AsyncMock(return_value=[])
+        # Each host has a unique tag
+        ctx = await _inventory(
+            database, [(f"host-{i}", "healthy", [f"tag-{i}"]) for i in range(10)]
+        )
 
         context = await get_infrastructure_context(ctx, max_groups=3)
 
@@ -2,15 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import sqlite3
+from typing import TYPE_CHECKING
+
 import pytest
 
 from merlya.persistence.database import (
+    DEFAULT_READ_POOL_SIZE,
     Database,
     IntegrityError,
+    ReadCursor,
+    decode_log_chunk,
     from_json,
     to_json,
+    track_queries,
 )
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 
 class TestJsonHelpers:
     """Tests for JSON serialization helpers."""
@@ -149,3 +161,271 @@ class TestDatabase:
             row = await cursor.fetchone()
             if row:  # Table may not exist in minimal tests
                 assert "ON DELETE CASCADE" in row["sql"]
+
+
+class TestConnectionPool:
+    """Tests for WAL mode, the read pool and the writer queue."""
+
+    @pytest.mark.asyncio
+    async def test_wal_and_read_pool(self, database: Database) -> None:
+        """Test that the database runs in WAL mode with read connections."""
+        async with await database.execute("PRAGMA journal_mode") as cursor:
+            row = await cursor.fetchone()
+
+        assert row is not None
+        assert row[0] == "wal"
+        assert database.read_pool_size == DEFAULT_READ_POOL_SIZE
+
+        cursor = await database.execute("SELECT name FROM variables")
+        assert isinstance(cursor, ReadCursor)
+
+    @pytest.mark.asyncio
+    async def test_reads_not_blocked_by_open_transaction(self, database: Database) -> None:
+        """Test that other tasks read committed data while a write transaction is open."""
+        await database.execute("INSERT INTO variables (name, value) VALUES ('a', '1')")
+        await database.commit()
+        in_transaction = asyncio.Event()
+        release = asyncio.Event()
+
+        async def writer() -> None:
+            async with database.transaction():
+                await database.execute("UPDATE variables SET value = '2' WHERE name = 'a'")
+                # Own uncommitted write is visible inside the transaction
+                async with await database.execute(
+                    "SELECT value FROM variables WHERE name = 'a'"
+                ) as cursor:
+                    row = await cursor.fetchone()
+                    assert row is not None
+                    assert row["value"] == "2"
+                in_transaction.set()
+                await release.wait()
+
+        task = asyncio.create_task(writer())
+        await in_transaction.wait()
+        async with await asyncio.wait_for(
+            database.execute("SELECT value FROM variables WHERE name = 'a'"), timeout=2
+        ) as cursor:
+            row = await cursor.fetchone()
+        release.set()
+        await task
+
+        assert row is not None
+        assert row["value"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_transactions_are_queued(self, database: Database) -> None:
+        """Test that a failing transaction never rolls back another task's writes."""
+
+        async def ok() -> None:
+            async with database.transaction():
+                await database.execute("INSERT INTO variables (name, value) VALUES ('ok', '1')")
+                await asyncio.sleep(0.01)
+
+        async def failing() -> None:
+            async with database.transaction():
+                await database.execute("INSERT INTO variables (name, value) VALUES ('bad', '1')")
+                raise ValueError("boom")
+
+        results = await asyncio.gather(ok(), failing(), return_exceptions=True)
+
+        assert isinstance(results[1], ValueError)
+        async with await database.execute("SELECT name FROM variables") as cursor:
+            names = {row["name"] for row in await cursor.fetchall()}
+        assert names == {"ok"}
+
+    @pytest.mark.asyncio
+    async def test_query_stats_per_method(self, database: Database) -> None:
+        """Test that queries are attributed to the tracked method."""
+
+        class Repo:
+            @track_queries
+            async def count(self) -> int:
+                async with await database.execute("SELECT COUNT(*) FROM variables") as cursor:
+                    row = await cursor.fetchone()
+                    return int(row[0]) if row else 0
+
+        await Repo().count()
+        await Repo().count()
+
+        stats = database.get_query_stats()
+        method = stats["TestConnectionPool.test_query_stats_per_method.<locals>.Repo.count"]
+        assert method["queries"] == 2
+        assert method["max_ms"] >= method["avg_ms"] > 0
+
+
+class TestMigrations:
+    """Tests for schema migrations."""
+
+    @pytest.mark.asyncio
+    async def test_v5_v6_move_conversation_messages_to_indexed_rows(
+        self, temp_db_path: Path
+    ) -> None:
+        """Test that legacy JSON conversation blobs become one row per message."""
+        legacy = sqlite3.connect(temp_db_path)
+        legacy.executescript(
+            """
+            CREATE TABLE conversations (
+                id TEXT PRIMARY KEY, title TEXT, messages TEXT, summary TEXT,
+                created_at TIMESTAMP, updated_at TIMESTAMP
+            );
+            CREATE TABLE config (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            INSERT INTO config VALUES ('schema_version', '4');
+            """
+        )
+        legacy.execute(
+            "INSERT INTO conversations (id, title, messages) VALUES (?, ?, ?)",
+            (
+                "c1",
+                "old",
+                json.dumps([{"kind": "request", "content": "hello"}, {"kind": "response"}]),
+            ),
+        )
+        legacy.commit()
+        legacy.close()
+
+        db = Database(temp_db_path)
+        await db.connect()
+        try:
+            async with await db.execute(
+                "SELECT message_count, messages FROM conversations WHERE id = 'c1'"
+            ) as cursor:
+                row = await cursor.fetchone()
+            async with await db.execute(
+                "SELECT sequence_num, message_data FROM conversation_messages ORDER BY sequence_num"
+            ) as cursor:
+                rows = [(r[0], json.loads(r[1])) for r in await cursor.fetchall()]
+            async with await db.execute(
+                "SELECT conversation_id FROM conversation_message_fts WHERE text MATCH 'hello'"
+            ) as cursor:
+                indexed = [r[0] for r in await cursor.fetchall()]
+        finally:
+            await db.close()
+            Database.reset_instance()
+
+        assert (row["message_count"], row["messages"]) == (2, None)
+        assert rows == [(0, {"kind": "request", "content": "hello"}), (1, {"kind": "response"})]
+        assert indexed == ["c1"]
+
+    @pytest.mark.asyncio
+    async def test_v7_fills_host_tags(self, temp_db_path: Path) -> None:
+        """Test that existing hosts.tags arrays are copied into host_tags."""
+        db = Database(temp_db_path)
+        await db.connect()
+        await db.execute(
+            "INSERT INTO hosts (id, name, hostname, tags) VALUES (?, ?, ?, ?)",
+            ("h1", "web-1", "10.0.0.1", json.dumps(["web", "prod", 42])),
+        )
+        await db.execute("DELETE FROM host_tags")
+        await db.execute("UPDATE config SET value = '6' WHERE key = 'schema_version'")
+        await db.commit()
+        await db.close()
+        Database.reset_instance()
+
+        db = Database(temp_db_path)
+        await db.connect()
+        try:
+            async with await db.execute(
+                "SELECT host_id, tag FROM host_tags ORDER BY tag"
+            ) as cursor:
+                rows = [tuple(r) for r in await cursor.fetchall()]
+        finally:
+            await db.close()
+            Database.reset_instance()
+
+        assert rows == [("h1", "prod"), ("h1", "web")]
+
+    @pytest.mark.asyncio
+    async def test_v9_fts_update_trigger_skips_unchanged_titles(self, temp_db_path: Path) -> None:
+        """Test that saving a turn without a title change no longer touches conversation_fts."""
+        db = Database(temp_db_path)
+        await db.connect()
+        await db.execute("DROP TRIGGER conversations_fts_update")
+        await db.execute(
+            """
+            CREATE TRIGGER conversations_fts_update
+            AFTER UPDATE OF title, summary ON conversations BEGIN
+                UPDATE conversation_fts SET title = new.title, summary = new.summary
+                WHERE conversation_id = new.id;
+            END
+            """
+        )
+        await db.execute("UPDATE config SET value = '8' WHERE key = 'schema_version'")
+        await db.commit()
+        await db.close()
+        Database.reset_instance()
+
+        async def changes(sql: str) -> int:
+            async with await db.execute("SELECT total_changes()") as cursor:
+                before = (await cursor.fetchone())[0]
+            await db.execute(sql)
+            async with await db.execute("SELECT total_changes()") as cursor:
+                return (await cursor.fetchone())[0] - before
+
+        db = Database(temp_db_path)
+        await db.connect()
+        try:
+            await db.execute("INSERT INTO conversations (id, title) VALUES ('c1', 'disk usage')")
+            unchanged = await changes(
+                "UPDATE conversations SET title = 'disk usage', message_count = 4 WHERE id = 'c1'"
+            )
+            renamed = await changes("UPDATE conversations SET title = 'nginx' WHERE id = 'c1'")
+            async with await db.execute(
+                "SELECT conversation_id FROM conversation_fts WHERE conversation_fts MATCH 'nginx'"
+            ) as cursor:
+                indexed = [row[0] for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+            Database.reset_instance()
+
+        assert unchanged == 1  # The conversation row only
+        assert renamed > 1  # Plus the search index writes
+        assert indexed == ["c1"]
+
+    @pytest.mark.asyncio
+    async def test_v8_compresses_raw_log_output(self, temp_db_path: Path) -> None:
+        """Test that raw_logs.output moves to raw_log_chunks and the column is dropped."""
+        output = "\n".join(f"line {i}" for i in range(20000))
+        legacy = sqlite3.connect(temp_db_path)
+        legacy.executescript(
+            """
+            CREATE TABLE raw_logs (
+                id TEXT PRIMARY KEY, host_id TEXT, command TEXT NOT NULL,
+                output TEXT NOT NULL, exit_code INTEGER, line_count INTEGER NOT NULL,
+                byte_size INTEGER NOT NULL, created_at TIMESTAMP, expires_at TIMESTAMP
+            );
+            CREATE TABLE config (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            INSERT INTO config VALUES ('schema_version', '7');
+            """
+        )
+        legacy.executemany(
+            "INSERT INTO raw_logs (id, command, output, line_count, byte_size) VALUES (?, ?, ?, ?, ?)",
+            [("big", "journalctl", output, 20000, len(output)), ("empty", "true", "", 0, 0)],
+        )
+        legacy.commit()
+        legacy.close()
+
+        db = Database(temp_db_path)
+        await db.connect()
+        try:
+            async with await db.execute("PRAGMA table_info(raw_logs)") as cursor:
+                columns = {row["name"] for row in await cursor.fetchall()}
+            async with await db.execute(
+                "SELECT log_id, data FROM raw_log_chunks ORDER BY log_id, start_line"
+            ) as cursor:
+                chunks = [(row[0], decode_log_chunk(row[1])) for row in await cursor.fetchall()]
+            async with await db.execute(
+                "SELECT line_count FROM raw_logs WHERE id = 'big'"
+            ) as cursor:
+                row = await cursor.fetchone()
+        finally:
+            await db.close()
+            Database.reset_instance()
+
+        assert "output" not in columns
+        assert row["line_count"] == 20000
+        assert (
+            "\n".join(line for log_id, lines in chunks if log_id == "big" for line in lines)
+            == output
+        )
+        assert [lines for log_id, lines in chunks if log_id == "empty"] == [[""]]
+        assert len(chunks) > 2
@@ -8,10 +8,11 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 import pytest
 
-from merlya.persistence.database import Database
+from merlya.persistence.database import Database, decode_log_chunk
 from merlya.tools.logs.store import (
     LogRef,
     RawLogEntry,
@@ -218,6 +219,44 @@ class TestGetRawLogSlice:
         sliced, _start, _end = result
         assert "Line 100" in sliced
 
+    @pytest.mark.asyncio
+    async def test_slice_decompresses_only_touched_chunks(self, test_db):
+        """Test slices of a multi-chunk log match split() and read one or two chunks."""
+        lines = [f"Line {i:06d}: {'x' * 60}" for i in range(1, 20001)]
+        log_ref = await store_raw_log(db=test_db, command="big", output="\n".join(lines) + "\n")
+        async with await test_db.execute(
+            "SELECT start_line FROM raw_log_chunks WHERE log_id = ? ORDER BY start_line",
+            (log_ref.id,),
+        ) as cursor:
+            boundaries = [row[0] for row in await cursor.fetchall()]
+        assert len(boundaries) > 10
+        split = [*lines, ""]  # Trailing newline: split() yields a last empty line
+
+        boundary = boundaries[3]
+        with patch("merlya.tools.logs.store.decode_log_chunk", wraps=decode_log_chunk) as decode:
+            sliced, start, end = await get_raw_log_slice(
+                test_db, log_ref.id, start_line=boundary - 9, end_line=boundary + 10
+            )
+        assert decode.call_count == 2  # Straddles a chunk boundary
+        assert (start, end) == (boundary - 9, boundary + 10)
+        assert sliced == "\n".join(split[boundary - 10 : boundary + 10])
+
+        sliced, start, end = await get_raw_log_slice(test_db, log_ref.id, around_line=19999)
+        assert (start, end) == (19949, 20001)
+        assert sliced == "\n".join(split[19948:])
+
+    @pytest.mark.asyncio
+    async def test_multi_chunk_log_round_trips(self, test_db):
+        """Test a log spanning several chunks is returned unchanged."""
+        output = "\n".join(f"événement {i}" for i in range(30000))
+        log_ref = await store_raw_log(db=test_db, command="big", output=output)
+
+        entry = await get_raw_log(test_db, log_ref.id)
+
+        assert entry is not None
+        assert entry.output == output
+        assert entry.byte_size == len(output.encode())
+
     @pytest.mark.asyncio
     async def test_slice_nonexistent_log(self, test_db):
         """Test slicing non-existent log returns None."""
@@ -266,6 +305,8 @@ class TestCleanupExpiredLogs:
         # Fresh log should still exist
         entry = await get_raw_log(test_db, fresh.id)
         assert entry is not None
+        async with await test_db.execute("SELECT DISTINCT log_id FROM raw_log_chunks") as cursor:
+            assert [row[0] for row in await cursor.fetchall()] == [fresh.id]
 
 
 class TestGetLogsByHost:
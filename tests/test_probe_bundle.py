@@ -0,0 +1,186 @@
+"""Tests for the /scan probe bundle."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import subprocess
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from merlya.commands.handlers.scan_format import ScanOptions, parse_scan_options
+from merlya.commands.handlers.system import _run_checks
+from merlya.ssh.types import SSHResult
+from merlya.tools.core.models import ToolResult
+from merlya.tools.system.health import HostHealth, _parse_health_output
+from merlya.tools.system.probe_bundle import (
+    PROBES,
+    build_bundle_script,
+    run_probe_bundle,
+    split_bundle_output,
+)
+
+MARKER = "@@merlya-test"
+
+
+def _bundle_output(sections: dict[str, str]) -> str:
+    """Render output as the bundle script prints it."""
+    return "".join(
+        f"{MARKER} begin {name}\n{body}\n{MARKER} end {name} 0\n" for name, body in sections.items()
+    )
+
+
+SAMPLE_SECTIONS = {
+    "memory": "MemTotal: 8000000 kB\nMemFree: 1000000 kB\nMemAvailable: 4000000 kB\n",
+    "cpu": "0.50 0.40 0.30 1/200 1234\n4\n",
+    "disk": "/dev/sda1 100000 95000 5000 95% /\n",
+    "services": (
+        "systemd\n"
+        "nginx.service loaded active running A high performance web server\n"
+        "ssh.service loaded active running OpenBSD Secure Shell server\n"
+    ),
+    "cron": (
+        "current|0 2 * * * /usr/local/bin/backup.sh\n"
+        "/etc/crontab|17 * * * * root cd / && run-parts --report /etc/cron.hourly\n"
+    ),
+    "logs": "journalctl\nJan 01 00:00:00 web kernel: I/O error\n",
+    "health": (
+        "---CPU---\n4\n1.00\n---MEM---\n8000000\n4000000\n---DISK---\n40\n"
+        "---UPTIME---\nup 3 days\n---SERVICES---\nsshd:active\ncron:inactive\n"
+    ),
+}
+
+
+class TestBundleScript:
+    """Tests for script generation and output splitting."""
+
+    def test_split_keeps_empty_and_multiline_sections(self) -> None:
+        output = f"{MARKER} begin a\nline 1\nline 2\n\n{MARKER} end a 0\n"
+        output += f"{MARKER} begin b\n\n{MARKER} end b 3\n"
+
+        sections = split_bundle_output(output, MARKER)
+
+        assert sections["a"].stdout == "line 1\nline 2\n"
+        assert sections["b"].stdout == ""
+        assert sections["b"].exit_code == 3
+
+    def test_truncated_section_is_dropped(self) -> None:
+        output = f"{MARKER} begin a\nok\n{MARKER} end a 0\n{MARKER} begin b\npartial"
+
+        assert list(split_bundle_output(output, MARKER)) == ["a"]
+
+    @pytest.mark.skipif(shutil.which("sh") is None, reason="needs a POSIX shell")
+    def test_script_runs_every_section(self) -> None:
+        script = build_bundle_script(PROBES, MARKER)
+
+        output = subprocess.run(
+            ["sh", "-c", script], capture_output=True, text=True, timeout=60, check=False
+        ).stdout
+
+        assert set(split_bundle_output(output, MARKER)) == set(PROBES)
+
+
+class TestRunProbeBundle:
+    """Tests for run_probe_bundle parsing."""
+
+    @pytest.mark.asyncio
+    async def test_sections_use_tool_parsers(self) -> None:
+        ctx = MagicMock()
+
+        async def execute(_ctx: object, _host: str, script: str, timeout: int) -> SSHResult:
+            marker = script.split("echo '", 1)[1].split(" begin ", 1)[0]
+            return SSHResult(
+                stdout=_bundle_output(SAMPLE_SECTIONS).replace(MARKER, marker),
+                stderr="",
+                exit_code=0,
+            )
+
+        with patch(
+            "merlya.tools.system.probe_bundle.execute_security_command",
+            new=AsyncMock(side_effect=execute),
+        ) as mock_exec:
+            results = await run_probe_bundle(ctx, "web-01", [*SAMPLE_SECTIONS, "network"])
+
+        mock_exec.assert_awaited_once()
+        assert set(results) == set(SAMPLE_SECTIONS)
+        assert results["memory"].data["use_percent"] == 50.0
+        assert results["cpu"].data["cpu_count"] == 4
+        assert results["disk"].data["warning"] is True
+        assert [s["name"] for s in results["services"].data["services"]] == ["nginx", "ssh"]
+        jobs = results["cron"].data["jobs"]
+        assert [(j["user"], j["source"]) for j in jobs] == [
+            ("current", "crontab (current)"),
+            ("root", "/etc/crontab"),
+        ]
+        assert results["logs"].data == {
+            "lines": ["Jan 01 00:00:00 web kernel: I/O error"],
+            "count": 1,
+            "source": "journalctl",
+        }
+        host = results["health"].data["hosts"][0]
+        assert host["cpu_percent"] == 25.0
+        assert host["services_down"] == ["cron"]
+
+    @pytest.mark.asyncio
+    async def test_failed_bundle_returns_nothing(self) -> None:
+        with patch(
+            "merlya.tools.system.probe_bundle.execute_security_command",
+            new=AsyncMock(side_effect=TimeoutError()),
+        ):
+            assert await run_probe_bundle(MagicMock(), "web-01", ["memory"]) == {}
+
+
+class TestRunChecks:
+    """Tests for /scan check dispatch."""
+
+    @pytest.mark.asyncio
+    async def test_bundle_with_fallback(self) -> None:
+        host = MagicMock()
+        host.name = "web-01"
+        memory = AsyncMock(return_value=ToolResult(success=True, data={"from": "tool"}))
+        cpu = AsyncMock()
+        network = AsyncMock(return_value=ToolResult(success=True, data={"checks": []}))
+        bundle = AsyncMock(return_value={"cpu": ToolResult(success=True, data={"from": "bundle"})})
+
+        with patch("merlya.tools.system.probe_bundle.run_probe_bundle", new=bundle):
+            results = await _run_checks(
+                MagicMock(),
+                host,
+                {"memory": memory, "cpu": cpu, "network": network},
+                ScanOptions(),
+                asyncio.Semaphore(10),
+            )
+
+        assert bundle.await_args.args[2] == ["memory", "cpu"]
+        assert results["cpu"].data == {"from": "bundle"}
+        assert results["memory"].data == {"from": "tool"}  # Missing from bundle output
+        cpu.assert_not_awaited()
+        network.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_no_bundle_option(self) -> None:
+        host = MagicMock()
+        memory = AsyncMock(return_value=ToolResult(success=True, data={}))
+        bundle = AsyncMock()
+
+        with patch("merlya.tools.system.probe_bundle.run_probe_bundle", new=bundle):
+            await _run_checks(
+                MagicMock(),
+                host,
+                {"memory": memory},
+                parse_scan_options(["--no-bundle"]),
+                asyncio.Semaphore(10),
+            )
+
+        bundle.assert_not_awaited()
+        memory.assert_awaited_once()
+
+
+def test_parse_health_output() -> None:
+    health = HostHealth(host_name="web-01")
+
+    _parse_health_output(health, SAMPLE_SECTIONS["health"])
+
+    assert (health.cpu_percent, health.memory_percent, health.disk_percent) == (25.0, 50.0, 40)
+    assert health.uptime == "up 3 days"
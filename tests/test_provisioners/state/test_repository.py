@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import subprocess
+import sys
+import textwrap
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pytest
 
@@ -13,6 +17,9 @@ from merlya.provisioners.state.models import (
 )
 from merlya.provisioners.state.repository import MissingResourcesError, StateRepository
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
 
 class TestStateRepositoryInit:
     """Test StateRepository initialization."""
@@ -26,6 +33,7 @@ class TestStateRepositoryInit:
 
         # Verify database file exists
         assert db_path.exists()
+        await repo.close()
 
     async def test_initialize_idempotent(self, tmp_path: Path) -> None:
         """Test initialize can be called multiple times."""
@@ -34,6 +42,44 @@ class TestStateRepositoryInit:
 
         await repo.initialize()
         await repo.initialize()  # Should not raise
+        await repo.close()
+
+    def test_unclosed_repository_does_not_block_exit(self, tmp_path: Path) -> None:
+        """Test a script that never calls close() still exits."""
+        script = tmp_path / "unclosed.py"
+        script.write_text(
+            textwrap.dedent(
+                f"""
+                import asyncio
+                from pathlib import Path
+
+                from merlya.provisioners.state import StateRepository, StateTracker
+
+                repo = StateRepository(db_path=Path({str(tmp_path / "state.db")!r}))
+
+                async def main():
+                    await repo.list_resources()
+
+                async def track():
+                    tracker = StateTracker(repository=repo)
+                    await tracker.track_resource("i-1", "aws_instance", "web", "aws", {{}})
+
+                asyncio.run(main())
+                asyncio.run(track())  # Reopened after the first loop closed it
+                loop = asyncio.new_event_loop()
+                loop.run_until_complete(main())  # Loop closed without cancelling tasks
+                loop.close()
+                print(len(asyncio.run(repo.get_resources(["i-1"]))))
+                """
+            )
+        )
+
+        result = subprocess.run(
+            [sys.executable, str(script)], capture_output=True, text=True, timeout=60
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "1"
 
     async def test_default_db_path(self) -> None:
         """Test default db path when none provided."""
@@ -46,12 +92,13 @@ class TestResourceOperations:
     """Test resource CRUD operations."""
 
     @pytest.fixture
-    async def repo(self, tmp_path: Path) -> StateRepository:
+    async def repo(self, tmp_path: Path) -> AsyncIterator[StateRepository]:
         """Create and initialize a repository."""
         db_path = tmp_path / "state.db"
         repo = StateRepository(db_path)
         await repo.initialize()
-        return repo
+        yield repo
+        await repo.close()
 
     @pytest.fixture
     def sample_resource(self) -> ResourceState:
@@ -121,6 +168,43 @@ class TestResourceOperations:
         result = await repo.delete_resource("nonexistent")
         assert result is False
 
+    async def test_save_and_get_resources_batch(self, repo: StateRepository) -> None:
+        """Test batch save and get of many resources."""
+        resources = [
+            ResourceState(
+                resource_id=f"i-{i:05d}",
+                resource_type="aws_instance",
+                name=f"web-{i}",
+                provider="aws",
+                tags={"index": str(i)},
+            )
+            for i in range(2000)
+        ]
+
+        assert await repo.save_resources(resources) == 2000
+        assert await repo.save_resources([]) == 0
+
+        found = await repo.get_resources([r.resource_id for r in resources] + ["missing"])
+        assert len(found) == 2000
+        assert "missing" not in found
+        assert found["i-01999"].tags == {"index": "1999"}
+        assert await repo.get_resources([]) == {}
+
+    async def test_connection_is_reused_in_wal_mode(
+        self, repo: StateRepository, sample_resource: ResourceState
+    ) -> None:
+        """Test every call shares one WAL connection, reopened after close()."""
+        conn = await repo._connection()
+        await repo.save_resource(sample_resource)
+        await repo.get_resource(sample_resource.resource_id)
+
+        assert await repo._connection() is conn
+        async with conn.execute("PRAGMA journal_mode") as cursor:
+            assert (await cursor.fetchone())[0] == "wal"
+
+        await repo.close()
+        assert await repo.get_resource(sample_resource.resource_id) is not None
+
     async def test_list_resources_empty(self, repo: StateRepository) -> None:
         """Test listing resources when empty."""
         result = await repo.list_resources()
@@ -220,12 +304,13 @@ class TestSnapshotOperations:
     """Test snapshot operations."""
 
     @pytest.fixture
-    async def repo(self, tmp_path: Path) -> StateRepository:
+    async def repo(self, tmp_path: Path) -> AsyncIterator[StateRepository]:
         """Create and initialize a repository."""
         db_path = tmp_path / "state.db"
         repo = StateRepository(db_path)
         await repo.initialize()
-        return repo
+        yield repo
+        await repo.close()
 
     @pytest.fixture
     def sample_snapshot(self) -> StateSnapshot:
@@ -417,12 +502,13 @@ class TestClearAll:
     """Test clear_all method."""
 
     @pytest.fixture
-    async def repo(self, tmp_path: Path) -> StateRepository:
+    async def repo(self, tmp_path: Path) -> AsyncIterator[StateRepository]:
         """Create and initialize a repository."""
         db_path = tmp_path / "state.db"
         repo = StateRepository(db_path)
         await repo.initialize()
-        return repo
+        yield repo
+        await repo.close()
 
     async def test_clear_all_resources(self, repo: StateRepository) -> None:
         """Test clearing all resources."""
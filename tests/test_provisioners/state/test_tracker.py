@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
 
 import pytest
 
@@ -13,6 +14,10 @@ from merlya.provisioners.state.models import (
 from merlya.provisioners.state.repository import StateRepository
 from merlya.provisioners.state.tracker import StateTracker
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
 
 class TestStateTrackerInit:
     """Test StateTracker initialization."""
@@ -34,18 +39,20 @@ class TestStateTrackerInit:
         tracker = StateTracker(repository=repo)
 
         assert tracker.repository is repo
+        await tracker.close()
 
 
 class TestResourceTracking:
     """Test resource tracking operations."""
 
     @pytest.fixture
-    async def tracker(self, tmp_path: Path) -> StateTracker:
+    async def tracker(self, tmp_path: Path) -> AsyncIterator[StateTracker]:
         """Create a tracker with initialized repository."""
         db_path = tmp_path / "state.db"
         tracker = StateTracker(db_path=db_path)
         await tracker.repository.initialize()
-        return tracker
+        yield tracker
+        await tracker.close()
 
     async def test_track_resource(self, tracker: StateTracker) -> None:
         """Test tracking a new resource."""
@@ -260,12 +267,13 @@ class TestDriftDetection:
     """Test drift detection operations."""
 
     @pytest.fixture
-    async def tracker(self, tmp_path: Path) -> StateTracker:
+    async def tracker(self, tmp_path: Path) -> AsyncIterator[StateTracker]:
         """Create a tracker with initialized repository."""
         db_path = tmp_path / "state.db"
         tracker = StateTracker(db_path=db_path)
         await tracker.repository.initialize()
-        return tracker
+        yield tracker
+        await tracker.close()
 
     async def test_check_drift_no_drift(self, tracker: StateTracker) -> None:
         """Test check_drift when configs match."""
@@ -363,6 +371,34 @@ class TestDriftDetection:
         assert statuses["i-001"] == DriftStatus.NO_DRIFT
         assert statuses["i-002"] == DriftStatus.DRIFTED
 
+    async def test_check_all_drift_saves_in_one_batch(self, tracker: StateTracker) -> None:
+        """Test check_all_drift persists every checked resource with one save_resources()."""
+        for i in range(3):
+            await tracker.track_resource(
+                resource_id=f"i-00{i}",
+                resource_type="aws_instance",
+                name=f"web-0{i}",
+                provider="aws",
+                expected_config={"instance_type": "t3.micro"},
+            )
+            await tracker.mark_created(f"i-00{i}", actual_config={"instance_type": "t3.micro"})
+
+        with patch.object(
+            tracker.repository, "save_resources", wraps=tracker.repository.save_resources
+        ) as save:
+            await tracker.check_all_drift(
+                actual_configs={"i-000": {"instance_type": "t3.large"}, "i-001": {}}
+            )
+
+        save.assert_awaited_once()
+        resource = await tracker.get_resource("i-000")
+        assert resource is not None
+        assert resource.actual_config == {"instance_type": "t3.large"}
+        assert resource.last_checked_at is not None
+        unchecked = await tracker.get_resource("i-002")
+        assert unchecked is not None
+        assert unchecked.last_checked_at is None
+
     async def test_check_all_drift_missing_from_actual(self, tracker: StateTracker) -> None:
         """Test check_all_drift when resource missing from actual configs."""
         await tracker.track_resource(
@@ -385,12 +421,13 @@ class TestSnapshotManagement:
     """Test snapshot management operations."""
 
     @pytest.fixture
-    async def tracker(self, tmp_path: Path) -> StateTracker:
+    async def tracker(self, tmp_path: Path) -> AsyncIterator[StateTracker]:
         """Create a tracker with initialized repository."""
         db_path = tmp_path / "state.db"
         tracker = StateTracker(db_path=db_path)
         await tracker.repository.initialize()
-        return tracker
+        yield tracker
+        await tracker.close()
 
     async def test_create_snapshot(self, tracker: StateTracker) -> None:
         """Test creating a snapshot."""
@@ -478,12 +515,13 @@ class TestRollbackSupport:
     """Test rollback support features."""
 
     @pytest.fixture
-    async def tracker(self, tmp_path: Path) -> StateTracker:
+    async def tracker(self, tmp_path: Path) -> AsyncIterator[StateTracker]:
         """Create a tracker with initialized repository."""
         db_path = tmp_path / "state.db"
         tracker = StateTracker(db_path=db_path)
         await tracker.repository.initialize()
-        return tracker
+        yield tracker
+        await tracker.close()
 
     async def test_get_rollback_config(self, tracker: StateTracker) -> None:
         """Test getting rollback config."""
@@ -516,12 +554,13 @@ class TestClearAll:
     """Test clear_all method."""
 
     @pytest.fixture
-    async def tracker(self, tmp_path: Path) -> StateTracker:
+    async def tracker(self, tmp_path: Path) -> AsyncIterator[StateTracker]:
         """Create a tracker with initialized repository."""
         db_path = tmp_path / "state.db"
         tracker = StateTracker(db_path=db_path)
         await tracker.repository.initialize()
-        return tracker
+        yield tracker
+        await tracker.close()
 
     async def test_clear_all(self, tracker: StateTracker) -> None:
         """Test clearing all state data."""
@@ -6,8 +6,13 @@ from typing import TYPE_CHECKING
 
 import pytest
 
-from merlya.persistence.models import Host
-from merlya.persistence.repositories import HostRepository, VariableRepository
+from merlya.persistence.models import Conversation, Host
+from merlya.persistence.repositories import (
+    ConversationRepository,
+    HostRepository,
+    ScanCacheRepository,
+    VariableRepository,
+)
 
 if TYPE_CHECKING:
     from merlya.persistence.database import Database
@@ -75,6 +80,43 @@ class TestHostRepository:
         prod_hosts = await host_repo.get_by_tag("prod")
         assert len(prod_hosts) == 2
 
+    @pytest.mark.asyncio
+    async def test_tag_index_follows_updates(self, host_repo: HostRepository) -> None:
+        """Test that host_tags stays in sync with host.tags."""
+        host = Host(name="web-1", hostname="192.168.1.1", tags=["web", "prod"])
+        await host_repo.create(host)
+
+        host.tags = ["web", "staging"]
+        await host_repo.update(host)
+        assert await host_repo.get_by_tag("prod") == []
+        assert [h.name for h in await host_repo.get_by_tag("staging")] == ["web-1"]
+
+        await host_repo.delete(host.id)
+        assert await host_repo.count_by_tag() == {}
+
+    @pytest.mark.asyncio
+    async def test_aggregates(self, host_repo: HostRepository) -> None:
+        """Test SQL-side host counts and tag groups."""
+        await host_repo.create(
+            Host(name="web-2", hostname="10.0.0.2", tags=["web"], health_status="healthy")
+        )
+        await host_repo.create(
+            Host(name="web-1", hostname="10.0.0.1", tags=["web", "prod"], health_status="healthy")
+        )
+        await host_repo.create(
+            Host(name="db-1", hostname="10.0.0.3", tags=["prod"], health_status="unreachable")
+        )
+
+        assert await host_repo.count_by_status() == {"healthy": 2, "unreachable": 1}
+        assert await host_repo.count_by_status(tag="prod", status="HEALTHY") == {"healthy": 1}
+        assert await host_repo.count_by_tag() == {"prod": 2, "web": 2}
+        assert await host_repo.count_by_tag(status="unreachable") == {"prod": 1}
+        assert await host_repo.get_names(tag="web", limit=1) == ["web-1"]
+        assert await host_repo.get_tag_groups(sample_size=1) == [
+            {"tag": "prod", "host_count": 2, "healthy_count": 1, "sample_hosts": ["db-1"]},
+            {"tag": "web", "host_count": 2, "healthy_count": 2, "sample_hosts": ["web-1"]},
+        ]
+
     @pytest.mark.asyncio
     async def test_get_by_tag_invalid_format(self, host_repo: HostRepository) -> None:
         """Test that invalid tag format returns empty list."""
@@ -217,3 +259,115 @@ class TestVariableRepository:
         assert len(all_vars) == 2
         assert any(v.name == "var_a" for v in all_vars)
         assert any(v.name == "var_b" for v in all_vars)
+
+
+class TestConversationRepository:
+    """Tests for ConversationRepository."""
+
+    @pytest.fixture
+    async def conv_repo(self, database: Database) -> ConversationRepository:
+        """Create conversation repository."""
+        return ConversationRepository(database)
+
+    @pytest.mark.asyncio
+    async def test_append_and_page_messages(self, conv_repo: ConversationRepository) -> None:
+        """Test messages are appended in order and loaded in pages."""
+        conv = await conv_repo.create(Conversation(title="disk", messages=[{"n": 0}]))
+        await conv_repo.append_messages(conv, [{"n": 1}, {"n": 2}])
+        await conv_repo.append_messages(conv, [{"n": 3}])
+
+        assert conv.message_count == 4
+        assert await conv_repo.get_messages(conv.id) == [{"n": i} for i in range(4)]
+        assert await conv_repo.get_messages(conv.id, offset=1, limit=2) == [{"n": 1}, {"n": 2}]
+
+    @pytest.mark.asyncio
+    async def test_listings_are_metadata_only(self, conv_repo: ConversationRepository) -> None:
+        """Test get_recent and search skip message bodies."""
+        conv = await conv_repo.create(Conversation(title="nginx", messages=[{"content": "502"}]))
+
+        recent = await conv_repo.get_recent()
+
+        assert [(c.id, c.message_count, c.messages) for c in recent] == [(conv.id, 1, [])]
+        assert [c.id for c in await conv_repo.get_by_prefix(conv.id[:6])] == [conv.id]
+        loaded = await conv_repo.get_by_id(conv.id, include_messages=True)
+        assert loaded is not None
+        assert loaded.messages == [{"content": "502"}]
+
+    @pytest.mark.asyncio
+    async def test_search_ranks_prefix_matches(self, conv_repo: ConversationRepository) -> None:
+        """Test full-text search over titles and message parts."""
+        message = {
+            "kind": "request",
+            "parts": [{"part_kind": "user-prompt", "content": "nginx returns 502 on web-01"}],
+        }
+        in_messages = await conv_repo.create(Conversation(title="Debugging", messages=[message]))
+        in_title = await conv_repo.create(Conversation(title="nginx upgrade"))
+        await conv_repo.create(Conversation(title="disk usage"))
+
+        found = await conv_repo.search("ngin")
+
+        assert {c.id for c in found} == {in_messages.id, in_title.id}
+        assert all(c.messages == [] for c in found)
+        [best] = await conv_repo.search("502 web")
+        assert best.id == in_messages.id
+        assert best.snippet == "nginx returns **502** on **web**-01"
+
+    @pytest.mark.asyncio
+    async def test_search_index_follows_changes(self, conv_repo: ConversationRepository) -> None:
+        """Test triggers keep the index in sync with renames, rewrites and deletes."""
+        conv = await conv_repo.create(Conversation(title="old title", messages=[{"content": "a"}]))
+
+        conv.title = "renamed"
+        await conv_repo.update(conv)
+        await conv_repo.replace_messages(conv, [{"content": "zebra"}])
+
+        assert await conv_repo.search("old") == []
+        assert [c.id for c in await conv_repo.search("renamed")] == [conv.id]
+        assert [c.id for c in await conv_repo.search("zebra")] == [conv.id]
+        await conv_repo.delete(conv.id)
+        assert await conv_repo.search("zebra") == []
+
+    @pytest.mark.asyncio
+    async def test_replace_messages(self, conv_repo: ConversationRepository) -> None:
+        """Test a rewrite replaces the stored history."""
+        conv = await conv_repo.create(Conversation(messages=[{"n": 0}, {"n": 1}]))
+
+        await conv_repo.replace_messages(conv, [{"n": 9}])
+
+        assert conv.message_count == 1
+        assert await conv_repo.get_messages(conv.id) == [{"n": 9}]
+
+
+class TestScanCacheRepository:
+    """Tests for ScanCacheRepository."""
+
+    @pytest.fixture
+    async def cache_repo(self, database: Database) -> ScanCacheRepository:
+        """Create scan cache repository."""
+        return ScanCacheRepository(database)
+
+    @pytest.mark.asyncio
+    async def test_set_and_get(self, cache_repo: ScanCacheRepository) -> None:
+        """Test a stored entry is returned until it is replaced."""
+        await cache_repo.set("host-1", "system", {"sections": {"disk": "ok"}}, ttl=60)
+        await cache_repo.set("host-1", "system", {"sections": {"disk": "full"}}, ttl=60)
+
+        entry = await cache_repo.get("host-1", "system")
+
+        assert entry is not None
+        assert entry.data == {"sections": {"disk": "full"}}
+        assert await cache_repo.get("host-1", "security") is None
+        assert await cache_repo.get("host-2", "system") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_hidden_and_purged(self, cache_repo: ScanCacheRepository) -> None:
+        """Test expired entries are never returned and purge_expired removes them."""
+        await cache_repo.set("host-1", "quick", {"n": 1}, ttl=-1)
+        await cache_repo.set("host-1", "system", {"n": 2}, ttl=60)
+
+        assert await cache_repo.get("host-1", "quick") is None
+        assert [e.scan_type for e in await cache_repo.get_for_host("host-1")] == ["system"]
+        assert await cache_repo.purge_expired() == 1
+        assert await cache_repo.purge_expired() == 0
+        assert await cache_repo.delete_for_host("host-1") == 1
+        assert await cache_repo.get_for_host("host-1") == []
@@ -0,0 +1,202 @@
+"""Tests for the read-only command result cache."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from merlya.ssh.types import SSHResult
+from merlya.tools.core.result_cache import CommandResultCache, classify_command
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _ok(stdout: str = "out") -> SSHResult:
+    return SSHResult(stdout=stdout, stderr="", exit_code=0)
+
+
+class TestClassifyCommand:
+    """Tests for read-only command classification."""
+
+    @pytest.mark.parametrize(
+        ("command", "expected"),
+        [
+            ("uname -r", "static"),
+            ("cat /etc/os-release", "static"),
+            ("sudo cat /etc/os-release", "static"),
+            ("df -h", "metrics"),
+            ("free -m | grep Mem", "metrics"),
+            ("systemctl is-active nginx", "status"),
+            ("docker ps --format '{{.Names}}'", "status"),
+            ("cat /etc/nginx/nginx.conf", "config"),
+            ("ls -la /var/log 2>/dev/null", "config"),
+            ("journalctl -u nginx -n 50", "volatile"),
+            ("find /var -name '*.log'", "volatile"),
+            ("hostname", "static"),
+            ("hostname -f", "static"),
+            ("hostnamectl", "static"),
+            ("hostnamectl status", "static"),
+            ("mount", "metrics"),
+            ("ip addr", "metrics"),
+            ("ip -4 addr show dev eth0", "metrics"),
+            ("ip route list", "metrics"),
+            ("ss -tulpn", "metrics"),
+            ("env", "config"),
+        ],
+    )
+    def test_read_only(self, command: str, expected: str) -> None:
+        command_class = classify_command(command)
+        assert command_class is not None
+        assert command_class.name == expected
+
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "systemctl restart nginx",
+            "rm -rf /tmp/x",
+            "cat /etc/hosts > /tmp/hosts",
+            "df -h; reboot",
+            "uname -r && touch /tmp/x",
+            "ls $(rm -rf /tmp/x)",
+            "ps aux | xargs kill",
+            "hostname newname",
+            "hostname -F /etc/hostname",
+            "hostnamectl set-hostname web2",
+            "sudo hostnamectl set-hostname x",
+            "mount /dev/sdb1 /mnt",
+            "findmnt --poll",
+            "ip addr add 10.0.0.2/24 dev eth0",
+            "ip link set eth0 down",
+            "ip route del default",
+            "ip -4 route add default via 10.0.0.1",
+            "ss -K dst 10.0.0.1",
+            "ss -tK dst 10.0.0.1",
+            "env rm -rf /tmp/x",
+            "printenv PATH",
+            "find /tmp -name '*.tmp' -delete",
+        ],
+    )
+    def test_mutating_or_unknown(self, command: str) -> None:
+        assert classify_command(command) is None
+
+
+class TestCommandResultCache:
+    """Tests for CommandResultCache."""
+
+    def test_hit_after_record(self) -> None:
+        cache = CommandResultCache()
+        assert cache.get("web", "uname -r") is None
+        cache.record("web", "uname -r", _ok("6.1"))
+
+        entry = cache.get("web", "uname  -r")
+
+        assert entry is not None
+        assert entry.stdout == "6.1"
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+        assert cache.stats.by_class["static"] == {"hits": 1, "misses": 1}
+
+    def test_keyed_by_host_and_user(self) -> None:
+        cache = CommandResultCache()
+        cache.record("web", "id", _ok(), username="deploy")
+
+        assert cache.get("db", "id", "deploy") is None
+        assert cache.get("web", "id") is None
+        assert cache.get("web", "id", "deploy") is not None
+
+    def test_ttl_per_class(self) -> None:
+        clock = FakeClock()
+        cache = CommandResultCache(clock=clock)
+        cache.record("web", "uname -r", _ok())
+        cache.record("web", "df -h", _ok())
+
+        clock.now += 20
+        assert cache.get("web", "df -h") is None
+        assert cache.get("web", "uname -r") is not None
+        assert len(cache) == 1
+
+    def test_failures_and_volatile_are_not_stored(self) -> None:
+        cache = CommandResultCache()
+        cache.record("web", "cat /etc/missing", SSHResult(stdout="", stderr="no", exit_code=1))
+        cache.record("web", "tail -n 20 /var/log/syslog", _ok())
+        cache.record("web", "uname -r", _ok(), store=False)
+
+        assert len(cache) == 0
+        assert cache.get("web", "tail -n 20 /var/log/syslog") is None
+        assert cache.stats.misses == 0  # Volatile lookups are not counted
+
+    def test_mutating_command_invalidates_host(self) -> None:
+        cache = CommandResultCache()
+        cache.record("web", "systemctl is-active nginx", _ok("inactive"))
+        cache.record("db", "uptime", _ok())
+
+        cache.record("web", "systemctl start nginx", _ok(""))
+
+        assert cache.get("web", "systemctl is-active nginx") is None
+        assert cache.get("db", "uptime") is not None
+        assert cache.stats.invalidations == 1
+
+    def test_invalidate_by_alias(self) -> None:
+        cache = CommandResultCache()
+        cache.record("10.0.0.5", "cat /etc/app.conf", _ok(), alias="web-01")
+
+        assert cache.invalidate_host("web-01") == 1
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = CommandResultCache(max_entries=2)
+        cache.record("a", "uptime", _ok())
+        cache.record("b", "uptime", _ok())
+        cache.get("a", "uptime")
+        cache.record("c", "uptime", _ok())
+
+        assert cache.get("b", "uptime") is None
+        assert cache.get("a", "uptime") is not None
+
+    def test_summary_and_clear(self) -> None:
+        cache = CommandResultCache()
+        cache.record("web", "uptime", _ok())
+        cache.get("web", "uptime")
+
+        summary = cache.summary()
+        assert summary["entries"] == 1
+        assert summary["hit_rate"] == 1.0
+
+        cache.clear()
+        assert cache.summary()["hits"] == 0
+        assert len(cache) == 0
+
+
+class TestSSHExecuteCache:
+    """Tests for result cache use in ssh_execute."""
+
+    @pytest.mark.asyncio
+    async def test_second_probe_served_from_cache(self, mock_shared_context: MagicMock) -> None:
+        from merlya.tools.core import ssh_execute
+
+        pool = MagicMock()
+        pool.execute = AsyncMock(return_value=_ok("Ubuntu"))
+        pool.has_passphrase_callback = MagicMock(return_value=True)
+        pool.has_mfa_callback = MagicMock(return_value=True)
+        mock_shared_context.get_ssh_pool = AsyncMock(return_value=pool)
+        mock_shared_context.result_cache = CommandResultCache()
+        mock_shared_context.config.ssh.result_cache = True
+
+        first = await ssh_execute(mock_shared_context, "web-01", "cat /etc/os-release")
+        second = await ssh_execute(mock_shared_context, "web-01", "cat /etc/os-release")
+        await ssh_execute(mock_shared_context, "web-01", "apt-get upgrade -y")
+        third = await ssh_execute(mock_shared_context, "web-01", "cat /etc/os-release")
+
+        assert first.data["stdout"] == second.data["stdout"] == "Ubuntu"
+        assert "cached" not in first.data
+        assert second.data["cached"] is True
+        assert "cached" not in third.data
+        assert pool.execute.await_count == 3
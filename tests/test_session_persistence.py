@@ -0,0 +1,94 @@
+"""Tests for SessionManager message persistence."""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pydantic_ai.messages import ModelRequest, UserPromptPart
+
+from merlya.session.manager import SessionManager
+from merlya.session.summarizer import SummaryResult
+
+if TYPE_CHECKING:
+    from merlya.persistence.database import Database
+
+
+def _message(text: str) -> ModelRequest:
+    return ModelRequest(parts=[UserPromptPart(content=text)])
+
+
+@pytest.fixture
+def manager(database: Database) -> SessionManager:
+    """SessionManager with heuristic token counts (no tiktoken download)."""
+    SessionManager.reset_instance()
+    with patch.dict(sys.modules, {"tiktoken": None}):
+        manager = SessionManager(db=database)
+    manager._should_summarize = lambda: False  # type: ignore[method-assign]
+    return manager
+
+
+async def _stored(database: Database, session_id: str) -> list[tuple[int, int]]:
+    async with await database.execute(
+        "SELECT id, sequence_num FROM session_messages WHERE session_id = ? ORDER BY sequence_num",
+        (session_id,),
+    ) as cursor:
+        return [(row["id"], row["sequence_num"]) for row in await cursor.fetchall()]
+
+
+class TestAppendOnlyPersistence:
+    """Tests for incremental session_messages writes."""
+
+    @pytest.mark.asyncio
+    async def test_only_new_messages_are_written(
+        self, manager: SessionManager, database: Database
+    ) -> None:
+        session = await manager.start_session()
+        await manager.add_message(_message("first"))
+        first = await _stored(database, session.id)
+
+        with patch.object(database, "executemany", wraps=database.executemany) as spy:
+            await manager.add_message(_message("second"))
+
+        assert len(spy.await_args.args[1]) == 1
+        stored = await _stored(database, session.id)
+        assert stored[0] == first[0]  # Existing row untouched
+        assert [seq for _, seq in stored] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_summarization_rewrites_history(
+        self, manager: SessionManager, database: Database
+    ) -> None:
+        session = await manager.start_session()
+        for i in range(8):
+            await manager.add_message(_message(f"message {i}"))
+
+        summary = SummaryResult(
+            summary="earlier work",
+            original_tokens=100,
+            summary_tokens=10,
+            compression_ratio=0.1,
+            method="truncate",
+        )
+        with patch.object(manager.summarizer, "summarize", new=AsyncMock(return_value=summary)):
+            await manager._trigger_summarization()
+        await manager.add_message(_message("after"))
+
+        assert [seq for _, seq in await _stored(database, session.id)] == list(range(6))
+
+    @pytest.mark.asyncio
+    async def test_loaded_session_resumes_sequence(
+        self, manager: SessionManager, database: Database
+    ) -> None:
+        session = await manager.start_session()
+        for i in range(3):
+            await manager.add_message(_message(f"message {i}"))
+
+        loaded = await manager.load_session(session.id)
+        assert loaded is not None
+        assert len(loaded.messages) == 3
+        await manager.add_message(_message("resumed"))
+
+        assert [seq for _, seq in await _stored(database, session.id)] == [0, 1, 2, 3]
@@ -0,0 +1,69 @@
+"""Smoke tests for the SSH pool benchmark harness."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.ssh_pool import BenchmarkConfig, compare_results, percentile, run_benchmark
+from benchmarks.ssh_server import ServerOptions
+
+
+def test_percentile_nearest_rank() -> None:
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_results() -> None:
+    baseline = {
+        "ops_per_s": 100.0,
+        "errors": 0,
+        "server": {"handshakes": 10},
+        "latency_ms": {"p50": 10.0, "p99": 20.0},
+    }
+    current = {
+        "ops_per_s": 150.0,
+        "errors": 0,
+        "server": {"handshakes": 10},
+        "latency_ms": {"p50": 5.0, "p99": 20.0},
+    }
+
+    comparison = compare_results(baseline, current)
+
+    assert comparison["ops_per_s"]["change_pct"] == 50.0
+    assert comparison["p50_ms"]["change_pct"] == -50.0
+    assert comparison["errors"]["change_pct"] is None
+
+
+@pytest.mark.asyncio
+async def test_execute_reuses_one_connection_per_host() -> None:
+    result = await run_benchmark(BenchmarkConfig(hosts=3, commands=4))
+
+    assert (result.operations, result.errors) == (12, 0)
+    assert result.server["handshakes"] == 3
+    assert result.server["sessions"] == 12
+    assert result.latency_ms["p99"] > 0
+
+
+@pytest.mark.asyncio
+async def test_max_sessions_rejections_are_retried() -> None:
+    config = BenchmarkConfig(hosts=1, commands=8, server=ServerOptions(max_sessions=1))
+
+    result = await run_benchmark(config)
+
+    assert result.errors == 0
+    assert result.server["peak_sessions_per_connection"] == 1
+    assert result.server["handshakes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dropped_connections_reconnect() -> None:
+    config = BenchmarkConfig(hosts=2, commands=10, server=ServerOptions(drop_rate=0.2, seed=7))
+
+    result = await run_benchmark(config)
+
+    assert result.server["dropped_connections"] > 0
+    assert result.server["handshakes"] > 2
+    assert result.pool["open_circuits"] == 0
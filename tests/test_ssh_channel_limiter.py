@@ -0,0 +1,157 @@
+"""Tests for adaptive per-host SSH channel limits."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncssh
+import pytest
+
+from merlya.ssh.channel_limiter import AdaptiveChannelLimiter
+from merlya.ssh.pool import SSHExecuteOptions, SSHPool
+from merlya.ssh.registry import ConnectionKey
+from merlya.ssh.types import SSHConnection, SSHResult, is_channel_limit_error
+
+
+class TestAdaptiveChannelLimiter:
+    """Tests for AIMD limit adaptation."""
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self) -> None:
+        limiter = AdaptiveChannelLimiter(initial=2)
+        running = 0
+        peak = 0
+
+        async def work() -> None:
+            nonlocal running, peak
+            async with limiter:
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.in_use == 0
+
+    def test_rejection_halves_limit(self) -> None:
+        limiter = AdaptiveChannelLimiter(initial=8)
+
+        limiter.record_rejection()
+        assert limiter.limit == 4
+        limiter.record_rejection()
+        limiter.record_rejection()
+        limiter.record_rejection()
+        assert limiter.limit == 1
+        assert limiter.rejections == 4
+
+    @pytest.mark.asyncio
+    async def test_success_at_capacity_raises_limit(self) -> None:
+        limiter = AdaptiveChannelLimiter(initial=2, max_limit=3)
+
+        for _ in range(2):
+            await limiter.acquire()
+        for _ in range(2):
+            limiter.release()
+            limiter.record_success()
+
+        assert limiter.limit == 3
+
+        # Ceiling reached: more successes do not raise further
+        for _ in range(3):
+            await limiter.acquire()
+        for _ in range(3):
+            limiter.release()
+            limiter.record_success()
+        assert limiter.limit == 3
+
+    @pytest.mark.asyncio
+    async def test_sequential_use_does_not_raise_limit(self) -> None:
+        limiter = AdaptiveChannelLimiter(initial=4)
+
+        for _ in range(20):
+            async with limiter:
+                pass
+            limiter.record_success()
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_raise_wakes_waiters(self) -> None:
+        limiter = AdaptiveChannelLimiter(initial=1, max_limit=2)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.record_success()  # 1 success at capacity 1 -> limit 2
+        await asyncio.wait_for(waiter, 1.0)
+
+        assert limiter.in_use == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self) -> None:
+        limiter = AdaptiveChannelLimiter(initial=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+        assert limiter.in_use == 0
+        assert not limiter.locked()
+
+
+class TestChannelLimitErrors:
+    """Tests for channel-open rejection detection."""
+
+    def test_channel_open_error(self) -> None:
+        error = asyncssh.ChannelOpenError(asyncssh.OPEN_ADMINISTRATIVELY_PROHIBITED, "refused")
+        assert is_channel_limit_error(error)
+
+    def test_closed_connection_is_not_a_limit(self) -> None:
+        error = asyncssh.ChannelOpenError(asyncssh.OPEN_CONNECT_FAILED, "SSH connection closed")
+        assert not is_channel_limit_error(error)
+
+    def test_message_patterns(self) -> None:
+        assert is_channel_limit_error(RuntimeError("channel open failed"))
+        assert not is_channel_limit_error(RuntimeError("connection refused"))
+
+
+class TestPoolChannelAdaptation:
+    """Tests for limiter integration in SSHPool."""
+
+    def setup_method(self) -> None:
+        SSHPool.reset_instance()
+
+    @pytest.mark.asyncio
+    async def test_rejection_lowers_limit_without_reconnect(self) -> None:
+        pool = SSHPool(retry_delay=0)
+        conn = SSHConnection(host="appliance", connection=MagicMock())
+        pool._connections[ConnectionKey("default", "appliance")] = conn
+
+        calls = 0
+
+        async def fake_execute(*_args: object, **_kwargs: object) -> SSHResult:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise asyncssh.ChannelOpenError(
+                    asyncssh.OPEN_ADMINISTRATIVELY_PROHIBITED, "open failed"
+                )
+            return SSHResult(stdout="ok", stderr="", exit_code=0)
+
+        with (
+            patch("merlya.ssh.pool.execute_command", side_effect=fake_execute),
+            patch.object(pool, "_invalidate_connection", new_callable=AsyncMock) as invalidate,
+        ):
+            result = await pool.execute("appliance", "uptime", SSHExecuteOptions())
+
+        assert result.stdout == "ok"
+        assert pool.get_channel_limits() == {"appliance:22": 2}
+        invalidate.assert_not_called()
@@ -0,0 +1,303 @@
+"""Tests for the SSH connection daemon and its client."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncssh
+import pytest
+
+from merlya.ssh.daemon import SSHDaemon
+from merlya.ssh.daemon_client import (
+    SSHDaemonAuthRequired,
+    SSHDaemonClient,
+    SSHDaemonUnavailable,
+)
+from merlya.ssh.daemon_protocol import ERROR_AUTH, ERROR_CONNECTION, error_kind
+from merlya.ssh.pool import SSHConnectionOptions, SSHExecuteOptions, SSHPool
+from merlya.ssh.sftp_transfer import SFTPTransferOptions, SFTPTransferStats
+from merlya.ssh.types import SSHResult
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterator
+
+
+@pytest.fixture
+def socket_path() -> Iterator[Path]:
+    # Unix socket paths are length-limited, so avoid pytest's deep tmp_path
+    directory = Path(tempfile.mkdtemp(prefix="merlya-", dir="/tmp"))
+    yield directory / "ssh.sock"
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _fake_pool() -> MagicMock:
+    pool = MagicMock()
+    pool.execute = AsyncMock(return_value=SSHResult(stdout="ok\n", stderr="", exit_code=0))
+    pool.disconnect = AsyncMock()
+    pool.get_connection = AsyncMock()
+    pool.disconnect_all = AsyncMock()
+    pool.stop_maintenance = AsyncMock()
+    pool.get_registry_stats = MagicMock(return_value={"connections": 1})
+    pool.get_jump_tunnel_stats = MagicMock(return_value=[])
+    return pool
+
+
+@pytest.fixture
+async def daemon(socket_path: Path) -> AsyncIterator[SSHDaemon]:
+    daemon = SSHDaemon(_fake_pool(), socket_path, idle_timeout=0)
+    await daemon.start()
+    yield daemon
+    await daemon.close()
+
+
+class TestDaemonRequests:
+    """Round trips between SSHDaemonClient and SSHDaemon."""
+
+    @pytest.mark.asyncio
+    async def test_connect_without_daemon(self, socket_path: Path) -> None:
+        assert await SSHDaemonClient.connect(socket_path) is None
+
+    @pytest.mark.asyncio
+    async def test_socket_is_private(self, daemon: SSHDaemon) -> None:
+        assert daemon.socket_path.stat().st_mode & 0o077 == 0
+
+    @pytest.mark.asyncio
+    async def test_execute(self, daemon: SSHDaemon) -> None:
+        client = await SSHDaemonClient.connect(daemon.socket_path)
+        assert client is not None
+        try:
+            opts = SSHExecuteOptions(
+                timeout=5, username="deploy", options=SSHConnectionOptions(port=2222)
+            )
+            result = await client.execute("web", "uptime", opts)
+        finally:
+            await client.close()
+
+        assert result == SSHResult(stdout="ok\n", stderr="", exit_code=0)
+        host, command, sent = daemon.pool.execute.call_args.args
+        assert (host, command) == ("web", "uptime")
+        assert sent.username == "deploy"
+        assert sent.options == SSHConnectionOptions(port=2222)
+
+    @pytest.mark.asyncio
+    async def test_prewarm(self, daemon: SSHDaemon) -> None:
+        client = await SSHDaemonClient.connect(daemon.socket_path)
+        assert client is not None
+        try:
+            ready = await client.prewarm(
+                "web", {"username": "deploy", "options": SSHConnectionOptions(port=2222)}
+            )
+        finally:
+            await client.close()
+
+        assert ready is True
+        daemon.pool.get_connection.assert_awaited_once_with(
+            "web",
+            username="deploy",
+            private_key=None,
+            options=SSHConnectionOptions(port=2222),
+            host_name=None,
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_socket(self, daemon: SSHDaemon) -> None:
+        async def execute(_host: str, command: str, _opts: object) -> SSHResult:
+            await asyncio.sleep(0.01 if command == "slow" else 0)
+            return SSHResult(stdout=command, stderr="", exit_code=0)
+
+        daemon.pool.execute = AsyncMock(side_effect=execute)
+        client = await SSHDaemonClient.connect(daemon.socket_path)
+        assert client is not None
+        try:
+            results = await asyncio.gather(
+                client.execute("a", "slow", SSHExecuteOptions()),
+                client.execute("b", "fast", SSHExecuteOptions()),
+            )
+        finally:
+            await client.close()
+
+        assert [r.stdout for r in results] == ["slow", "fast"]
+
+    @pytest.mark.asyncio
+    async def test_large_output_is_truncated(self, daemon: SSHDaemon) -> None:
+        big = "x" * 5000
+        daemon.pool.execute = AsyncMock(
+            return_value=SSHResult(stdout=big, stderr="err", exit_code=0)
+        )
+        client = await SSHDaemonClient.connect(daemon.socket_path)
+        assert client is not None
+        try:
+            with patch("merlya.ssh.daemon.MAX_OUTPUT_CHARS", 1000):
+                result = await client.execute("web", "cat big.log", SSHExecuteOptions())
+        finally:
+            await client.close()
+
+        assert result.truncated
+        assert result.stdout.startswith("x" * 500) and result.stdout.endswith("x" * 500)
+        assert "[4000 bytes truncated]" in result.stdout
+        assert result.stderr == "err"
+
+    @pytest.mark.asyncio
+    async def test_oversized_response_fails_only_its_request(self, socket_path: Path) -> None:
+        with (
+            patch("merlya.ssh.daemon.MAX_MESSAGE_BYTES", 4096),
+            patch("merlya.ssh.daemon_client.MAX_MESSAGE_BYTES", 4096),
+        ):
+            daemon = SSHDaemon(_fake_pool(), socket_path, idle_timeout=0)
+            daemon.pool.get_registry_stats = MagicMock(return_value={"blob": "y" * 10_000})
+            await daemon.start()
+            client = await SSHDaemonClient.connect(socket_path)
+            assert client is not None
+            try:
+                stats, result = await asyncio.gather(
+                    client.stats(),
+                    client.execute("web", "uptime", SSHExecuteOptions()),
+                    return_exceptions=True,
+                )
+                assert isinstance(stats, ValueError)
+                assert isinstance(result, SSHResult)
+                assert client.connected
+                assert (await client.ping())["pid"]
+            finally:
+                await client.close()
+                await daemon.close()
+
+    @pytest.mark.asyncio
+    async def test_errors_map_to_exceptions(self, daemon: SSHDaemon) -> None:
+        client = await SSHDaemonClient.connect(daemon.socket_path)
+        assert client is not None
+        try:
+            daemon.pool.execute.side_effect = TimeoutError("too slow")
+            with pytest.raises(TimeoutError, match="too slow"):
+                await client.execute("web", "sleep 9", SSHExecuteOptions())
+
+            daemon.pool.execute.side_effect = asyncssh.PermissionDenied("denied")
+            with pytest.raises(SSHDaemonAuthRequired):
+                await client.execute("web", "id", SSHExecuteOptions())
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_download_forwards_progress(self, daemon: SSHDaemon) -> None:
+        async def download(
+            _host: str, _remote: str, _local: str, transfer: SFTPTransferOptions, **_kw: object
+        ) -> SFTPTransferStats:
+            assert transfer.on_progress is not None
+            transfer.on_progress(5, 10)
+            transfer.on_progress(10, 10)
+            return SFTPTransferStats(size=10, transferred=10, elapsed=0.5)
+
+        daemon.pool.download_file = AsyncMock(side_effect=download)
+        seen: list[tuple[int, int]] = []
+        client = await SSHDaemonClient.connect(daemon.socket_path)
+        assert client is not None
+        try:
+            stats = await client.transfer(
+                "download",
+                "web",
+                "/tmp/out.log",
+                "/var/log/app.log",
+                SFTPTransferOptions(on_progress=lambda d, t: seen.append((d, t))),
+                {},
+            )
+        finally:
+            await client.close()
+
+        assert stats.size == 10
+        assert seen == [(5, 10), (10, 10)]
+
+    @pytest.mark.asyncio
+    async def test_shutdown(self, socket_path: Path) -> None:
+        daemon = SSHDaemon(_fake_pool(), socket_path, idle_timeout=0)
+        await daemon.start()
+        serving = asyncio.create_task(daemon.serve_forever())
+        client = await SSHDaemonClient.connect(socket_path)
+        assert client is not None
+
+        await client.shutdown()
+        await asyncio.wait_for(serving, timeout=5)
+        await client.close()
+
+        assert not socket_path.exists()
+        daemon.pool.disconnect_all.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_replaces_stale_socket(self, socket_path: Path) -> None:
+        socket_path.parent.mkdir(exist_ok=True)
+        socket_path.touch()
+        daemon = SSHDaemon(_fake_pool(), socket_path, idle_timeout=0)
+
+        await daemon.start()
+        try:
+            client = await SSHDaemonClient.connect(socket_path)
+            assert client is not None
+            assert (await client.ping())["pid"] > 0
+            await client.close()
+        finally:
+            await daemon.close()
+
+
+class TestErrorKind:
+    """Tests for daemon error classification."""
+
+    def test_auth(self) -> None:
+        assert error_kind(asyncssh.KeyEncryptionError("bad passphrase")) == ERROR_AUTH
+        assert error_kind(RuntimeError("Passphrase required for key")) == ERROR_AUTH
+
+    def test_connection(self) -> None:
+        assert error_kind(ConnectionRefusedError("refused")) == ERROR_CONNECTION
+
+
+class TestPoolDaemonRouting:
+    """Tests for SSHPool delegation to an attached daemon."""
+
+    def setup_method(self) -> None:
+        SSHPool.reset_instance()
+
+    @pytest.mark.asyncio
+    async def test_execute_goes_through_daemon(self) -> None:
+        pool = SSHPool()
+        client = MagicMock()
+        client.execute = AsyncMock(return_value=SSHResult(stdout="x", stderr="", exit_code=0))
+        pool.attach_daemon(client)
+        pool._execute_once = AsyncMock()  # type: ignore[method-assign]
+
+        result = await pool.execute("web", "ls", SSHExecuteOptions(username="u"))
+
+        assert result.stdout == "x"
+        pool._execute_once.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_daemon_needs_auth(self) -> None:
+        pool = SSHPool()
+        client = MagicMock()
+        client.execute = AsyncMock(side_effect=SSHDaemonAuthRequired("passphrase"))
+        pool.attach_daemon(client)
+        local = SSHResult(stdout="local", stderr="", exit_code=0)
+        pool._execute_once = AsyncMock(return_value=local)  # type: ignore[method-assign]
+
+        result = await pool.execute("web", "ls", SSHExecuteOptions())
+
+        assert result is local
+        assert pool.daemon_attached
+
+    @pytest.mark.asyncio
+    async def test_detaches_unreachable_daemon(self) -> None:
+        pool = SSHPool()
+        client = MagicMock()
+        client.execute = AsyncMock(side_effect=SSHDaemonUnavailable("closed"))
+        client.close = AsyncMock()
+        pool.attach_daemon(client)
+        local = SSHResult(stdout="local", stderr="", exit_code=0)
+        pool._execute_once = AsyncMock(return_value=local)  # type: ignore[method-assign]
+
+        result = await pool.execute("web", "ls", SSHExecuteOptions())
+
+        assert result is local
+        assert not pool.daemon_attached
+        client.close.assert_awaited_once()
@@ -0,0 +1,166 @@
+"""Tests for SSHPool.execute_many fleet fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from merlya.ssh import FanoutOptions, SSHExecuteOptions, SSHPool, SSHResult, SSHTarget
+
+
+class _FakePool(SSHPool):
+    """SSHPool whose execute() is scripted per host."""
+
+    def __init__(self, delays: dict[str, float], exit_codes: dict[str, int] | None = None) -> None:
+        super().__init__()
+        self.delays = delays
+        self.exit_codes = exit_codes or {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+        self.seen_options: dict[str, SSHExecuteOptions | None] = {}
+
+    async def execute(  # type: ignore[override]
+        self,
+        host: str,
+        command: str,
+        exec_options: SSHExecuteOptions | None = None,
+    ) -> SSHResult:
+        self.started.append(host)
+        self.seen_options[host] = exec_options
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(host, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(host)
+            raise
+        finally:
+            self.in_flight -= 1
+        if host.startswith("boom"):
+            raise ConnectionError(f"cannot reach {host}")
+        return SSHResult(
+            stdout=f"{host}:{command}", stderr="", exit_code=self.exit_codes.get(host, 0)
+        )
+
+
+async def _collect(pool: SSHPool, targets: list, **kwargs) -> list:
+    return [item async for item in pool.execute_many(targets, "uptime", **kwargs)]
+
+
+class TestExecuteMany:
+    """Tests for as-completed fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_yields_in_completion_order(self) -> None:
+        """Fast hosts are yielded before slow ones."""
+        pool = _FakePool({"slow": 0.05, "fast": 0.0, "mid": 0.02})
+
+        results = await _collect(pool, ["slow", "fast", "mid"])
+
+        assert [host for host, _ in results] == ["fast", "mid", "slow"]
+        assert all(isinstance(r, SSHResult) for _, r in results)
+
+    @pytest.mark.asyncio
+    async def test_errors_are_yielded_not_raised(self) -> None:
+        """A failing host yields its exception and does not stop the others."""
+        pool = _FakePool({})
+
+        results = dict(await _collect(pool, ["ok-1", "boom-1", "ok-2"]))
+
+        assert isinstance(results["boom-1"], ConnectionError)
+        assert results["ok-1"].stdout == "ok-1:uptime"
+        assert results["ok-2"].exit_code == 0
+
+    @pytest.mark.asyncio
+    async def test_respects_max_concurrency(self) -> None:
+        """No more than max_concurrency hosts run at once."""
+        hosts = [f"h{i}" for i in range(20)]
+        pool = _FakePool(dict.fromkeys(hosts, 0.01))
+
+        results = await _collect(pool, hosts, fanout=FanoutOptions(max_concurrency=3))
+
+        assert len(results) == 20
+        assert pool.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_targets_consumed_lazily(self) -> None:
+        """Targets are pulled from the iterable only as slots free up."""
+        pool = _FakePool({})
+        pulled: list[str] = []
+
+        def targets():
+            for i in range(100):
+                pulled.append(f"h{i}")
+                yield f"h{i}"
+
+        gen = pool.execute_many(targets(), "uptime", fanout=FanoutOptions(max_concurrency=2))
+        await gen.__anext__()
+        await gen.aclose()
+
+        assert len(pulled) <= 4
+
+    @pytest.mark.asyncio
+    async def test_fail_fast_cancels_remaining(self) -> None:
+        """fail_fast stops on the first failure and cancels in-flight hosts."""
+        pool = _FakePool({"boom": 0.0, "slow-1": 1.0, "slow-2": 1.0}, {})
+
+        results = await _collect(
+            pool, ["boom", "slow-1", "slow-2"], fanout=FanoutOptions(fail_fast=True)
+        )
+
+        assert [host for host, _ in results] == ["boom"]
+        assert sorted(pool.cancelled) == ["slow-1", "slow-2"]
+
+    @pytest.mark.asyncio
+    async def test_fail_fast_on_nonzero_exit(self) -> None:
+        """A non-zero exit code counts as a failure for fail_fast."""
+        pool = _FakePool({"bad": 0.0, "slow": 1.0}, {"bad": 2})
+
+        results = await _collect(pool, ["bad", "slow"], fanout=FanoutOptions(fail_fast=True))
+
+        assert len(results) == 1
+        assert results[0][1].exit_code == 2
+        assert pool.cancelled == ["slow"]
+
+    @pytest.mark.asyncio
+    async def test_quorum_stops_after_enough_successes(self) -> None:
+        """quorum cancels the rest once N hosts succeeded."""
+        hosts = ["a", "b", "c", "d"]
+        pool = _FakePool({"a": 0.0, "b": 0.0, "c": 1.0, "d": 1.0})
+
+        results = await _collect(pool, hosts, fanout=FanoutOptions(quorum=2))
+
+        assert sorted(host for host, _ in results) == ["a", "b"]
+        assert sorted(pool.cancelled) == ["c", "d"]
+
+    @pytest.mark.asyncio
+    async def test_per_target_options_and_label(self) -> None:
+        """SSHTarget options override shared options and label is yielded."""
+        pool = _FakePool({})
+        shared = SSHExecuteOptions(timeout=5)
+        specific = SSHExecuteOptions(timeout=30, username="admin")
+
+        results = await _collect(
+            pool,
+            [SSHTarget(host="10.0.0.1", exec_options=specific, label="web-01"), "10.0.0.2"],
+            exec_options=shared,
+        )
+
+        assert {host for host, _ in results} == {"web-01", "10.0.0.2"}
+        assert pool.seen_options["10.0.0.1"] is specific
+        assert pool.seen_options["10.0.0.2"] is shared
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self) -> None:
+        """Invalid command or fan-out options are rejected up front."""
+        pool = _FakePool({})
+
+        with pytest.raises(ValueError, match="cannot be empty"):
+            [item async for item in pool.execute_many(["a"], " ")]
+        with pytest.raises(ValueError, match="max_concurrency"):
+            await _collect(pool, ["a"], fanout=FanoutOptions(max_concurrency=0))
+        with pytest.raises(ValueError, match="quorum"):
+            await _collect(pool, ["a"], fanout=FanoutOptions(quorum=0))
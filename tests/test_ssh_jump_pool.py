@@ -0,0 +1,159 @@
+"""Tests for shared, reference-counted jump-host tunnels."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from merlya.ssh.jump_pool import JumpTunnelPool, jump_key_for
+from merlya.ssh.pool import SSHConnectionOptions, SSHPool
+
+
+def _asyncssh_conn() -> MagicMock:
+    conn = MagicMock()
+    conn.is_closed = MagicMock(return_value=False)
+    conn.wait_closed = AsyncMock()
+    return conn
+
+
+class TestJumpTunnelPool:
+    """Tests for JumpTunnelPool."""
+
+    def test_key_ignores_target(self) -> None:
+        a = SSHConnectionOptions(port=22, jump_host="bastion", jump_username="ops")
+        b = SSHConnectionOptions(port=2222, jump_host="bastion", jump_port=22, jump_username="ops")
+
+        assert jump_key_for(a) == jump_key_for(b) == ("bastion", 22, "ops", None)
+        assert jump_key_for(SSHConnectionOptions()) is None
+
+    @pytest.mark.asyncio
+    async def test_different_jump_keys_do_not_share_tunnel(self) -> None:
+        pool = JumpTunnelPool()
+        connect = AsyncMock(side_effect=lambda _opts: _asyncssh_conn())
+        alice = SSHConnectionOptions(jump_host="bastion", jump_private_key="~/.ssh/alice")
+        bob = SSHConnectionOptions(jump_host="bastion", jump_private_key="~/.ssh/bob")
+
+        lease_a = await pool.acquire(alice, connect)
+        lease_b = await pool.acquire(bob, connect)
+        lease_a2 = await pool.acquire(
+            SSHConnectionOptions(
+                jump_host="bastion", jump_private_key=str(Path("~/.ssh/alice").expanduser())
+            ),
+            connect,
+        )
+
+        assert connect.await_count == 2
+        assert lease_a is not None and lease_b is not None and lease_a2 is not None
+        assert lease_a.connection is not lease_b.connection
+        assert lease_a2.connection is lease_a.connection
+
+    @pytest.mark.asyncio
+    async def test_no_jump_host_returns_none(self) -> None:
+        pool = JumpTunnelPool()
+        connect = AsyncMock()
+
+        assert await pool.acquire(SSHConnectionOptions(), connect) is None
+        connect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_targets_share_one_bastion(self) -> None:
+        pool = JumpTunnelPool()
+        bastion = _asyncssh_conn()
+
+        async def connect(_opts: SSHConnectionOptions) -> MagicMock:
+            await asyncio.sleep(0.01)
+            return bastion
+
+        connect_mock = AsyncMock(side_effect=connect)
+        opts = SSHConnectionOptions(jump_host="bastion")
+
+        leases = await asyncio.gather(*(pool.acquire(opts, connect_mock) for _ in range(50)))
+
+        assert connect_mock.await_count == 1
+        assert all(lease is not None and lease.connection is bastion for lease in leases)
+        assert pool.stats()[0]["dependents"] == 50
+
+    @pytest.mark.asyncio
+    async def test_closes_only_after_last_release(self) -> None:
+        pool = JumpTunnelPool()
+        bastion = _asyncssh_conn()
+        opts = SSHConnectionOptions(jump_host="bastion")
+        connect = AsyncMock(return_value=bastion)
+
+        first = await pool.acquire(opts, connect)
+        second = await pool.acquire(opts, connect)
+        assert first is not None and second is not None
+
+        await first.release()
+        await first.release()  # idempotent
+        bastion.close.assert_not_called()
+
+        await second.release()
+        bastion.close.assert_called_once()
+        assert pool.stats() == []
+
+    @pytest.mark.asyncio
+    async def test_dead_bastion_is_replaced(self) -> None:
+        pool = JumpTunnelPool()
+        dead, fresh = _asyncssh_conn(), _asyncssh_conn()
+        connect = AsyncMock(side_effect=[dead, fresh])
+        opts = SSHConnectionOptions(jump_host="bastion")
+
+        await pool.acquire(opts, connect)
+        dead.is_closed.return_value = True
+        lease = await pool.acquire(opts, connect)
+
+        assert lease is not None and lease.connection is fresh
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_opens_for_failing_bastion(self) -> None:
+        pool = JumpTunnelPool()
+        connect = AsyncMock(side_effect=OSError("no route to host"))
+        opts = SSHConnectionOptions(jump_host="bastion")
+
+        for _ in range(5):
+            with pytest.raises(OSError):
+                await pool.acquire(opts, connect)
+
+        with pytest.raises(RuntimeError, match="Circuit breaker open for jump host bastion"):
+            await pool.acquire(opts, connect)
+        assert connect.await_count == 5
+        assert pool.get_circuit_status("bastion")[0]["state"] == "open"
+
+
+class TestSSHPoolJumpSharing:
+    """Tests for tunnel sharing through SSHPool."""
+
+    def setup_method(self) -> None:
+        SSHPool.reset_instance()
+
+    @pytest.mark.asyncio
+    async def test_targets_share_tunnel_and_release_on_close(self) -> None:
+        pool = SSHPool()
+        bastion = _asyncssh_conn()
+        opts = SSHConnectionOptions(jump_host="bastion")
+
+        with (
+            patch.object(pool, "_build_ssh_options", new_callable=AsyncMock, return_value={}),
+            patch.object(
+                pool, "_setup_jump_tunnel", new_callable=AsyncMock, return_value=bastion
+            ) as setup,
+            patch.object(pool, "_create_mfa_client", return_value=None),
+            patch.object(
+                pool, "_connect_with_options", new_callable=AsyncMock, return_value=_asyncssh_conn()
+            ) as connect,
+        ):
+            conn1 = await pool.get_connection("web-1", options=opts)
+            conn2 = await pool.get_connection("web-2", options=opts)
+
+        assert setup.await_count == 1
+        assert all(call.args[1]["tunnel"] is bastion for call in connect.await_args_list)
+        assert pool.get_jump_tunnel_stats()[0]["dependents"] == 2
+
+        await conn1.close()
+        bastion.close.assert_not_called()
+        await conn2.close()
+        bastion.close.assert_called_once()
@@ -11,6 +11,7 @@ import asyncssh
 import pytest
 
 from merlya.ssh.pool import SSHConnectionOptions, SSHPool
+from merlya.ssh.registry import ConnectionKey
 
 
 class TestSSHPoolSingleton:
@@ -120,15 +121,13 @@ class TestSSHPoolLimits:
         )
         new_conn.close = AsyncMock()
 
-        pool._connections = {
-            "host1": old_conn,
-            "host2": new_conn,
-        }
+        pool._connections.add(ConnectionKey("user", "host1"), old_conn)
+        pool._connections.add(ConnectionKey("user", "host2"), new_conn)
 
         await pool._evict_lru_connection()
 
-        assert "host1" not in pool._connections
-        assert "host2" in pool._connections
+        assert ConnectionKey("user", "host1") not in pool._connections
+        assert ConnectionKey("user", "host2") in pool._connections
 
 
 class TestSSHPoolPortValidation:
@@ -299,18 +298,18 @@ class TestSSHPoolConnectionLock:
         """Test that connection lock is created for new key."""
         pool = await SSHPool.get_instance()
 
-        lock = await pool._get_connection_lock("user@host:22")
+        lock = await pool._get_connection_lock(ConnectionKey("user", "host"))
 
         assert lock is not None
-        assert "user@host:22" in pool._connection_locks
+        assert ConnectionKey("user", "host") in pool._connection_locks
 
     @pytest.mark.asyncio
     async def test_get_connection_lock_reuses_existing(self) -> None:
         """Test that existing lock is reused."""
         pool = await SSHPool.get_instance()
 
-        lock1 = await pool._get_connection_lock("user@host:22")
-        lock2 = await pool._get_connection_lock("user@host:22")
+        lock1 = await pool._get_connection_lock(ConnectionKey("user", "host"))
+        lock2 = await pool._get_connection_lock(ConnectionKey("user", "host"))
 
         assert lock1 is lock2
 
@@ -326,13 +325,75 @@ class TestSSHPoolEviction:
     async def test_evict_lru_empty_pool(self) -> None:
         """Test eviction on empty pool does nothing."""
         pool = await SSHPool.get_instance()
-        pool._connections = {}
 
         # Should not raise
         await pool._evict_lru_connection()
 
         assert pool._connections == {}
 
+    @pytest.mark.asyncio
+    async def test_evict_lru_follows_reuse_order(self) -> None:
+        """Test that reused connections move to the back of the LRU order."""
+        from merlya.ssh.types import SSHConnection
+
+        pool = await SSHPool.get_instance()
+
+        conns = {}
+        for name in ("a", "b", "c"):
+            conn = SSHConnection(host=name, connection=MagicMock())
+            conn.close = AsyncMock()
+            conns[ConnectionKey("user", name)] = conn
+        pool._connections.update(conns)
+
+        pool._touch_connection(ConnectionKey("user", "a"))
+        await pool._evict_lru_connection()
+        await pool._drain_pending_closes()
+
+        assert list(pool._connections) == [ConnectionKey("user", "c"), ConnectionKey("user", "a")]
+        conns[ConnectionKey("user", "b")].close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_evict_lru_closes_outside_pool_lock(self) -> None:
+        """Test that a slow close does not hold the pool lock."""
+        from merlya.ssh.types import SSHConnection
+
+        pool = await SSHPool.get_instance()
+        release = asyncio.Event()
+
+        async def slow_close() -> None:
+            await release.wait()
+
+        conn = SSHConnection(host="slow", connection=MagicMock())
+        conn.close = slow_close  # type: ignore[method-assign]
+        pool._connections[ConnectionKey("user", "slow")] = conn
+
+        async with pool._pool_locked():
+            await pool._evict_lru_connection()
+
+        # Lock is free even though the close has not completed yet
+        lock = await asyncio.wait_for(
+            pool._get_connection_lock(ConnectionKey("user", "other")), 1.0
+        )
+        assert lock is not None
+        assert len(pool._pending_closes) == 1
+
+        release.set()
+        await pool._drain_pending_closes()
+        assert not pool._pending_closes
+
+    @pytest.mark.asyncio
+    async def test_pool_lock_wait_is_tracked(self) -> None:
+        """Test that pool lock acquisition records a wait-time metric."""
+        from merlya.core.metrics import get_registry
+
+        pool = await SSHPool.get_instance()
+        histogram = get_registry().histogram("merlya_ssh_pool_lock_wait_seconds")
+        before = histogram.get_stats()["count"]
+
+        await pool._get_connection_lock(ConnectionKey("user", "host"))
+
+        assert histogram.get_stats()["count"] == before + 1
+
 
 class TestSSHPoolHasConnection:
     """Tests for has_connection method."""
@@ -351,7 +412,7 @@ class TestSSHPoolHasConnection:
         mock_conn = MagicMock()
         conn = SSHConnection(host="192.168.1.1", connection=mock_conn)
         conn.is_alive = MagicMock(return_value=True)
-        pool._connections = {"user@192.168.1.1:22": conn}
+        pool._connections[ConnectionKey("user", "192.168.1.1")] = conn
 
         assert pool.has_connection("192.168.1.1") is True
 
@@ -359,7 +420,6 @@ class TestSSHPoolHasConnection:
     async def test_has_connection_false_not_found(self) -> None:
         """Test has_connection returns False when not found."""
         pool = await SSHPool.get_instance()
-        pool._connections = {}
 
         assert pool.has_connection("unknown-host") is False
 
@@ -373,7 +433,7 @@ class TestSSHPoolHasConnection:
         mock_conn = MagicMock()
         conn = SSHConnection(host="192.168.1.1", connection=mock_conn)
         conn.is_alive = MagicMock(return_value=False)
-        pool._connections = {"user@192.168.1.1:22": conn}
+        pool._connections[ConnectionKey("user", "192.168.1.1")] = conn
 
         assert pool.has_connection("192.168.1.1") is False
 
@@ -387,7 +447,7 @@ class TestSSHPoolHasConnection:
         mock_conn = MagicMock()
         conn = SSHConnection(host="192.168.1.1", connection=mock_conn)
         conn.is_alive = MagicMock(return_value=True)
-        pool._connections = {"user@192.168.1.1:2222": conn}
+        pool._connections[ConnectionKey("user", "192.168.1.1", 2222)] = conn
 
         assert pool.has_connection("192.168.1.1", port=2222) is True
         assert pool.has_connection("192.168.1.1", port=22) is False
@@ -402,7 +462,7 @@ class TestSSHPoolHasConnection:
         mock_conn = MagicMock()
         conn = SSHConnection(host="192.168.1.1", connection=mock_conn)
         conn.is_alive = MagicMock(return_value=True)
-        pool._connections = {"admin@192.168.1.1:22": conn}
+        pool._connections[ConnectionKey("admin", "192.168.1.1")] = conn
 
         assert pool.has_connection("192.168.1.1", username="admin") is True
         assert pool.has_connection("192.168.1.1", username="root") is False
@@ -425,18 +485,17 @@ class TestSSHPoolDisconnect:
         mock_conn = MagicMock()
         conn = SSHConnection(host="host1", connection=mock_conn)
         conn.close = AsyncMock()
-        pool._connections = {"user@host1:22": conn}
+        pool._connections[ConnectionKey("user", "host1")] = conn
 
         await pool.disconnect("host1")
 
-        assert "user@host1:22" not in pool._connections
+        assert ConnectionKey("user", "host1") not in pool._connections
         conn.close.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_disconnect_nonexistent_host(self) -> None:
         """Test disconnecting non-existent host does nothing."""
         pool = await SSHPool.get_instance()
-        pool._connections = {}
 
         # Should not raise
         await pool.disconnect("nonexistent")
@@ -456,13 +515,15 @@ class TestSSHPoolDisconnect:
         conn2 = SSHConnection(host="host2", connection=mock_conn2)
         conn2.close = AsyncMock()
 
-        pool._connections = {
-            "user@host1:22": conn1,
-            "user@host2:22": conn2,
-        }
+        pool._connections.update(
+            {
+                ConnectionKey("user", "host1"): conn1,
+                ConnectionKey("user", "host2"): conn2,
+            }
+        )
         pool._connection_locks = {
-            "user@host1:22": asyncio.Lock(),
-            "user@host2:22": asyncio.Lock(),
+            ConnectionKey("user", "host1"): asyncio.Lock(),
+            ConnectionKey("user", "host2"): asyncio.Lock(),
         }
 
         await pool.disconnect_all()
@@ -828,7 +889,7 @@ class TestSSHPoolGetConnection:
         conn.is_alive = MagicMock(return_value=True)
         conn.refresh_timeout = MagicMock()
 
-        pool._connections = {"user@host1:22": conn}
+        pool._connections[ConnectionKey("user", "host1")] = conn
 
         result = await pool.get_connection("host1", username="user")
 
@@ -847,7 +908,7 @@ class TestSSHPoolGetConnection:
         old_conn.is_alive = MagicMock(return_value=False)
         old_conn.close = AsyncMock()
 
-        pool._connections = {"user@host1:22": old_conn}
+        pool._connections[ConnectionKey("user", "host1")] = old_conn
 
         # Mock _create_connection to return new connection
         new_conn = SSHConnection(host="host1", connection=MagicMock())
@@ -878,7 +939,7 @@ class TestSSHPoolGetConnection:
         old_conn.is_alive = MagicMock(return_value=True)
         old_conn.close = AsyncMock()
 
-        pool._connections = {"user@host1:22": old_conn}
+        pool._connections[ConnectionKey("user", "host1")] = old_conn
 
         new_conn = SSHConnection(host="host2", connection=MagicMock())
         with patch.object(
@@ -886,8 +947,8 @@ class TestSSHPoolGetConnection:
         ):
             await pool.get_connection("host2", username="admin")
 
-        assert "user@host1:22" not in pool._connections
-        assert "admin@host2:22" in pool._connections
+        assert ConnectionKey("user", "host1") not in pool._connections
+        assert ConnectionKey("admin", "host2") in pool._connections
 
 
 # ==============================================================================
@@ -1036,7 +1097,7 @@ class TestSSHPoolExecuteFlow:
         conn.is_alive = MagicMock(return_value=True)
         conn.refresh_timeout = MagicMock()
 
-        pool._connections = {"user@host1:22": conn}
+        pool._connections[ConnectionKey("user", "host1")] = conn
 
         result = await pool.execute("host1", "ls -la", username="user")
 
@@ -1063,7 +1124,7 @@ class TestSSHPoolExecuteFlow:
         conn.is_alive = MagicMock(return_value=True)
         conn.refresh_timeout = MagicMock()
 
-        pool._connections = {"user@host1:22": conn}
+        pool._connections[ConnectionKey("user", "host1")] = conn
 
         result = await pool.execute("host1", "cat /bin/ls", username="user")
 
@@ -1084,7 +1145,7 @@ class TestSSHPoolExecuteFlow:
         conn.is_alive = MagicMock(return_value=True)
         conn.refresh_timeout = MagicMock()
 
-        pool._connections = {"user@host1:22": conn}
+        pool._connections[ConnectionKey("user", "host1")] = conn
 
         with pytest.raises(TimeoutError):
             await pool.execute("host1", "sleep 1000", username="user", timeout=1)
@@ -1100,7 +1161,7 @@ class TestSSHPoolExecuteFlow:
         conn.is_alive = MagicMock(return_value=True)
         conn.refresh_timeout = MagicMock()
 
-        pool._connections = {"user@host1:22": conn}
+        pool._connections[ConnectionKey("user", "host1")] = conn
 
         with pytest.raises(RuntimeError, match="is closed"):
             await pool.execute("host1", "ls", username="user")
@@ -1124,7 +1185,7 @@ class TestSSHPoolExecuteFlow:
         conn.is_alive = MagicMock(return_value=True)
         conn.refresh_timeout = MagicMock()
 
-        pool._connections = {"user@host1:22": conn}
+        pool._connections[ConnectionKey("user", "host1")] = conn
 
         result = await pool.execute("host1", "cat", username="user", input_data="hello")
 
@@ -0,0 +1,223 @@
+"""Tests for SSHPool background maintenance (reaper + keepalives)."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from merlya.core.metrics import get_registry
+from merlya.ssh.pool import SSHPool
+from merlya.ssh.registry import ConnectionKey
+from merlya.ssh.types import SSHConnection
+
+
+def _conn(host: str, idle_seconds: float = 0, closed: bool = False) -> SSHConnection:
+    transport = MagicMock()
+    transport.is_closed = MagicMock(return_value=closed)
+    conn = SSHConnection(
+        host=host,
+        connection=transport,
+        last_used=datetime.now(UTC) - timedelta(seconds=idle_seconds),
+        timeout=600,
+    )
+    conn.close = AsyncMock()  # type: ignore[method-assign]
+    return conn
+
+
+class TestRunMaintenance:
+    """Tests for a single maintenance sweep."""
+
+    def setup_method(self) -> None:
+        SSHPool.reset_instance()
+
+    @pytest.mark.asyncio
+    async def test_reaps_expired_and_closed(self) -> None:
+        pool = SSHPool()
+        hot = _conn("hot")
+        expired = _conn("expired", idle_seconds=700)
+        zombie = _conn("zombie", closed=True)
+        pool._connections.update(
+            {
+                ConnectionKey("u", "hot"): hot,
+                ConnectionKey("u", "expired"): expired,
+                ConnectionKey("u", "zombie"): zombie,
+            }
+        )
+
+        stats = await pool.run_maintenance()
+        await pool._drain_pending_closes()
+
+        assert list(pool._connections) == [ConnectionKey("u", "hot")]
+        assert stats.reaped == 2
+        expired.close.assert_called_once()
+        zombie.close.assert_called_once()
+        hot.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_busy_connection_is_not_reaped(self) -> None:
+        """A command running longer than the pool timeout keeps its connection."""
+        pool = SSHPool()
+        busy = _conn("busy", idle_seconds=700)
+        pool._connections[ConnectionKey("u", "busy")] = busy
+
+        with busy.use():
+            stats = await pool.run_maintenance()
+            assert stats.reaped == 0
+            assert busy.is_alive()
+
+        # Finishing the command restarts the idle clock
+        assert busy.is_alive()
+        assert (await pool.run_maintenance()).reaped == 0
+        busy.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_execute_marks_connection_busy(self) -> None:
+        """The connection is in use for as long as execute() runs."""
+        from merlya.ssh.types import SSHResult
+
+        pool = SSHPool()
+        conn = _conn("web")
+        pool.get_connection = AsyncMock(return_value=conn)  # type: ignore[method-assign]
+        seen: list[bool] = []
+
+        async def run(*_args: object) -> SSHResult:
+            seen.append(conn.in_use)
+            return SSHResult(stdout="", stderr="", exit_code=0)
+
+        with patch("merlya.ssh.pool.execute_command", side_effect=run):
+            await pool.execute("web", "sleep 900")
+
+        assert seen == [True]
+        assert not conn.in_use
+
+    @pytest.mark.asyncio
+    async def test_keepalive_only_for_hot_connections(self) -> None:
+        pool = SSHPool()
+        hot = _conn("hot", idle_seconds=10)
+        cold = _conn("cold", idle_seconds=500)
+        cold._keepalive_interval = 30
+        pool._connections.update({ConnectionKey("u", "hot"): hot, ConnectionKey("u", "cold"): cold})
+
+        stats = await pool.run_maintenance()
+
+        assert (stats.active, stats.idle) == (1, 1)
+        hot.connection.set_keepalive.assert_called_once_with(interval=30, count_max=3)
+        cold.connection.set_keepalive.assert_called_once_with(interval=0, count_max=3)
+
+        # Second sweep does not re-send identical settings
+        await pool.run_maintenance()
+        assert hot.connection.set_keepalive.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_closes_idle_sftp_sessions(self) -> None:
+        pool = SSHPool()
+        busy, idle = _conn("busy"), _conn("idle")
+        for conn in (busy, idle):
+            conn._sftp = MagicMock()
+            conn._sftp.wait_closed = AsyncMock()
+        busy._sftp_last_used = datetime.now(UTC)
+        idle._sftp_last_used = datetime.now(UTC) - timedelta(seconds=idle.sftp_idle_timeout + 1)
+        pool._connections.update(
+            {ConnectionKey("u", "busy"): busy, ConnectionKey("u", "idle"): idle}
+        )
+
+        stats = await pool.run_maintenance()
+
+        assert stats.sftp_closed == 1
+        assert busy._sftp is not None
+        assert idle._sftp is None
+
+    @pytest.mark.asyncio
+    async def test_sftp_session_in_use_survives_sweep(self, tmp_path) -> None:
+        """A transfer outlasting sftp_idle_timeout keeps its session."""
+        pool = SSHPool()
+        conn = _conn("web")
+        sftp = MagicMock()
+        sftp.wait_closed = AsyncMock()
+        release = asyncio.Event()
+
+        async def slow_put(*_args: object, **_kwargs: object) -> None:
+            await release.wait()
+
+        sftp.put = AsyncMock(side_effect=slow_put)
+        conn.connection.start_sftp_client = AsyncMock(return_value=sftp)
+        conn.sftp_idle_timeout = 0
+        pool._connections[ConnectionKey("u", "web")] = conn
+        pool.get_connection = AsyncMock(return_value=conn)  # type: ignore[method-assign]
+        local = tmp_path / "big.img"
+        local.write_bytes(b"x")
+
+        upload = asyncio.create_task(pool.upload_file("web", local, "/srv/big.img"))
+        await asyncio.sleep(0.01)
+
+        stats = await pool.run_maintenance()
+        assert stats.sftp_closed == 0
+        assert await conn.get_sftp_client() is sftp  # Not reopened under the upload
+        sftp.exit.assert_not_called()
+
+        release.set()
+        await upload
+        assert conn._sftp_users == 0
+        await asyncio.sleep(0.01)
+        assert (await pool.run_maintenance()).sftp_closed == 1
+
+    @pytest.mark.asyncio
+    async def test_exposes_metrics(self) -> None:
+        pool = SSHPool()
+        pool._connections.update(
+            {
+                ConnectionKey("u", "a"): _conn("a"),
+                ConnectionKey("u", "b"): _conn("b", idle_seconds=400),
+                ConnectionKey("u", "c"): _conn("c", idle_seconds=900),
+            }
+        )
+        reaped = get_registry().counter("merlya_ssh_connections_reaped_total")
+        before = reaped.get(reason="expired")
+
+        await pool.run_maintenance()
+
+        assert get_registry().gauge("merlya_ssh_connections_active").get() == 1
+        assert get_registry().gauge("merlya_ssh_connections_idle").get() == 1
+        assert reaped.get(reason="expired") == before + 1
+
+
+class TestMaintenanceTask:
+    """Tests for the background task lifecycle."""
+
+    def setup_method(self) -> None:
+        SSHPool.reset_instance()
+
+    @pytest.mark.asyncio
+    async def test_background_task_reaps_periodically(self) -> None:
+        pool = SSHPool()
+        pool.maintenance_interval = 0.01
+        expired = _conn("expired", idle_seconds=700)
+        pool._connections[ConnectionKey("u", "expired")] = expired
+
+        pool._ensure_maintenance()
+        for _ in range(50):
+            if not pool._connections:
+                break
+            await asyncio.sleep(0.01)
+
+        assert pool._connections == {}
+        await pool.stop_maintenance()
+        assert pool._maintenance_task is None
+
+    @pytest.mark.asyncio
+    async def test_ensure_is_idempotent_and_disabled_with_zero_interval(self) -> None:
+        pool = SSHPool()
+        pool._ensure_maintenance()
+        task = pool._maintenance_task
+        pool._ensure_maintenance()
+        assert pool._maintenance_task is task
+
+        await pool.disconnect_all()
+        assert pool._maintenance_task is None
+
+        pool.maintenance_interval = 0
+        pool._ensure_maintenance()
+        assert pool._maintenance_task is None
@@ -0,0 +1,150 @@
+"""Tests for SSH connection prewarming."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from merlya.persistence.models import Host
+from merlya.ssh import SSHConnectionOptions, SSHExecuteOptions, SSHPool, SSHTarget
+from merlya.ssh.daemon_client import SSHDaemonAuthRequired
+from merlya.tools.core.ssh_connection import prewarm_hosts
+
+
+class _FakePool(SSHPool):
+    """SSHPool whose get_connection() only records calls."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls: list[tuple] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_connection(  # type: ignore[override]
+        self,
+        host: str,
+        username: str | None = None,
+        private_key: str | None = None,
+        options: SSHConnectionOptions | None = None,
+        host_name: str | None = None,
+    ) -> MagicMock:
+        self.calls.append((host, username, private_key, options, host_name))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if host.startswith("boom"):
+            raise ConnectionError(f"cannot reach {host}")
+        return MagicMock()
+
+
+class TestPoolPrewarm:
+    """Tests for SSHPool.prewarm."""
+
+    @pytest.mark.asyncio
+    async def test_counts_ready_connections_and_ignores_failures(self) -> None:
+        """Failed handshakes are swallowed and excluded from the count."""
+        pool = _FakePool()
+
+        ready = await pool.prewarm(["a", "boom-1", "b"])
+
+        assert ready == 2
+        assert {call[0] for call in pool.calls} == {"a", "boom-1", "b"}
+
+    @pytest.mark.asyncio
+    async def test_respects_concurrency(self) -> None:
+        """No more than max_concurrency handshakes run at once."""
+        pool = _FakePool()
+
+        await pool.prewarm([f"h{i}" for i in range(10)], max_concurrency=3)
+
+        assert pool.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_uses_target_options(self) -> None:
+        """Per-target credentials and options reach get_connection."""
+        pool = _FakePool()
+        opts = SSHConnectionOptions(port=2222)
+        target = SSHTarget(
+            host="10.0.0.1",
+            exec_options=SSHExecuteOptions(
+                username="admin", private_key="~/.ssh/id", options=opts, host_name="web-01"
+            ),
+            label="web-01",
+        )
+
+        await pool.prewarm([target])
+
+        assert pool.calls == [("10.0.0.1", "admin", "~/.ssh/id", opts, "web-01")]
+
+    @pytest.mark.asyncio
+    async def test_warms_daemon_pool_when_attached(self) -> None:
+        """With a daemon attached, connections are opened in the daemon's pool."""
+        pool = _FakePool()
+        client = MagicMock()
+        client.prewarm = AsyncMock(return_value=True)
+        pool.attach_daemon(client)
+        opts = SSHConnectionOptions(port=2222)
+        target = SSHTarget(
+            host="10.0.0.1", exec_options=SSHExecuteOptions(username="admin", options=opts)
+        )
+
+        ready = await pool.prewarm([target, "b"])
+
+        assert ready == 2
+        assert pool.calls == []
+        client.prewarm.assert_any_await(
+            "10.0.0.1",
+            {"username": "admin", "private_key": None, "options": opts, "host_name": None},
+        )
+        assert client.prewarm.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_warms_locally_when_daemon_needs_auth(self) -> None:
+        """Hosts the daemon can't authenticate to are warmed in this process."""
+        pool = _FakePool()
+        client = MagicMock()
+        client.prewarm = AsyncMock(side_effect=SSHDaemonAuthRequired("passphrase"))
+        pool.attach_daemon(client)
+
+        ready = await pool.prewarm(["a"])
+
+        assert ready == 1
+        assert [call[0] for call in pool.calls] == ["a"]
+        assert pool.daemon_attached
+
+
+class TestPrewarmHosts:
+    """Tests for prewarm_hosts inventory resolution."""
+
+    @pytest.mark.asyncio
+    async def test_only_inventory_hosts_are_warmed(self) -> None:
+        """Local aliases and unknown names are skipped; duplicates warmed once."""
+        web = Host(name="web-01", hostname="10.0.0.1", port=2222, username="admin")
+        ctx = MagicMock()
+        ctx.hosts.get_by_name = AsyncMock(side_effect=lambda n: web if n == "web-01" else None)
+        pool = _FakePool()
+        ctx.get_ssh_pool = AsyncMock(return_value=pool)
+
+        ready = await prewarm_hosts(ctx, ["@web-01", "web-01", "localhost", "unknown"])
+
+        assert ready == 1
+        assert len(pool.calls) == 1
+        host, username, _, options, host_name = pool.calls[0]
+        assert (host, username, host_name) == ("10.0.0.1", "admin", "web-01")
+        assert options.port == 2222
+
+    @pytest.mark.asyncio
+    async def test_no_targets_skips_pool(self) -> None:
+        """Nothing to warm does not create the pool."""
+        ctx = MagicMock()
+        ctx.hosts.get_by_name = AsyncMock(return_value=None)
+        ctx.get_ssh_pool = AsyncMock()
+
+        assert await prewarm_hosts(ctx, ["unknown"]) == 0
+        ctx.get_ssh_pool.assert_not_called()
@@ -0,0 +1,150 @@
+"""Tests for PTY elevation: sentinel prompt and early EOF."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from merlya.core.metrics import get_registry, reset_metrics
+from merlya.ssh.prompt_detection import wait_for_prompt
+from merlya.ssh.pty_handler import execute_with_pty, with_prompt_sentinel
+from merlya.ssh.types import SSHConnection
+
+
+class _FakeStdout:
+    """Reader returning scripted chunks, then EOF (or hanging)."""
+
+    def __init__(self, chunks: list[str], hang: bool = False) -> None:
+        self.chunks = list(chunks)
+        self.hang = hang
+
+    async def read(self, _n: int = -1) -> str:
+        if self.chunks:
+            await asyncio.sleep(0)
+            if _n == -1:
+                data, self.chunks = "".join(self.chunks), []
+                return data
+            return self.chunks.pop(0)
+        if self.hang:
+            await asyncio.sleep(3600)
+        return ""
+
+
+class _FakeProcess:
+    """PTY process whose output may depend on the command (sentinel)."""
+
+    def __init__(self, stdout: _FakeStdout, exit_status: int = 0) -> None:
+        self.stdout = stdout
+        self.stdin = MagicMock()
+        self.exit_status = exit_status
+
+    async def __aenter__(self) -> _FakeProcess:
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        return None
+
+    async def wait(self) -> None:
+        return None
+
+
+def _conn(make_process) -> SSHConnection:
+    asyncssh_conn = MagicMock()
+    asyncssh_conn.create_process = MagicMock(side_effect=make_process)
+    return SSHConnection(host="web-01", connection=asyncssh_conn)
+
+
+class TestPromptSentinel:
+    """Tests for with_prompt_sentinel."""
+
+    def test_sudo_stdin_gets_unique_prompt(self) -> None:
+        """`sudo -S` is rewritten with a fresh -p sentinel."""
+        cmd, sentinel = with_prompt_sentinel("sudo -S systemctl status nginx")
+        _, other = with_prompt_sentinel("sudo -S id")
+
+        assert sentinel is not None and sentinel != other
+        assert cmd == f"sudo -S -p {sentinel} systemctl status nginx"
+
+    @pytest.mark.parametrize("command", ["sudo -S -p 'pw:' id", "su -c id", "doas id", "sudo id"])
+    def test_other_commands_unchanged(self, command: str) -> None:
+        """Explicit prompts, su/doas and non-stdin sudo are left alone."""
+        assert with_prompt_sentinel(command) == (command, None)
+
+
+class TestWaitForPrompt:
+    """Tests for wait_for_prompt early exits."""
+
+    @pytest.mark.asyncio
+    async def test_returns_immediately_on_eof(self) -> None:
+        """A finished command does not wait for the timeout."""
+        proc = _FakeProcess(_FakeStdout(["total 0\n"]))
+
+        wait = await wait_for_prompt(proc, timeout=5.0)  # type: ignore[arg-type]
+
+        assert not wait.found and wait.eof
+        assert wait.outcome == "eof"
+        assert wait.buffer == "total 0\n"
+        assert wait.elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_detects_sentinel(self) -> None:
+        """The exact sentinel counts as a prompt even without known patterns."""
+        proc = _FakeProcess(_FakeStdout(["merlya-sudo-", "abcd1234:"], hang=True))
+
+        wait = await wait_for_prompt(proc, sentinel="merlya-sudo-abcd1234:")  # type: ignore[arg-type]
+
+        assert wait.found and wait.outcome == "prompt"
+
+    @pytest.mark.asyncio
+    async def test_timeout_for_silent_running_command(self) -> None:
+        """A command that neither prompts nor exits is bounded by timeout."""
+        proc = _FakeProcess(_FakeStdout(["working...\n"], hang=True))
+
+        wait = await wait_for_prompt(proc, timeout=0.05)  # type: ignore[arg-type]
+
+        assert wait.outcome == "timeout" and wait.buffer == "working...\n"
+
+
+class TestExecuteWithPty:
+    """Tests for execute_with_pty password handling."""
+
+    def setup_method(self) -> None:
+        reset_metrics()
+
+    @pytest.mark.asyncio
+    async def test_sends_password_on_sentinel_and_strips_it(self) -> None:
+        """The password is sent on the sentinel prompt, which is removed from output."""
+        processes: list[_FakeProcess] = []
+
+        def make_process(command: str, **_kwargs: object) -> _FakeProcess:
+            sentinel = command.split(" -p ", 1)[1].split()[0]
+            proc = _FakeProcess(_FakeStdout([sentinel, "\nroot\n"]))
+            processes.append(proc)
+            return proc
+
+        result = await execute_with_pty(_conn(make_process), "sudo -S whoami", "secret", 10)
+
+        assert result.stdout == "\nroot\n"
+        processes[0].stdin.write.assert_called_once_with("secret\n")
+        processes[0].stdin.write_eof.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_passwordless_sudo_does_not_wait(self) -> None:
+        """Passwordless sudo finishes at EOF and records the wait."""
+        processes: list[_FakeProcess] = []
+
+        def make_process(_command: str, **_kwargs: object) -> _FakeProcess:
+            proc = _FakeProcess(_FakeStdout(["root\n"]))
+            processes.append(proc)
+            return proc
+
+        result = await asyncio.wait_for(
+            execute_with_pty(_conn(make_process), "sudo -S whoami", "secret", 10), timeout=1.0
+        )
+
+        assert result.stdout == "root\n"
+        processes[0].stdin.write.assert_not_called()
+        waits = get_registry().counter("merlya_ssh_prompt_waits_total")
+        assert waits.get(outcome="eof") == 1
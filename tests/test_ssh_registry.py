@@ -0,0 +1,134 @@
+"""Tests for the SSH connection registry."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from merlya.ssh.pool import SSHConnectionOptions, SSHPool
+from merlya.ssh.registry import ConnectionKey, ConnectionRegistry
+from merlya.ssh.types import SSHConnection
+
+
+def _conn(host: str) -> SSHConnection:
+    conn = SSHConnection(host=host, connection=MagicMock())
+    conn.close = AsyncMock()  # type: ignore[method-assign]
+    return conn
+
+
+class TestConnectionKey:
+    """Tests for ConnectionKey."""
+
+    def test_for_target_defaults_user(self) -> None:
+        key = ConnectionKey.for_target("web", None, SSHConnectionOptions(port=2222))
+        assert key == ConnectionKey("default", "web", 2222, None)
+
+    def test_for_target_includes_jump(self) -> None:
+        opts = SSHConnectionOptions(jump_host="bastion", jump_port=2200)
+        key = ConnectionKey.for_target("web", "deploy", opts)
+        assert key.jump is not None
+        assert key != ConnectionKey("deploy", "web")
+
+    def test_str(self) -> None:
+        assert str(ConnectionKey("deploy", "web")) == "deploy@web:22"
+
+
+class TestConnectionRegistry:
+    """Tests for ConnectionRegistry indexes and LRU order."""
+
+    def test_lru_order(self) -> None:
+        registry = ConnectionRegistry()
+        a, b = ConnectionKey("u", "a"), ConnectionKey("u", "b")
+        registry.add(a, _conn("a"))
+        registry.add(b, _conn("b"))
+
+        registry.touch(a)
+
+        assert registry.oldest() == b
+        assert list(registry) == [b, a]
+
+    def test_oldest_empty(self) -> None:
+        assert ConnectionRegistry().oldest() is None
+
+    def test_keys_for_is_exact(self) -> None:
+        registry = ConnectionRegistry()
+        registry.add(ConnectionKey("u", "web-1"), _conn("web-1"))
+        registry.add(ConnectionKey("u", "web-10"), _conn("web-10"))
+
+        assert registry.keys_for("web-1") == {ConnectionKey("u", "web-1")}
+        assert registry.keys_for("web") == set()
+
+    def test_lookup_by_inventory_name(self) -> None:
+        registry = ConnectionRegistry()
+        key = ConnectionKey("u", "10.0.0.5")
+        registry.add(key, _conn("10.0.0.5"), name="db-primary")
+
+        assert registry.keys_for("db-primary") == {key}
+        assert registry.keys_for("10.0.0.5") == {key}
+        assert registry.name_of(key) == "db-primary"
+
+    def test_find_filters(self) -> None:
+        registry = ConnectionRegistry()
+        registry.add(ConnectionKey("u", "web", 22), _conn("web"))
+        registry.add(ConnectionKey("admin", "web", 2222), _conn("web"))
+
+        assert registry.find("web", port=2222) == [ConnectionKey("admin", "web", 2222)]
+        assert registry.find("web", username="u") == [ConnectionKey("u", "web", 22)]
+        assert registry.find("web", port=22, username="admin") == []
+
+    def test_delete_cleans_indexes(self) -> None:
+        registry = ConnectionRegistry()
+        key = ConnectionKey("u", "10.0.0.5")
+        registry.add(key, _conn("10.0.0.5"), name="db")
+
+        del registry[key]
+
+        assert registry.keys_for("db") == set()
+        assert registry.stats()["hosts"] == 0
+        assert registry.stats()["names"] == 0
+
+    def test_stats(self) -> None:
+        registry = ConnectionRegistry()
+        registry.add(ConnectionKey("u", "a"), _conn("a"), name="alpha")
+        registry.add(ConnectionKey("v", "a"), _conn("a"))
+
+        stats = registry.stats()
+
+        assert stats["connections"] == 2
+        assert stats["hosts"] == 1
+        assert stats["names"] == 1
+        assert stats["registry_bytes"] > 0
+
+
+class TestPoolRegistry:
+    """Tests for SSHPool lookups through the registry."""
+
+    def setup_method(self) -> None:
+        SSHPool.reset_instance()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_does_not_match_prefix(self) -> None:
+        pool = SSHPool()
+        pool._connections[ConnectionKey("u", "web-1")] = _conn("web-1")
+        pool._connections[ConnectionKey("u", "web-10")] = _conn("web-10")
+
+        await pool.disconnect("web-1")
+
+        assert list(pool._connections) == [ConnectionKey("u", "web-10")]
+
+    @pytest.mark.asyncio
+    async def test_get_connection_indexes_inventory_name(self) -> None:
+        pool = SSHPool()
+        conn = _conn("10.0.0.5")
+        with patch.object(pool, "_create_connection", new_callable=AsyncMock, return_value=conn):
+            await pool.get_connection("10.0.0.5", username="deploy", host_name="db-primary")
+
+        assert pool.has_connection("db-primary")
+        assert pool.has_connection("10.0.0.5", port=22, username="deploy")
+        assert not pool.has_connection("db-primary", username="root")
+
+        await pool.disconnect("db-primary")
+
+        assert len(pool._connections) == 0
+        assert pool.get_registry_stats()["connections"] == 0
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from merlya.ssh.sftp import SFTPOperations
+from merlya.ssh.types import SSHConnection
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -49,10 +51,9 @@ class TestUploadFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -99,10 +100,9 @@ class TestUploadFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -133,10 +133,9 @@ class TestDownloadFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -159,10 +158,9 @@ class TestDownloadFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -224,10 +222,9 @@ class TestListRemoteDir:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -256,10 +253,9 @@ class TestListRemoteDir:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -301,10 +297,9 @@ class TestListRemoteDir:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -338,10 +333,9 @@ class TestReadRemoteFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -366,10 +360,9 @@ class TestReadRemoteFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -416,10 +409,9 @@ class TestWriteRemoteFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -446,10 +438,9 @@ class TestWriteRemoteFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
@@ -486,13 +477,246 @@ class TestWriteRemoteFile:
         mock_sftp.__aexit__ = AsyncMock(return_value=False)
 
         mock_async_conn = MagicMock()
-        mock_async_conn.start_sftp_client = MagicMock(return_value=mock_sftp)
+        mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
 
-        mock_conn = MagicMock()
-        mock_conn.connection = mock_async_conn
+        mock_conn = SSHConnection(host="host1", connection=mock_async_conn)
 
         pool._mock_connection = mock_conn
 
         await pool.write_remote_file("host1", "/tmp/empty.txt", "")
 
         mock_file.write.assert_called_once_with("")
+
+
+# ==============================================================================
+# Tests for SFTP session reuse and batch operations
+# ==============================================================================
+
+
+def _entry(name: str, is_dir: bool = False) -> MagicMock:
+    entry = MagicMock()
+    entry.filename = name
+    entry.attrs.size = 4096 if is_dir else 10
+    entry.attrs.type = 2 if is_dir else 1
+    entry.attrs.permissions = 0o755 if is_dir else 0o644
+    entry.attrs.mtime = 1234567890
+    return entry
+
+
+def _pool_with_sftp(mock_sftp: MagicMock) -> tuple[MockSSHPoolWithSFTP, SSHConnection]:
+    mock_async_conn = MagicMock()
+    mock_async_conn.start_sftp_client = AsyncMock(return_value=mock_sftp)
+    pool = MockSSHPoolWithSFTP()
+    pool._mock_connection = SSHConnection(host="host1", connection=mock_async_conn)
+    return pool, pool._mock_connection
+
+
+class TestSFTPSessionReuse:
+    """Tests for the per-connection SFTP session."""
+
+    @pytest.mark.asyncio
+    async def test_session_reused_across_operations(self, tmp_path: Path) -> None:
+        """Consecutive operations negotiate the SFTP subsystem once."""
+        mock_sftp = MagicMock()
+        mock_sftp.put = AsyncMock()
+        mock_sftp.get = AsyncMock()
+        pool, conn = _pool_with_sftp(mock_sftp)
+        local_file = tmp_path / "a.conf"
+        local_file.write_text("x")
+
+        await pool.upload_file("host1", local_file, "/etc/a.conf")
+        await pool.download_file("host1", "/etc/b.conf", tmp_path / "b.conf")
+
+        conn.connection.start_sftp_client.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_idle_session_is_reopened(self) -> None:
+        """A session idle past its timeout is closed and reopened."""
+        first, second = MagicMock(), MagicMock()
+        first.wait_closed = AsyncMock()
+        _, conn = _pool_with_sftp(first)
+        conn.connection.start_sftp_client = AsyncMock(side_effect=[first, second])
+        conn.sftp_idle_timeout = 0
+
+        assert await conn.get_sftp_client() is first
+        await asyncio.sleep(0.01)
+        assert await conn.get_sftp_client() is second
+        first.exit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_session_dropped_on_channel_failure(self) -> None:
+        """Non-SFTP errors invalidate the session; SFTP errors keep it."""
+        import asyncssh
+
+        mock_sftp = MagicMock()
+        mock_sftp.wait_closed = AsyncMock()
+        mock_sftp.get = AsyncMock(side_effect=asyncssh.SFTPNoSuchFile("missing"))
+        pool, conn = _pool_with_sftp(mock_sftp)
+
+        with pytest.raises(asyncssh.SFTPError):
+            await pool.download_file("host1", "/missing", "/tmp/merlya-missing")
+        assert conn._sftp is mock_sftp
+
+        mock_sftp.get = AsyncMock(side_effect=ConnectionResetError("reset"))
+        with pytest.raises(ConnectionResetError):
+            await pool.download_file("host1", "/file", "/tmp/merlya-file")
+        assert conn._sftp is None
+
+    @pytest.mark.asyncio
+    async def test_connection_close_closes_session(self) -> None:
+        """Closing the SSH connection closes its SFTP session."""
+        mock_sftp = MagicMock()
+        mock_sftp.wait_closed = AsyncMock()
+        _, conn = _pool_with_sftp(mock_sftp)
+        conn.connection.wait_closed = AsyncMock()
+
+        await conn.get_sftp_client()
+        await conn.close()
+
+        mock_sftp.exit.assert_called_once()
+        assert conn._sftp is None
+
+
+class TestBatchTransfers:
+    """Tests for upload_files / download_files."""
+
+    @pytest.mark.asyncio
+    async def test_upload_files_reports_each_file(self, tmp_path: Path) -> None:
+        """Failures are reported per file without stopping the batch."""
+        mock_sftp = MagicMock()
+        mock_sftp.put = AsyncMock(side_effect=[None, OSError("disk full")])
+        pool, conn = _pool_with_sftp(mock_sftp)
+        files = []
+        for name in ("a", "b"):
+            path = tmp_path / name
+            path.write_text(name)
+            files.append((path, f"/etc/{name}"))
+        files.append((tmp_path / "missing", "/etc/missing"))
+
+        results = await pool.upload_files("host1", files)
+
+        assert [r.destination for r in results] == ["/etc/a", "/etc/b", "/etc/missing"]
+        assert [r.ok for r in results] == [True, False, False]
+        assert results[1].error == "disk full"
+        assert "not found" in (results[2].error or "")
+        conn.connection.start_sftp_client.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lost_session_is_dropped_after_batch(self, tmp_path: Path) -> None:
+        """A lost SFTP channel invalidates the cached session."""
+        import asyncssh
+
+        mock_sftp = MagicMock()
+        mock_sftp.wait_closed = AsyncMock()
+        mock_sftp.get = AsyncMock(side_effect=asyncssh.SFTPConnectionLost("lost"))
+        pool, conn = _pool_with_sftp(mock_sftp)
+
+        results = await pool.download_files("host1", [("/etc/a", tmp_path / "a")])
+
+        assert not results[0].ok
+        assert conn._sftp is None
+
+    @pytest.mark.asyncio
+    async def test_download_files_creates_parents(self, tmp_path: Path) -> None:
+        """Each download gets its parent directory created."""
+        mock_sftp = MagicMock()
+        mock_sftp.get = AsyncMock()
+        pool, _ = _pool_with_sftp(mock_sftp)
+
+        results = await pool.download_files(
+            "host1", [("/etc/a", tmp_path / "x" / "a"), ("/etc/b", tmp_path / "y" / "b")]
+        )
+
+        assert all(r.ok for r in results)
+        assert (tmp_path / "x").is_dir() and (tmp_path / "y").is_dir()
+        assert mock_sftp.get.await_count == 2
+
+
+class TestWalkRemoteDir:
+    """Tests for walk_remote_dir."""
+
+    def _tree_sftp(self, tree: dict[str, list[MagicMock]]) -> MagicMock:
+        import asyncssh
+
+        async def scandir(path: str):
+            if path not in tree:
+                raise asyncssh.SFTPPermissionDenied(f"denied: {path}")
+            for entry in [_entry("."), _entry(".."), *tree[path]]:
+                yield entry
+
+        mock_sftp = MagicMock()
+        mock_sftp.scandir = scandir
+        return mock_sftp
+
+    @pytest.mark.asyncio
+    async def test_walk_respects_depth(self) -> None:
+        """Entries below max_depth are not listed."""
+        tree = {
+            "/srv": [_entry("app", is_dir=True), _entry("README")],
+            "/srv/app": [_entry("conf", is_dir=True), _entry("main.py")],
+            "/srv/app/conf": [_entry("settings.toml")],
+        }
+        pool, _ = _pool_with_sftp(self._tree_sftp(tree))
+
+        entries = await pool.walk_remote_dir("host1", "/srv", max_depth=2)
+
+        assert [(e["path"], e["depth"]) for e in entries] == [
+            ("/srv/app", 1),
+            ("/srv/README", 1),
+            ("/srv/app/conf", 2),
+            ("/srv/app/main.py", 2),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_walk_skips_unreadable_subdirs_and_caps_entries(self) -> None:
+        """Unreadable subdirectories are skipped; max_entries bounds output."""
+        tree = {"/": [_entry("root", is_dir=True), _entry("tmp", is_dir=True)], "/tmp": []}
+        pool, _ = _pool_with_sftp(self._tree_sftp(tree))
+
+        entries = await pool.walk_remote_dir("host1", "/", max_depth=3)
+        assert [e["path"] for e in entries] == ["/root", "/tmp"]
+
+        capped = await pool.walk_remote_dir("host1", "/", max_entries=1)
+        assert len(capped) == 1
+
+    @pytest.mark.asyncio
+    async def test_walk_bounds_concurrent_listings(self) -> None:
+        """No more than max_concurrency directories are listed at once."""
+        import asyncio
+
+        tree = {"/": [_entry(f"d{i}", is_dir=True) for i in range(20)]}
+        tree.update({f"/d{i}": [_entry("f")] for i in range(20)})
+        in_flight = 0
+        max_in_flight = 0
+
+        async def scandir(path: str):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                await asyncio.sleep(0.001)
+                for entry in tree[path]:
+                    yield entry
+            finally:
+                in_flight -= 1
+
+        mock_sftp = MagicMock()
+        mock_sftp.scandir = scandir
+        pool, _ = _pool_with_sftp(mock_sftp)
+
+        entries = await pool.walk_remote_dir("host1", "/", max_depth=2, max_concurrency=3)
+
+        assert len(entries) == 40
+        assert max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_walk_unreadable_root_raises(self) -> None:
+        """An unreadable root is an error, not an empty listing."""
+        import asyncssh
+
+        pool, _ = _pool_with_sftp(self._tree_sftp({}))
+
+        with pytest.raises(asyncssh.SFTPError):
+            await pool.walk_remote_dir("host1", "/secret")
+        with pytest.raises(ValueError, match="max_depth"):
+            await pool.walk_remote_dir("host1", "/", max_depth=0)
@@ -0,0 +1,255 @@
+"""Tests for tunable and resumable SFTP transfers."""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from merlya.ssh.sftp_transfer import (
+    SFTPTransferOptions,
+    SFTPTransferStats,
+    download_resumable,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+
+class _FakeRemoteFile:
+    """Remote file serving parallel blocks in reverse order."""
+
+    def __init__(self, data: bytes, block_size: int) -> None:
+        self.data = data
+        self.block_size = block_size
+
+    async def __aenter__(self) -> _FakeRemoteFile:
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        return None
+
+    async def read(self, size: int, offset: int) -> bytes:
+        return self.data[offset : offset + size]
+
+    async def read_parallel(self, size: int, offset: int) -> AsyncIterator[tuple[int, bytes]]:
+        end = min(len(self.data), offset + size)
+        blocks = [
+            (pos, self.data[pos : min(pos + self.block_size, end)])
+            for pos in range(offset, end, self.block_size)
+        ]
+
+        async def iterate() -> AsyncIterator[tuple[int, bytes]]:
+            for pos, block in reversed(blocks):
+                yield pos, block
+
+        return iterate()
+
+
+class _FakeSFTP:
+    """In-memory SFTP session for a single remote file."""
+
+    def __init__(self, data: bytes, mtime: int = 1_700_000_000) -> None:
+        self.data = data
+        self.mtime = mtime
+        self.parallel_reads: list[tuple[int, int]] = []
+        self.open_kwargs: list[dict] = []
+
+    async def stat(self, _path: str) -> MagicMock:
+        attrs = MagicMock()
+        attrs.size = len(self.data)
+        attrs.mtime = self.mtime
+        return attrs
+
+    def open(self, _path: str, _mode: str, **kwargs: int) -> _FakeRemoteFile:
+        self.open_kwargs.append(kwargs)
+        remote = _FakeRemoteFile(self.data, kwargs.get("block_size", 4))
+        original = remote.read_parallel
+
+        async def tracked(size: int, offset: int) -> AsyncIterator[tuple[int, bytes]]:
+            self.parallel_reads.append((size, offset))
+            return await original(size, offset)
+
+        remote.read_parallel = tracked  # type: ignore[method-assign]
+        return remote
+
+
+DATA = bytes(range(256)) * 40  # 10 KiB
+
+
+class TestTransferOptions:
+    """Tests for SFTPTransferOptions / SFTPTransferStats."""
+
+    def test_only_explicit_settings_are_passed(self) -> None:
+        """Unset knobs keep asyncssh defaults."""
+        assert SFTPTransferOptions().asyncssh_kwargs() == {}
+
+        calls: list[tuple[int, int]] = []
+        kwargs = SFTPTransferOptions(
+            block_size=65536, max_requests=128, on_progress=lambda d, t: calls.append((d, t))
+        ).asyncssh_kwargs()
+
+        assert kwargs["block_size"] == 65536
+        assert kwargs["max_requests"] == 128
+        kwargs["progress_handler"](b"src", b"dst", 10, 100)
+        assert calls == [(10, 100)]
+
+    def test_throughput(self) -> None:
+        """MB/s is computed from bytes actually transferred."""
+        assert SFTPTransferStats(size=0, transferred=0, elapsed=0).mb_per_s == 0.0
+        stats = SFTPTransferStats(size=4 << 20, transferred=2 << 20, elapsed=0.5)
+        assert stats.mb_per_s == pytest.approx(4.0)
+
+
+class TestDownloadResumable:
+    """Tests for download_resumable."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_download_writes_in_order(self, tmp_path: Path) -> None:
+        """Out-of-order blocks still produce an exact copy; progress reaches total."""
+        sftp = _FakeSFTP(DATA)
+        local = tmp_path / "dump.bin"
+        progress: list[int] = []
+
+        stats = await download_resumable(
+            sftp,  # type: ignore[arg-type]
+            "/var/dump.bin",
+            local,
+            SFTPTransferOptions(block_size=1000, on_progress=lambda d, _t: progress.append(d)),
+        )
+
+        assert local.read_bytes() == DATA
+        assert not (tmp_path / "dump.bin.part").exists()
+        assert int(local.stat().st_mtime) == sftp.mtime
+        assert (stats.size, stats.transferred, stats.resumed_from) == (len(DATA), len(DATA), 0)
+        assert progress[-1] == len(DATA)
+        assert progress == sorted(progress)
+
+    @pytest.mark.asyncio
+    async def test_resumes_matching_part_file(self, tmp_path: Path) -> None:
+        """A valid .part prefix is continued, not re-downloaded."""
+        sftp = _FakeSFTP(DATA)
+        local = tmp_path / "dump.bin"
+        (tmp_path / "dump.bin.part").write_bytes(DATA[:4000])
+
+        stats = await download_resumable(
+            sftp,  # type: ignore[arg-type]
+            "/var/dump.bin",
+            local,
+            SFTPTransferOptions(resume=True),
+        )
+
+        assert local.read_bytes() == DATA
+        assert stats.resumed_from == 4000
+        assert stats.transferred == len(DATA) - 4000
+        assert sftp.parallel_reads == [(len(DATA) - 4000, 4000)]
+
+    @pytest.mark.asyncio
+    async def test_restarts_when_checksum_differs(self, tmp_path: Path) -> None:
+        """A .part file that no longer matches the remote is discarded."""
+        sftp = _FakeSFTP(DATA)
+        local = tmp_path / "dump.bin"
+        (tmp_path / "dump.bin.part").write_bytes(b"\xff" * 4000)
+
+        stats = await download_resumable(
+            sftp,  # type: ignore[arg-type]
+            "/var/dump.bin",
+            local,
+            SFTPTransferOptions(resume=True),
+        )
+
+        assert local.read_bytes() == DATA
+        assert stats.resumed_from == 0
+        assert sftp.parallel_reads == [(len(DATA), 0)]
+
+    @pytest.mark.asyncio
+    async def test_skips_complete_file(self, tmp_path: Path) -> None:
+        """An identical local file is not transferred again."""
+        sftp = _FakeSFTP(DATA)
+        local = tmp_path / "dump.bin"
+        local.write_bytes(DATA)
+        os.utime(local, (sftp.mtime, sftp.mtime))
+
+        stats = await download_resumable(
+            sftp,  # type: ignore[arg-type]
+            "/var/dump.bin",
+            local,
+            SFTPTransferOptions(resume=True),
+        )
+
+        assert stats.transferred == 0
+        assert sftp.parallel_reads == []
+
+    @pytest.mark.asyncio
+    async def test_refetches_same_size_file_changed_remotely(self, tmp_path: Path) -> None:
+        """A remote file rewritten in place (same size, new mtime) is downloaded again."""
+        changed = b"\xff" + DATA[1:]
+        sftp = _FakeSFTP(changed, mtime=1_700_000_500)
+        local = tmp_path / "dump.bin"
+        local.write_bytes(DATA)
+        os.utime(local, (1_700_000_000, 1_700_000_000))
+
+        stats = await download_resumable(
+            sftp,  # type: ignore[arg-type]
+            "/var/dump.bin",
+            local,
+            SFTPTransferOptions(resume=True),
+        )
+
+        assert local.read_bytes() == changed
+        assert stats.transferred == len(DATA)
+
+    @pytest.mark.asyncio
+    async def test_complete_check_samples_middle_of_file(self, tmp_path: Path) -> None:
+        """Head, middle and tail are compared, not only the last window."""
+        middle = len(DATA) // 2
+        changed = DATA[:middle] + b"\xff" + DATA[middle + 1 :]
+        sftp = _FakeSFTP(changed)
+        local = tmp_path / "dump.bin"
+        local.write_bytes(DATA)
+        os.utime(local, (sftp.mtime, sftp.mtime))
+
+        with patch("merlya.ssh.sftp_transfer.RESUME_CHECK_BYTES", 1000):
+            stats = await download_resumable(
+                sftp,  # type: ignore[arg-type]
+                "/var/dump.bin",
+                local,
+                SFTPTransferOptions(resume=True),
+            )
+
+        assert local.read_bytes() == changed
+        assert stats.transferred == len(DATA)
+
+
+class TestPoolTransfers:
+    """Tests for SFTPOperations upload/download stats."""
+
+    @pytest.mark.asyncio
+    async def test_upload_returns_stats_and_passes_tuning(self, tmp_path: Path) -> None:
+        """Explicit block size / requests reach asyncssh; stats report size."""
+        from merlya.ssh.sftp import SFTPOperations
+        from merlya.ssh.types import SSHConnection
+
+        mock_sftp = MagicMock()
+        mock_sftp.put = AsyncMock()
+        transport = MagicMock()
+        transport.start_sftp_client = AsyncMock(return_value=mock_sftp)
+        conn = SSHConnection(host="host1", connection=transport)
+
+        class _Pool(SFTPOperations):
+            async def get_connection(self, host: str, **kwargs: object) -> SSHConnection:
+                return conn
+
+        local = tmp_path / "app.tar"
+        local.write_bytes(b"x" * 2048)
+
+        stats = await _Pool().upload_file(
+            "host1", local, "/tmp/app.tar", SFTPTransferOptions(block_size=1024, max_requests=8)
+        )
+
+        assert stats.size == stats.transferred == 2048
+        _, kwargs = mock_sftp.put.call_args
+        assert kwargs == {"block_size": 1024, "max_requests": 8}
@@ -0,0 +1,177 @@
+"""Tests for streaming SSH command execution."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from merlya.ssh.executor import ExecuteParams, execute_command
+from merlya.ssh.streaming import CommandStream, OutputCapture, StreamChunk, StreamOptions
+from merlya.ssh.types import SSHConnection
+
+
+class _FakeReader:
+    """Minimal SSHReader replacement returning scripted chunks."""
+
+    def __init__(self, chunks: list[str], delay: float = 0.0) -> None:
+        self._chunks = list(chunks)
+        self._delay = delay
+
+    async def read(self, _n: int = -1) -> str:
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        return self._chunks.pop(0) if self._chunks else ""
+
+
+def _make_conn(
+    stdout: list[str], stderr: list[str] | None = None, exit_status: int = 0, delay: float = 0.0
+) -> tuple[SSHConnection, MagicMock]:
+    process = MagicMock()
+    process.stdout = _FakeReader(stdout, delay)
+    process.stderr = _FakeReader(stderr or [], delay)
+    process.stdin = MagicMock()
+    process.wait = AsyncMock(return_value=MagicMock(exit_status=exit_status))
+
+    asyncssh_conn = MagicMock()
+    asyncssh_conn.create_process = AsyncMock(return_value=process)
+    return SSHConnection(host="host1", connection=asyncssh_conn), process
+
+
+class TestOutputCapture:
+    """Tests for bounded head/tail capture."""
+
+    def test_small_output_kept_verbatim(self) -> None:
+        capture = OutputCapture(max_bytes=100)
+        capture.write("hello ")
+        capture.write("world")
+
+        assert capture.getvalue() == "hello world"
+        assert not capture.truncated
+
+    def test_large_output_keeps_head_and_tail(self) -> None:
+        capture = OutputCapture(max_bytes=10, head_ratio=0.5)
+        for i in range(100):
+            capture.write(f"{i:03d}")
+
+        value = capture.getvalue()
+        assert value.startswith("00000")
+        assert value.endswith("98099")
+        assert capture.truncated
+        assert capture.total_bytes == 300
+        assert capture.dropped_bytes == 290
+        assert "[290 bytes truncated]" in value
+
+    def test_single_huge_chunk(self) -> None:
+        capture = OutputCapture(max_bytes=4, head_ratio=0.5)
+        capture.write("abcdefghij")
+
+        assert capture.getvalue() == "ab\n... [6 bytes truncated] ...\nij"
+
+    def test_tail_only(self) -> None:
+        capture = OutputCapture(max_bytes=3, head_ratio=0.0)
+        capture.write("12345")
+        capture.write("67")
+
+        assert capture.getvalue().endswith("567")
+
+
+class TestCommandStream:
+    """Tests for the chunk iterator."""
+
+    @pytest.mark.asyncio
+    async def test_yields_chunks_and_exit_code(self) -> None:
+        conn, process = _make_conn(["line1\n", "line2\n"], ["warn\n"], exit_status=3)
+        stream = CommandStream(conn, "journalctl")
+
+        chunks = [chunk async for chunk in stream]
+
+        assert StreamChunk("stdout", "line1\n") in chunks
+        assert StreamChunk("stderr", "warn\n") in chunks
+        assert [c.data for c in chunks if c.stream == "stdout"] == ["line1\n", "line2\n"]
+        assert stream.exit_code == 3
+        process.stdin.write_eof.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_early_exit_closes_process(self) -> None:
+        conn, process = _make_conn([f"{i}\n" for i in range(100)])
+        stream = CommandStream(conn, "cat big.log")
+
+        iterator = stream.__aiter__()
+        first = await iterator.__anext__()
+        await iterator.aclose()  # type: ignore[attr-defined]
+
+        assert first.data == "0\n"
+        assert stream.exit_code is None
+        process.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_closed_connection_raises(self) -> None:
+        conn = SSHConnection(host="host1", connection=None)
+
+        with pytest.raises(RuntimeError, match="is closed"):
+            [chunk async for chunk in CommandStream(conn, "ls")]
+
+
+class TestExecuteStreaming:
+    """Tests for streaming through execute_command."""
+
+    @pytest.mark.asyncio
+    async def test_bounded_result_and_callback(self) -> None:
+        conn, _ = _make_conn(["a" * 50, "b" * 50, "c" * 50])
+        seen: list[StreamChunk] = []
+        params = ExecuteParams(
+            host="host1",
+            command="cat big.log",
+            stream=StreamOptions(max_capture_bytes=20, on_chunk=seen.append),
+        )
+
+        result = await execute_command(params, conn)
+
+        assert len(seen) == 3
+        assert result.truncated
+        assert result.stdout.startswith("a" * 10)
+        assert result.stdout.endswith("c" * 10)
+        assert result.exit_code == 0
+
+    @pytest.mark.asyncio
+    async def test_async_callback(self) -> None:
+        conn, _ = _make_conn(["x\n"])
+        received: list[str] = []
+
+        async def on_chunk(chunk: StreamChunk) -> None:
+            received.append(chunk.data)
+
+        params = ExecuteParams(
+            host="host1", command="uptime", stream=StreamOptions(on_chunk=on_chunk)
+        )
+        result = await execute_command(params, conn)
+
+        assert received == ["x\n"]
+        assert result.stdout == "x\n"
+        assert not result.truncated
+
+    @pytest.mark.asyncio
+    async def test_timeout(self) -> None:
+        conn, _ = _make_conn(["x"] * 10, delay=0.5)
+        params = ExecuteParams(
+            host="host1", command="tail -f", timeout=0.05, stream=StreamOptions()
+        )  # type: ignore[arg-type]
+
+        with pytest.raises(TimeoutError):
+            await execute_command(params, conn)
+
+    @pytest.mark.asyncio
+    async def test_pty_commands_do_not_stream(self) -> None:
+        conn, _ = _make_conn([])
+        params = ExecuteParams(
+            host="host1", command="sudo -S id", input_data="pw", stream=StreamOptions()
+        )
+
+        with pytest.MonkeyPatch.context() as mp:
+            fake_pty = AsyncMock(return_value=MagicMock(exit_code=0))
+            mp.setattr("merlya.ssh.executor.execute_with_pty", fake_pty)
+            await execute_command(params, conn)
+
+        fake_pty.assert_awaited_once()
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from merlya.persistence.models import ScanCache
 from merlya.tools.core import (
     ToolResult,
     ask_user,
     detect_unsafe_password,
+    get_cached_scan,
     get_host,
     get_variable,
     list_hosts,
@@ -559,6 +562,37 @@ class TestGetHost:
         assert result.success is False
 
 
+class TestGetCachedScan:
+    """Tests for get_cached_scan function."""
+
+    @pytest.mark.asyncio
+    async def test_returns_unexpired_sections(self, mock_shared_context: MagicMock) -> None:
+        """Test cached sections are keyed by scan type."""
+        entry = ScanCache(
+            host_id="h1",
+            scan_type="system:docker",
+            data={"sections": {"system": {}}, "cached_at": "2026-01-01T00:00:00+00:00"},
+            expires_at=datetime(2026, 1, 1, 0, 5, tzinfo=UTC),
+        )
+        mock_shared_context.scan_cache.get_for_host = AsyncMock(return_value=[entry])
+
+        result = await get_cached_scan(mock_shared_context, "web-01")
+
+        assert result.success is True
+        assert result.data["host"] == "web-01"
+        scan = result.data["scans"]["system:docker"]
+        assert scan["sections"] == {"system": {}}
+        assert scan["expires_at"] == "2026-01-01T00:05:00+00:00"
+
+    @pytest.mark.asyncio
+    async def test_unknown_host(self, mock_shared_context: MagicMock) -> None:
+        """Test an unknown host is an error."""
+        result = await get_cached_scan(mock_shared_context, "nonexistent")
+
+        assert result.success is False
+        assert "not found" in result.error
+
+
 # ==============================================================================
 # Tests for ask_user
 # ==============================================================================
@@ -9,6 +9,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from merlya.ssh.pool import SSHResult
+from merlya.ssh.sftp import SFTPTransferStats
 from merlya.tools.files.tools import (
     FileResult,
     _format_size,
@@ -851,7 +852,7 @@ class TestUploadFile:
 
         try:
             mock_pool = MagicMock()
-            mock_pool.upload_file = AsyncMock()
+            mock_pool.upload_file = AsyncMock(return_value=SFTPTransferStats(12, 12, 0.1))
             mock_shared_context.get_ssh_pool = AsyncMock(return_value=mock_pool)
 
             result = await upload_file(
@@ -905,7 +906,7 @@ class TestUploadFile:
 
         try:
             mock_pool = MagicMock()
-            mock_pool.upload_file = AsyncMock()
+            mock_pool.upload_file = AsyncMock(return_value=SFTPTransferStats(12, 12, 0.1))
             mock_shared_context.get_ssh_pool = AsyncMock(return_value=mock_pool)
 
             result = await upload_file(
@@ -971,7 +972,7 @@ class TestDownloadFile:
             local_path.write_text("downloaded content")
 
             mock_pool = MagicMock()
-            mock_pool.download_file = AsyncMock()
+            mock_pool.download_file = AsyncMock(return_value=SFTPTransferStats(12, 12, 0.1))
             mock_shared_context.get_ssh_pool = AsyncMock(return_value=mock_pool)
 
             result = await download_file(
@@ -985,7 +986,7 @@ class TestDownloadFile:
     async def test_download_file_default_local_path(self, mock_shared_context: MagicMock) -> None:
         """Test download with default local path."""
         mock_pool = MagicMock()
-        mock_pool.download_file = AsyncMock()
+        mock_pool.download_file = AsyncMock(return_value=SFTPTransferStats(12, 12, 0.1))
         mock_shared_context.get_ssh_pool = AsyncMock(return_value=mock_pool)
 
         # Mock the file being created